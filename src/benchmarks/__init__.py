@@ -0,0 +1,32 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy wydajności programu `transactions2pln`.
+
+Testy wydajności nie są częścią testów automatycznych, gdyż ich wyniki
+zależą od komputera, na którym są wykonywane. Uruchamia się je poleceniem
+`python -m benchmarks.run` w katalogu `src/`.
+
+Zawiera następujące moduły:
+`generate` -- Generator syntetycznych plików z transakcjami i archiwalnych
+tabel kursów NBP.
+`run` -- Program mierzący wydajność przetwarzania wygenerowanych plików
+i zapisujący wyniki.
+`startup` -- Program mierzący czas uruchamiania programu i czas importu
+modułów.
+"""
@@ -0,0 +1,312 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Generator syntetycznych danych do testów wydajności.
+
+Generuje pliki z transakcjami o zadanej liczbie wierszy, szerokości kolumn,
+udziale walut i zakresie lat, a także pełne archiwalne tabele kursów NBP
+w formacie publikowanym przez NBP, tak by testy nie wymagały połączenia
+z siecią. Może być uruchomiony jako program poleceniem
+`python -m benchmarks.generate`.
+
+Zawiera następujące funkcje:
+`parse_currencies` -- Funkcja odczytująca opis udziału walut w transakcjach.
+`parse_years` -- Funkcja odczytująca zakres lat.
+`generate_nbp_archive` -- Funkcja zapisująca plik z archiwalną tabelą
+kursów NBP za dany rok.
+`generate_nbp_archives` -- Funkcja zapisująca pliki z tabelami kursów
+potrzebnymi do przetworzenia transakcji z danych lat.
+`generate_transactions` -- Funkcja zapisująca plik z transakcjami.
+`main` -- Funkcja uruchamiająca generator jako program wiersza poleceń.
+"""
+import csv
+import os
+import random
+import sys
+import typing
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from datetime import date, timedelta
+
+from transactions2pln.utils import TablesManager
+
+# Domyślny udział walut w transakcjach, w formacie przyjmowanym przez
+# funkcję `parse_currencies()`. Zawiera waluty z tabel A i B.
+DEFAULT_CURRENCIES: str = 'USD:40,EUR:30,GBP:10,CHF:10,JPY:5,AED:5'
+# Format dat w generowanych plikach z transakcjami.
+DATE_FORMAT: str = '%Y-%m-%d'
+# Nagłówki kolumn w generowanych plikach z transakcjami.
+LABELS: list[str] = ['ID', 'Name', 'Symbol', 'Date', 'Currency', 'Value']
+
+# Liczba wierszy zapisywanych naraz do pliku z transakcjami.
+_BATCH_SIZE: int = 10000
+
+
+def parse_currencies(value: str) -> dict[str, int]:
+	"""Odczytuje opis udziału walut w transakcjach.
+
+	Funkcja przyjmuje jeden argument, `value`, będący listą kodów walut
+	oddzielonych przecinkami, gdzie po każdym kodzie może wystąpić
+	dwukropek i waga (domyślnie 1). Zamiast kodu waluty można podać
+	oznaczenie tabeli NBP poprzedzone znakiem `@` (np. `@a`), co oznacza
+	wszystkie waluty z tej tabeli z podaną wagą.
+
+	Zwraca słownik, w którym kluczami są kody walut a wartościami wagi.
+	"""
+	weights: dict[str, int] = {}
+	for item in value.split(','):
+		code, _, weight = item.strip().partition(':')
+		try:
+			weight_value: int = int(weight or '1')
+			assert weight_value > 0
+		except (AssertionError, ValueError) as err:
+			raise ArgumentTypeError(
+				f"nieprawidłowa waga waluty '{item}'.") from err
+		codes: typing.Iterable[str]
+		if code.startswith('@'):
+			if code[1:] not in TablesManager.CURRENCY_MAP:
+				raise ArgumentTypeError(f"nieznana tabela NBP '{code[1:]}'.")
+			codes = sorted(TablesManager.CURRENCY_MAP[code[1:]])
+		else:
+			try:
+				TablesManager.get_table_mark(code)
+			except ValueError as err:
+				raise ArgumentTypeError(str(err)) from err
+			codes = (code,)
+		for currency in codes:
+			weights[currency] = weight_value
+	return weights
+
+
+def parse_years(value: str) -> range:
+	"""Odczytuje zakres lat podany jako jeden rok (`2023`) albo pierwszy
+	i ostatni rok oddzielone myślnikiem (`2021-2023`)."""
+	first, _, last = value.partition('-')
+	try:
+		years: range = range(int(first), int(last or first) + 1)
+		assert years
+	except (AssertionError, ValueError) as err:
+		raise ArgumentTypeError(
+			f"nieprawidłowy zakres lat '{value}'.") from err
+	return years
+
+
+def generate_nbp_archive(
+		path: str,
+		table: str,
+		year: int,
+		seed: int = 0,
+	) -> None:
+	"""Zapisuje plik z archiwalną tabelą kursów NBP za dany rok.
+
+	Funkcja przyjmuje następujące argumenty:
+	`path` -- Ścieżka do zapisywanego pliku.
+	`table` -- Oznaczenie tabeli NBP, klucz słownika
+	`utils.TablesManager.CURRENCY_MAP`.
+	`year` -- Rok, którego dotyczy tabela.
+	`seed` -- Opcjonalnie, wartość inicjalizująca generator liczb losowych.
+
+	Plik zawiera kursy wszystkich walut z danej tabeli dla każdego dnia
+	roboczego. W rzeczywistości NBP publikuje tabelę B raz w tygodniu, ale
+	program przyjmuje kursy najwyżej sprzed 3 dni, więc wygenerowana tabela
+	jest publikowana codziennie - inaczej większość transakcji w walutach
+	z tabeli B nie mogłaby zostać przetworzona.
+	"""
+	rng: random.Random = random.Random(f'{seed}-{table}-{year}')
+	currencies: list[str] = sorted(TablesManager.CURRENCY_MAP[table])
+	rates: list[float] = [rng.uniform(0.01, 10) for _ in currencies]
+	with open(path, 'w', encoding='cp1250', newline='') as f:
+		f.write(
+			'data;' + ''.join(f'1{c};' for c in currencies)
+			+ 'nr tabeli;pełny numer tabeli;\r\n'
+		)
+		f.write(';' + ''.join(f'{c};' for c in currencies) + '\r\n')
+		day: date = date(year, 1, 1)
+		number: int = 0
+		while day.year == year:
+			if day.weekday() < 5:
+				number += 1
+				rates = [rate * rng.uniform(0.99, 1.01) for rate in rates]
+				f.write(
+					day.strftime('%Y%m%d;')
+					+ ''.join(f'{rate:.4f};'.replace('.', ',') for rate in rates)
+					+ f'{number};{number:03}/{table.upper()}/NBP/{year}\r\n'
+				)
+			day += timedelta(1)
+		f.write('\r\n')
+		f.write('kod ISO;' + ''.join(f'{c};' for c in currencies) + '\r\n')
+		f.write('nazwa waluty;' + ''.join(f'{c};' for c in currencies) + '\r\n')
+		f.write('liczba jednostek;' + '1;' * len(currencies) + '\r\n')
+
+
+def generate_nbp_archives(
+		directory: str,
+		currencies: typing.Iterable[str],
+		years: range,
+		seed: int = 0,
+	) -> list[str]:
+	"""Zapisuje pliki z tabelami kursów potrzebnymi do przetworzenia
+	transakcji w podanych walutach z podanych lat.
+
+	Pliki są zapisywane w katalogu `directory` pod nazwami takimi, jak
+	w archiwum NBP. Generowane są również tabele z roku poprzedzającego
+	pierwszy rok z `years`, gdyż kursy z pierwszych dni stycznia mogą
+	pochodzić z poprzedniego roku. Istniejące pliki nie są zapisywane
+	ponownie. Zwraca listę ścieżek do plików.
+	"""
+	tables: set[str] = {
+		TablesManager.get_table_mark(currency) for currency in currencies}
+	paths: list[str] = []
+	for table in sorted(tables):
+		for year in range(years.start - 1, years.stop):
+			path: str = os.path.join(
+				directory, f'archiwum_tab_{table}_{year}.csv')
+			if not os.path.exists(path):
+				generate_nbp_archive(path, table, year, seed)
+			paths.append(path)
+	return paths
+
+
+def generate_transactions(
+		path: str,
+		rows: int,
+		currencies: dict[str, int],
+		years: range,
+		width: int = 20,
+		seed: int = 0,
+	) -> None:
+	"""Zapisuje plik CSV z transakcjami.
+
+	Funkcja przyjmuje następujące argumenty:
+	`path` -- Ścieżka do zapisywanego pliku.
+	`rows` -- Liczba wierszy z transakcjami.
+	`currencies` -- Słownik, w którym kluczami są kody walut, a wartościami
+	ich wagi, jak zwracany przez funkcję `parse_currencies()`.
+	`years` -- Zakres lat, z których pochodzą daty transakcji.
+	`width` -- Opcjonalnie, szerokość kolumny z nazwą kontrahenta, w znakach.
+	`seed` -- Opcjonalnie, wartość inicjalizująca generator liczb losowych.
+
+	Plik zawiera nagłówki `LABELS`, a daty zapisane są w formacie
+	`DATE_FORMAT`.
+	"""
+	rng: random.Random = random.Random(seed)
+	first_day: int = date(years.start, 1, 1).toordinal()
+	days: int = date(years.stop, 1, 1).toordinal() - first_day
+	codes: list[str] = list(currencies)
+	weights: list[int] = list(currencies.values())
+	names: list[str] = [
+		f'Company {i:02} '.ljust(width, 'x')[:width] for i in range(100)]
+	with open(path, 'w', newline='') as f:
+		writer: typing.Any = csv.writer(f)
+		writer.writerow(LABELS)
+		written: int = 0
+		while written < rows:
+			count: int = min(_BATCH_SIZE, rows - written)
+			writer.writerows(
+				[
+					str(written + i + 1),
+					rng.choice(names),
+					f'S{rng.randrange(1000):03}',
+					date.fromordinal(
+						first_day + rng.randrange(days)).strftime(DATE_FORMAT),
+					currency,
+					f'{rng.randrange(1, 10000000) / 100:.2f}',
+				]
+				for i, currency in enumerate(
+					rng.choices(codes, weights, k=count))
+			)
+			written += count
+
+
+def main(argv: list[str]|None = None) -> int:
+	"""Uruchamia generator jako program wiersza poleceń.
+
+	Przyjmuje jeden opcjonalny argument, `argv`, będący listą argumentów
+	wiersza poleceń (domyślnie: `sys.argv[1:]`). Zwraca 0.
+	"""
+	argparser: ArgumentParser = ArgumentParser(
+		prog="python -m benchmarks.generate",
+		description="""
+			Generuje plik z transakcjami i archiwalne tabele kursów NBP
+			do testów wydajności.
+		""",
+	)
+	argparser.add_argument(
+		'directory',
+		help="Katalog, w którym zapisywane są wygenerowane pliki.",
+	)
+	argparser.add_argument(
+		'-r', '--rows',
+		default=10000,
+		type=int,
+		help="Liczba wierszy z transakcjami. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'-c', '--currencies',
+		default=parse_currencies(DEFAULT_CURRENCIES),
+		type=parse_currencies,
+		help=f"""
+			Waluty transakcji z wagami, np. USD:3,EUR:1. Zapis @a oznacza
+			wszystkie waluty z tabeli A. Domyślnie: {DEFAULT_CURRENCIES}.
+		""",
+	)
+	argparser.add_argument(
+		'-y', '--years',
+		default=parse_years('2022-2023'),
+		type=parse_years,
+		help="Zakres lat, z których pochodzą transakcje. Domyślnie: 2022-2023.",
+	)
+	argparser.add_argument(
+		'-w', '--width',
+		default=20,
+		type=int,
+		help="""
+			Szerokość kolumny z nazwą kontrahenta, w znakach.
+			Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'-s', '--seed',
+		default=0,
+		type=int,
+		help="""
+			Wartość inicjalizująca generator liczb losowych.
+			Domyślnie: %(default)s.
+		""",
+	)
+	args: Namespace = argparser.parse_args(argv)
+
+	os.makedirs(args.directory, exist_ok=True)
+	transactions_path: str = os.path.join(args.directory, 'transactions.csv')
+	generate_transactions(
+		transactions_path,
+		args.rows,
+		args.currencies,
+		args.years,
+		args.width,
+		args.seed,
+	)
+	print(transactions_path)
+	for path in generate_nbp_archives(
+		args.directory, args.currencies, args.years, args.seed,
+	):
+		print(path)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
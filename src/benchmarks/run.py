@@ -0,0 +1,369 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Program mierzący wydajność programu `transactions2pln`.
+
+Dla każdej podanej liczby wierszy generuje plik z transakcjami i tabele
+kursów NBP, po czym mierzy czas przetwarzania i szczytowe zużycie pamięci
+w formatach CSV i JSON, przy zimnych (pobieranych) i ciepłych (obecnych
+w pamięci podręcznej) tabelach kursów. Każdy pomiar odbywa się w osobnym
+procesie. Wyniki są dopisywane do pliku JSON i porównywane z poprzednim
+wynikiem z tego samego komputera, dzięki czemu widoczne są regresje
+pomiędzy wersjami programu. Uruchamiany poleceniem `python -m benchmarks.run`.
+
+Zawiera następujące funkcje:
+`run_scenario` -- Funkcja mierząca jednokrotne przetworzenie pliku.
+`main` -- Funkcja uruchamiająca testy wydajności jako program wiersza
+poleceń.
+"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import typing
+import zlib
+from argparse import SUPPRESS, ArgumentParser, Namespace
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks import generate
+
+# Domyślna ścieżka pliku z wynikami.
+DEFAULT_RESULTS: str = os.path.join(os.path.dirname(__file__), 'results.json')
+FORMATS: tuple[str, ...] = ('csv', 'json')
+TABLES: tuple[str, ...] = ('cold', 'warm')
+
+Result = dict[str, typing.Any]
+
+
+def _peak_memory() -> int|None:
+	# Zwraca szczytowe zużycie pamięci bieżącego procesu w bajtach, albo
+	# `None` jeśli system go nie udostępnia.
+	try:
+		import resource
+	except ImportError:
+		return # type: ignore[return-value]
+	peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux podaje wartość w kilobajtach, macOS - w bajtach.
+	return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _run_child(spec: Result) -> Result:
+	# Wykonywane w procesie potomnym - uruchamia program z podanymi
+	# argumentami i zwraca czas wykonania i zużycie pamięci.
+	from transactions2pln import script, utils
+	utils.TablesManager.DOWNLOAD_URL = spec['url']
+	sys.argv = ['transactions2pln'] + spec['args']
+	start: float = time.perf_counter()
+	code: int = script.run()
+	seconds: float = time.perf_counter() - start
+	return {'code': code, 'seconds': seconds, 'peak_memory': _peak_memory()}
+
+
+def run_scenario(
+		input_path: str,
+		nbp_dir: str,
+		cache_dir: str,
+		output_path: str,
+		output_format: str,
+		extra_args: typing.Sequence[str] = (),
+	) -> Result:
+	"""Mierzy jednokrotne przetworzenie pliku z transakcjami.
+
+	Funkcja przyjmuje następujące argumenty:
+	`input_path` -- Ścieżka do pliku wygenerowanego przez funkcję
+	`generate.generate_transactions()`.
+	`nbp_dir` -- Katalog z tabelami kursów, z którego są one pobierane
+	zamiast z serwera NBP.
+	`cache_dir` -- Katalog pamięci podręcznej tabel kursów.
+	`output_path` -- Ścieżka do pliku wyjściowego, usuwanego po pomiarze.
+	`output_format` -- Format wyjściowy, jeden z `FORMATS`.
+	`extra_args` -- Opcjonalnie, dodatkowe argumenty wiersza poleceń.
+
+	Program jest uruchamiany w osobnym procesie, tak by pomiar pamięci
+	nie obejmował innych pomiarów. Zwraca słownik z czasem wykonania
+	w sekundach (`seconds`) i szczytowym zużyciem pamięci w bajtach
+	(`peak_memory`). Jeżeli program zakończy się błędem, zgłasza wyjątek
+	`RuntimeError`.
+	"""
+	args: list[str] = [
+		input_path,
+		'-o', output_path,
+		'-d', 'Date',
+		'-f', generate.DATE_FORMAT,
+		'-c', 'Currency',
+		'-a', 'Value',
+		'--cache-dir', cache_dir,
+	]
+	if output_format == 'json':
+		args.append('--json')
+	args.extend(extra_args)
+	spec: Result = {
+		'url': Path(nbp_dir).as_uri() + '/archiwum_tab_{table}_{year}.csv',
+		'args': args,
+	}
+	process: subprocess.CompletedProcess[str] = subprocess.run(
+		[sys.executable, '-m', 'benchmarks.run', '--child', json.dumps(spec)],
+		cwd=Path(__file__).parent.parent,
+		capture_output=True,
+		text=True,
+	)
+	try:
+		result: Result = json.loads(process.stdout)
+		assert result['code'] == 0
+	except (AssertionError, ValueError) as err:
+		raise RuntimeError(
+			f"pomiar zakończył się błędem: {process.stderr.strip()}") from err
+	finally:
+		if os.path.exists(output_path):
+			os.remove(output_path)
+	del result['code']
+	return result
+
+
+def _scenario_key(result: Result) -> tuple[typing.Any, ...]:
+	return (
+		result['rows'], result['width'], result['currencies'], result['years'],
+		result['format'], result['tables'], result['extra_args'],
+	)
+
+
+def _load_results(path: str) -> list[Result]:
+	try:
+		with open(path) as f:
+			return list(json.load(f))
+	except FileNotFoundError:
+		return []
+
+
+def _machine() -> str:
+	return f'{platform.node()}/{platform.machine()}/{os.cpu_count()}'
+
+
+def _git_commit() -> str|None:
+	try:
+		return subprocess.run(
+			['git', 'rev-parse', '--short', 'HEAD'],
+			cwd=Path(__file__).parent,
+			capture_output=True,
+			text=True,
+			check=True,
+		).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return # type: ignore[return-value]
+
+
+def _version() -> str|None:
+	try:
+		return metadata.version('transactions2pln')
+	except metadata.PackageNotFoundError:
+		return # type: ignore[return-value]
+
+
+def _print_results(results: list[Result], previous: list[Result]) -> None:
+	# Wypisuje tabelę wyników wraz ze zmianą przepustowości względem
+	# ostatniego z poprzednich pomiarów tego samego scenariusza.
+	previous_map: dict[tuple[typing.Any, ...], Result] = {
+		_scenario_key(result): result for result in previous}
+	print(
+		f"{'wiersze':>10} {'format':>6} {'tabele':>6} {'czas [s]':>9} "
+		f"{'wiersze/s':>10} {'MB/s':>7} {'pamięć [MiB]':>12} {'zmiana':>7}"
+	)
+	for result in results:
+		memory: str = '-'
+		if result['peak_memory'] is not None:
+			memory = f"{result['peak_memory'] / 2**20:.1f}"
+		change: str = '-'
+		old: Result|None = previous_map.get(_scenario_key(result))
+		if old is not None:
+			change = f"{result['rows_per_s'] / old['rows_per_s'] - 1:+.1%}"
+		print(
+			f"{result['rows']:>10} {result['format']:>6} {result['tables']:>6} "
+			f"{result['seconds']:>9.3f} {result['rows_per_s']:>10.0f} "
+			f"{result['mb_per_s']:>7.2f} {memory:>12} {change:>7}"
+		)
+
+
+def main(argv: list[str]|None = None) -> int:
+	"""Uruchamia testy wydajności jako program wiersza poleceń.
+
+	Przyjmuje jeden opcjonalny argument, `argv`, będący listą argumentów
+	wiersza poleceń (domyślnie: `sys.argv[1:]`). Zwraca 0.
+	"""
+	argparser: ArgumentParser = ArgumentParser(
+		prog="python -m benchmarks.run",
+		description="Mierzy wydajność programu transactions2pln.",
+	)
+	argparser.add_argument(
+		'-r', '--rows',
+		default=[10000, 100000],
+		type=int,
+		nargs='+',
+		help="""
+			Liczby wierszy w testowanych plikach z transakcjami.
+			Domyślnie: 10000 100000.
+		""",
+	)
+	argparser.add_argument(
+		'-c', '--currencies',
+		default=generate.DEFAULT_CURRENCIES,
+		help=f"""
+			Waluty transakcji z wagami, w formacie takim jak
+			w benchmarks.generate. Domyślnie: {generate.DEFAULT_CURRENCIES}.
+		""",
+	)
+	argparser.add_argument(
+		'-y', '--years',
+		default='2022-2023',
+		help="Zakres lat, z których pochodzą transakcje. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'-w', '--width',
+		default=20,
+		type=int,
+		help="""
+			Szerokość kolumny z nazwą kontrahenta, w znakach.
+			Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'-n', '--repeat',
+		default=3,
+		type=int,
+		help="""
+			Liczba powtórzeń każdego pomiaru - zapisywany jest najlepszy
+			wynik. Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'-a', '--args',
+		default='',
+		help="""
+			Dodatkowe argumenty przekazywane programowi, oddzielone spacjami,
+			np. "--workers 4".
+		""",
+	)
+	argparser.add_argument(
+		'--data-dir',
+		help="""
+			Katalog, w którym przechowywane są wygenerowane pliki, by można
+			było użyć ich ponownie. Domyślnie: katalog tymczasowy.
+		""",
+	)
+	argparser.add_argument(
+		'--results',
+		default=DEFAULT_RESULTS,
+		help="Plik JSON, do którego dopisywane są wyniki. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'--no-save',
+		dest='save',
+		action='store_false',
+		help="Nie zapisuj wyników.",
+	)
+	argparser.add_argument('--child', help=SUPPRESS)
+	args: Namespace = argparser.parse_args(argv)
+
+	if args.child:
+		print(json.dumps(_run_child(json.loads(args.child))))
+		return 0
+
+	currencies: dict[str, int] = generate.parse_currencies(args.currencies)
+	years: range = generate.parse_years(args.years)
+	extra_args: list[str] = args.args.split()
+	tmpdir: TemporaryDirectory = TemporaryDirectory() # type: ignore[type-arg]
+	data_dir: str = args.data_dir or tmpdir.name
+	nbp_dir: str = os.path.join(data_dir, 'nbp')
+	os.makedirs(nbp_dir, exist_ok=True)
+	generate.generate_nbp_archives(nbp_dir, currencies, years)
+
+	output_path: str = os.path.join(tmpdir.name, 'output')
+	results: list[Result] = []
+	try:
+		for rows in args.rows:
+			input_path: str = os.path.join(
+				data_dir,
+				f'transactions_{rows}_{args.width}_{args.years}_'
+				f'{zlib.crc32(args.currencies.encode()):08x}.csv',
+			)
+			if not os.path.exists(input_path):
+				generate.generate_transactions(
+					input_path, rows, currencies, years, args.width)
+			size: int = os.path.getsize(input_path)
+			for output_format in FORMATS:
+				for tables in TABLES:
+					cache_dir: str = os.path.join(tmpdir.name, 'cache', tables)
+					measures: list[Result] = []
+					for _ in range(max(args.repeat, 1)):
+						if tables == 'cold':
+							shutil.rmtree(cache_dir, ignore_errors=True)
+						elif not os.path.exists(cache_dir):
+							# Przebieg wypełniający pamięć podręczną nie jest mierzony.
+							run_scenario(
+								input_path, nbp_dir, cache_dir, output_path, output_format,
+								extra_args)
+						measures.append(run_scenario(
+							input_path, nbp_dir, cache_dir, output_path, output_format,
+							extra_args))
+					best: Result = min(measures, key=lambda m: m['seconds'])
+					results.append({
+						'rows': rows,
+						'width': args.width,
+						'currencies': args.currencies,
+						'years': args.years,
+						'format': output_format,
+						'tables': tables,
+						'extra_args': args.args,
+						'seconds': best['seconds'],
+						'rows_per_s': rows / best['seconds'],
+						'mb_per_s': size / 2**20 / best['seconds'],
+						'peak_memory': max(
+							m['peak_memory'] or 0 for m in measures) or None,
+					})
+	finally:
+		tmpdir.cleanup()
+
+	saved: list[Result] = _load_results(args.results)
+	machine: str = _machine()
+	previous: list[Result] = []
+	for entry in saved:
+		if entry['machine'] == machine:
+			previous.extend(entry['results'])
+	_print_results(results, previous)
+	if args.save:
+		saved.append({
+			'date': datetime.now().isoformat(timespec='seconds'),
+			'version': _version(),
+			'commit': _git_commit(),
+			'python': platform.python_version(),
+			'machine': machine,
+			'results': results,
+		})
+		with open(args.results, 'w') as f:
+			json.dump(saved, f, indent='\t')
+			f.write('\n')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
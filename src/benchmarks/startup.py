@@ -0,0 +1,306 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Program mierzący czas uruchamiania programu `transactions2pln`.
+
+Program bywa uruchamiany wielokrotnie, np. w pętlach skryptów powłoki, dla
+małych plików - wtedy czas jego wykonania zależy głównie od czasu
+uruchomienia interpretera i importu modułów. Ten program mierzy czas
+wykonania polecenia `transactions2pln -h` oraz przetworzenia małego pliku
+przy tabelach kursów obecnych w pamięci podręcznej, a także czas importu
+modułów zgłaszany przez interpreter uruchomiony z opcją `-X importtime`
+(równoważną zmiennej środowiskowej `PYTHONPROFILEIMPORTTIME`, dzięki czemu
+pomiar jest możliwy również dla pliku wykonywalnego zbudowanego przez
+cx_Freeze). Czas importu modułów paczki `transactions2pln` jest porównywany
+z budżetem, a wyniki dopisywane do pliku JSON, jak w programie
+`benchmarks.run`.
+Uruchamiany poleceniem `python -m benchmarks.startup`.
+
+Zawiera następujące funkcje:
+`parse_importtime` -- Funkcja odczytująca raport o czasie importu modułów.
+`measure` -- Funkcja mierząca czas wykonania polecenia.
+`main` -- Funkcja uruchamiająca pomiary jako program wiersza poleceń.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks import generate
+from benchmarks.run import (
+	Result,
+	_git_commit,
+	_load_results,
+	_machine,
+	_version,
+)
+
+# Domyślna ścieżka pliku z wynikami.
+DEFAULT_RESULTS: str = os.path.join(
+	os.path.dirname(__file__), 'startup_results.json')
+# Domyślny budżet czasu importu modułów paczki `transactions2pln` (wraz
+# z importowanymi przez nie modułami), w milisekundach.
+DEFAULT_BUDGET: float = 30.0
+# Moduły, które są importowane dopiero w razie potrzeby i nie powinny być
+# importowane przy wyświetlaniu pomocy ani przetwarzaniu małego pliku przy
+# tabelach kursów obecnych w pamięci podręcznej.
+LAZY_MODULES: tuple[str, ...] = (
+	'asyncio',
+	'cProfile',
+	'concurrent.futures',
+	'hashlib',
+	'http.client',
+	'multiprocessing',
+	'tempfile',
+	'urllib.request',
+)
+SCENARIOS: tuple[str, ...] = ('help', 'small')
+
+
+def parse_importtime(report: str) -> tuple[dict[str, float], set[str]]:
+	"""Odczytuje raport o czasie importu modułów.
+
+	Funkcja przyjmuje jeden argument, `report`, będący zawartością
+	standardowego strumienia błędów interpretera uruchomionego z opcją
+	`-X importtime`. Zwraca parę, w której pierwszym elementem jest słownik
+	z czasem importu w sekundach modułów importowanych bezpośrednio, wraz
+	z importowanymi przez nie modułami, a drugim - zbiór nazw wszystkich
+	zaimportowanych modułów.
+	"""
+	times: dict[str, float] = {}
+	modules: set[str] = set()
+	for line in report.splitlines():
+		if not line.startswith('import time:'):
+			continue
+		fields: list[str] = line[len('import time:'):].split('|')
+		if len(fields) != 3 or not fields[1].strip().isdigit():
+			continue
+		name: str = fields[2][1:]
+		modules.add(name.strip())
+		# Moduły importowane przez inne moduły są wcięte, a ich czas jest
+		# już wliczony w czas modułu importującego.
+		if not name.startswith(' '):
+			times[name] = int(fields[1]) / 1e6
+	return times, modules
+
+
+def measure(
+		command: list[str],
+		cwd: str|None = None,
+		repeat: int = 1,
+	) -> Result:
+	"""Mierzy czas wykonania polecenia.
+
+	Funkcja przyjmuje następujące argumenty:
+	`command` -- Polecenie wraz z argumentami, jak w funkcji
+	`subprocess.run()`.
+	`cwd` -- Opcjonalnie, katalog roboczy polecenia.
+	`repeat` -- Opcjonalnie, liczba powtórzeń pomiaru - zwracany jest
+	najlepszy wynik.
+
+	Zwraca słownik z czasem wykonania polecenia (`seconds`), łącznym
+	czasem importu modułów (`import_seconds`) i czasem importu modułów paczki
+	`transactions2pln` (`package_seconds`) w sekundach, a także listą
+	zaimportowanych modułów z `LAZY_MODULES` (`lazy_modules`). Jeżeli
+	polecenie zakończy się błędem, zgłasza wyjątek `RuntimeError`.
+	"""
+	env: dict[str, str] = dict(os.environ, PYTHONPROFILEIMPORTTIME='1')
+	seconds: list[float] = []
+	import_seconds: list[float] = []
+	package_seconds: list[float] = []
+	modules: set[str] = set()
+	for _ in range(max(repeat, 1)):
+		start: float = time.perf_counter()
+		process: subprocess.CompletedProcess[str] = subprocess.run(
+			command, cwd=cwd, env=env, capture_output=True, text=True)
+		seconds.append(time.perf_counter() - start)
+		if process.returncode != 0:
+			raise RuntimeError(
+				f"pomiar zakończył się błędem: {process.stderr.strip()}")
+		times: dict[str, float]
+		times, modules = parse_importtime(process.stderr)
+		import_seconds.append(sum(times.values()))
+		package_seconds.append(sum(
+			value for name, value in times.items()
+			if name.partition('.')[0] == 'transactions2pln'
+		))
+	return {
+		'seconds': min(seconds),
+		'import_seconds': min(import_seconds),
+		'package_seconds': min(package_seconds),
+		'lazy_modules': sorted(modules.intersection(LAZY_MODULES)),
+	}
+
+
+def _print_results(
+		results: list[Result],
+		previous: list[Result],
+		budget: float,
+	) -> None:
+	# Wypisuje tabelę wyników wraz ze zmianą czasu wykonania względem
+	# ostatniego z poprzednich pomiarów tego samego scenariusza.
+	previous_map: dict[tuple[str, str], Result] = {
+		(result['scenario'], result['command']): result for result in previous}
+	print(
+		f"{'scenariusz':>10} {'czas [ms]':>10} {'import [ms]':>12} "
+		f"{'paczka [ms]':>12} {'budżet':>7} {'zmiana':>7}"
+	)
+	for result in results:
+		change: str = '-'
+		old: Result|None = previous_map.get(
+			(result['scenario'], result['command']))
+		if old is not None:
+			change = f"{result['seconds'] / old['seconds'] - 1:+.1%}"
+		within: str = (
+			"OK" if result['package_seconds'] * 1000 <= budget else "PRZEKR.")
+		print(
+			f"{result['scenario']:>10} {result['seconds'] * 1000:>10.1f} "
+			f"{result['import_seconds'] * 1000:>12.1f} "
+			f"{result['package_seconds'] * 1000:>12.1f} {within:>7} "
+			f"{change:>7}"
+		)
+		if result['lazy_modules']:
+			print(
+				f"{'':>10} zaimportowane moduły: "
+				f"{', '.join(result['lazy_modules'])}"
+			)
+
+
+def main(argv: list[str]|None = None) -> int:
+	"""Uruchamia pomiary czasu uruchamiania jako program wiersza poleceń.
+
+	Przyjmuje jeden opcjonalny argument, `argv`, będący listą argumentów
+	wiersza poleceń (domyślnie: `sys.argv[1:]`). Zwraca 0, jeżeli czas
+	importu modułów paczki `transactions2pln` mieści się w budżecie i nie
+	zostały zaimportowane moduły z `LAZY_MODULES`, a w przeciwnym razie 1.
+	"""
+	argparser: ArgumentParser = ArgumentParser(
+		prog="python -m benchmarks.startup",
+		description="Mierzy czas uruchamiania programu transactions2pln.",
+	)
+	argparser.add_argument(
+		'-e', '--executable',
+		help="""
+			Ścieżka do pliku wykonywalnego programu, np. zbudowanego przez
+			cx_Freeze. Domyślnie: program jest uruchamiany poleceniem
+			"python -m transactions2pln" w bieżącym interpreterze.
+		""",
+	)
+	argparser.add_argument(
+		'-n', '--repeat',
+		default=10,
+		type=int,
+		help="""
+			Liczba powtórzeń każdego pomiaru - zapisywany jest najlepszy
+			wynik. Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'-b', '--budget',
+		default=DEFAULT_BUDGET,
+		type=float,
+		help="""
+			Budżet czasu importu modułów paczki transactions2pln w każdym
+			scenariuszu, w milisekundach. Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'--results',
+		default=DEFAULT_RESULTS,
+		help="Plik JSON, do którego dopisywane są wyniki. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'--no-save',
+		dest='save',
+		action='store_false',
+		help="Nie zapisuj wyników.",
+	)
+	args: Namespace = argparser.parse_args(argv)
+
+	command: list[str] = [sys.executable, '-m', 'transactions2pln']
+	if args.executable:
+		command = [os.path.abspath(args.executable)]
+	cwd: str = str(Path(__file__).parent.parent)
+	results: list[Result] = []
+	with TemporaryDirectory() as tmpdir:
+		# Pliki z tabelami kursów mają nazwy takie, jak w pamięci podręcznej,
+		# a tabele za zamknięte lata nie są pobierane ponownie.
+		currencies: dict[str, int] = generate.parse_currencies(
+			generate.DEFAULT_CURRENCIES)
+		years: range = generate.parse_years('2022')
+		cache_dir: str = os.path.join(tmpdir, 'cache')
+		os.mkdir(cache_dir)
+		generate.generate_nbp_archives(cache_dir, currencies, years)
+		input_path: str = os.path.join(tmpdir, 'transactions.csv')
+		generate.generate_transactions(input_path, 10, currencies, years)
+		scenarios: dict[str, list[str]] = {
+			'help': ['-h'],
+			'small': [
+				input_path,
+				'-o', os.path.join(tmpdir, 'output.csv'),
+				'-d', 'Date',
+				'-f', generate.DATE_FORMAT,
+				'-c', 'Currency',
+				'-a', 'Value',
+				'--cache-dir', cache_dir,
+			],
+		}
+		for scenario in SCENARIOS:
+			result: Result = measure(
+				command + scenarios[scenario], cwd, args.repeat)
+			results.append({
+				'scenario': scenario,
+				'command': 'executable' if args.executable else 'python',
+				**result,
+			})
+
+	saved: list[Result] = _load_results(args.results)
+	machine: str = _machine()
+	previous: list[Result] = []
+	for entry in saved:
+		if entry['machine'] == machine:
+			previous.extend(entry['results'])
+	_print_results(results, previous, args.budget)
+	if args.save:
+		saved.append({
+			'date': datetime.now().isoformat(timespec='seconds'),
+			'version': _version(),
+			'commit': _git_commit(),
+			'python': platform.python_version(),
+			'machine': machine,
+			'budget': args.budget,
+			'results': results,
+		})
+		with open(args.results, 'w') as f:
+			json.dump(saved, f, indent='\t')
+			f.write('\n')
+	return int(any(
+		result['package_seconds'] * 1000 > args.budget
+		or result['lazy_modules']
+		for result in results
+	))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
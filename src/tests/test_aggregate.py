@@ -0,0 +1,114 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `aggregate`.
+
+Zawiera następujące klasy:
+`AggregatorTestCase` -- Testy obiektów klasy `aggregate.Aggregator`.
+"""
+from unittest import TestCase
+
+from transactions2pln.aggregate import Aggregator
+from transactions2pln.utils import DateParser
+
+
+class AggregatorTestCase(TestCase):
+	"""Testy obiektów klasy `aggregate.Aggregator`.
+
+	Zawiera metody testujące poprawność obiektów klasy `aggregate.Aggregator`.
+	Udostępnia następujące atrybuty:
+	`ROWS` -- Lista przetworzonych wierszy używanych w testach.
+	`test_total` -- Metoda testująca sumowanie wszystkich wierszy.
+	`test_group` -- Metoda testująca sumowanie w grupach wyznaczonych
+	kolumnami.
+	`test_period` -- Metoda testująca sumowanie w okresach.
+	`test_exact` -- Metoda testująca dokładność sumowania.
+	`test_labels` -- Metoda testująca nagłówki kolumn wyników.
+	`test_invalid_period` -- Metoda testująca obsługę nieznanego okresu.
+	"""
+	ROWS: list[list[str]] = [
+		['Acme Corp', '2023/04/21', 'AUD', '1563.87', '2,8094', '4393,54'],
+		['Acme Corp', '2023/05/02', 'USD', '4356.12', '4,1823', '18218,6'],
+		['Theta', '2023/04/26', 'USD', '1893.65', '4,1557', '7869,44'],
+		['Acme Corp', '2023/05/08', 'USD', '947.21', '4,1801', '3959,43'],
+	]
+
+	def test_total(self) -> None:
+		"""Testuje sumowanie wszystkich wierszy w jednej grupie."""
+		aggregator: Aggregator = Aggregator([])
+		aggregator.update(self.ROWS[:2])
+		aggregator.update(self.ROWS[2:])
+		self.assertEqual(
+			list(aggregator.get_rows()),
+			[['4', '34441,01', '3959,43', '18218,6']],
+		)
+
+	def test_group(self) -> None:
+		"""Testuje sumowanie w grupach wyznaczonych wartościami kolumn."""
+		aggregator: Aggregator = Aggregator([0, 2], decimal_point=',')
+		aggregator.update(self.ROWS)
+		self.assertEqual(list(aggregator.get_rows()), [
+			['Acme Corp', 'AUD', '1', '4393,54', '4393,54', '4393,54'],
+			['Acme Corp', 'USD', '2', '22178,03', '3959,43', '18218,6'],
+			['Theta', 'USD', '1', '7869,44', '7869,44', '7869,44'],
+		])
+
+	def test_period(self) -> None:
+		"""Testuje sumowanie w okresach, w których przypadają daty
+		transakcji."""
+		date_parser: DateParser = DateParser('%Y/%m/%d')
+		aggregator: Aggregator = Aggregator([2], 'month', date_parser)
+		aggregator.update(self.ROWS)
+		self.assertEqual(list(aggregator.get_rows()), [
+			['AUD', '2023-04', '1', '4393,54', '4393,54', '4393,54'],
+			['USD', '2023-05', '2', '22178,03', '3959,43', '18218,6'],
+			['USD', '2023-04', '1', '7869,44', '7869,44', '7869,44'],
+		])
+
+		# Wskazana kolumna z datą.
+		aggregator = Aggregator([], 'year', date_parser, 1)
+		aggregator.update(self.ROWS)
+		self.assertEqual(
+			list(aggregator.get_rows()),
+			[['2023', '4', '34441,01', '3959,43', '18218,6']],
+		)
+
+	def test_exact(self) -> None:
+		"""Testuje, czy sumy są obliczane bez zaokrągleń."""
+		aggregator: Aggregator = Aggregator([], decimal_point='.')
+		aggregator.update(
+			[['99999999999999999999.99'], ['0.01'], ['1E+2']] * 2)
+		self.assertEqual(list(aggregator.get_rows()), [[
+			'6', '200000000000000000200.00', '0.01', '99999999999999999999.99',
+		]])
+
+	def test_labels(self) -> None:
+		"""Testuje nagłówki kolumn wyników."""
+		aggregator: Aggregator = Aggregator(
+			[2, 9], 'day', DateParser('%Y/%m/%d'))
+		self.assertEqual(
+			aggregator.get_labels(['a', 'b', 'c']),
+			['c', '10', Aggregator.PERIOD_LABEL, *Aggregator.LABELS],
+		)
+
+	def test_invalid_period(self) -> None:
+		"""Testuje obsługę nieznanego okresu i braku obiektu odczytującego
+		daty."""
+		date_parser: DateParser = DateParser('%Y/%m/%d')
+		self.assertRaises(ValueError, Aggregator, [], 'week', date_parser)
+		self.assertRaises(ValueError, Aggregator, [], 'month')
@@ -0,0 +1,221 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `api`.
+
+Zawiera następujące klasy:
+`ConvertRowsTestCase` -- Testy funkcji `api.convert_rows()` i obiektów
+klasy `api.Rates`.
+`ResolveColumnsTestCase` -- Testy funkcji `api.resolve_columns()`
+i `api.detect_date()`.
+"""
+import asyncio
+import csv
+import decimal
+import locale
+import os
+import shutil
+from datetime import date
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import api, exceptions as exc, utils
+
+
+class ConvertRowsTestCase(TestCase):
+	"""Testy funkcji `api.convert_rows()` i obiektów klasy `api.Rates`.
+
+	Testy są wykonywane przy ustawieniach językowych `C`, by sprawdzić,
+	że wyniki od nich nie zależą. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_convert_rows` -- Metoda testująca przeliczanie wierszy.
+	`test_global_state` -- Metoda testująca, czy funkcja nie zmienia ustawień
+	procesu.
+	`test_errors` -- Metoda testująca zgłaszanie błędów.
+	`test_rates` -- Metoda testująca odczyt pojedynczych kursów.
+	`test_preload` -- Metoda testująca wczytywanie tabel z wybranych lat.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia język `C` i tworzy obiekt klasy `api.Rates`
+		z testową tabelą kursów NBP za 2023 rok. Ustawia następujące atrybuty
+		publiczne:
+		`rates` -- Testowy obiekt klasy `api.Rates`.
+		`rows` -- Lista wierszy z pliku z testowymi danymi z nagłówkami.
+		"""
+		self._locale = locale.setlocale(locale.LC_NUMERIC)
+		locale.setlocale(locale.LC_NUMERIC, 'C')
+		data_dir: str = os.path.join(os.path.dirname(__file__), 'data')
+		self.rates: api.Rates = api.Rates()
+		shutil.copy(
+			os.path.join(data_dir, 'nbp_table.csv'),
+			os.path.join(self.rates._tmpdir.name, 'archiwum_tab_a_2023.csv'),
+		)
+		with open(os.path.join(data_dir, 'transactions_with_labels.csv')) as f:
+			self.rows: list[list[str]] = list(csv.reader(f))
+		with open(
+			os.path.join(data_dir, 'transactions_output.csv'), newline='',
+		) as f:
+			self._output: list[list[str]] = list(csv.reader(f))
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, przywracając ustawienia języka
+		i usuwając katalog roboczy obiektu `rates`."""
+		locale.setlocale(locale.LC_NUMERIC, self._locale)
+		self.rates.close()
+
+	def test_convert_rows(self) -> None:
+		"""Testuje przeliczanie wierszy z nagłówkami i bez nich."""
+		self.assertEqual(
+			list(api.convert_rows(
+				self.rows, self.rates, 'Currency', amount_column='F', labels=True)),
+			[self.rows[0] + list(api.LABELS)] + self._output,
+		)
+		# Kolumny podane jako indeksy, kolumna z datą wykrywana, a wiersze
+		# jako krotki, które nie są zmieniane.
+		rows: list[tuple[str, ...]] = [tuple(row) for row in self.rows[1:]]
+		self.assertEqual(
+			list(api.convert_rows(rows, self.rates, 4, amount_column=5)),
+			self._output,
+		)
+		self.assertEqual(rows[0], tuple(self.rows[1]))
+		# Inny separator dziesiętny i stała waluta.
+		self.assertEqual(
+			next(api.convert_rows(
+				self.rows[1:], self.rates, 'USD', date_column=3,
+				date_format='%Y/%m/%d', decimal_point='.'))[-2:],
+			['4.2151', '26041.86'],
+		)
+		self.assertEqual(
+			list(api.convert_rows([], self.rates, 'USD', labels=True)), [])
+
+	def test_global_state(self) -> None:
+		"""Testuje, czy przeliczanie nie zmienia ustawień językowych
+		ani kontekstu arytmetycznego procesu."""
+		context: decimal.Context = decimal.getcontext()
+		precision: int = context.prec
+		list(api.convert_rows(self.rows[1:], self.rates, 4, precision=20))
+		self.assertEqual('C', locale.setlocale(locale.LC_NUMERIC))
+		self.assertIs(context, decimal.getcontext())
+		self.assertEqual(precision, context.prec)
+
+	def test_errors(self) -> None:
+		"""Testuje zgłaszanie błędów przy pobieraniu wierszy."""
+		rows = api.convert_rows(self.rows, self.rates, 'Waluta', labels=True)
+		self.assertEqual(next(rows), self.rows[0] + list(api.LABELS))
+		self.assertRaises(exc.ColumnParameterError, next, rows)
+
+		data: list[list[str]] = [list(row) for row in self.rows[1:]]
+		data[1][4] = 'XYZ'
+		rows = api.convert_rows(data, self.rates, 'E', amount_column='F')
+		self.assertEqual(next(rows), self._output[0])
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			next(rows)
+		self.assertEqual(cm.exception.row_number, 2)
+
+		self.assertRaises(
+			ValueError,
+			list,
+			api.convert_rows(self.rows[1:], self.rates, 'USD', engine='gpu'),
+		)
+
+	def test_rates(self) -> None:
+		"""Testuje odczyt kursów i zamykanie obiektu `api.Rates`."""
+		with self.rates as rates:
+			self.assertEqual(
+				rates.get_exchange_ratio('USD', date(2023, 4, 18)),
+				decimal.Decimal('4.2151'),
+			)
+			# Dla soboty używany jest kurs z piątku.
+			self.assertEqual(
+				rates.get_exchange_ratio('USD', date(2023, 4, 22)),
+				decimal.Decimal('4.2006'),
+			)
+			self.assertEqual(
+				asyncio.run(
+					rates.get_exchange_ratio_async('USD', date(2023, 4, 18))),
+				decimal.Decimal('4.2151'),
+			)
+		self.assertFalse(os.path.exists(self.rates._tmpdir.name))
+
+	def test_preload(self) -> None:
+		"""Testuje pobieranie i wczytywanie wszystkich tabel z wybranych
+		lat metodą `preload()`."""
+		with (
+			patch.object(self.rates.tables, 'prefetch') as prefetch,
+			patch.object(
+				utils.TablesManager, 'get_dense_table', autospec=True,
+			) as get_dense_table,
+		):
+			self.rates.preload([2022, 2023])
+		self.assertEqual(
+			set(prefetch.call_args.args[0]),
+			{('a', 2022), ('b', 2022), ('a', 2023), ('b', 2023)},
+		)
+		self.assertEqual(
+			{(c.args[1], c.args[0].year) for c in get_dense_table.call_args_list},
+			{('a', 2022), ('b', 2022), ('a', 2023), ('b', 2023)},
+		)
+
+
+class ResolveColumnsTestCase(TestCase):
+	"""Testy funkcji `api.resolve_columns()` i `api.detect_date()`.
+
+	Udostępnia następujące atrybuty:
+	`test_resolve_columns` -- Metoda testująca ustalanie kolumn.
+	`test_detect_date` -- Metoda testująca wykrywanie kolumny z datą.
+	"""
+
+	def test_resolve_columns(self) -> None:
+		"""Testuje ustalanie waluty i indeksów kolumn."""
+		labels: list[str] = ['Date', 'Currency', 'Value', 'EUR']
+		self.assertEqual(
+			api.resolve_columns(labels, 'USD', 'Value', 'A'),
+			('USD', None, 2, 0),
+		)
+		# Kod waluty będący nagłówkiem oznacza kolumnę.
+		self.assertEqual(
+			api.resolve_columns(labels, 'EUR', 2), (None, 3, 2, None))
+		self.assertEqual(api.resolve_columns([], 1), (None, 1, None, None))
+		for args in (
+			(labels, 'Waluta'),
+			(labels, ''),
+			(labels, 'USD', 'Kwota'),
+			(labels, 'USD', None, 'Data'),
+		):
+			with self.subTest(args=args):
+				self.assertRaises(
+					exc.ColumnParameterError, api.resolve_columns, *args)
+
+	def test_detect_date(self) -> None:
+		"""Testuje wykrywanie kolumny z datą i formatu dat."""
+		rows: list[list[str]] = [['1', '2023-04-18'], ['2', '2023-04-19']]
+		detected = api.detect_date(iter(rows))
+		self.assertEqual(list(detected[0]), rows)
+		self.assertEqual(detected[1:], (1, '%Y-%m-%d'))
+		self.assertEqual(
+			api.detect_date(iter(rows), None, '%d.%m.%Y')[1:],
+			(None, '%d.%m.%Y'),
+		)
+		rows_iterator = iter(rows)
+		self.assertIs(
+			api.detect_date(rows_iterator, 0, '%Y')[0], rows_iterator)
@@ -0,0 +1,267 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `batch`.
+
+Zawiera następujące klasy:
+`BatchTestCase` -- Testy przetwarzania wielu plików.
+`RunTestCase` -- Testy uruchamiania przetwarzania jako programu.
+"""
+import gzip
+import json
+import os
+import shutil
+import typing
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import api, batch, exceptions as exc
+from transactions2pln.cache import TablesCache
+
+_DATA_DIR: str = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class BatchTestCase(TestCase):
+	"""Testy funkcji przetwarzających wiele plików.
+
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_expand_paths` -- Metoda testująca rozwijanie wzorców ścieżek.
+	`test_output_paths` -- Metoda testująca ustalanie ścieżek plików
+	wyjściowych.
+	`test_convert_files` -- Metoda testująca przetwarzanie plików w jednym
+	procesie i w puli procesów.
+	`test_convert_json` -- Metoda testująca zapis wyników w formacie JSON.
+	`test_convert_compressed` -- Metoda testująca przetwarzanie plików
+	skompresowanych.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Tworzy katalog tymczasowy z plikami wejściowymi
+		i pamięcią podręczną zawierającą testową tabelę kursów NBP za 2023
+		rok. Ustawia następujące atrybuty publiczne:
+		`tmpdir` -- Ścieżka do katalogu tymczasowego.
+		`inputs` -- Ścieżki do plików wejściowych: poprawnego pliku z danymi,
+		tego samego pliku z nagłówkami i pliku z błędnym wierszem.
+		`rates` -- Obiekt klasy `api.Rates` korzystający z pamięci podręcznej.
+		"""
+		tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.addCleanup(tmpdir.cleanup)
+		self.tmpdir: str = tmpdir.name
+		cache_dir: str = os.path.join(self.tmpdir, 'cache')
+		os.mkdir(cache_dir)
+		shutil.copy(
+			os.path.join(_DATA_DIR, 'nbp_table.csv'),
+			os.path.join(cache_dir, 'archiwum_tab_a_2023.csv'),
+		)
+		input_dir: str = os.path.join(self.tmpdir, 'input')
+		os.mkdir(input_dir)
+		self.inputs: list[str] = [
+			os.path.join(input_dir, name)
+			for name in ('a.csv', 'b.csv', 'c.csv')
+		]
+		shutil.copy(os.path.join(_DATA_DIR, 'transactions.csv'), self.inputs[0])
+		shutil.copy(
+			os.path.join(_DATA_DIR, 'transactions_with_labels.csv'),
+			self.inputs[1],
+		)
+		with open(self.inputs[2], 'w') as f:
+			f.write(
+				'1,A,X,2023/04/18,CAD,"6178.23"\n2,B,Y,2023/04/18,XXX,"1.00"\n')
+		self.rates: api.Rates = api.Rates(TablesCache(cache_dir))
+		self.addCleanup(self.rates.close)
+
+	def _read(self, path: str) -> str:
+		with open(path, newline='') as f:
+			return f.read()
+
+	def test_expand_paths(self) -> None:
+		"""Testuje rozwijanie wzorców ścieżek.
+
+		Pliki pasujące do wzorca powinny zostać zwrócone w kolejności
+		alfabetycznej i bez powtórzeń, a ścieżka, do której nie pasuje żaden
+		plik, bez zmian.
+		"""
+		missing: str = os.path.join(self.tmpdir, 'missing.csv')
+		self.assertEqual(
+			batch.expand_paths([
+				self.inputs[1],
+				os.path.join(self.tmpdir, 'input', '**', '*.csv'),
+				missing,
+			]),
+			[self.inputs[1], self.inputs[0], self.inputs[2], missing],
+		)
+
+	def test_output_paths(self) -> None:
+		"""Testuje ustalanie ścieżek plików wyjściowych."""
+		output_dir: str = os.path.join(self.tmpdir, 'output')
+		self.assertEqual(
+			batch.output_paths(self.inputs[:2], output_dir, 'ndjson'),
+			[
+				os.path.join(output_dir, 'a.ndjson'),
+				os.path.join(output_dir, 'b.ndjson'),
+			],
+		)
+		# Plik wyjściowy jest kompresowany tak jak plik wejściowy.
+		self.assertEqual(
+			batch.output_paths(['dane.csv.gz'], output_dir, 'json'),
+			[os.path.join(output_dir, 'dane.json.gz')],
+		)
+		# Pliki o tej samej nazwie w różnych katalogach.
+		self.assertRaises(
+			ValueError,
+			batch.output_paths,
+			[self.inputs[0], os.path.join(self.tmpdir, 'a.csv')],
+			output_dir,
+		)
+		# Plik wyjściowy zastąpiłby plik wejściowy.
+		self.assertRaises(
+			ValueError,
+			batch.output_paths,
+			self.inputs,
+			os.path.dirname(self.inputs[0]),
+		)
+
+	def test_convert_files(self) -> None:
+		"""Testuje przetwarzanie plików w jednym procesie i w puli procesów.
+
+		Błąd w jednym z plików nie powinien przerywać przetwarzania
+		pozostałych, a wiersze przetworzone przed błędem powinny zostać
+		zapisane.
+		"""
+		expected: str = self._read(
+			os.path.join(_DATA_DIR, 'transactions_output.csv'))
+		for workers in (1, 2):
+			with self.subTest(workers=workers):
+				output_dir: str = os.path.join(self.tmpdir, f'output{workers}')
+				results: list[batch.FileResult] = list(batch.convert_files(
+					[self.inputs[0], self.inputs[2]],
+					output_dir,
+					self.rates,
+					workers=workers,
+					currency='E',
+					date_format='%Y/%m/%d',
+				))
+				self.assertEqual(
+					[result.input for result in results],
+					[self.inputs[0], self.inputs[2]],
+				)
+				self.assertIsNone(results[0].error)
+				self.assertEqual(results[0].rows, 6)
+				self.assertEqual(self._read(results[0].output), expected)
+				self.assertIs(results[1].error_type, exc.RowProcessingError)
+				self.assertIn("wiersza 2", typing.cast(str, results[1].error))
+				self.assertEqual(results[1].rows, 1)
+				self.assertEqual(
+					self._read(results[1].output),
+					'1,A,X,2023/04/18,CAD,6178.23,"3,1533","19481,81"\r\n',
+				)
+
+	def test_convert_json(self) -> None:
+		"""Testuje zapis wyników w formacie JSON."""
+		result: batch.FileResult
+		result, = batch.convert_files(
+			self.inputs[:1],
+			os.path.join(self.tmpdir, 'output'),
+			self.rates,
+			'json',
+			currency='E',
+			date_column='D',
+		)
+		self.assertIsNone(result.error)
+		self.assertTrue(result.output.endswith('a.json'))
+		with (
+			open(result.output) as output,
+			open(os.path.join(_DATA_DIR, 'transactions_output.json')) as expected,
+		):
+			self.assertEqual(json.load(output), json.load(expected))
+
+	def test_convert_compressed(self) -> None:
+		"""Testuje przetwarzanie pliku skompresowanego."""
+		input_path: str = self.inputs[0] + '.gz'
+		with (
+			open(self.inputs[0], 'rb') as input,
+			gzip.open(input_path, 'wb') as f,
+		):
+			shutil.copyfileobj(input, f)
+		result: batch.FileResult
+		result, = batch.convert_files(
+			[input_path],
+			os.path.join(self.tmpdir, 'output'),
+			self.rates,
+			currency='E',
+			date_format='%Y/%m/%d',
+		)
+		self.assertIsNone(result.error)
+		self.assertTrue(result.output.endswith('a.csv.gz'))
+		with gzip.open(result.output, 'rt', newline='') as output:
+			self.assertEqual(
+				output.read(),
+				self._read(os.path.join(_DATA_DIR, 'transactions_output.csv')),
+			)
+
+
+class RunTestCase(TestCase):
+	"""Testy funkcji `batch.run()`.
+
+	Udostępnia następujące atrybuty:
+	`test_run` -- Metoda testująca przetwarzanie plików i podsumowanie.
+	"""
+
+	def test_run(self) -> None:
+		"""Testuje, czy funkcja przetwarza wszystkie pliki, wyświetla
+		podsumowanie i zwraca kod błędu przetwarzania danych, jeśli nie
+		udało się przetworzyć któregoś z plików."""
+		with TemporaryDirectory() as tmpdir:
+			shutil.copy(
+				os.path.join(_DATA_DIR, 'transactions_with_labels.csv'),
+				os.path.join(tmpdir, 'a.csv'),
+			)
+			with open(os.path.join(tmpdir, 'b.csv'), 'w') as f:
+				f.write('ID,Date,Currency,Value\n1,2023/04/18,XXX,"1.00"\n')
+			cache_dir: str = os.path.join(tmpdir, 'cache')
+			os.mkdir(cache_dir)
+			shutil.copy(
+				os.path.join(_DATA_DIR, 'nbp_table.csv'),
+				os.path.join(cache_dir, 'archiwum_tab_a_2023.csv'),
+			)
+			argv: list[str] = [
+				'transactions2pln-batch',
+				os.path.join(tmpdir, '*.csv'),
+				'-O', os.path.join(tmpdir, 'output'),
+				'-c', 'Currency',
+				'--cache-dir', cache_dir,
+			]
+			with (
+				patch('sys.argv', argv),
+				patch('sys.stderr', new_callable=StringIO) as stderr,
+			):
+				self.assertEqual(batch.run(), 5)
+			self.assertTrue(
+				os.path.isfile(os.path.join(tmpdir, 'output', 'a.csv')))
+		summary: list[str] = stderr.getvalue().splitlines()
+		self.assertTrue(summary[0].endswith("a.csv: OK, wiersze: 6"))
+		self.assertIn(
+			"b.csv: BŁĄD - Błąd podczas przetwarzania wiersza 2", summary[1])
+		self.assertEqual(summary[2], "Przetworzono pliki: 1 z 2.")
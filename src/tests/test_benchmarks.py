@@ -0,0 +1,155 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy pakietu `benchmarks`.
+
+Same pomiary wydajności nie są testowane, gdyż ich wyniki zależą od
+komputera. Testowany jest generator danych, od którego poprawności zależy
+wiarygodność pomiarów, oraz odczyt raportu o imporcie modułów.
+
+Zawiera następujące klasy:
+`GenerateTestCase` -- Testy modułu `benchmarks.generate`.
+`StartupTestCase` -- Testy modułu `benchmarks.startup`.
+"""
+import csv
+import os
+import sys
+from argparse import ArgumentTypeError
+from datetime import date
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from benchmarks import generate, startup
+from transactions2pln import utils
+
+
+class GenerateTestCase(TestCase):
+	"""Testy modułu `benchmarks.generate`.
+
+	Zawiera metody testujące i wspomagające testowanie poprawności
+	funkcji z modułu `benchmarks.generate`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_parse_currencies` -- Metoda testująca funkcję `parse_currencies()`.
+	`test_parse_years` -- Metoda testująca funkcję `parse_years()`.
+	`test_generate_nbp_archives` -- Metoda testująca, czy wygenerowane
+	tabele kursów są odczytywane przez `utils.TablesManager`.
+	`test_generate_transactions` -- Metoda testująca funkcję
+	`generate_transactions()`.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe, tworząc katalog tymczasowy."""
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, usuwając katalog tymczasowy."""
+		self._tmpdir.cleanup()
+
+	def test_parse_currencies(self) -> None:
+		"""Testuje odczytywanie udziału walut w transakcjach."""
+		self.assertEqual(
+			generate.parse_currencies('USD:3,EUR'), {'USD': 3, 'EUR': 1})
+		self.assertEqual(
+			set(generate.parse_currencies('@b:2')),
+			utils.TablesManager.CURRENCY_MAP['b'],
+		)
+		for value in ('USD:0', 'USD:x', 'XXX', '@c'):
+			with self.subTest(value=value):
+				self.assertRaises(
+					ArgumentTypeError, generate.parse_currencies, value)
+
+	def test_parse_years(self) -> None:
+		"""Testuje odczytywanie zakresu lat."""
+		self.assertEqual(generate.parse_years('2023'), range(2023, 2024))
+		self.assertEqual(generate.parse_years('2021-2023'), range(2021, 2024))
+		self.assertRaises(ArgumentTypeError, generate.parse_years, '2023-2021')
+
+	def test_generate_nbp_archives(self) -> None:
+		"""Testuje, czy wygenerowane tabele kursów zawierają kursy
+		wszystkich walut z każdego dnia roboczego."""
+		paths: list[str] = generate.generate_nbp_archives(
+			self._tmpdir.name, {'USD': 1, 'AED': 1}, range(2023, 2024))
+		self.assertEqual(
+			[os.path.basename(path) for path in paths],
+			[
+				'archiwum_tab_a_2022.csv', 'archiwum_tab_a_2023.csv',
+				'archiwum_tab_b_2022.csv', 'archiwum_tab_b_2023.csv',
+			],
+		)
+		manager: utils.TablesManager = utils.TablesManager(self._tmpdir, 2023)
+		table: utils.ExchangeTable = manager.get_table('b')
+		self.assertEqual(len(table), 260)
+		self.assertNotIn(date(2023, 1, 7), table)
+		rate: list[str] = table[date(2023, 1, 2)]
+		self.assertRegex(rate[manager._currency_lookup['AED']], r'^\d+,\d{4}$')
+
+	def test_generate_transactions(self) -> None:
+		"""Testuje generowanie pliku z transakcjami."""
+		path: str = os.path.join(self._tmpdir.name, 'transactions.csv')
+		generate.generate_transactions(
+			path, 25, {'USD': 1, 'AED': 1}, range(2022, 2024), width=8)
+		with open(path, newline='') as f:
+			rows: list[list[str]] = list(csv.reader(f))
+		self.assertEqual(rows[0], generate.LABELS)
+		self.assertEqual(len(rows), 26)
+		for row in rows[1:]:
+			self.assertEqual(len(row[1]), 8)
+			self.assertIn(row[4], {'USD', 'AED'})
+			self.assertIn(row[3][:4], {'2022', '2023'})
+
+
+class StartupTestCase(TestCase):
+	"""Testy modułu `benchmarks.startup`.
+
+	Udostępnia następujące atrybuty:
+	`test_parse_importtime` -- Metoda testująca odczyt raportu o czasie
+	importu modułów.
+	`test_lazy_modules` -- Metoda testująca, czy wyświetlenie pomocy
+	programu nie wymaga importu modułów z `startup.LAZY_MODULES`.
+	"""
+
+	def test_parse_importtime(self) -> None:
+		"""Testuje odczyt raportu o czasie importu modułów."""
+		report: str = (
+			'import time: self [us] | cumulative | imported package\n'
+			'import time:       120 |        120 |   _io\n'
+			'import time:       300 |        420 | io\n'
+			'import time:       500 |        500 |     json.decoder\n'
+			'import time:       200 |        700 |   json\n'
+			'import time:      1000 |       1700 | transactions2pln.utils\n'
+			'Błąd parametru --currency\n'
+		)
+		self.assertEqual(
+			startup.parse_importtime(report),
+			(
+				{'io': 0.00042, 'transactions2pln.utils': 0.0017},
+				{'_io', 'io', 'json.decoder', 'json', 'transactions2pln.utils'},
+			),
+		)
+
+	def test_lazy_modules(self) -> None:
+		"""Testuje, czy wyświetlenie pomocy programu nie wymaga importu
+		modułów, które są importowane dopiero w razie potrzeby."""
+		result: dict = startup.measure(
+			[sys.executable, '-m', 'transactions2pln', '-h'],
+			os.path.dirname(os.path.dirname(__file__)),
+		)
+		self.assertEqual(result['lazy_modules'], [])
+		self.assertGreater(result['package_seconds'], 0)
@@ -0,0 +1,193 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `cache`.
+
+Zawiera następujące klasy:
+`TablesCacheTestCase` -- Testy obiektów klasy `cache.TablesCache`.
+`DefaultCacheDirTestCase` -- Testy funkcji `cache.default_cache_dir`.
+`LazyTemporaryDirectoryTestCase` -- Testy obiektów klasy
+`cache.LazyTemporaryDirectory`.
+"""
+import os
+import pickle
+import sys
+import time
+from datetime import date
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+from unittest.mock import Mock, patch
+
+from transactions2pln import cache
+
+
+class TablesCacheTestCase(TestCase):
+	"""Testy obiektów klasy `cache.TablesCache`.
+
+	Zawiera metody testujące i wspomagające testowanie poprawności
+	obiektów klasy `cache.TablesCache`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_fetch_missing` -- Metoda testująca pobieranie brakującego pliku.
+	`test_fetch_closed_year` -- Metoda testująca ponowne użycie pliku
+	za zamknięty rok.
+	`test_fetch_current_year` -- Metoda testująca politykę ważności pliku
+	za bieżący rok.
+	`test_fetch_error` -- Metoda testująca zachowanie przy błędzie pobierania.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Tworzy katalog tymczasowy i ustawia następujące atrybuty
+		publiczne:
+		`cache` -- Testowy obiekt klasy `cache.TablesCache`, przechowujący
+		pliki w podkatalogu katalogu tymczasowego.
+		`download` -- Makieta funkcji pobierającej plik, zapisująca
+		pod podaną ścieżką testową zawartość.
+		"""
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.cache: cache.TablesCache = cache.TablesCache(
+			os.path.join(self._tmpdir.name, 'cache'))
+		self.download: Mock = Mock(side_effect=self._write)
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, usuwając katalog tymczasowy."""
+		self._tmpdir.cleanup()
+
+	def _write(self, path: str) -> None:
+		with open(path, 'w') as f:
+			f.write('data')
+
+	def _set_mtime(self, table: str, year: int, mtime: float) -> None:
+		os.utime(self.cache.get_path(table, year), (mtime, mtime))
+
+	def test_fetch_missing(self) -> None:
+		"""Testuje pobieranie pliku nieobecnego w pamięci podręcznej."""
+		path: str = self.cache.fetch('a', 2023, self.download)
+		self.assertEqual(path, self.cache.get_path('a', 2023))
+		self.assertTrue(os.path.isfile(path))
+		self.download.assert_called_once()
+		# Plik nie powinien być zapisywany bezpośrednio pod docelową ścieżką.
+		self.assertNotEqual(self.download.call_args[0][0], path)
+
+	def test_fetch_closed_year(self) -> None:
+		"""Testuje, czy plik za zamknięty rok pobrany po jego zakończeniu
+		nie jest pobierany ponownie, a pobrany w jego trakcie - jest."""
+		self.cache.fetch('b', 2020, self.download)
+		# Plik pobrany dawno, ale już po zakończeniu roku.
+		self._set_mtime('b', 2020, time.mktime((2021, 1, 5, 0, 0, 0, 0, 0, -1)))
+		self.cache.fetch('b', 2020, self.download)
+		self.assertEqual(self.download.call_count, 1)
+		# Plik pobrany jeszcze w trakcie roku, którego dotyczy.
+		self._set_mtime('b', 2020, time.mktime((2020, 12, 5, 0, 0, 0, 0, 0, -1)))
+		self.cache.fetch('b', 2020, self.download)
+		self.assertEqual(self.download.call_count, 2)
+
+	def test_fetch_current_year(self) -> None:
+		"""Testuje politykę ważności pliku za bieżący rok."""
+		year: int = date.today().year
+		self.cache.fetch('a', year, self.download)
+		self.assertTrue(self.cache.is_fresh('a', year))
+		self.cache.fetch('a', year, self.download)
+		self.assertEqual(self.download.call_count, 1)
+		self._set_mtime('a', year, time.time() - self.cache.max_age - 1)
+		self.assertFalse(self.cache.is_fresh('a', year))
+		self.cache.fetch('a', year, self.download)
+		self.assertEqual(self.download.call_count, 2)
+
+	def test_fetch_error(self) -> None:
+		"""Testuje, czy błąd pobierania nie pozostawia w pamięci podręcznej
+		niekompletnych plików."""
+		def failing_download(path: str) -> None:
+			self._write(path)
+			raise OSError
+
+		self.assertRaises(OSError, self.cache.fetch, 'a', 2023, failing_download)
+		self.assertFalse(self.cache.is_fresh('a', 2023))
+		self.assertEqual(
+			[f for f in os.listdir(self.cache.name) if not f.endswith('.lock')],
+			[],
+		)
+
+
+class DefaultCacheDirTestCase(TestCase):
+	"""Testy funkcji `cache.default_cache_dir`.
+
+	Udostępnia następujące atrybuty:
+	`test_xdg_cache_home` -- Metoda testująca użycie zmiennej środowiskowej
+	`XDG_CACHE_HOME`.
+	`test_relative_xdg_cache_home` -- Metoda testująca pomijanie względnej
+	ścieżki w zmiennej środowiskowej `XDG_CACHE_HOME`.
+	"""
+
+	@skipIf(sys.platform == 'win32', "Specyfikacja XDG nie dotyczy Windows.")
+	def test_xdg_cache_home(self) -> None:
+		"""Testuje użycie ścieżki ze zmiennej `XDG_CACHE_HOME`."""
+		with patch.dict(os.environ, {'XDG_CACHE_HOME': '/var/cache/test'}):
+			self.assertEqual(
+				cache.default_cache_dir(), '/var/cache/test/transactions2pln')
+
+	@skipIf(sys.platform == 'win32', "Specyfikacja XDG nie dotyczy Windows.")
+	def test_relative_xdg_cache_home(self) -> None:
+		"""Testuje pominięcie względnej ścieżki ze zmiennej `XDG_CACHE_HOME`."""
+		with patch.dict(os.environ, {'XDG_CACHE_HOME': 'cache'}):
+			self.assertEqual(
+				cache.default_cache_dir(),
+				os.path.join(os.path.expanduser('~'), '.cache', 'transactions2pln'),
+			)
+
+
+class LazyTemporaryDirectoryTestCase(TestCase):
+	"""Testy obiektów klasy `cache.LazyTemporaryDirectory`.
+
+	Udostępnia następujące atrybuty:
+	`test_name` -- Metoda testująca tworzenie katalogu przy pierwszym użyciu.
+	`test_pickle` -- Metoda testująca przekazywanie obiektów do innych
+	procesów.
+	"""
+
+	def test_name(self) -> None:
+		"""Testuje, czy katalog jest tworzony dopiero przy pierwszym odczycie
+		atrybutu `name` i usuwany przez metodę `cleanup()`."""
+		tmpdir: cache.LazyTemporaryDirectory = cache.LazyTemporaryDirectory(
+			prefix='lazy_')
+		# Usunięcie nieutworzonego katalogu nie powoduje błędu.
+		tmpdir.cleanup()
+		with patch('tempfile.mkdtemp') as mkdtemp_mock:
+			cache.LazyTemporaryDirectory()
+		mkdtemp_mock.assert_not_called()
+
+		name: str = tmpdir.name
+		self.assertTrue(os.path.isdir(name))
+		self.assertTrue(os.path.basename(name).startswith('lazy_'))
+		self.assertEqual(tmpdir.name, name)
+		tmpdir.cleanup()
+		self.assertFalse(os.path.exists(name))
+
+	def test_pickle(self) -> None:
+		"""Testuje, czy kopia obiektu przekazana do innego procesu korzysta
+		z tego samego katalogu, ale go nie usuwa."""
+		tmpdir: cache.LazyTemporaryDirectory = cache.LazyTemporaryDirectory()
+		self.addCleanup(tmpdir.cleanup)
+		copy: cache.LazyTemporaryDirectory = pickle.loads(pickle.dumps(tmpdir))
+		self.assertEqual(copy.name, tmpdir.name)
+		copy.cleanup()
+		self.assertTrue(os.path.isdir(tmpdir.name))
@@ -0,0 +1,152 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `checkpoint`.
+
+Zawiera następujące klasy:
+`CheckpointTestCase` -- Testy zapisywania i wczytywania stanu przetwarzania.
+"""
+import os
+import typing
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from transactions2pln.checkpoint import Checkpoint
+
+
+class CheckpointTestCase(TestCase):
+	"""Testy obiektów klasy `checkpoint.Checkpoint`.
+
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_read_rows` -- Metoda testująca odczyt wierszy wraz z pozycjami.
+	`test_advance` -- Metoda testująca oznaczanie wierszy jako zapisanych.
+	`test_commit` -- Metoda testująca zapisywanie i wczytywanie stanu.
+	`test_load_changed` -- Metoda testująca odrzucanie stanu, który nie
+	odpowiada plikom.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Tworzy katalog tymczasowy z plikiem wejściowym i pustym
+		plikiem wyjściowym. Ustawia następujące atrybuty publiczne:
+		`input_path` -- Ścieżka do pliku wejściowego.
+		`output_path` -- Ścieżka do pliku wyjściowego.
+		`checkpoint` -- Obiekt klasy `checkpoint.Checkpoint` dla tych plików.
+		"""
+		tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.addCleanup(tmpdir.cleanup)
+		self.input_path: str = os.path.join(tmpdir.name, 'input.csv')
+		self.output_path: str = os.path.join(tmpdir.name, 'output.csv')
+		with open(self.input_path, 'wb') as f:
+			f.write(b'a,b\r\n"x\r\ny",1\r\n\xc4\x85,2\r\n')
+		open(self.output_path, 'w').close()
+		self.checkpoint: Checkpoint = Checkpoint(
+			os.path.join(tmpdir.name, 'state.json'),
+			self.input_path,
+			{'labels': True},
+		)
+
+	def _read_rows(self, mark: bool = True) -> list[list[str]]:
+		with open(self.input_path, encoding='utf-8') as f:
+			return list(self.checkpoint.read_rows(f, mark))
+
+	def _commit(self, rows: int, data: str) -> None:
+		with open(self.output_path, 'a') as f:
+			f.write(data)
+			self.assertTrue(self.checkpoint.advance(rows))
+			self.checkpoint.commit(f)
+
+	def _load(self) -> bool:
+		with open(self.output_path, 'a') as f:
+			return self.checkpoint.load(f)
+
+	def test_read_rows(self) -> None:
+		"""Testuje, czy wiersze są odczytywane tak, jak z pliku otwartego
+		w trybie tekstowym, a ich pozycje odnoszą się do pliku w bajtach."""
+		self.assertEqual(
+			self._read_rows(), [['a', 'b'], ['x\ny', '1'], ['ą', '2']])
+		self.assertEqual(self.checkpoint.position(), 21)
+		self.assertEqual(
+			list(self.checkpoint._marks), [(1, 5), (2, 15), (3, 21)])
+		# Wiersze odczytane bez zapamiętywania pozycji nie zmieniają stanu.
+		self.checkpoint.reset()
+		self._read_rows(mark=False)
+		self.assertFalse(self.checkpoint._marks)
+
+	def test_advance(self) -> None:
+		"""Testuje oznaczanie wierszy jako zapisanych do pliku wyjściowego
+		metodą `advance()`."""
+		self._read_rows()
+		self.assertTrue(self.checkpoint.advance(2))
+		# Pozycja za trzecim wierszem nie jest znana, więc stanu po nim nie
+		# można zapisać.
+		self.checkpoint.mark(5, 40)
+		self.assertFalse(self.checkpoint.advance(4))
+		self.assertTrue(self.checkpoint.advance(5))
+
+	def test_commit(self) -> None:
+		"""Testuje zapisywanie stanu metodą `commit()` i wznawianie
+		przetwarzania po jego wczytaniu metodą `load()`."""
+		self.assertFalse(self._load())
+		self._read_rows()
+		self.checkpoint.header = ['a', 'b']
+		self.checkpoint.date_column = 1
+		self._commit(2, 'out1\n')
+		# Dane zapisane po zapisaniu stanu zostaną zapisane ponownie.
+		with open(self.output_path, 'a') as f:
+			f.write('out2\n')
+		self.assertTrue(self._load())
+		self.assertEqual(self.checkpoint.rows, 2)
+		self.assertEqual(self.checkpoint.input_offset, 15)
+		self.assertEqual(self.checkpoint.output_offset, 5)
+		self.assertEqual(self.checkpoint.header, ['a', 'b'])
+		self.assertEqual(self.checkpoint.date_column, 1)
+		self.assertIsNone(self.checkpoint.date_format)
+		self.assertEqual(self._read_rows(), [['ą', '2']])
+		# Skrót obejmuje całą przetworzoną część pliku, również przy
+		# kolejnych zapisach stanu.
+		self._commit(3, 'out2\n')
+		self.assertTrue(self._load())
+		self.assertEqual(self.checkpoint.rows, 3)
+		self.assertEqual(self._read_rows(), [])
+
+	def test_load_changed(self) -> None:
+		"""Testuje, czy stan nie jest wczytywany, jeżeli nie odpowiada plikom
+		wejściowemu i wyjściowemu lub opcjom przetwarzania."""
+		self._read_rows()
+		self._commit(2, 'out1\n')
+		tests: dict[str, typing.Callable[[], typing.Any]] = {
+			'input': lambda: open(self.input_path, 'r+b').write(b'A'),
+			'output': lambda: open(self.output_path, 'w').close(),
+			'options': lambda: self.checkpoint.options.update(labels=False),
+			'state': lambda: open(self.checkpoint.path, 'w').close(),
+		}
+		for name, change in tests.items():
+			with self.subTest(change=name):
+				self.assertTrue(self._load())
+				change()
+				self.assertFalse(self._load())
+				self.assertEqual(self.checkpoint.rows, 0)
+				self.assertEqual(self.checkpoint.input_offset, 0)
+				self.setUp()
+				self._read_rows()
+				self._commit(2, 'out1\n')
@@ -0,0 +1,145 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `columnar`.
+
+Zawiera następujące klasy:
+`ColumnarWriterTestCase` -- Testy obiektów klasy `columnar.ColumnarWriter`.
+"""
+import typing
+import unittest
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import api, columnar, utils
+
+
+class ColumnarWriterTestCase(TestCase):
+	"""Testy obiektów klasy `columnar.ColumnarWriter`.
+
+	Udostępnia następujące atrybuty:
+	`test_parquet` -- Metoda testująca zapis w formacie Parquet.
+	`test_arrow` -- Metoda testująca zapis w formacie Arrow IPC.
+	`test_empty` -- Metoda testująca zapis pliku bez wierszy danych.
+	`test_pyarrow_missing` -- Metoda testująca błąd przy braku biblioteki
+	pyarrow.
+	"""
+	ROWS: list[list[str]] = [
+		['1', '2023/04/18', 'CAD', '3,1533', '19481,81'],
+		['2', 'x', 'USD', '4,1557', '7869,44'],
+		['3', '2023/04/21', '0,028546', '1,43'],
+	]
+
+	def _write(self, output_format: str) -> BytesIO:
+		# Zapisuje wiersze `ROWS` w grupach po dwa wiersze.
+		file: BytesIO = BytesIO()
+		writer: columnar.ColumnarWriter = columnar.ColumnarWriter(
+			file,
+			output_format,
+			date_column=1,
+			date_parser=utils.DateParser('%Y/%m/%d'),
+			decimal_point=',',
+			row_group_size=2,
+		)
+		writer.writerows(self.ROWS)
+		writer.writeend()
+		self.assertFalse(file.closed)
+		file.seek(0)
+		return file
+
+	def _check(self, table: typing.Any) -> None:
+		# Sprawdza typy i wartości kolumn tabeli zapisanej z wierszy `ROWS`.
+		self.assertEqual(
+			table.column_names, ['1', '2', '3', *api.LABELS])
+		self.assertEqual(
+			[str(field.type) for field in table.schema],
+			[
+				'string',
+				'date32[day]',
+				'string',
+				'decimal128(38, 12)',
+				'decimal128(38, 2)',
+			],
+		)
+		self.assertEqual(table.to_pylist(), [
+			{
+				'1': '1', '2': date(2023, 4, 18), '3': 'CAD',
+				api.LABELS[0]: Decimal('3.1533'),
+				api.LABELS[1]: Decimal('19481.81'),
+			},
+			{
+				'1': '2', '2': None, '3': 'USD',
+				api.LABELS[0]: Decimal('4.1557'),
+				api.LABELS[1]: Decimal('7869.44'),
+			},
+			{
+				'1': '3', '2': date(2023, 4, 21), '3': None,
+				api.LABELS[0]: Decimal('0.028546'),
+				api.LABELS[1]: Decimal('1.43'),
+			},
+		])
+
+	@unittest.skipIf(
+		columnar.pyarrow is None, "biblioteka pyarrow nie jest dostępna")
+	def test_parquet(self) -> None:
+		"""Testuje zapis w formacie Parquet.
+
+		Wiersze powinny zostać zapisane w grupach o podanej wielkości,
+		a wartości, które nie są datą, jako puste.
+		"""
+		import pyarrow.parquet
+		parquet_file: typing.Any = pyarrow.parquet.ParquetFile(
+			self._write('parquet'))
+		self.assertEqual(parquet_file.num_row_groups, 2)
+		self._check(parquet_file.read())
+
+	@unittest.skipIf(
+		columnar.pyarrow is None, "biblioteka pyarrow nie jest dostępna")
+	def test_arrow(self) -> None:
+		"""Testuje zapis w formacie Arrow IPC."""
+		import pyarrow.ipc
+		reader: typing.Any = pyarrow.ipc.open_file(self._write('arrow'))
+		self.assertEqual(reader.num_record_batches, 2)
+		self._check(reader.read_all())
+
+	@unittest.skipIf(
+		columnar.pyarrow is None, "biblioteka pyarrow nie jest dostępna")
+	def test_empty(self) -> None:
+		"""Testuje zapis pliku bez wierszy danych.
+
+		Plik powinien zawierać kolumny o nazwach z nagłówków.
+		"""
+		import pyarrow.parquet
+		file: BytesIO = BytesIO()
+		labels: list[str] = ['ID', 'Date', *api.LABELS]
+		writer: columnar.ColumnarWriter = columnar.ColumnarWriter(
+			file, labels=labels)
+		writer.writeend()
+		file.seek(0)
+		table: typing.Any = pyarrow.parquet.read_table(file)
+		self.assertEqual(table.num_rows, 0)
+		self.assertEqual(table.column_names, labels)
+
+	def test_pyarrow_missing(self) -> None:
+		"""Testuje zgłaszanie błędu, jeśli biblioteka pyarrow nie jest
+		zainstalowana."""
+		with patch.object(columnar, 'pyarrow', None):
+			self.assertRaises(RuntimeError, columnar.ColumnarWriter, BytesIO())
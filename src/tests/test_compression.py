@@ -0,0 +1,188 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `compression`.
+
+Zawiera następujące klasy:
+`CompressionTestCase` -- Testy funkcji rozpoznających format kompresji.
+`OpenFileTestCase` -- Testy otwierania plików skompresowanych.
+"""
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import compression
+
+
+class CompressionTestCase(TestCase):
+	"""Testy funkcji rozpoznających format kompresji.
+
+	Udostępnia następujące atrybuty:
+	`test_detect` -- Metoda testująca rozpoznawanie formatu na podstawie
+	pierwszych bajtów pliku.
+	`test_get_compression` -- Metoda testująca rozpoznawanie formatu
+	na podstawie rozszerzenia nazwy pliku.
+	`test_split_extension` -- Metoda testująca oddzielanie rozszerzenia
+	formatu kompresji.
+	"""
+
+	def test_detect(self) -> None:
+		"""Testuje rozpoznawanie formatu na podstawie pierwszych bajtów."""
+		self.assertEqual(compression.detect(gzip.compress(b'a')), 'gzip')
+		self.assertEqual(compression.detect(bz2.compress(b'a')), 'bzip2')
+		self.assertEqual(compression.detect(lzma.compress(b'a')), 'xz')
+		self.assertEqual(
+			compression.detect(b'\x28\xb5\x2f\xfd\x00'), 'zstd')
+		self.assertIsNone(compression.detect(b'ID,Date\n'))
+		self.assertIsNone(compression.detect(b''))
+
+	def test_get_compression(self) -> None:
+		"""Testuje rozpoznawanie formatu na podstawie rozszerzenia."""
+		self.assertEqual(compression.get_compression('a.csv.gz'), 'gzip')
+		self.assertEqual(compression.get_compression('a.CSV.BZ2'), 'bzip2')
+		self.assertEqual(compression.get_compression('a.xz'), 'xz')
+		self.assertEqual(compression.get_compression('a.zst'), 'zstd')
+		self.assertIsNone(compression.get_compression('a.csv'))
+		self.assertIsNone(compression.get_compression('gz'))
+
+	def test_split_extension(self) -> None:
+		"""Testuje oddzielanie rozszerzenia formatu kompresji."""
+		self.assertEqual(
+			compression.split_extension('a.csv.gz'), ('a.csv', '.gz'))
+		self.assertEqual(compression.split_extension('a.csv'), ('a.csv', ''))
+
+
+class OpenFileTestCase(TestCase):
+	"""Testy otwierania plików skompresowanych.
+
+	Udostępnia następujące atrybuty:
+	`DATA` -- Dane zapisywane i odczytywane w testach.
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_roundtrip` -- Metoda testująca zapis i odczyt plików w każdym
+	z obsługiwanych formatów.
+	`test_detect_content` -- Metoda testująca rozpoznawanie formatu pliku
+	wejściowego niezależnie od rozszerzenia.
+	`test_zstd_missing` -- Metoda testująca obsługę braku biblioteki
+	zstandard.
+	`test_file_type` -- Metoda testująca otwieranie plików podanych jako
+	opcje wiersza poleceń.
+	"""
+	DATA: str = 'ID,Kwota\r\n1,"1,50"\r\n2,zażółć\r\n'
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia atrybut `tmpdir` - ścieżkę do katalogu
+		tymczasowego.
+		"""
+		tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.addCleanup(tmpdir.cleanup)
+		self.tmpdir: str = tmpdir.name
+
+	def _write(self, path: str) -> None:
+		with compression.open_file(path, 'w', 'utf-8') as f:
+			f.write(self.DATA)
+
+	def test_roundtrip(self) -> None:
+		"""Testuje zapis i odczyt plików w każdym z obsługiwanych formatów."""
+		openers: dict[str, object] = {
+			'.gz': gzip.open,
+			'.bz2': bz2.open,
+			'.xz': lzma.open,
+		}
+		for extension, opener in openers.items():
+			with self.subTest(extension=extension):
+				path: str = os.path.join(self.tmpdir, 'a.csv' + extension)
+				self._write(path)
+				with opener(path, 'rb') as f: # type: ignore[operator]
+					self.assertEqual(f.read(), self.DATA.encode('utf-8'))
+				with compression.open_file(path, encoding='utf-8') as f:
+					self.assertIsInstance(f, compression.CompressedFile)
+					self.assertEqual(f.name, path)
+					self.assertFalse(f.seekable())
+					self.assertEqual(
+						f.read(), self.DATA.replace('\r\n', '\n'))
+				self.assertTrue(f.compressed.closed)
+
+		# Plik bez rozszerzenia formatu kompresji nie jest kompresowany.
+		path = os.path.join(self.tmpdir, 'a.csv')
+		self._write(path)
+		with open(path, encoding='utf-8', newline='') as f:
+			self.assertEqual(f.read(), self.DATA)
+		with compression.open_file(path, encoding='utf-8') as f:
+			self.assertNotIsInstance(f, compression.CompressedFile)
+
+	def test_detect_content(self) -> None:
+		"""Testuje, czy format pliku wejściowego jest rozpoznawany na
+		podstawie zawartości, a nie rozszerzenia."""
+		path: str = os.path.join(self.tmpdir, 'a.csv')
+		with open(path, 'wb') as f:
+			f.write(lzma.compress(self.DATA.encode('utf-8')))
+		with compression.open_file(path, encoding='utf-8') as f:
+			self.assertEqual(f.compression, 'xz') # type: ignore[attr-defined]
+			self.assertEqual(f.readline(), 'ID,Kwota\n')
+
+	@patch.dict('sys.modules', {'zstandard': None})
+	def test_zstd_missing(self) -> None:
+		"""Testuje, czy przy braku biblioteki zstandard próba otwarcia pliku
+		w formacie Zstandard kończy się błędem."""
+		path: str = os.path.join(self.tmpdir, 'a.csv.zst')
+		self.assertRaises(RuntimeError, compression.open_file, path, 'w')
+		with open(path, 'wb') as f:
+			f.write(b'\x28\xb5\x2f\xfd\x00')
+		self.assertRaises(RuntimeError, compression.open_file, path)
+		self.assertRaises(
+			argparse.ArgumentTypeError,
+			compression.CompressedFileType('r'),
+			path,
+		)
+
+	def test_file_type(self) -> None:
+		"""Testuje otwieranie plików podanych jako opcje wiersza poleceń."""
+		path: str = os.path.join(self.tmpdir, 'a.csv.gz')
+		file_type: compression.CompressedFileType = (
+			compression.CompressedFileType('w', encoding='utf-8'))
+		with file_type(path) as f:
+			f.write(self.DATA)
+		with compression.CompressedFileType('r', encoding='utf-8')(path) as f:
+			self.assertEqual(f.read(), self.DATA.replace('\r\n', '\n'))
+
+		# Dane ze standardowego wejścia.
+		stdin: io.TextIOWrapper = io.TextIOWrapper(io.BufferedReader(
+			io.BytesIO(gzip.compress(self.DATA.encode('utf-8')))))
+		with patch('sys.stdin', stdin):
+			f = compression.CompressedFileType('r', encoding='utf-8')('-')
+			self.assertEqual(f.read(), self.DATA.replace('\r\n', '\n'))
+		stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(b'ID\n')))
+		with patch('sys.stdin', stdin):
+			self.assertIs(compression.CompressedFileType('r')('-'), stdin)
+
+		# Do plików skompresowanych nie można dopisywać danych.
+		self.assertRaises(
+			argparse.ArgumentTypeError,
+			compression.CompressedFileType('a'),
+			path,
+		)
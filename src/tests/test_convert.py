@@ -0,0 +1,138 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `convert`.
+
+Zawiera następujące klasy:
+`RowConverterTestCase` -- Testy obiektów klasy `convert.RowConverter`.
+"""
+import decimal
+import locale
+import os
+import shutil
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from transactions2pln import exceptions as exc, utils
+from transactions2pln.convert import RowConverter
+
+
+class RowConverterTestCase(TestCase):
+	"""Testy obiektów klasy `convert.RowConverter`.
+
+	Zawiera metody testujące i wspomagające testowanie poprawności
+	obiektów klasy `convert.RowConverter`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_convert` -- Metoda testująca przeliczanie wiersza.
+	`test_convert_errors` -- Metoda testująca błędy przeliczania wiersza.
+	`test_get_date_without_column` -- Metoda testująca wyszukiwanie daty
+	we wszystkich polach wiersza.
+	`test_get_needed_tables` -- Metoda testująca ustalanie potrzebnych
+	tabel kursów.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia język na polski i tworzy katalog tymczasowy
+		z testową tabelą kursów NBP za 2023 rok, dzięki czemu nie jest ona
+		pobierana. Ustawia następujący atrybut publiczny:
+		`converter` -- Testowy obiekt klasy `convert.RowConverter`
+		odczytujący walutę, datę i kwotę z kolumn 5, 4 i 6.
+		"""
+		self._locale = locale.getlocale(locale.LC_NUMERIC)
+		locale.setlocale(locale.LC_NUMERIC, 'pl_PL.UTF-8')
+		self._context: decimal.Context = decimal.getcontext().copy()
+		decimal.getcontext().prec = 10
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		shutil.copy(
+			os.path.join(os.path.dirname(__file__), 'data', 'nbp_table.csv'),
+			os.path.join(self._tmpdir.name, 'archiwum_tab_a_2023.csv'),
+		)
+		self.converter: RowConverter = RowConverter(
+			utils.TablesPool(self._tmpdir),
+			utils.DateParser('%Y/%m/%d'),
+			currency_column=4,
+			amount_column=5,
+			date_column=3,
+		)
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, przywracając ustawienia języka
+		i precyzji działań oraz usuwając katalog tymczasowy."""
+		locale.setlocale(locale.LC_NUMERIC, self._locale)
+		decimal.setcontext(self._context)
+		self._tmpdir.cleanup()
+
+	def test_convert(self) -> None:
+		"""Testuje dodawanie kursu i kwoty w PLN do wiersza."""
+		row: list[str] = ['34567', 'GI', 'CGLB', '2023/04/18', 'CAD', '6178.23']
+		self.assertEqual(
+			self.converter.convert(row, 1),
+			['34567', 'GI', 'CGLB', '2023/04/18', 'CAD', '6178.23',
+				'3,1533', '19481,81'],
+		)
+		# Dla stałej waluty kolumna z walutą nie jest odczytywana, a bez
+		# kolumny z kwotą przyjmowana jest ostatnia kolumna.
+		self.converter.currency = 'USD'
+		self.converter.date_column = 0
+		self.converter.amount_column = None
+		self.assertEqual(
+			self.converter.convert(['2023/04/26', 'CAD', '1893.65'], 1)[3:],
+			['4,1557', '7869,44'],
+		)
+
+	def test_convert_errors(self) -> None:
+		"""Testuje zgłaszanie błędów przeliczania z numerem wiersza."""
+		rows: list[list[str]] = [
+			['1', 'GI', 'CGLB', '2023/04/18', 'CAD', '6178.23'],
+			['2', 'GI', 'CGLB', '18.04.2023', 'CAD', '6178.23'],
+		]
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			list(self.converter.convert_rows(rows, 1))
+		self.assertEqual(cm.exception.row_number, 3)
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			self.converter.convert(
+				['1', 'GI', 'CGLB', '2023/04/18', 'XYZ', '6178.23'], 7)
+		self.assertEqual(cm.exception.row_number, 7)
+
+	def test_get_date_without_column(self) -> None:
+		"""Testuje wyszukiwanie daty we wszystkich polach wiersza."""
+		self.converter.date_column = None
+		self.assertEqual(
+			str(self.converter.get_date(['a', '2023/04/22', 'b'], 1)),
+			'2023-04-21',
+		)
+		self.assertRaises(
+			exc.RowProcessingError, self.converter.get_date, ['a', 'b'], 1)
+
+	def test_get_needed_tables(self) -> None:
+		"""Testuje ustalanie tabel kursów potrzebnych dla wierszy danych."""
+		rows: list[list[str]] = [
+			['1', 'GI', 'CGLB', '2023/04/18', 'CAD', '6178.23'],
+			['2', 'GI', 'CGLB', '2024/01/02', 'USD', '6178.23'],
+			['3', 'GI', 'CGLB', '2022/06/01', 'XYZ', '6178.23'],
+			['4', 'GI', 'CGLB', 'bad', 'CAD', '6178.23'],
+		]
+		self.assertEqual(
+			self.converter.get_needed_tables(rows),
+			{('a', 2023), ('a', 2024)},
+		)
@@ -0,0 +1,146 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `follow`.
+
+Zawiera następujące klasy:
+`FollowerTestCase` -- Testy odczytu pliku, do którego dopisywane są dane.
+"""
+import os
+import typing
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln.follow import Follower
+
+
+class FollowerTestCase(TestCase):
+	"""Testy obiektów klasy `follow.Follower`.
+
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_follow` -- Metoda testująca odczyt dopisywanych wierszy.
+	`test_read_available` -- Metoda testująca odczyt wierszy bez oczekiwania.
+	`test_rotation` -- Metoda testująca odczyt pliku zastąpionego nowym.
+	`test_truncation` -- Metoda testująca odczyt skróconego pliku.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Tworzy katalog tymczasowy z plikiem wejściowym
+		i otwiera ten plik. Ustawia następujące atrybuty publiczne:
+		`path` -- Ścieżka do pliku wejściowego.
+		`file` -- Plik wejściowy otwarty do odczytu.
+		"""
+		tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.addCleanup(tmpdir.cleanup)
+		self.path: str = os.path.join(tmpdir.name, 'input.csv')
+		with open(self.path, 'w') as f:
+			f.write('a,b\n1,2\n')
+		self.file: typing.TextIO = open(self.path)
+		self.addCleanup(self.file.close)
+
+	def _append(self, data: str) -> None:
+		with open(self.path, 'a') as f:
+			f.write(data)
+
+	def _follow(
+			self,
+			follower: Follower,
+			writes: list[typing.Callable[[], object]],
+		) -> list[list[str]]:
+		# Odczytuje wszystkie wiersze, wykonując przy kolejnych oczekiwaniach
+		# na dane kolejne funkcje z listy `writes`, a po ich wyczerpaniu
+		# przerywając odczyt.
+		def sleep(interval: float) -> None:
+			self.assertEqual(interval, follower.interval)
+			if not writes:
+				raise KeyboardInterrupt
+			writes.pop(0)()
+
+		with patch('transactions2pln.follow.time.sleep', sleep):
+			return list(follower)
+
+	def test_follow(self) -> None:
+		"""Testuje odczyt wierszy dopisywanych do pliku.
+
+		Niedokończona linia powinna zostać odczytana dopiero po dopisaniu jej
+		reszty, a funkcja `on_wait` powinna być wywoływana przed
+		oczekiwaniem na dane tylko wtedy, gdy odczytano nowe wiersze.
+		"""
+		waits: list[None] = []
+		follower: Follower = Follower(
+			self.file, 0.5, on_wait=lambda: waits.append(None))
+		rows: list[list[str]] = self._follow(follower, [
+			lambda: self._append('3,'),
+			lambda: self._append('4\n5,6\n'),
+			lambda: self._append('7,'),
+		])
+		self.assertEqual(rows, [['a', 'b'], ['1', '2'], ['3', '4'], ['5', '6']])
+		self.assertEqual(len(waits), 2)
+		self.assertEqual(follower.rotations, 0)
+
+	def test_read_available(self) -> None:
+		"""Testuje odczyt wierszy zapisanych już w pliku.
+
+		Niedokończona linia nie powinna zostać zwrócona, lecz odczytana
+		w dalszej iteracji po dopisaniu jej reszty.
+		"""
+		self._append('3,')
+		follower: Follower = Follower(self.file)
+		self.assertEqual(follower.read_available(1), [['a', 'b']])
+		self.assertEqual(follower.read_available(5), [['1', '2']])
+		rows: list[list[str]] = self._follow(follower, [
+			lambda: self._append('4\n'),
+		])
+		self.assertEqual(rows, [['3', '4']])
+
+	def test_rotation(self) -> None:
+		"""Testuje odczyt pliku, który został zastąpiony nowym plikiem.
+
+		Wiersze dopisane do poprzedniego pliku przed jego zastąpieniem
+		powinny zostać odczytane, a nagłówki nowego pliku pominięte.
+		"""
+		def rotate() -> None:
+			self._append('3,4\n')
+			os.rename(self.path, self.path + '.1')
+			with open(self.path, 'w') as f:
+				f.write('a,b\n5,6\n')
+
+		follower: Follower = Follower(self.file, labels=True)
+		rows: list[list[str]] = self._follow(follower, [rotate])
+		self.assertEqual(rows, [['a', 'b'], ['1', '2'], ['3', '4'], ['5', '6']])
+		self.assertEqual(follower.rotations, 1)
+		self.assertIsNot(follower.file, self.file)
+		self.assertTrue(follower.file.closed)
+
+	def test_truncation(self) -> None:
+		"""Testuje odczyt pliku, który został skrócony."""
+		def truncate() -> None:
+			with open(self.path, 'w') as f:
+				f.write('a\n')
+
+		follower: Follower = Follower(self.file)
+		rows: list[list[str]] = self._follow(follower, [truncate])
+		self.assertEqual(rows, [['a', 'b'], ['1', '2'], ['a']])
+		self.assertEqual(follower.rotations, 1)
+		self.assertIs(follower.file, self.file)
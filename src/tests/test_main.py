@@ -50,6 +50,16 @@ class MainTestCase(TestCase):
 		self.assertRegex(run_output.stdout, br'  input {17}')
 		self.assertIn(b'-o OUTPUT, --output OUTPUT', run_output.stdout)
 		self.assertIn(b'-j, --json', run_output.stdout)
+		self.assertIn(b'--ndjson', run_output.stdout)
+		self.assertIn(b'--parquet', run_output.stdout)
+		self.assertIn(b'--arrow', run_output.stdout)
+		self.assertIn(b'--aggregate', run_output.stdout)
+		self.assertIn(b'-g COLUMN, --group-by COLUMN', run_output.stdout)
+		self.assertIn(b'--period {day,month,year}', run_output.stdout)
+		self.assertIn(b'--flush {row,end,N}', run_output.stdout)
+		self.assertIn(b'--buffer-size BUFFER_SIZE', run_output.stdout)
+		self.assertIn(b'--checkpoint [FILE]', run_output.stdout)
+		self.assertIn(b'--follow [SECONDS]', run_output.stdout)
 		self.assertIn(
 			b'-a AMOUNT_COLUMN, --amount-column AMOUNT_COLUMN', run_output.stdout)
 		self.assertIn(b'-c CURRENCY, --currency CURRENCY', run_output.stdout)
@@ -58,3 +68,14 @@ class MainTestCase(TestCase):
 		self.assertIn(
 			b'-f DATE_FORMAT, --date-format DATE_FORMAT', run_output.stdout)
 		self.assertIn(b'-l, --no-labels', run_output.stdout)
+		self.assertIn(b'--engine {row,numpy}', run_output.stdout)
+		self.assertIn(b'--stats [{text,json}]', run_output.stdout)
+		self.assertIn(b'--profile FILE', run_output.stdout)
+		self.assertIn(b'--progress [{text,json}]', run_output.stdout)
+		self.assertIn(
+			b'--progress-interval SECONDS', run_output.stdout)
+		self.assertIn(b'-w N, --workers N', run_output.stdout)
+		self.assertIn(b'-p, --prefetch', run_output.stdout)
+		self.assertIn(b'--cache-dir CACHE_DIR', run_output.stdout)
+		self.assertIn(b'--no-cache', run_output.stdout)
+		self.assertIn(b'--snapshot FILE', run_output.stdout)
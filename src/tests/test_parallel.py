@@ -0,0 +1,203 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `parallel`.
+
+Zawiera następujące klasy:
+`SplitCsvChunksTestCase` -- Testy funkcji `parallel.split_csv_chunks`.
+`ConvertFileTestCase` -- Testy funkcji `parallel.convert_file`.
+"""
+import decimal
+import locale
+import os
+import shutil
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from transactions2pln import exceptions as exc, parallel, utils
+from transactions2pln.convert import RowConverter
+
+
+class SplitCsvChunksTestCase(TestCase):
+	"""Testy funkcji `parallel.split_csv_chunks`.
+
+	Zawiera metody testujące poprawność działania funkcji
+	`split_csv_chunks()` z modułu `parallel`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_split` -- Metoda testująca podział pliku na fragmenty.
+	`test_quoted_newline` -- Metoda testująca pomijanie znaków nowej linii
+	wewnątrz pól ujętych w cudzysłów.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe, tworząc katalog tymczasowy."""
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		self.path: str = os.path.join(self._tmpdir.name, 'input.csv')
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, usuwając katalog tymczasowy."""
+		self._tmpdir.cleanup()
+
+	def _split(self, data: bytes, chunk_size: int) -> list[bytes]:
+		with open(self.path, 'wb') as f:
+			f.write(data)
+		return [
+			data[start:end]
+			for start, end in parallel.split_csv_chunks(self.path, chunk_size)
+		]
+
+	def test_split(self) -> None:
+		"""Testuje podział pliku na fragmenty zawierające całe wiersze."""
+		self.assertEqual(
+			self._split(b'aa,1\nbb,2\ncc,3\n', 6), [b'aa,1\nbb,2\n', b'cc,3\n'])
+		self.assertEqual(self._split(b'aa,1\nbb,2', 5), [b'aa,1\n', b'bb,2'])
+		self.assertEqual(self._split(b'', 5), [])
+
+	def test_quoted_newline(self) -> None:
+		"""Testuje, czy fragmenty nie kończą się wewnątrz pól ujętych
+		w cudzysłów."""
+		self.assertEqual(
+			self._split(b'"a\n""b""\nc",1\nd,2\n', 2),
+			[b'"a\n""b""\nc",1\n', b'd,2\n'],
+		)
+
+
+class ConvertFileTestCase(TestCase):
+	"""Testy funkcji `parallel.convert_file`.
+
+	Zawiera metody testujące poprawność działania funkcji
+	`convert_file()` z modułu `parallel`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_convert_file` -- Metoda testująca zachowanie kolejności wierszy.
+	`test_row_number` -- Metoda testująca numery wierszy w komunikatach
+	błędów.
+	`test_progress` -- Metoda testująca raportowanie pozycji w pliku.
+	`test_start` -- Metoda testująca przetwarzanie pliku od wybranej pozycji.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia język na polski i tworzy katalog tymczasowy
+		z testową tabelą kursów NBP za 2023 rok oraz plikiem wejściowym
+		z nagłówkami i wielokrotnie powtórzonymi testowymi transakcjami.
+		Ustawia następujące atrybuty publiczne:
+		`converter` -- Testowy obiekt klasy `convert.RowConverter`.
+		`path` -- Ścieżka do testowego pliku wejściowego.
+		"""
+		self._locale = locale.getlocale(locale.LC_NUMERIC)
+		locale.setlocale(locale.LC_NUMERIC, 'pl_PL.UTF-8')
+		self._context: decimal.Context = decimal.getcontext().copy()
+		decimal.getcontext().prec = 10
+		data_dir: str = os.path.join(os.path.dirname(__file__), 'data')
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		shutil.copy(
+			os.path.join(data_dir, 'nbp_table.csv'),
+			os.path.join(self._tmpdir.name, 'archiwum_tab_a_2023.csv'),
+		)
+		self.converter: RowConverter = RowConverter(
+			utils.TablesPool(self._tmpdir),
+			utils.DateParser('%Y/%m/%d'),
+			currency_column=4,
+			amount_column=5,
+			date_column=3,
+		)
+		with open(os.path.join(data_dir, 'transactions_with_labels.csv')) as f:
+			self._labels: str = f.readline()
+			self._rows: str = f.read()
+		self.path: str = os.path.join(self._tmpdir.name, 'input.csv')
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, przywracając ustawienia języka
+		i precyzji działań oraz usuwając katalog tymczasowy."""
+		locale.setlocale(locale.LC_NUMERIC, self._locale)
+		decimal.setcontext(self._context)
+		self._tmpdir.cleanup()
+
+	def _convert(self, data: str) -> list[list[str]]:
+		with open(self.path, 'w') as f:
+			f.write(data)
+		rows: list[list[str]] = []
+		with open(self.path) as f:
+			for chunk_rows in parallel.convert_file(
+				self.converter, f, 2, 1, chunk_size=256,
+			):
+				rows.extend(chunk_rows)
+		return rows
+
+	def test_convert_file(self) -> None:
+		"""Testuje, czy wiersze przetworzone w wielu procesach są zwracane
+		w kolejności z pliku wejściowego."""
+		rows: list[list[str]] = self._convert(self._labels + self._rows * 20)
+		self.assertEqual(len(rows), 120)
+		self.assertEqual(
+			[row[0] for row in rows[:3]], ['34567', '90123', '156890'])
+		self.assertEqual(
+			rows[-1],
+			['334678', 'Zenith Solutions', 'ZEN', '2023/05/11', 'CHF',
+				'241.71', '4,6284', '1118,73'],
+		)
+
+	def test_row_number(self) -> None:
+		"""Testuje, czy numery wierszy w komunikatach błędów odnoszą się
+		do całego pliku wejściowego."""
+		data: str = self._labels + self._rows * 20
+		data += '1,"Acme\nCorp",ACM,2023/13/01,USD,1.00\n' + self._rows
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			self._convert(data)
+		self.assertEqual(cm.exception.row_number, 122)
+
+	def test_progress(self) -> None:
+		"""Testuje wywoływanie funkcji raportującej postęp z pozycją końca
+		kolejnych fragmentów pliku."""
+		data: str = self._labels + self._rows * 20
+		with open(self.path, 'w') as f:
+			f.write(data)
+		positions: list[int] = []
+		with open(self.path) as f:
+			for _ in parallel.convert_file(
+				self.converter, f, 2, 1, chunk_size=256, progress=positions.append,
+			):
+				pass
+		self.assertGreater(len(positions), 1)
+		self.assertEqual(positions, sorted(positions))
+		self.assertEqual(positions[-1], os.path.getsize(self.path))
+
+	def test_start(self) -> None:
+		"""Testuje przetwarzanie pliku od pozycji za pierwszymi wierszami,
+		np. przy wznawianiu przetwarzania."""
+		data: str = self._labels + self._rows * 20
+		data += '1,"Acme\nCorp",ACM,2023/13/01,USD,1.00\n'
+		with open(self.path, 'w') as f:
+			f.write(data)
+		start: int = len((self._labels + self._rows * 10).encode())
+		rows: list[list[str]] = []
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			with open(self.path) as f:
+				for chunk_rows in parallel.convert_file(
+					self.converter, f, 2, chunk_size=256, start=start, start_row=61,
+				):
+					rows.extend(chunk_rows)
+		self.assertEqual(len(rows), 60)
+		self.assertEqual(rows[0][0], '34567')
+		self.assertEqual(cm.exception.row_number, 122)
@@ -0,0 +1,132 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `progress`.
+
+Zawiera następujące klasy:
+`ProgressReporterTestCase` -- Testy obiektów klasy
+`progress.ProgressReporter`.
+`InputTestCase` -- Testy funkcji `progress.input_size()`
+i `progress.input_position()`.
+"""
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import progress
+
+
+class ProgressReporterTestCase(TestCase):
+	"""Testy obiektów klasy `progress.ProgressReporter`.
+
+	Zawiera metody testujące poprawność obiektów klasy
+	`progress.ProgressReporter`. Czas jest w nich podmieniany, by wyniki
+	nie zależały od szybkości wykonania testów. Udostępnia następujące
+	atrybuty:
+	`test_json` -- Metoda testująca zdarzenia w formacie JSON.
+	`test_text` -- Metoda testująca raporty tekstowe.
+	"""
+
+	@patch('transactions2pln.progress.time.monotonic')
+	def test_json(self, monotonic_mock) -> None:
+		"""Testuje wypisywanie zdarzeń w formacie JSON nie częściej niż raz
+		na `interval` sekund."""
+		monotonic_mock.return_value = 100.0
+		stream: StringIO = StringIO()
+		reporter: progress.ProgressReporter = progress.ProgressReporter(
+			stream, 1000, 'json', 2.0)
+		reporter.start()
+
+		monotonic_mock.return_value = 101.0
+		reporter.update(10, 100)
+		monotonic_mock.return_value = 102.0
+		reporter.update(20, 200)
+		monotonic_mock.return_value = 103.0
+		reporter.update(30, 300)
+		monotonic_mock.return_value = 105.0
+		reporter.finish(50, 1000)
+
+		events: list[dict] = [
+			json.loads(line) for line in stream.getvalue().splitlines()]
+		self.assertEqual(
+			['start', 'progress', 'end'], [e['event'] for e in events])
+		self.assertEqual(20, events[1]['rows'])
+		self.assertEqual(2.0, events[1]['elapsed'])
+		self.assertEqual(10.0, events[1]['rows_per_s'])
+		self.assertEqual(100.0, events[1]['bytes_per_s'])
+		# Pozostało 800 z 1000 bajtów, przetwarzanych po 100 bajtów na sekundę.
+		self.assertEqual(8.0, events[1]['eta'])
+		self.assertEqual(0.0, events[2]['eta'])
+
+	@patch('transactions2pln.progress.time.monotonic')
+	def test_text(self, monotonic_mock) -> None:
+		"""Testuje wypisywanie postępu jako nadpisywanego wiersza tekstu."""
+		monotonic_mock.return_value = 0.0
+		stream: StringIO = StringIO()
+		reporter: progress.ProgressReporter = progress.ProgressReporter(
+			stream, 4 * 2**20)
+		reporter.start()
+		self.assertEqual('', stream.getvalue())
+
+		monotonic_mock.return_value = 2.0
+		reporter.update(1000, 2**20)
+		self.assertTrue(stream.getvalue().startswith(
+			"\rPrzetworzono wierszy: 1000 (25%), 500 wierszy/s, 0.5 MiB/s, "
+			"pozostało ok. 0:00:06"
+		))
+
+		# Bez znanej wielkości pliku nie jest szacowany czas do końca.
+		stream = StringIO()
+		reporter = progress.ProgressReporter(stream)
+		reporter.finish(10, error=True)
+		self.assertNotIn("pozostało", stream.getvalue())
+		self.assertTrue(stream.getvalue().endswith('\n'))
+
+
+class InputTestCase(TestCase):
+	"""Testy funkcji `progress.input_size()` i `progress.input_position()`.
+
+	Udostępnia następujące atrybuty:
+	`test_file` -- Metoda testująca odczyt z pliku na dysku.
+	`test_not_file` -- Metoda testująca odczyt ze strumienia bez pozycji.
+	"""
+
+	def test_file(self) -> None:
+		"""Testuje odczyt wielkości pliku i pozycji w pliku."""
+		with TemporaryDirectory() as tmpdir:
+			path: str = os.path.join(tmpdir, 'input.csv')
+			with open(path, 'w') as f:
+				f.write('a,b\n' * 100)
+			with open(path) as f:
+				self.assertEqual(400, progress.input_size(f))
+				position = progress.input_position(f)
+				assert position is not None
+				self.assertEqual(0, position())
+				f.read()
+				self.assertEqual(400, position())
+
+	def test_not_file(self) -> None:
+		"""Testuje odczyt ze strumienia, który nie jest plikiem na dysku."""
+		read_fd, write_fd = os.pipe()
+		with open(read_fd) as pipe, open(write_fd, 'w'):
+			self.assertIsNone(progress.input_size(pipe))
+			self.assertIsNone(progress.input_position(pipe))
+		self.assertIsNone(progress.input_size(StringIO()))
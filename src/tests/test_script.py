@@ -28,14 +28,33 @@ katalogu tymczasowego do innych klas zawierających testy.
 `ScriptLocaleTestCase` -- Klasa zawierająca testy sprawdzające zachowanie
 przy innym niż Polski języku systemowym.
 """
+import gzip
+import importlib.util
 import json
 import locale
 import os
+import pstats
+import shutil
 import typing
+import unittest
+from functools import partial
+from datetime import date
+from decimal import Decimal
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock, mock_open, patch
 
-from transactions2pln import exceptions as exc, script
+from transactions2pln import (
+	api,
+	compression,
+	exceptions as exc,
+	parallel,
+	progress,
+	script,
+	utils,
+)
+from transactions2pln.convert import RowConverter
 
 
 class TemporaryDirectoryMockMixin:
@@ -122,7 +141,27 @@ class BaseScriptTestCase(TemporaryDirectoryMockMixin, TestCase):
 		args_mock.currency = '5'
 		args_mock.amount_column = '6'
 		args_mock.json = False
+		args_mock.ndjson = False
+		args_mock.parquet = False
+		args_mock.arrow = False
+		args_mock.aggregate = False
+		args_mock.group_by = None
+		args_mock.period = None
 		args_mock.labels = False
+		args_mock.max_years = None
+		args_mock.cache = False
+		args_mock.cache_dir = None
+		args_mock.prefetch = False
+		args_mock.workers = 1
+		args_mock.engine = 'row'
+		args_mock.stats = None
+		args_mock.profile = None
+		args_mock.progress = None
+		args_mock.snapshot = None
+		args_mock.checkpoint = None
+		args_mock.follow = None
+		args_mock.flush = 0
+		args_mock.buffer_size = utils.BufferedOutput.DEFAULT_BUFFER_SIZE
 		return args_mock
 
 
@@ -138,6 +177,8 @@ class RunScriptTestCase(BaseScriptTestCase):
 	przy przetwarzaniu danych.
 	`test_success` -- Metoda testująca poprawność działania przy odpowiednim
 	zestawie parametrów i środowisku.
+	`test_profile` -- Metoda testująca zapisywanie profilu wykonania.
+	`test_positive_float` -- Metoda testująca parametry z dodatnimi liczbami.
 	"""
 
 	def test_error_file(self) -> None:
@@ -145,11 +186,20 @@ class RunScriptTestCase(BaseScriptTestCase):
 		args_mock: Mock = Mock()
 		args_mock.input = mock_open()()
 		args_mock.labels = True
+		args_mock.cache = False
+		args_mock.profile = None
+		args_mock.checkpoint = None
+		args_mock.follow = None
+		args_mock.parquet = False
+		args_mock.arrow = False
+		args_mock.aggregate = False
+		args_mock.group_by = None
+		args_mock.period = None
 
 		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
 		with patch('builtins.open', self.mock_open):
 			with patch(
-				'transactions2pln.script.TemporaryDirectory',
+				'transactions2pln.script.LazyTemporaryDirectory',
 				return_value=self._tmpdir
 			):
 				# Patchujemy również metodę `parse_args()`
@@ -171,7 +221,7 @@ class RunScriptTestCase(BaseScriptTestCase):
 		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
 		with patch('builtins.open', self.mock_open):
 			with patch(
-				'transactions2pln.script.TemporaryDirectory',
+				'transactions2pln.script.LazyTemporaryDirectory',
 				return_value=self._tmpdir
 			):
 				# Patchujemy również metodę `parse_args()`
@@ -193,7 +243,7 @@ class RunScriptTestCase(BaseScriptTestCase):
 		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
 		with patch('builtins.open', self.mock_open):
 			with patch(
-				'transactions2pln.script.TemporaryDirectory',
+				'transactions2pln.script.LazyTemporaryDirectory',
 				return_value=self._tmpdir
 			):
 				# Patchujemy również metodę `parse_args()`
@@ -214,7 +264,7 @@ class RunScriptTestCase(BaseScriptTestCase):
 		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
 		with patch('builtins.open', self.mock_open):
 			with patch(
-				'transactions2pln.script.TemporaryDirectory',
+				'transactions2pln.script.LazyTemporaryDirectory',
 				return_value=self._tmpdir
 			):
 				# Patchujemy również metodę `parse_args()`
@@ -237,6 +287,41 @@ class RunScriptTestCase(BaseScriptTestCase):
 				f.read(),
 			)
 
+	def test_profile(self) -> None:
+		"""Testuje zapisywanie profilu wykonania w pliku."""
+		with TemporaryDirectory() as tmpdir:
+			path: str = os.path.join(tmpdir, 'profile.prof')
+			# Profil jest zapisywany również wtedy, gdy wykonanie zakończy się
+			# błędem.
+			with self.assertRaises(script.ArgumentTypeError):
+				with script._profile(path):
+					script._positive_int('0')
+			self.assertIn(
+				(
+					'script.py',
+					script._positive_int.__code__.co_firstlineno,
+					'_positive_int',
+				),
+				{
+					(os.path.basename(filename), line, name)
+					for filename, line, name in pstats.Stats(path).stats
+				},
+			)
+
+		# Bez ścieżki profil nie jest tworzony.
+		with patch('cProfile.Profile') as profile_mock:
+			with script._profile(None):
+				pass
+		profile_mock.assert_not_called()
+
+	def test_positive_float(self) -> None:
+		"""Testuje zamianę wartości parametrów na dodatnie liczby."""
+		self.assertEqual(0.5, script._positive_float('0.5'))
+		for value in ('0', '-1', 'never'):
+			with self.subTest(value=value):
+				self.assertRaises(
+					script.ArgumentTypeError, script._positive_float, value)
+
 
 class Transactions2PLNTestCase(BaseScriptTestCase):
 	"""Testy funkcji `script.transactions2pln()`.
@@ -244,6 +329,7 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 	Zawiera metody testujące i wspomagające testowanie funkcji
 	`script.transactions2pln()`. Udostępnia następujące atrybuty:
 	`test_json` -- Metoda testująca zapisywanie w formacie JSON.
+	`test_ndjson` -- Metoda testująca zapisywanie w formacie NDJSON.
 	`test_amount_column_as_letter` -- Metoda testująca oznaczanie
 	kolumny z kwotami literą.
 	`test_amount_column_fallback` -- Metoda testująca używanie ostatniej kolumny
@@ -251,7 +337,25 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 	`test_currency_as_code` -- Metoda testująca oznaczanie waluty kodem ISO.
 	`test_date_column_as_letter` -- Metoda testująca oznaczanie
 	kolumny z datami literą.
+	`test_date_detection` -- Metoda testująca wykrywanie kolumny z datami
+	i formatu dat.
 	`test_labels` -- Metoda testująca obsługę nagłówków.
+	`test_prefetch` -- Metoda testująca wstępne pobieranie tabel kursów.
+	`test_flush` -- Metoda testująca zapisywanie danych po każdym wierszu.
+	`test_workers` -- Metoda testująca przetwarzanie w wielu procesach.
+	`test_stats` -- Metoda testująca wypisywanie statystyk przetwarzania.
+	`test_progress` -- Metoda testująca raportowanie postępu.
+	`test_engine_numpy` -- Metoda testująca przetwarzanie partiami
+	za pomocą biblioteki NumPy.
+	`test_checkpoint` -- Metoda testująca przetwarzanie jedynie wierszy
+	dopisanych od poprzedniego uruchomienia.
+	`test_follow` -- Metoda testująca przetwarzanie wierszy dopisywanych
+	do pliku wejściowego w trakcie działania programu.
+	`test_parquet` -- Metoda testująca zapisywanie danych w formacie Parquet.
+	`test_aggregate` -- Metoda testująca sumowanie kwot w PLN w grupach
+	transakcji.
+	`test_compressed` -- Metoda testująca przetwarzanie pliku
+	skompresowanego.
 	"""
 
 	@patch('transactions2pln.utils.urlretrieve')
@@ -275,6 +379,29 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 				json.load(transactions_output),
 			)
 
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_ndjson(self, _) -> None:
+		"""Testuje zapisywanie danych w formacie NDJSON."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.ndjson = True
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open):
+			# Przy prawidłowym wykonaniu, funkcja powinna zwrócić `None`.
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+
+		# Porównanie danych zapisanych do makiety pliku wynikowego z oczekiwanymi.
+		written: str = ''.join(
+			[c[0][0] for c in args_mock.output.write.call_args_list])
+		self.assertTrue(written.endswith('\n'))
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.json'),
+		) as transactions_output:
+			self.assertEqual(
+				[json.loads(line) for line in written.splitlines()],
+				json.load(transactions_output),
+			)
+
 	@patch('transactions2pln.utils.urlretrieve')
 	def test_amount_column_as_letter(self, _) -> None:
 		"""Testuje przyjmowanie litery jako oznaczenia kolumny z kwotami."""
@@ -380,6 +507,29 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 				f.read(),
 			)
 
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_date_detection(self, _) -> None:
+		"""Testuje wykrywanie kolumny z datami i formatu dat."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.date_column = ''
+		args_mock.date_format = None
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open):
+			with patch('sys.stderr', new_callable=StringIO) as stderr:
+				self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		self.assertIn("kolumnę z datą 4 i format dat %Y/%m/%d", stderr.getvalue())
+
+		# Porównanie danych zapisanych do makiety pliku wynikowego z oczekiwanymi.
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as transactions_output:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				transactions_output.read(),
+			)
+
 	@patch('transactions2pln.utils.urlretrieve')
 	def test_labels(self, _) -> None:
 		"""Testuje obsługę nagłówków."""
@@ -399,6 +549,7 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 		# Testuje poprawne przetworzenie pliku z nagłówkami.
 		args_mock.input = open(
 			os.path.join(self._test_data_dir, 'transactions_with_labels.csv'))
+		self.addCleanup(args_mock.input.close)
 		with patch('builtins.open', self.mock_open):
 			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
 
@@ -413,6 +564,442 @@ class Transactions2PLNTestCase(BaseScriptTestCase):
 				labels_output + transactions_output.read(),
 			)
 
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_prefetch(self, _) -> None:
+		"""Testuje wstępne pobieranie potrzebnych tabel kursów."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.prefetch = True
+
+		with patch.object(
+			utils.TablesPool, 'prefetch', autospec=True
+		) as prefetch:
+			# Po spatchowaniu, open() zwraca zawsze zawartość pliku
+			# data/nbp_table.csv
+			with patch('builtins.open', self.mock_open):
+				self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		self.assertEqual(set(prefetch.call_args[0][1]), {('a', 2023)})
+
+		# Mimo wstępnego przebiegu przez plik, przetworzone muszą zostać
+		# wszystkie wiersze.
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as f:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				f.read(),
+			)
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_flush(self, _) -> None:
+		"""Testuje zapisywanie danych do pliku wynikowego
+		po każdym wierszu."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.flush = script._flush_policy('row')
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as f:
+			expected_rows: list[str] = f.read().splitlines(keepends=True)
+		# Każdy wiersz jest zapisywany i opróżniany z bufora osobno.
+		self.assertEqual(
+			[c[0][0] for c in args_mock.output.write.call_args_list],
+			expected_rows,
+		)
+		self.assertGreaterEqual(
+			args_mock.output.flush.call_count, len(expected_rows))
+		for value in ('0', '-1', 'always'):
+			with self.subTest(value=value):
+				self.assertRaises(
+					script.ArgumentTypeError, script._flush_policy, value)
+
+	def test_workers(self) -> None:
+		"""Testuje przetwarzanie pliku wejściowego w wielu procesach."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.workers = 2
+
+		# Procesy robocze odczytują pliki samodzielnie, więc zamiast
+		# podmieniać funkcję `open()` umieszczamy testową tabelę kursów
+		# w katalogu tymczasowym, gdzie zostanie odnaleziona bez pobierania.
+		with TemporaryDirectory() as tmpdir:
+			shutil.copy(
+				os.path.join(self._test_data_dir, 'nbp_table.csv'),
+				os.path.join(tmpdir, 'archiwum_tab_a_2023.csv'),
+			)
+			tmpdir_mock: Mock = Mock(['name'])
+			tmpdir_mock.name = tmpdir
+			# Mały rozmiar fragmentów wymusza podział pliku między procesy.
+			with patch.object(
+				parallel,
+				'convert_file',
+				partial(parallel.convert_file, chunk_size=64),
+			):
+				self.assertIsNone(script.transactions2pln(args_mock, tmpdir_mock))
+
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as transactions_output:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				transactions_output.read(),
+			)
+		for value in ('0', '-1', 'all'):
+			with self.subTest(value=value):
+				self.assertRaises(
+					script.ArgumentTypeError, script._positive_int, value)
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_stats(self, _) -> None:
+		"""Testuje wypisywanie statystyk przetwarzania."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.stats = 'json'
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open):
+			with patch('sys.stderr', new_callable=StringIO) as stderr:
+				self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		stats: dict[str, typing.Any] = json.loads(stderr.getvalue())
+		self.assertEqual(6, stats['rows'])
+		self.assertEqual(1, stats['tables_downloaded'])
+		self.assertEqual(0, stats['tables_reused'])
+		self.assertEqual(6, stats['rate_lookups'])
+		self.assertEqual(6, stats['date_lookups'])
+		self.assertEqual(
+			{'download', 'tables', 'read', 'dates', 'rates', 'amounts', 'write'},
+			set(stats['stages']),
+		)
+
+		# Statystyki nie zmieniają danych wynikowych.
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as transactions_output:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				transactions_output.read(),
+			)
+
+		self.test_file.seek(0)
+		args_mock = self.get_args_mock()
+		args_mock.stats = 'text'
+		with patch('builtins.open', self.mock_open):
+			with patch('sys.stderr', new_callable=StringIO) as stderr:
+				self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		self.assertIn("wiersze: 6", stderr.getvalue())
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_progress(self, _) -> None:
+		"""Testuje raportowanie postępu w formacie JSON."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.progress = 'json'
+		args_mock.progress_interval = 1.0
+		# Zdarzenia są przechwytywane w osobnym strumieniu, gdyż do
+		# standardowego strumienia błędów mogą trafić również inne komunikaty,
+		# np. ostrzeżenia o niezamkniętych plikach z wcześniejszych testów.
+		stream: StringIO = StringIO()
+		reporter: typing.Callable[..., progress.ProgressReporter] = partial(
+			progress.ProgressReporter, stream)
+
+		def get_events() -> list[dict[str, typing.Any]]:
+			return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open), patch(
+			'transactions2pln.progress.ProgressReporter',
+			side_effect=lambda _, *args: reporter(*args),
+		):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		events: list[dict[str, typing.Any]] = get_events()
+		self.assertEqual('start', events[0]['event'])
+		self.assertEqual('end', events[-1]['event'])
+		self.assertEqual(6, events[-1]['rows'])
+		size: int = os.path.getsize(self.test_file.name)
+		self.assertEqual(size, events[-1]['total_bytes'])
+		self.assertEqual(size, events[-1]['bytes'])
+
+		# Przerwanie przetwarzania przez błąd kończy raportowanie zdarzeniem
+		# `error`.
+		self.test_file.seek(0)
+		args_mock = self.get_args_mock()
+		args_mock.progress = 'json'
+		args_mock.progress_interval = 1.0
+		args_mock.date_format = '%d.%m.%Y'
+		stream.seek(0)
+		stream.truncate()
+		with patch('builtins.open', self.mock_open), patch(
+			'transactions2pln.progress.ProgressReporter',
+			side_effect=lambda _, *args: reporter(*args),
+		):
+			self.assertRaises(
+				exc.RowProcessingError,
+				script.transactions2pln,
+				args_mock,
+				self._tmpdir,
+			)
+		self.assertEqual('error', get_events()[-1]['event'])
+
+	@unittest.skipIf(
+		importlib.util.find_spec('numpy') is None,
+		"biblioteka NumPy nie jest dostępna",
+	)
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_engine_numpy(self, _) -> None:
+		"""Testuje przetwarzanie partiami za pomocą biblioteki NumPy."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.engine = 'numpy'
+
+		# Po spatchowaniu, open() zwraca zawsze zawartość pliku data/nbp_table.csv
+		with patch('builtins.open', self.mock_open):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+
+		# Porównanie danych zapisanych do makiety pliku wynikowego z oczekiwanymi.
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as transactions_output:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				transactions_output.read(),
+			)
+
+	def test_checkpoint(self) -> None:
+		"""Testuje zapisywanie stanu przetwarzania i przetwarzanie przy
+		kolejnym uruchomieniu jedynie wierszy dopisanych do pliku wejściowego.
+		"""
+		input_rows: list[str] = self.test_file.readlines()
+		with TemporaryDirectory() as tmpdir:
+			shutil.copy(
+				os.path.join(self._test_data_dir, 'nbp_table.csv'),
+				os.path.join(tmpdir, 'archiwum_tab_a_2023.csv'),
+			)
+			tmpdir_mock: Mock = Mock(['name'])
+			tmpdir_mock.name = tmpdir
+			input_path: str = os.path.join(tmpdir, 'transactions.csv')
+			output_path: str = os.path.join(tmpdir, 'output.csv')
+			processed: int = 0
+			for rows in (input_rows[:2], input_rows):
+				with open(input_path, 'w') as f:
+					f.writelines(rows)
+				args_mock: Mock = self.get_args_mock()
+				args_mock.checkpoint = ''
+				with (
+					open(input_path) as args_mock.input,
+					open(output_path, 'a') as args_mock.output,
+					patch.object(
+						RowConverter,
+						'convert',
+						autospec=True,
+						side_effect=RowConverter.convert,
+					) as convert,
+				):
+					self.assertIsNone(
+						script.transactions2pln(args_mock, tmpdir_mock))
+				# Przy drugim uruchomieniu przetwarzane są tylko nowe wiersze.
+				self.assertEqual(
+					[c.args[2] for c in convert.call_args_list],
+					list(range(processed + 1, len(rows) + 1)),
+				)
+				processed = len(rows)
+			self.assertTrue(os.path.isfile(output_path + '.checkpoint'))
+			with (
+				open(output_path, newline='') as output,
+				open(
+					os.path.join(self._test_data_dir, 'transactions_output.csv'),
+					newline='',
+				) as transactions_output,
+			):
+				self.assertEqual(output.read(), transactions_output.read())
+
+		# Stanu nie można zapisać, jeśli wyniki są zwracane do konsoli.
+		args_mock = self.get_args_mock()
+		args_mock.checkpoint = ''
+		args_mock.output = None
+		self.assertRaises(
+			ValueError, script.transactions2pln, args_mock, self._tmpdir)
+
+	def test_follow(self) -> None:
+		"""Testuje przetwarzanie wierszy dopisywanych do pliku wejściowego
+		w trakcie działania programu.
+
+		Wyniki dla wierszy odczytanych przed oczekiwaniem na dane powinny
+		zostać zapisane przed tym oczekiwaniem.
+		"""
+		input_rows: list[str] = self.test_file.readlines()
+		with TemporaryDirectory() as tmpdir:
+			shutil.copy(
+				os.path.join(self._test_data_dir, 'nbp_table.csv'),
+				os.path.join(tmpdir, 'archiwum_tab_a_2023.csv'),
+			)
+			tmpdir_mock: Mock = Mock(['name'])
+			tmpdir_mock.name = tmpdir
+			input_path: str = os.path.join(tmpdir, 'transactions.csv')
+			output_path: str = os.path.join(tmpdir, 'output.csv')
+			with open(input_path, 'w') as f:
+				f.writelines(input_rows[:2])
+			written: list[int] = []
+
+			def sleep(interval: float) -> None:
+				self.assertEqual(interval, 0.5)
+				with open(output_path) as f:
+					written.append(len(f.readlines()))
+				if len(written) > 1:
+					raise KeyboardInterrupt
+				with open(input_path, 'a') as f:
+					f.writelines(input_rows[2:])
+
+			args_mock: Mock = self.get_args_mock()
+			args_mock.follow = 0.5
+			args_mock.engine = 'numpy'
+			with (
+				open(input_path) as args_mock.input,
+				open(output_path, 'w') as args_mock.output,
+				patch('transactions2pln.follow.time.sleep', sleep),
+				patch('sys.stderr', new_callable=StringIO) as stderr,
+			):
+				self.assertIsNone(
+					script.transactions2pln(args_mock, tmpdir_mock))
+			self.assertIn("przetwarzane pojedynczo", stderr.getvalue())
+			self.assertEqual(written, [2, len(input_rows)])
+			with (
+				open(output_path, newline='') as output,
+				open(
+					os.path.join(self._test_data_dir, 'transactions_output.csv'),
+					newline='',
+				) as transactions_output,
+			):
+				self.assertEqual(output.read(), transactions_output.read())
+
+		# Opcji nie można łączyć z zapisem stanu przetwarzania.
+		args_mock = self.get_args_mock()
+		args_mock.follow = 0.5
+		args_mock.checkpoint = ''
+		self.assertRaises(
+			ValueError, script.transactions2pln, args_mock, self._tmpdir)
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_parquet(self, _) -> None:
+		"""Testuje zapisywanie danych w formacie Parquet."""
+		# Pliku Parquet nie można uzupełniać, więc opcja nie może być
+		# używana razem z zapisem stanu przetwarzania.
+		args_mock: Mock = self.get_args_mock()
+		args_mock.parquet = True
+		args_mock.checkpoint = ''
+		self.assertRaises(
+			ValueError, script.transactions2pln, args_mock, self._tmpdir)
+
+		if importlib.util.find_spec('pyarrow') is None:
+			self.skipTest("biblioteka pyarrow nie jest dostępna")
+		import pyarrow.parquet
+		args_mock = self.get_args_mock()
+		args_mock.parquet = True
+		args_mock.output.buffer = BytesIO()
+		with patch('builtins.open', self.mock_open):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		args_mock.output.buffer.seek(0)
+		table: typing.Any = pyarrow.parquet.read_table(args_mock.output.buffer)
+		self.assertEqual(table.num_rows, 6)
+		self.assertEqual(
+			table.column_names, ['1', '2', '3', '4', '5', '6', *api.LABELS])
+		row: dict[str, typing.Any] = table.slice(0, 1).to_pylist()[0]
+		self.assertEqual(row['4'], date(2023, 4, 18))
+		self.assertEqual(row[api.LABELS[0]], Decimal('3.1533'))
+		self.assertEqual(row[api.LABELS[1]], Decimal('19481.81'))
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_aggregate(self, _) -> None:
+		"""Testuje sumowanie kwot w PLN w grupach transakcji."""
+		args_mock: Mock = self.get_args_mock()
+		args_mock.labels = True
+		args_mock.amount_column = 'Value'
+		args_mock.currency = 'Currency'
+		args_mock.date_column = 'Date'
+		args_mock.group_by = ['Currency']
+		args_mock.period = 'month'
+		args_mock.input = open(
+			os.path.join(self._test_data_dir, 'transactions_with_labels.csv'))
+		self.addCleanup(args_mock.input.close)
+		with patch('builtins.open', self.mock_open):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		self.assertEqual(
+			''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+			'Currency,okres,liczba transakcji,suma w PLN,'
+			'najmniejsza kwota w PLN,największa kwota w PLN\r\n'
+			'CAD,2023-04,1,"19481,81","19481,81","19481,81"\r\n'
+			'AUD,2023-04,1,"4393,54","4393,54","4393,54"\r\n'
+			'USD,2023-04,1,"7869,44","7869,44","7869,44"\r\n'
+			'USD,2023-05,1,"18218,6","18218,6","18218,6"\r\n'
+			'GBP,2023-05,1,"4953,62","4953,62","4953,62"\r\n'
+			'CHF,2023-05,1,"1118,73","1118,73","1118,73"\r\n',
+		)
+
+		# Po błędzie przetwarzania zapisywane są wyniki dla wierszy
+		# przetworzonych przed błędnym.
+		with TemporaryDirectory() as tmpdir:
+			path: str = os.path.join(tmpdir, 'transactions.csv')
+			with open(path, 'w') as f:
+				f.write(''.join(self.test_file.readlines()[:2]))
+				f.write('1,"Acme Corp",ACM,2023/05/02,USD,abc\n')
+			args_mock = self.get_args_mock()
+			args_mock.aggregate = True
+			args_mock.input = open(path)
+			self.addCleanup(args_mock.input.close)
+			with patch('builtins.open', self.mock_open):
+				self.assertRaises(
+					exc.RowProcessingError,
+					script.transactions2pln, args_mock, self._tmpdir,
+				)
+		self.assertEqual(
+			''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+			'2,"23875,35","4393,54","19481,81"\r\n',
+		)
+
+		# Nieznana kolumna wyznaczająca grupę.
+		args_mock = self.get_args_mock()
+		args_mock.group_by = ['Portfel']
+		self.assertRaises(
+			exc.ColumnParameterError,
+			script.transactions2pln, args_mock, self._tmpdir,
+		)
+
+		# Sumowania nie można łączyć z zapisem stanu przetwarzania.
+		args_mock = self.get_args_mock()
+		args_mock.aggregate = True
+		args_mock.checkpoint = ''
+		self.assertRaises(
+			ValueError, script.transactions2pln, args_mock, self._tmpdir)
+
+	@patch('transactions2pln.utils.urlretrieve')
+	def test_compressed(self, _) -> None:
+		"""Testuje przetwarzanie pliku skompresowanego."""
+		compressed: BytesIO = BytesIO(
+			gzip.compress(self.test_file.read().encode()))
+		args_mock: Mock = self.get_args_mock()
+		args_mock.input = compression.CompressedFile(compressed, 'gzip')
+		self.addCleanup(args_mock.input.close)
+		with patch('builtins.open', self.mock_open):
+			self.assertIsNone(script.transactions2pln(args_mock, self._tmpdir))
+		with open(
+			os.path.join(self._test_data_dir, 'transactions_output.csv'),
+			newline='',
+		) as f:
+			self.assertEqual(
+				''.join([c[0][0] for c in args_mock.output.write.call_args_list]),
+				f.read(),
+			)
+
+		# Pozycja w pliku skompresowanym nie pozwala wznowić przetwarzania.
+		args_mock = self.get_args_mock()
+		args_mock.input = compression.CompressedFile(compressed, 'gzip')
+		args_mock.checkpoint = ''
+		self.assertRaises(
+			ValueError, script.transactions2pln, args_mock, self._tmpdir)
+
 
 class ScriptLocaleTestCase(TemporaryDirectoryMockMixin, TestCase):
 	"""Testy zachowania modułu `script` przy niewspieranych ustawieniach języka.
@@ -445,7 +1032,8 @@ class ScriptLocaleTestCase(TemporaryDirectoryMockMixin, TestCase):
 		"""
 		locale.setlocale(locale.LC_CTYPE, self.saved_locale)
 
-	@patch.object(script.ArgumentParser, 'parse_args')
+	@patch.object(
+		script.ArgumentParser, 'parse_args', return_value=Mock(profile=None))
 	def test_locale_not_polish(self, _) -> None:
 		"""Testuje błędy przy wykonywaniu z językiem innym niż polski.
 
@@ -454,7 +1042,7 @@ class ScriptLocaleTestCase(TemporaryDirectoryMockMixin, TestCase):
 		z językiem systemowym innym niż polski.
 		"""
 		with patch(
-			'transactions2pln.script.TemporaryDirectory',
+			'transactions2pln.script.LazyTemporaryDirectory',
 			return_value=self._tmpdir
 		):
 			self.assertEqual(2, script.run())
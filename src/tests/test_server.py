@@ -0,0 +1,297 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `server`.
+
+Zawiera następujące klasy:
+`ConversionServerTestCase` -- Testy obsługi żądań przez serwer.
+`RunTestCase` -- Testy uruchamiania serwera jako programu.
+"""
+import http.client
+import json
+import os
+import shutil
+import socket
+import threading
+import typing
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import api, server
+
+
+class ConversionServerTestCase(TestCase):
+	"""Testy obsługi żądań przez obiekty klasy `server.ConversionServer`.
+
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`request` -- Metoda wysyłająca żądanie do testowego serwera.
+	`test_convert_csv` -- Metoda testująca przeliczanie danych CSV.
+	`test_convert_ndjson` -- Metoda testująca przeliczanie danych NDJSON.
+	`test_convert_errors` -- Metoda testująca błędy przeliczania.
+	`test_rate` -- Metoda testująca odczyt kursów.
+	`test_refresh` -- Metoda testująca ponowne wczytywanie tabel.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Uruchamia w osobnym wątku serwer korzystający z testowej
+		tabeli kursów NBP za 2023 rok. Ustawia następujące atrybuty publiczne:
+		`server` -- Testowy obiekt klasy `server.ConversionServer`.
+		`input` -- Zawartość pliku z testowymi danymi z nagłówkami.
+		`output` -- Oczekiwane wyniki przeliczenia danych z `input`.
+		"""
+		data_dir: str = os.path.join(os.path.dirname(__file__), 'data')
+		rates: api.Rates = api.Rates()
+		self.addCleanup(rates.close)
+		shutil.copy(
+			os.path.join(data_dir, 'nbp_table.csv'),
+			os.path.join(rates._tmpdir.name, 'archiwum_tab_a_2023.csv'),
+		)
+		self.server: server.ConversionServer = server.ConversionServer(
+			('127.0.0.1', 0), rates)
+		self.addCleanup(self.server.server_close)
+		# Dziennik żądań nie jest potrzebny w wynikach testów.
+		patcher = patch.object(server.RequestHandler, 'log_message')
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		thread: threading.Thread = threading.Thread(
+			target=self.server.serve_forever)
+		thread.start()
+		self.addCleanup(thread.join)
+		self.addCleanup(self.server.shutdown)
+		with open(
+			os.path.join(data_dir, 'transactions_with_labels.csv'), 'rb',
+		) as f:
+			self.input: bytes = f.read()
+		with open(os.path.join(data_dir, 'transactions_output.csv'), 'rb') as f:
+			self.output: bytes = f.read()
+
+	def request(
+			self,
+			method: str,
+			path: str,
+			body: bytes|None = None,
+			content_type: str = 'text/csv',
+		) -> tuple[int, str, bytes]:
+		"""Wysyła żądanie do testowego serwera i zwraca status, typ treści
+		i treść odpowiedzi."""
+		connection: http.client.HTTPConnection = http.client.HTTPConnection(
+			*self.server.server_address[:2])
+		try:
+			connection.request(
+				method, path, body, {'Content-Type': content_type})
+			response: http.client.HTTPResponse = connection.getresponse()
+			return (
+				response.status,
+				response.getheader('Content-Type', ''),
+				response.read(),
+			)
+		finally:
+			connection.close()
+
+	def test_convert_csv(self) -> None:
+		"""Testuje przeliczanie danych w formacie CSV."""
+		status, content_type, body = self.request(
+			'POST', '/convert?currency=Currency', self.input)
+		self.assertEqual(status, 200)
+		self.assertEqual(content_type, 'text/csv; charset=utf-8')
+		self.assertEqual(
+			body,
+			b'ID,Name,Symbol,Date,Currency,Value,kurs do PLN,kwota w PLN\r\n'
+			+ self.output,
+		)
+		# Dane bez nagłówków, wyniki w formacie JSON.
+		status, content_type, body = self.request(
+			'POST',
+			'/convert?currency=E&labels=0&format=json&decimal-point=.',
+			self.input.split(b'\n', 1)[1],
+		)
+		self.assertEqual(status, 200)
+		self.assertEqual(content_type, 'application/json; charset=utf-8')
+		rows: list[list[str]] = json.loads(body)
+		self.assertEqual(rows[0][-2:], ['3.1533', '19481.81'])
+		self.assertEqual(len(rows), self.output.count(b'\n'))
+
+	def test_convert_ndjson(self) -> None:
+		"""Testuje przeliczanie danych w formacie NDJSON."""
+		input: bytes = (
+			b'{"date": "2023-04-18", "amount": 10.5}\n'
+			b'\n'
+			b'{"date": "2023-04-19", "amount": "3"}\n'
+		)
+		status, content_type, body = self.request(
+			'POST', '/convert?amount-column=amount', input,
+			'application/x-ndjson',
+		)
+		self.assertEqual(status, 200)
+		self.assertEqual(content_type, 'application/x-ndjson; charset=utf-8')
+		self.assertEqual(
+			[json.loads(line) for line in body.splitlines()],
+			[
+				{
+					'date': '2023-04-18', 'amount': '10.5',
+					'kurs do PLN': '4,2151', 'kwota w PLN': '44,26',
+				},
+				{
+					'date': '2023-04-19', 'amount': '3',
+					'kurs do PLN': '4,2244', 'kwota w PLN': '12,67',
+				},
+			],
+		)
+		# Wiersze jako tablice, wyniki w formacie CSV.
+		status, content_type, body = self.request(
+			'POST', '/convert?currency=CAD&format=csv',
+			b'["2023-04-18", 1]\n', 'application/x-ndjson',
+		)
+		self.assertEqual(status, 200)
+		self.assertEqual(body, b'2023-04-18,1,"3,1533","3,15"\r\n')
+
+	def test_convert_errors(self) -> None:
+		"""Testuje obsługę błędów przy przeliczaniu danych."""
+		for path, body in (
+			('/convert?currency=Waluta', self.input),
+			('/convert?format=xml', self.input),
+			('/convert?labels=0', b'2023-04-18,abc\n'),
+		):
+			with self.subTest(path=path):
+				status, content_type, response = self.request('POST', path, body)
+				self.assertEqual(status, 400)
+				self.assertEqual(content_type, 'application/json; charset=utf-8')
+				self.assertIn('error', json.loads(response))
+		# Wiersze NDJSON innego typu niż obiekty i tablice, wiersze różnych
+		# typów i wiersze z brakującymi kolumnami.
+		for body in (
+			b'5\n',
+			b'"2023-04-18"\n',
+			b'["2023-04-18", 1]\n{"date": "2023-04-18"}\n',
+			b'{"date": "2023-04-18", "amount": 1}\n["2023-04-18", 1]\n',
+			b'["2023-04-18"]\n',
+		):
+			with self.subTest(body=body):
+				status, _, response = self.request(
+					'POST', '/convert?currency=CAD', body, 'application/x-ndjson')
+				self.assertEqual(status, 400)
+				self.assertIn('error', json.loads(response))
+		status, _, _ = self.request('POST', '/rate', self.input)
+		self.assertEqual(status, 404)
+		# Nieznane kodowanie znaków treści żądania.
+		status, _, response = self.request(
+			'POST', '/convert', self.input, 'text/csv; charset=foo')
+		self.assertEqual(status, 400)
+		self.assertIn('error', json.loads(response))
+		# Błąd pobierania tabeli kursów, tak jak w żądaniu `GET /rate`.
+		with patch('transactions2pln.utils.urlretrieve', side_effect=OSError):
+			status, _, response = self.request(
+				'POST', '/convert?labels=0', b'2022-04-18,1\n')
+		self.assertEqual(status, 502)
+		self.assertIn('error', json.loads(response))
+
+		# Błąd wykryty w trakcie przesyłania wyników przerywa odpowiedź.
+		with self.assertRaises(http.client.IncompleteRead) as cm:
+			self.request(
+				'POST', '/convert?labels=0',
+				b'2023-04-18,1\n2023-04-19,abc\n',
+			)
+		self.assertEqual(cm.exception.partial, b'2023-04-18,1,"4,2151","4,22"\r\n')
+		# Przy podanych kolumnach i formacie daty wiersze nie są odczytywane
+		# z wyprzedzeniem, więc błędy w dalszych wierszach NDJSON również
+		# przerywają odpowiedź.
+		path: str = (
+			'/convert?currency=CAD&format=csv&date-column=1&amount-column=2'
+			'&date-format=%Y-%m-%d'
+		)
+		for body in (
+			b'["2023-04-18", 1]\n{"date": "2023-04-19"}\n',
+			b'["2023-04-18", 1]\n["2023-04-19"]\n',
+		):
+			with self.subTest(body=body):
+				with self.assertRaises(http.client.IncompleteRead) as cm:
+					self.request('POST', path, body, 'application/x-ndjson')
+				self.assertEqual(
+					cm.exception.partial, b'2023-04-18,1,"3,1533","3,15"\r\n')
+
+		# Treść bez nagłówka Content-Length.
+		connection: http.client.HTTPConnection = http.client.HTTPConnection(
+			*self.server.server_address[:2])
+		self.addCleanup(connection.close)
+		connection.request(
+			'POST', '/convert', iter([self.input]),
+			{'Transfer-Encoding': 'chunked'},
+		)
+		self.assertEqual(connection.getresponse().status, 411)
+
+	def test_rate(self) -> None:
+		"""Testuje odczyt kursów żądaniem `GET /rate`."""
+		status, content_type, body = self.request(
+			'GET', '/rate?currency=USD&date=2023-04-22')
+		self.assertEqual(status, 200)
+		self.assertEqual(content_type, 'application/json; charset=utf-8')
+		self.assertEqual(
+			json.loads(body),
+			{'currency': 'USD', 'date': '2023-04-22', 'rate': '4.2006'},
+		)
+		for path, expected_status in (
+			('/rate?currency=USD&date=22.04.2023', 400),
+			('/rate?currency=XYZ&date=2023-04-22', 404),
+			('/rates?currency=USD&date=2023-04-22', 404),
+		):
+			with self.subTest(path=path):
+				status, _, body = self.request('GET', path)
+				self.assertEqual(status, expected_status)
+				self.assertIn('error', json.loads(body))
+
+	def test_refresh(self) -> None:
+		"""Testuje usuwanie z pamięci tabel za bieżący rok metodą
+		`refresh()`."""
+		with patch.object(self.server.rates.tables, 'discard') as discard:
+			self.server.refresh()
+			discard.assert_not_called()
+			self.server.refresh_interval = 0
+			self.server.refresh()
+			discard.assert_called_once()
+
+
+class RunTestCase(TestCase):
+	"""Testy funkcji `server.run()`.
+
+	Udostępnia następujące atrybuty:
+	`test_port_in_use` -- Metoda testująca błąd zajętego portu.
+	"""
+
+	def test_port_in_use(self) -> None:
+		"""Testuje, czy przy zajętym porcie funkcja zwraca kod błędu
+		systemu."""
+		with socket.socket() as sock:
+			sock.bind(('127.0.0.1', 0))
+			sock.listen()
+			port: int = sock.getsockname()[1]
+			argv: list[str] = [
+				'transactions2pln-serve', '--port', str(port), '--preload',
+				'--no-cache',
+			]
+			preload: typing.Any
+			with (
+				patch('sys.argv', argv),
+				patch('sys.stderr'),
+				patch.object(api.Rates, 'preload') as preload,
+			):
+				self.assertEqual(server.run(), 2)
+			preload.assert_called_once_with([])
@@ -0,0 +1,206 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `snapshot`.
+
+Zawiera następujące klasy:
+`SnapshotTestCase` -- Testy tworzenia i odczytu migawek kursów.
+"""
+import os
+import pickle
+import typing
+from datetime import date
+from decimal import Decimal
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import snapshot, utils
+
+
+class SnapshotTestCase(TestCase):
+	"""Testy tworzenia, odczytu i sprawdzania migawek kursów.
+
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_build` -- Metoda testująca tworzenie i odczyt migawki.
+	`test_current_year` -- Metoda testująca pomijanie nieopublikowanych
+	jeszcze kursów z bieżącego roku.
+	`test_invalid` -- Metoda testująca otwieranie nieprawidłowych plików.
+	`test_verify` -- Metoda testująca sprawdzanie poprawności migawki.
+	`test_update` -- Metoda testująca aktualizację migawki.
+	`test_pickle` -- Metoda testująca przekazywanie obiektów do innych
+	procesów.
+	`test_run` -- Metoda testująca program wiersza poleceń.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Podmienia metodę `TablesManager._download_table()` tak,
+		by zwracała testowe tabele z kursami USD i EUR za kilka dni
+		z przełomu lat 2022 i 2023. Ustawia następujące atrybuty publiczne:
+		`tables` -- Słownik testowych tabel A, w którym kluczami są lata.
+		`pool` -- Obiekt klasy `utils.TablesPool` z testowymi tabelami.
+		`path` -- Ścieżka do pliku migawki w katalogu tymczasowym.
+		"""
+		self.tables: dict[int, utils.ExchangeTable] = {
+			2022: {date(2022, 12, 30): ['4,4018', '4,6899']},
+			2023: {
+				date(2023, 1, 2): ['4,3811', '4,6784'],
+				date(2023, 1, 3): ['4,4135', '4,69'],
+			},
+		}
+
+		def download_table(
+			manager: utils.TablesManager,
+			table: str,
+			year: int,
+		) -> utils.ExchangeTable:
+			if table != 'a':
+				return {}
+			manager._currency_lookup.update({'USD': 0, 'EUR': 1})
+			return self.tables.get(year, {})
+
+		patcher = patch.object(
+			utils.TablesManager,
+			'_download_table',
+			autospec=True,
+			side_effect=download_table,
+		)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		tmpdir: TemporaryDirectory = TemporaryDirectory() # type: ignore[type-arg]
+		self.addCleanup(tmpdir.cleanup)
+		self.pool: utils.TablesPool = utils.TablesPool(tmpdir)
+		self.path: str = os.path.join(tmpdir.name, 'rates.t2p')
+
+	def test_build(self) -> None:
+		"""Testuje tworzenie migawki i odczyt zapisanych w niej kursów."""
+		self.assertEqual(snapshot.build(self.path, self.pool, 2022, 2023), 2)
+		with snapshot.Snapshot(self.path) as rates:
+			self.assertEqual(rates.first_year, 2022)
+			self.assertEqual(rates.last_year, 2023)
+			self.assertEqual(rates.created, date.today())
+			self.assertEqual(rates.currencies, {'EUR': 'a', 'USD': 'a'})
+			self.assertTrue(rates.covers(2022))
+			self.assertFalse(rates.covers(2024))
+			for currency, check_date in (
+				('USD', date(2022, 12, 30)),
+				# Kurs z 1 stycznia pochodzi z tabeli z poprzedniego roku.
+				('USD', date(2023, 1, 1)),
+				('EUR', date(2023, 1, 3)),
+				('EUR', date(2023, 1, 6)),
+			):
+				with self.subTest(currency=currency, check_date=check_date):
+					rate: Decimal|None = rates.get_rate(currency, check_date)
+					expected: Decimal = self.pool.get_exchange_ratio(
+						currency, check_date)
+					self.assertEqual(rate, expected)
+					# Zapisana jest również liczba cyfr po przecinku.
+					self.assertEqual(str(rate), str(expected))
+			self.assertIsNone(rates.get_rate('USD', date(2023, 1, 7)))
+			self.assertIsNone(rates.get_rate('USD', date(2021, 12, 30)))
+			self.assertIsNone(rates.get_rate('GBP', date(2023, 1, 2)))
+		self.assertRaises(
+			ValueError, snapshot.build, self.path, self.pool, 2024, 2023)
+
+	def test_current_year(self) -> None:
+		"""Testuje, czy kursy z dni po ostatniej publikacji w roku utworzenia
+		migawki nie są zapisywane."""
+		columns = snapshot._collect(self.pool, 2023, 2023, date(2023, 1, 5))
+		self.assertNotEqual(columns['USD'][1][2], -1)
+		self.assertEqual(columns['USD'][1][3], -1)
+		columns = snapshot._collect(self.pool, 2023, 2023, date(2024, 1, 5))
+		self.assertNotEqual(columns['USD'][1][3], -1)
+
+	def test_invalid(self) -> None:
+		"""Testuje otwieranie plików niebędących prawidłowymi migawkami."""
+		for content in (b'', b'T2PS', b'XXXX' + bytes(100)):
+			with self.subTest(content=content):
+				with open(self.path, 'wb') as f:
+					f.write(content)
+				self.assertRaises(ValueError, snapshot.Snapshot, self.path)
+		snapshot.build(self.path, self.pool, 2023, 2023)
+		with open(self.path, 'r+b') as f:
+			f.write(snapshot.HEADER.pack(snapshot.MAGIC, 99, 2023, 1, 2, 1, 0))
+		self.assertRaisesRegex(
+			ValueError, 'wersji 99', snapshot.Snapshot, self.path)
+		self.assertRaises(OSError, snapshot.Snapshot, self.path + '.x')
+
+	def test_verify(self) -> None:
+		"""Testuje sprawdzanie sumy kontrolnej i zgodności z tabelami."""
+		snapshot.build(self.path, self.pool, 2022, 2023)
+		self.assertIsNone(snapshot.verify(self.path, self.pool))
+		self.tables[2023][date(2023, 1, 3)] = ['4,4136', '4,69']
+		verify_pool: utils.TablesPool = utils.TablesPool(
+			self.pool._tmpdir) # type: ignore[arg-type]
+		self.assertRaisesRegex(
+			ValueError, 'USD w dniu 2023-01-03',
+			snapshot.verify, self.path, verify_pool,
+		)
+		with open(self.path, 'r+b') as f:
+			f.seek(-1, os.SEEK_END)
+			f.write(b'\0')
+		self.assertRaisesRegex(
+			ValueError, 'suma kontrolna', snapshot.verify, self.path)
+
+	def test_update(self) -> None:
+		"""Testuje rozszerzanie migawki o kolejne lata."""
+		snapshot.build(self.path, self.pool, 2022, 2022)
+		self.assertEqual(
+			snapshot.update(self.path, self.pool, 2023), (2022, 2023))
+		with snapshot.Snapshot(self.path) as rates:
+			self.assertEqual(
+				rates.get_rate('USD', date(2023, 1, 2)), Decimal('4.3811'))
+		# Migawka nie jest zawężana do wcześniejszego roku.
+		self.assertEqual(
+			snapshot.update(self.path, self.pool, 2022), (2022, 2023))
+
+	def test_pickle(self) -> None:
+		"""Testuje, czy przekazany do innego procesu obiekt otwiera ponownie
+		ten sam plik."""
+		snapshot.build(self.path, self.pool, 2023, 2023)
+		with snapshot.Snapshot(self.path) as rates:
+			copy: snapshot.Snapshot = pickle.loads(pickle.dumps(rates))
+		self.addCleanup(copy.close)
+		self.assertEqual(copy.path, self.path)
+		self.assertEqual(
+			copy.get_rate('USD', date(2023, 1, 2)), Decimal('4.3811'))
+
+	def test_run(self) -> None:
+		"""Testuje polecenia programu wiersza poleceń."""
+		stderr: typing.Any
+		for argv, code in (
+			(['build', self.path, '--from', '2022', '--to', '2023'], 0),
+			(['update', self.path, '--to', '2023'], 0),
+			(['verify', self.path, '--tables'], 0),
+			(['verify', self.path + '.x'], 1),
+		):
+			with self.subTest(argv=argv):
+				with (
+					patch('sys.argv', ['transactions2pln-snapshot', *argv, '--no-cache']),
+					patch('sys.stderr') as stderr,
+				):
+					self.assertEqual(snapshot.run(), code)
+				self.assertTrue(stderr.write.called)
+		with open(self.path, 'wb'):
+			pass
+		with patch('sys.argv', ['', 'verify', self.path]), patch('sys.stderr'):
+			self.assertEqual(snapshot.run(), 3)
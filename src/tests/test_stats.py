@@ -0,0 +1,105 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `stats`.
+
+Zawiera następujące klasy:
+`StatsTestCase` -- Testy obiektów klasy `stats.Stats`.
+`TimerTestCase` -- Testy funkcji `stats.timer()`.
+"""
+import json
+from unittest import TestCase
+
+from transactions2pln.stats import Stats, timer
+
+
+class StatsTestCase(TestCase):
+	"""Testy obiektów klasy `stats.Stats`.
+
+	Zawiera metody testujące poprawność obiektów klasy `stats.Stats`.
+	Udostępnia następujące atrybuty:
+	`test_timed` -- Metoda testująca mierzenie czasu odczytu iteratora.
+	`test_summary` -- Metoda testująca podsumowanie statystyk.
+	`test_format` -- Metoda testująca formatowanie podsumowania.
+	"""
+
+	def test_timed(self) -> None:
+		"""Testuje mierzenie czasu odczytu elementów iteratora."""
+		stats: Stats = Stats()
+		self.assertEqual([1, 2, 3], list(stats.timed([1, 2, 3], 'read')))
+		self.assertEqual(['read'], list(stats.times))
+		self.assertGreaterEqual(stats.times['read'], 0.0)
+
+	def test_summary(self) -> None:
+		"""Testuje podsumowanie statystyk."""
+		stats: Stats = Stats()
+		stats.count('rows', 10)
+		stats.count('rate_lookups', 4)
+		stats.count('rate_misses')
+		stats.count('tables_downloaded')
+		stats.add_time('write', 0.5)
+		stats.add_time('write', 0.25)
+
+		summary: dict = stats.summary()
+		self.assertEqual(10, summary['rows'])
+		self.assertEqual({'write': 0.75}, summary['stages'])
+		self.assertEqual(1, summary['tables_downloaded'])
+		self.assertEqual(0, summary['tables_reused'])
+		self.assertEqual(4, summary['rate_lookups'])
+		self.assertEqual(0.75, summary['rate_hit_rate'])
+		self.assertEqual(0, summary['date_lookups'])
+		self.assertIsNone(summary['date_hit_rate'])
+		self.assertGreater(summary['rows_per_s'], 0)
+
+	def test_format(self) -> None:
+		"""Testuje formatowanie podsumowania jako tekstu i jako JSON."""
+		stats: Stats = Stats()
+		stats.count('rows', 3)
+		stats.count('date_lookups', 3)
+		stats.add_time('dates', 0.1)
+
+		text: str = stats.format()
+		self.assertIn("wiersze: 3", text)
+		self.assertIn("odczyt dat: 0.100 s", text)
+		self.assertIn("odczyty dat z pamięci podręcznej: 100.0% z 3", text)
+		self.assertNotIn("odczyty kursów", text)
+		self.assertNotIn("zapis pliku wyjściowego", text)
+
+		self.assertEqual(3, json.loads(stats.format('json'))['rows'])
+
+
+class TimerTestCase(TestCase):
+	"""Testy funkcji `stats.timer()`.
+
+	Udostępnia następujące atrybuty:
+	`test_timer` -- Metoda testująca mierzenie czasu bloku kodu.
+	"""
+
+	def test_timer(self) -> None:
+		"""Testuje mierzenie czasu bloku kodu, również zakończonego błędem."""
+		stats: Stats = Stats()
+		with timer(stats, 'tables'):
+			pass
+		with self.assertRaises(KeyError):
+			with timer(stats, 'download'):
+				raise KeyError
+		self.assertEqual({'tables', 'download'}, set(stats.times))
+
+		# Bez obiektu statystyk nic nie jest mierzone.
+		with timer(None, 'tables'):
+			pass
@@ -19,20 +19,68 @@
 """Testy modułu `utils`.
 
 Zawiera następujące klasy:
+`BufferedOutputTestCase` -- Testy obiektów klasy `utils.BufferedOutput`.
 `JSONWrapperTestCase` -- Testy obiektów klasy `utils.JSONWrapper`.
 `TablesManagerTestCase` -- Testy obiektów klasy `utils.TablesManager`.
+`TablesPoolTestCase` -- Testy obiektów klasy `utils.TablesPool`.
+`DateParserTestCase` -- Testy obiektów klasy `utils.DateParser`.
 `GetColumnIndexTestCase` -- Testy funkcji `utils.get_column_index`.
 """
+import asyncio
 import json
 import locale
 import os
+import pickle
+import threading
 import typing
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from unittest import TestCase
 from unittest.mock import Mock, mock_open, patch
 
 from transactions2pln import utils
+from transactions2pln.cache import LazyTemporaryDirectory
+
+
+class BufferedOutputTestCase(TestCase):
+	"""Testy obiektów klasy `utils.BufferedOutput`.
+
+	Zawiera metody testujące poprawność obiektów klasy `utils.BufferedOutput`.
+	Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`test_write` -- Metoda testująca metodę `write()`.
+	`test_flush` -- Metoda testująca metodę `flush()`.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wywołaniem którejś z metod
+		testujących. Ustawia atrybut publiczny `output` będący obiektem klasy
+		`utils.BufferedOutput` z buforem o wielkości 10 znaków.
+		"""
+		self._file: typing.IO[str] = mock_open()()
+		self.output: utils.BufferedOutput = utils.BufferedOutput(self._file, 10)
+
+	def test_write(self) -> None:
+		"""Testuje gromadzenie danych w buforze przez metodę `write()`."""
+		self.assertEqual(self.output.write('abcde'), 5)
+		self.output.write('fghi')
+		self._file.write.assert_not_called()
+		# Przekroczenie wielkości bufora powoduje zapis całej jego zawartości.
+		self.output.write('jk')
+		self._file.write.assert_called_once_with('abcdefghijk')
+		self._file.flush.assert_not_called()
+
+	def test_flush(self) -> None:
+		"""Testuje opróżnianie bufora metodą `flush()`."""
+		self.output.write('abc')
+		self.output.flush()
+		self._file.write.assert_called_once_with('abc')
+		self._file.flush.assert_called_once()
+		# Pusty bufor nie powoduje zapisu.
+		self.output.flush()
+		self._file.write.assert_called_once()
 
 
 class JSONWrapperTestCase(TestCase):
@@ -45,7 +93,13 @@ class JSONWrapperTestCase(TestCase):
 	tablicę JSON w pliku wyjściowym.
 	`test_attributes` -- Metoda testująca udostępniane atrybuty.
 	`test_writerow` -- Metoda testująca metodę `writerow()`.
+	`test_writerows` -- Metoda testująca metodę `writerows()`.
 	`test_writeend` -- Metoda testująca metodę `writeend()`.
+	`test_lines` -- Metoda testująca zapisywanie w formacie NDJSON.
+	`test_duplicate_labels` -- Metoda testująca zapisywanie wierszy
+	przy powtarzających się nagłówkach.
+	`test_resume` -- Metoda testująca dopisywanie wierszy do zapisanej
+	wcześniej tablicy.
 	"""
 
 	def setUp(self) -> None:
@@ -103,6 +157,28 @@ class JSONWrapperTestCase(TestCase):
 			[i[0][0] for i in self._file.write.call_args_list[-2:]],
 		)
 
+	def test_writerows(self) -> None:
+		"""Testuje zapisywanie wielu wierszy danych metodą `writerows()`."""
+		testrows: list[list[str]] = [['x', 'y', 'z'], ['1', '2', '3']]
+		for labels in (None, self._labels):
+			with self.subTest(labels=bool(labels)):
+				file: typing.IO[str] = mock_open()()
+				wrapper: utils.JSONWrapper = utils.JSONWrapper(file, labels)
+				wrapper.writerow(testrows[0])
+				self.assertIsNone(wrapper.writerows(testrows))
+				wrapper.writerows([])
+				wrapper.writeend()
+				expected: list[typing.Any] = testrows[:1] + testrows
+				if labels:
+					expected = [dict(zip(labels, row)) for row in expected]
+				self.assertEqual(
+					json.loads(''.join(c[0][0] for c in file.write.call_args_list)),
+					expected,
+				)
+				# Znak otwierający tablicę, pierwszy wiersz, wszystkie wiersze
+				# przekazane do `writerows()` i znak końca tablicy.
+				self.assertEqual(file.write.call_count, 4)
+
 	def test_writeend(self) -> None:
 		"""Testuje zapisanie znaku końca tablicy metodą `writeend()`."""
 		for wrapper in (self.wrapper, self.wrapper_with_labels):
@@ -110,6 +186,45 @@ class JSONWrapperTestCase(TestCase):
 				self.assertIsNone(wrapper.writeend())
 				self.assertEqual(self._file.write.call_args[0][0], ']')
 
+	def test_lines(self) -> None:
+		"""Testuje zapisywanie danych w formacie NDJSON."""
+		file: typing.IO[str] = mock_open()()
+		wrapper: utils.JSONWrapper = utils.JSONWrapper(file, self._labels, True)
+		wrapper.writerow(['x', 'y', 'z'])
+		wrapper.writerows([['1', '2', '3'], ['ą', '"', '\\']])
+		wrapper.writeend()
+		self.assertEqual(
+			''.join(c[0][0] for c in file.write.call_args_list),
+			''.join(
+				json.dumps(dict(zip(self._labels, row))) + '\n'
+				for row in (['x', 'y', 'z'], ['1', '2', '3'], ['ą', '"', '\\'])
+			),
+		)
+		file.flush.assert_called()
+
+	def test_duplicate_labels(self) -> None:
+		"""Testuje, czy przy powtarzających się nagłówkach zapisywane dane
+		są takie same jak zwracane przez `json.dumps()`."""
+		file: typing.IO[str] = mock_open()()
+		labels: list[str] = ['a', 'b', 'a']
+		utils.JSONWrapper(file, labels).writerow(['x', 'y', 'z'])
+		self.assertEqual(
+			file.write.call_args[0][0], json.dumps({'a': 'z', 'b': 'y'}))
+
+	def test_resume(self) -> None:
+		"""Testuje dopisywanie wierszy do tablicy, której początek został
+		zapisany wcześniej."""
+		file: typing.IO[str] = mock_open()()
+		wrapper: utils.JSONWrapper = utils.JSONWrapper(
+			file, self._labels, resume=True)
+		wrapper.writerows([['1', '2', '3']])
+		wrapper.writeend()
+		self.assertEqual(
+			'[{"a": "x", "b": "y", "c": "z"}' + ''.join(
+				c[0][0] for c in file.write.call_args_list),
+			'[{"a": "x", "b": "y", "c": "z"},{"a": "1", "b": "2", "c": "3"}]',
+		)
+
 
 class TablesManagerTestCase(TestCase):
 	"""Testy obiektów klasy `utils.TablesManager`.
@@ -122,11 +237,19 @@ class TablesManagerTestCase(TestCase):
 	`test_get_table` -- Metoda testująca metodę `get_table()`.
 	`test_get_nonexistent_table` -- Metoda testująca metodę `get_table()`
 	dla nieistniejącej tabeli.
+	`test_get_dense_table` -- Metoda testująca metodę `get_dense_table()`.
+	`test_get_rate_column` -- Metoda testująca metodę `get_rate_column()`.
 	`test_get_exchange_ratio` -- Metoda testująca metodę `get_exchange_ratio()`.
 	`test_get_exchange_ratio_for_incorrect_date` -- Metoda testująca metodę
 	`get_exchange_ratio()` dla daty nieobecnej w tabeli testowej.
 	`test_get_exchange_ratio_for_nonexistent_currency` -- Metoda testująca
 	metodę `get_exchange_ratio()` dla nieistniejącej waluty.
+	`test_get_exchange_ratio_for_invalid_rate` -- Metoda testująca metodę
+	`get_exchange_ratio()` dla tabeli z nieprawidłowym kursem.
+	`test_get_table_concurrent` -- Metoda testująca jednoczesne wywołania
+	metody `get_table()` w wielu wątkach.
+	`test_get_table_async` -- Metoda testująca metodę `get_table_async()`.
+	`test_pickle` -- Metoda testująca serializację obiektów.
 	"""
 
 	def setUp(self) -> None:
@@ -198,6 +321,36 @@ class TablesManagerTestCase(TestCase):
 		zakończy się przewidzianym błędem."""
 		self.assertRaises(ValueError, self.manager.get_table, 'x')
 
+	def test_get_dense_table(self) -> None:
+		"""Testuje odczyt danych z tabeli NBP w postaci listy indeksowanej
+		numerem dnia w roku za pomocą metody `get_dense_table()`."""
+		dense_table: utils.DenseTable = self.manager.get_dense_table('a')
+		self.assertEqual(len(dense_table), 365)
+		day: int = self._date.timetuple().tm_yday - 1
+		# Kurs obowiązuje w dniu publikacji i przez kolejne 3 dni.
+		self.assertIsNone(dense_table[day - 1])
+		for offset in range(4):
+			with self.subTest(offset=offset):
+				self.assertIs(dense_table[day + offset], self._table[self._date])
+		self.assertIsNone(dense_table[day + 4])
+		# Lista jest tworzona tylko raz.
+		self.assertIs(self.manager.get_dense_table('a'), dense_table)
+
+	def test_get_rate_column(self) -> None:
+		"""Testuje odczyt kursów waluty w postaci listy indeksowanej numerem
+		dnia w roku za pomocą metody `get_rate_column()`."""
+		with patch.object(
+			self.manager, '_currency_lookup', self._currency_lookup
+		):
+			rate_column: utils.RateColumn = self.manager.get_rate_column('GBP')
+		day: int = self._date.timetuple().tm_yday - 1
+		self.assertEqual(
+			rate_column[day:day + 5], [Decimal('5.2005')] * 4 + [None])
+		self.assertIs(rate_column[day], rate_column[day + 3])
+		self.assertIs(self.manager.get_rate_column('GBP'), rate_column)
+		# Waluta obecna w tabeli B, ale nie w testowym nagłówku.
+		self.assertRaises(ValueError, self.manager.get_rate_column, 'BAM')
+
 	def test_get_exchange_ratio(self) -> None:
 		"""Testuje uzyskiwanie kursu wymiany za pomocą metody
 		`get_exchange_ratio()`."""
@@ -224,6 +377,400 @@ class TablesManagerTestCase(TestCase):
 		self.assertRaises(
 			ValueError, self.manager.get_exchange_ratio, 'T2P', self._date)
 
+	def test_get_exchange_ratio_for_invalid_rate(self) -> None:
+		"""Testuje, czy nieprawidłowy kurs w tabeli powoduje błąd tylko przy
+		odczycie kursów obowiązujących w dniach, których dotyczy."""
+		invalid_date: date = date(2023, 4, 20)
+		self._table[invalid_date] = ['', 'x', 'NaN'] + self._table[self._date][3:]
+		with patch.object(
+			self.manager, '_currency_lookup', self._currency_lookup
+		):
+			for currency in ('USD', 'AUD', 'CAD'):
+				with self.subTest(currency=currency):
+					self.assertIsNone(self.manager.get_rate_column(currency)[
+						invalid_date.timetuple().tm_yday - 1])
+					self.assertRaises(
+						ValueError,
+						self.manager.get_exchange_ratio,
+						currency,
+						invalid_date + timedelta(1),
+					)
+					self.assertRaises(
+						ValueError,
+						self.manager.get_published_rate,
+						currency,
+						invalid_date,
+					)
+			self.assertEqual(
+				self.manager.get_exchange_ratio('USD', self._date),
+				Decimal('4.1753'),
+			)
+			self.assertEqual(
+				self.manager.get_exchange_ratio('NZD', invalid_date),
+				Decimal('2.5590'),
+			)
+
+	def test_get_table_concurrent(self) -> None:
+		"""Testuje, czy jednoczesne żądania tej samej tabeli w wielu wątkach
+		powodują tylko jedno jej pobranie."""
+		started: threading.Event = threading.Event()
+		release: threading.Event = threading.Event()
+
+		def download_table(table: str, year: int) -> utils.ExchangeTable:
+			started.set()
+			release.wait(5)
+			return self._table
+
+		self.manager._download_table = Mock(side_effect=download_table)
+		results: list[utils.ExchangeTable] = []
+		threads: list[threading.Thread] = [
+			threading.Thread(
+				target=lambda: results.append(self.manager.get_dense_table('a')))
+			for _ in range(4)
+		]
+		for thread in threads:
+			thread.start()
+		started.wait(5)
+		release.set()
+		for thread in threads:
+			thread.join(5)
+		self.manager._download_table.assert_called_once_with('a', 2023)
+		self.assertEqual(len(results), 4)
+		self.assertTrue(all(result is results[0] for result in results))
+
+	def test_get_table_async(self) -> None:
+		"""Testuje jednoczesne wywołania metody `get_table_async()`
+		w zadaniach `asyncio`."""
+
+		async def get_tables() -> list[utils.ExchangeTable]:
+			return await asyncio.gather(
+				*(self.manager.get_table_async('a') for _ in range(4)))
+
+		self.assertEqual(asyncio.run(get_tables()), [self._table] * 4)
+		self.manager._download_table.assert_called_once_with('a', 2023)
+		self.assertRaises(
+			ValueError, asyncio.run, self.manager.get_table_async('x'))
+
+	def test_pickle(self) -> None:
+		"""Testuje, czy obiekty mogą być przekazywane do innych procesów
+		mimo zawierania blokad."""
+		manager: utils.TablesManager = utils.TablesManager(
+			LazyTemporaryDirectory(), 2023)
+		self.addCleanup(manager._tmpdir.cleanup)
+		manager.table_a = self._table # type: ignore[attr-defined]
+		copy: utils.TablesManager = pickle.loads(pickle.dumps(manager))
+		self.assertEqual(copy.get_table('a'), self._table)
+		self.assertIsNot(copy._table_locks['a'], manager._table_locks['a'])
+		pool: utils.TablesPool = utils.TablesPool(manager._tmpdir)
+		pool.get_manager(2023)
+		self.assertEqual(
+			list(pickle.loads(pickle.dumps(pool))._managers), [2023])
+
+
+class TablesPoolTestCase(TestCase):
+	"""Testy obiektów klasy `utils.TablesPool`.
+
+	Zawiera metody testujące i wspomagające testowanie poprawności
+	obiektów klasy `utils.TablesPool`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_get_manager` -- Metoda testująca metodę `get_manager()`.
+	`test_get_exchange_ratio` -- Metoda testująca metodę `get_exchange_ratio()`
+	dla dat z różnych lat.
+	`test_get_exchange_ratio_previous_year` -- Metoda testująca metodę
+	`get_exchange_ratio()` dla dat z początku stycznia.
+	`test_get_exchange_ratio_memo` -- Metoda testująca zapamiętywanie
+	odczytanych kursów przez metodę `get_exchange_ratio()`.
+	`test_prefetch` -- Metoda testująca metodę `prefetch()`.
+	`test_discard` -- Metoda testująca metodę `discard()`.
+	`test_get_exchange_ratio_async` -- Metoda testująca metodę
+	`get_exchange_ratio_async()`.
+	`test_snapshot` -- Metoda testująca odczyt kursów z migawki.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia język na polski i podmienia metodę
+		`TablesManager._download_table()` tak, by zwracała testowe tabele
+		z kursem USD za kilka dni z przełomu lat 2022 i 2023. Ustawia
+		następujące atrybuty publiczne:
+		`pool` -- Testowy obiekt klasy `utils.TablesPool`.
+		`download` -- Makieta metody `TablesManager._download_table()`.
+		"""
+		self._locale = locale.getlocale(locale.LC_NUMERIC)
+		locale.setlocale(locale.LC_NUMERIC, 'pl_PL.UTF-8')
+		tables: dict[int, utils.ExchangeTable] = {
+			2022: {date(2022, 12, 30): ['4,4018']},
+			2023: {date(2023, 1, 2): ['4,3811'], date(2023, 1, 3): ['4,4135']},
+		}
+
+		def download_table(
+			manager: utils.TablesManager,
+			table: str,
+			year: int,
+		) -> utils.ExchangeTable:
+			manager._currency_lookup = {'USD': 0}
+			return tables.get(year, {})
+
+		patcher = patch.object(
+			utils.TablesManager,
+			'_download_table',
+			autospec=True,
+			side_effect=download_table,
+		)
+		self.download: Mock = patcher.start()
+		self.addCleanup(patcher.stop)
+		self._tmpdir: typing.Any = Mock(['name'])
+		self._tmpdir.name = os.path.join(os.getcwd(), repr(self)[-13:-1])
+		self.pool: utils.TablesPool = utils.TablesPool(self._tmpdir, max_years=2)
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, przywracając ustawienia językowe."""
+		locale.setlocale(locale.LC_NUMERIC, self._locale)
+
+	def test_get_manager(self) -> None:
+		"""Testuje tworzenie, przechowywanie i usuwanie obiektów
+		`TablesManager` przez metodę `get_manager()`."""
+		manager_2022: utils.TablesManager = self.pool.get_manager(2022)
+		self.assertEqual(manager_2022.year, 2022)
+		self.assertIs(self.pool.get_manager(2022), manager_2022)
+		manager_2023: utils.TablesManager = self.pool.get_manager(2023)
+		# Rok 2022 jest teraz najdawniej używany, ale po ponownym użyciu
+		# usunięty powinien zostać rok 2023.
+		self.pool.get_manager(2022)
+		self.pool.get_manager(2021)
+		self.assertIs(self.pool.get_manager(2022), manager_2022)
+		self.assertIsNot(self.pool.get_manager(2023), manager_2023)
+		self.assertRaises(ValueError, utils.TablesPool, self._tmpdir, None, 1)
+		# Domyślnie przechowywane są obiekty dla wszystkich użytych lat.
+		pool: utils.TablesPool = utils.TablesPool(self._tmpdir)
+		managers: list[utils.TablesManager] = [
+			pool.get_manager(year) for year in range(2015, 2025)]
+		for manager in managers:
+			self.assertIs(pool.get_manager(manager.year), manager)
+
+	def test_get_exchange_ratio(self) -> None:
+		"""Testuje uzyskiwanie kursów z różnych lat."""
+		self.assertEqual(
+			self.pool.get_exchange_ratio('USD', date(2022, 12, 30)),
+			Decimal('4.4018'),
+		)
+		self.assertEqual(
+			self.pool.get_exchange_ratio('USD', date(2023, 1, 3)),
+			Decimal('4.4135'),
+		)
+		self.assertRaises(
+			ValueError, self.pool.get_exchange_ratio, 'USD', date(2023, 1, 10))
+
+	def test_get_exchange_ratio_previous_year(self) -> None:
+		"""Testuje uzyskiwanie kursu z tabeli za poprzedni rok dla dat
+		z początku stycznia."""
+		self.assertEqual(
+			self.pool.get_exchange_ratio('USD', date(2023, 1, 1)),
+			Decimal('4.4018'),
+		)
+		self.assertEqual(
+			{c.args[2] for c in self.download.call_args_list}, {2022, 2023})
+		# Waluta dodana do tabel dopiero w danym roku nie figuruje w nagłówku
+		# tabeli za poprzedni rok.
+		del self.pool.get_manager(2022)._currency_lookup['USD']
+		self.pool._rates.clear()
+		self.assertRaises(
+			ValueError, self.pool.get_exchange_ratio, 'USD', date(2023, 1, 1))
+
+	def test_get_exchange_ratio_memo(self) -> None:
+		"""Testuje, czy ponowne odczytanie kursu dla tej samej waluty i daty
+		nie wymaga odwołania do obiektów `TablesManager`."""
+		check_date: date = date(2023, 1, 2)
+		rate: Decimal = self.pool.get_exchange_ratio('USD', check_date)
+		with patch.object(self.pool, 'get_manager') as get_manager:
+			self.assertIs(self.pool.get_exchange_ratio('USD', check_date), rate)
+			get_manager.assert_not_called()
+
+	def test_prefetch(self) -> None:
+		"""Testuje równoległe pobieranie plików z tabelami za pomocą metody
+		`prefetch()`."""
+		with patch.object(
+			utils.TablesManager,
+			'get_table_file',
+			autospec=True,
+			side_effect=[OSError, 'archiwum_tab_b_2022.csv'],
+		) as get_table_file:
+			# Błędy pobierania powinny zostać pominięte.
+			self.assertIsNone(self.pool.prefetch([('a', 2023), ('b', 2022)]))
+		self.assertEqual(
+			{(c.args[0].year, c.args[1]) for c in get_table_file.call_args_list},
+			{(2023, 'a'), (2022, 'b')},
+		)
+		# Pliki są jedynie pobierane, bez parsowania.
+		self.download.assert_not_called()
+
+	def test_discard(self) -> None:
+		"""Testuje usuwanie tabel i kursów z wybranego roku za pomocą
+		metody `discard()`."""
+		manager_2022: utils.TablesManager = self.pool.get_manager(2022)
+		self.pool.get_exchange_ratio('USD', date(2023, 1, 2))
+		self.pool.get_exchange_ratio('USD', date(2023, 1, 1))
+		os.mkdir(self._tmpdir.name)
+		self.addCleanup(os.rmdir, self._tmpdir.name)
+		path: str = os.path.join(self._tmpdir.name, 'archiwum_tab_a_2022.csv')
+		open(path, 'w').close()
+		self.pool.discard(2022)
+		self.assertFalse(os.path.exists(path))
+		self.assertIsNot(self.pool.get_manager(2022), manager_2022)
+		self.download.reset_mock()
+		# Kurs z 1 stycznia 2023 pochodzi z tabeli z 2022 roku i musi zostać
+		# odczytany ponownie, a kurs z 2 stycznia nie.
+		self.pool.get_exchange_ratio('USD', date(2023, 1, 2))
+		self.download.assert_not_called()
+		self.pool.get_exchange_ratio('USD', date(2023, 1, 1))
+		self.assertEqual(
+			[c.args[2] for c in self.download.call_args_list], [2022])
+
+	def test_get_exchange_ratio_async(self) -> None:
+		"""Testuje odczyt kursów metodą `get_exchange_ratio_async()`."""
+		check_date: date = date(2023, 1, 2)
+		rate: Decimal = asyncio.run(
+			self.pool.get_exchange_ratio_async('USD', check_date))
+		self.assertEqual(rate, Decimal('4.3811'))
+		# Już odczytany kurs jest zwracany bez uruchamiania wątku.
+		with patch('asyncio.to_thread') as to_thread:
+			self.assertIs(
+				asyncio.run(self.pool.get_exchange_ratio_async('USD', check_date)),
+				rate,
+			)
+			to_thread.assert_not_called()
+		self.assertRaises(
+			ValueError,
+			asyncio.run,
+			self.pool.get_exchange_ratio_async('USD', date(2023, 1, 10)),
+		)
+
+	def test_snapshot(self) -> None:
+		"""Testuje odczyt kursów z migawki przekazanej do obiektu
+		`TablesPool` i pomijanie tabel z lat, które obejmuje."""
+		snapshot: Mock = Mock(['covers', 'get_rate'])
+		snapshot.covers.side_effect = lambda year: year == 2022
+		snapshot.get_rate.side_effect = (
+			lambda currency, day: Decimal('4.4018') if day.year == 2022
+			else None
+		)
+		pool: utils.TablesPool = utils.TablesPool(
+			self._tmpdir, snapshot=snapshot)
+		with patch.object(pool, 'get_manager') as get_manager:
+			self.assertEqual(
+				pool.get_exchange_ratio('USD', date(2022, 12, 31)),
+				Decimal('4.4018'),
+			)
+			get_manager.assert_not_called()
+		# Kursów spoza migawki szukamy w tabelach.
+		self.assertEqual(
+			pool.get_exchange_ratio('USD', date(2023, 1, 3)),
+			Decimal('4.4135'),
+		)
+		with patch.object(
+			utils.TablesManager, 'get_table_file', autospec=True,
+		) as get_table_file:
+			pool.prefetch([('a', 2022), ('a', 2023)])
+		self.assertEqual(
+			[c.args[0].year for c in get_table_file.call_args_list], [2023])
+
+
+class DateParserTestCase(TestCase):
+	"""Testy obiektów klasy `utils.DateParser`.
+
+	Zawiera metody testujące poprawność obiektów klasy `utils.DateParser`.
+	Udostępnia następujące atrybuty:
+	`test_parse` -- Metoda testująca metodę `parse()`.
+	`test_get_lookup_date` -- Metoda testująca metodę `get_lookup_date()`.
+	`test_cache_size` -- Metoda testująca ograniczenie liczby zapamiętanych dat.
+	"""
+
+	def test_parse(self) -> None:
+		"""Testuje, czy metoda `parse()` zwraca dla każdego formatu
+		takie same wyniki jak `datetime.strptime()`."""
+		values: list[str] = [
+			'2023-04-18', '2023-4-18', '2023-02-29', '2023-00-10', '2023- 1-05',
+			'+023-01-01', '2023/04/18', '2023/4/8', '18.04.2023', '8.4.2023',
+			'31.04.2023', '18.04.2023 ', '18/04/2023',
+		]
+		for date_format in utils.DateParser.FAST_FORMATS | {'%d/%m/%Y'}:
+			parser: utils.DateParser = utils.DateParser(date_format)
+			for value in values:
+				with self.subTest(date_format=date_format, value=value):
+					try:
+						expected: date = datetime.strptime(value, date_format).date()
+					except ValueError:
+						self.assertRaises(ValueError, parser.parse, value)
+					else:
+						self.assertEqual(parser.parse(value), expected)
+
+	def test_get_lookup_date(self) -> None:
+		"""Testuje uzyskiwanie daty kursu wymiany za pomocą metody
+		`get_lookup_date()`."""
+		parser: utils.DateParser = utils.DateParser('%Y-%m-%d')
+		# Dni robocze pozostają bez zmian, weekendy zmieniane są na piątek.
+		self.assertEqual(parser.get_lookup_date('2023-04-20'), date(2023, 4, 20))
+		self.assertEqual(parser.get_lookup_date('2023-04-22'), date(2023, 4, 21))
+		self.assertEqual(parser.get_lookup_date('2023-04-23'), date(2023, 4, 21))
+		self.assertRaises(ValueError, parser.get_lookup_date, '2023-04-31')
+		# Ponowne odczytanie tego samego łańcucha korzysta z zapamiętanej daty.
+		with patch.object(parser, 'parse') as parse:
+			self.assertEqual(
+				parser.get_lookup_date('2023-04-22'), date(2023, 4, 21))
+			parse.assert_not_called()
+
+	def test_cache_size(self) -> None:
+		"""Testuje, czy liczba zapamiętanych dat nie przekracza
+		`MAX_CACHE_SIZE`."""
+		parser: utils.DateParser = utils.DateParser('%Y-%m-%d')
+		with patch.object(parser, 'MAX_CACHE_SIZE', 2):
+			for day in range(1, 6):
+				parser.get_lookup_date(f'2023-04-{day:02}')
+				self.assertLessEqual(len(parser._lookup_dates), 2)
+
+
+class DetectDateColumnTestCase(TestCase):
+	"""Testy funkcji `utils.detect_date_column`.
+
+	Zawiera metody testujące poprawność działania
+	funkcji `detect_date_column()` z modułu `utils`.
+	Udostępnia następujące atrybuty:
+	`test_detect` -- Metoda testująca wykrywanie kolumny i formatu.
+	`test_restricted` -- Metoda testująca ograniczenie sprawdzanych
+	kolumn i formatów.
+	`test_not_found` -- Metoda testująca brak kolumny z datami.
+	"""
+
+	sample: list[list[str]] = [
+		['34567', 'Global Innovations', '18.04.2023', '2023-04-18', '6178.23'],
+		['90123', 'Acme Corp', '21.04.2023', '2023-04-21', '1563.87'],
+	]
+
+	def test_detect(self) -> None:
+		"""Testuje wykrywanie kolumny z datami i ich formatu."""
+		self.assertEqual(
+			utils.detect_date_column(self.sample), (3, '%Y-%m-%d'))
+
+	def test_restricted(self) -> None:
+		"""Testuje wykrywanie przy podanych formatach i kolumnach."""
+		self.assertEqual(
+			utils.detect_date_column(self.sample, ('%d.%m.%Y', '%Y-%m-%d')),
+			(2, '%d.%m.%Y'),
+		)
+		self.assertEqual(
+			utils.detect_date_column(self.sample, columns=(2,)), (2, '%d.%m.%Y'))
+
+	def test_not_found(self) -> None:
+		"""Testuje zachowanie, gdy żadna kolumna nie zawiera dat w każdym
+		wierszu próbki."""
+		sample: list[list[str]] = [row.copy() for row in self.sample]
+		sample[1][2] = sample[1][3] = ''
+		self.assertIsNone(utils.detect_date_column(sample))
+		self.assertIsNone(utils.detect_date_column([]))
+
 
 class GetColumnIndexTestCase(TestCase):
 	"""Testy funkcji `utils.get_column_index`.
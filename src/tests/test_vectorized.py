@@ -0,0 +1,188 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Testy modułu `vectorized`.
+
+Zawiera następujące klasy:
+`VectorizedConverterTestCase` -- Testy obiektów klasy
+`vectorized.VectorizedConverter`.
+"""
+import decimal
+import locale
+import os
+import shutil
+import unittest
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from transactions2pln import exceptions as exc, utils, vectorized
+from transactions2pln.convert import RowConverter
+
+
+@unittest.skipIf(
+	vectorized.numpy is None, "biblioteka NumPy nie jest dostępna")
+class VectorizedConverterTestCase(TestCase):
+	"""Testy obiektów klasy `vectorized.VectorizedConverter`.
+
+	Zawiera metody testujące, czy obiekty klasy
+	`vectorized.VectorizedConverter` dają takie same wyniki jak obiekty klasy
+	`convert.RowConverter`. Udostępnia następujące atrybuty:
+	`setUp` -- Metoda przygotowująca środowisko testowe.
+	`tearDown` -- Metoda czyszcząca środowisko testowe.
+	`test_convert_rows` -- Metoda testująca przeliczanie wierszy.
+	`test_rounding` -- Metoda testująca zaokrąglanie kwot.
+	`test_fallback` -- Metoda testująca przetwarzanie pojedynczych wierszy.
+	`test_errors` -- Metoda testująca zgłaszanie błędów.
+	`test_numpy_missing` -- Metoda testująca błąd przy braku biblioteki
+	NumPy.
+	"""
+
+	def setUp(self) -> None:
+		"""Przygotowuje środowisko testowe.
+
+		Ta metoda jest wywoływana przed każdym wykonaniem którejś z metod
+		testujących. Ustawia język na polski i tworzy katalog tymczasowy
+		z testową tabelą kursów NBP za 2023 rok. Ustawia następujące atrybuty
+		publiczne:
+		`converter` -- Testowy obiekt klasy `vectorized.VectorizedConverter`
+		odczytujący walutę, datę i kwotę z kolumn 3, 2 i 4.
+		`row_converter` -- Obiekt klasy `convert.RowConverter` z takimi samymi
+		ustawieniami, z którego wynikami porównywane są wyniki `converter`.
+		"""
+		self._locale = locale.getlocale(locale.LC_NUMERIC)
+		locale.setlocale(locale.LC_NUMERIC, 'pl_PL.UTF-8')
+		self._context: decimal.Context = decimal.getcontext().copy()
+		decimal.getcontext().prec = 10
+		self._tmpdir: TemporaryDirectory = ( # type: ignore[type-arg]
+			TemporaryDirectory())
+		shutil.copy(
+			os.path.join(os.path.dirname(__file__), 'data', 'nbp_table.csv'),
+			os.path.join(self._tmpdir.name, 'archiwum_tab_a_2023.csv'),
+		)
+		self.converter: vectorized.VectorizedConverter = (
+			vectorized.VectorizedConverter(
+				utils.TablesPool(self._tmpdir),
+				utils.DateParser('%Y/%m/%d'),
+				currency_column=2,
+				amount_column=3,
+				date_column=1,
+			))
+		self.row_converter: RowConverter = RowConverter(
+			utils.TablesPool(self._tmpdir),
+			utils.DateParser('%Y/%m/%d'),
+			currency_column=2,
+			amount_column=3,
+			date_column=1,
+		)
+
+	def tearDown(self) -> None:
+		"""Czyści środowisko testowe, przywracając ustawienia języka
+		i precyzji działań oraz usuwając katalog tymczasowy."""
+		locale.setlocale(locale.LC_NUMERIC, self._locale)
+		decimal.setcontext(self._context)
+		self._tmpdir.cleanup()
+
+	def _assert_same(self, amounts: list[str]) -> None:
+		# Sprawdza, czy wiersze z kwotami `amounts` są przeliczane tak samo
+		# jak przez `convert.RowConverter`, łącznie z treścią błędów.
+		currencies: list[str] = ['USD', 'EUR', 'GBP', 'CHF']
+		for i, amount in enumerate(amounts):
+			row: list[str] = [
+				str(i), f'2023/04/{18 + i % 10}', currencies[i % 4], amount]
+			results: list[list[list[str]]|str] = []
+			for converter in (self.converter, self.row_converter):
+				try:
+					results.append(list(converter.convert_rows([list(row)])))
+				except exc.RowProcessingError as err:
+					results.append(str(err))
+			with self.subTest(amount=amount):
+				self.assertEqual(results[0], results[1])
+
+	def test_convert_rows(self) -> None:
+		"""Testuje przeliczanie wierszy w kilku partiach."""
+		self.converter.BATCH_SIZE = 3
+		self._assert_same(
+			['6178.23', '1563.87', '1893.65', '4356.12', '947.21', '241.71', '1'])
+		self.assertEqual(
+			list(self.converter.convert_rows([['1', '2023/04/18', 'CAD', '10']])),
+			[['1', '2023/04/18', 'CAD', '10', '3,1533', '31,53']],
+		)
+
+	def test_rounding(self) -> None:
+		"""Testuje zaokrąglanie kwot, również do liczby cyfr znaczących
+		określonej przez kontekst arytmetyczny."""
+		amounts: list[str] = [
+			'0', '-0', '-0.00', '0.001', '-0.001', '0.005', '0.0011', '-2.5',
+			'100.50', '123456.789', '999999.995', '12345678.91', '0001.10',
+			'7', '-7.125', '31415926535',
+		]
+		self._assert_same(amounts)
+		for prec in (4, 18):
+			with self.subTest(prec=prec):
+				decimal.getcontext().prec = prec
+				self._assert_same(amounts)
+
+	def test_fallback(self) -> None:
+		"""Testuje przetwarzanie pojedynczo wierszy z kwotami w zapisie,
+		który nie jest odczytywany wektorowo."""
+		amounts: list[str] = [
+			'+3', '1e3', ' 4', '5.', '.5', '1_000', '٣', 'NaN', '1' * 20]
+		self.assertEqual(
+			self.converter.convert_batch([
+				['1', '2023/04/18', 'USD', amount] for amount in amounts]),
+			[None] * len(amounts),
+		)
+		self._assert_same(amounts)
+
+	def test_errors(self) -> None:
+		"""Testuje zgłaszanie błędów z numerem wiersza po zwróceniu wierszy
+		przetworzonych przed błędnym."""
+		rows: list[list[str]] = [
+			['1', '2023/04/18', 'USD', '1.00'],
+			['2', '2023/04/18', 'XYZ', '1.00'],
+			['3', '2023/04/18', 'USD', '1.00'],
+		]
+		converted: list[list[str]] = []
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			for row in self.converter.convert_rows(rows, 1):
+				converted.append(row)
+		self.assertEqual(cm.exception.row_number, 3)
+		self.assertEqual(len(converted), 1)
+
+		with self.assertRaises(exc.RowProcessingError) as cm:
+			list(self.converter.convert_rows([
+				['1', '2023/04/18', 'USD', '1.00'],
+				['2', '18.04.2023', 'USD', '1.00'],
+			]))
+		self.assertEqual(cm.exception.row_number, 2)
+
+		# Za krótkie wiersze są przetwarzane pojedynczo.
+		with self.assertRaises(IndexError):
+			list(self.converter.convert_rows([['1', '2023/04/18']]))
+
+	def test_numpy_missing(self) -> None:
+		"""Testuje zgłaszanie błędu, jeśli biblioteka NumPy nie jest
+		zainstalowana."""
+		with patch.object(vectorized, 'numpy', None):
+			self.assertRaises(
+				RuntimeError,
+				vectorized.VectorizedConverter,
+				utils.TablesPool(self._tmpdir),
+				utils.DateParser('%Y/%m/%d'),
+			)
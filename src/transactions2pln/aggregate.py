@@ -0,0 +1,185 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Sumowanie kwot w PLN w grupach transakcji.
+
+Często potrzebne są jedynie sumy kwot w PLN, np. dla każdej waluty, miesiąca
+albo rachunku, a nie wszystkie przetworzone wiersze. Ten moduł pozwala
+obliczyć je w trakcie przetwarzania, bez zapisywania i ponownego odczytu
+wszystkich wierszy. Pamięć potrzebna do obliczeń zależy od liczby grup,
+a nie liczby wierszy.
+
+Zawiera następujące klasy:
+`Aggregator` -- Klasa obliczająca liczbę transakcji, sumę oraz najmniejszą
+i największą kwotę w PLN w grupach przetworzonych wierszy.
+"""
+import decimal
+import typing
+from datetime import date
+
+from transactions2pln import utils
+
+# Kontekst arytmetyczny, w którym dodawanie jest zawsze dokładne, niezależnie
+# od precyzji ustawionej dla przeliczania kwot.
+_EXACT_CONTEXT: decimal.Context = decimal.Context(
+	prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+class Aggregator():
+	"""Oblicza liczbę transakcji, sumę oraz najmniejszą i największą kwotę
+	w PLN w grupach przetworzonych wierszy.
+
+	Grupę wyznaczają wartości z kolumn `columns` oraz, opcjonalnie, okres
+	(dzień, miesiąc albo rok), w którym przypada data transakcji. Kwotą
+	w PLN jest ostatnia wartość każdego przetworzonego wiersza. Sumy są
+	obliczane dokładnie, bez względu na ustawioną precyzję obliczeń. Grupy
+	są zwracane w kolejności pierwszego wystąpienia w danych.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`LABELS` -- Nagłówki kolumn z wynikami dla każdej grupy.
+	`PERIOD_LABEL` -- Nagłówek kolumny z okresem.
+	`PERIODS` -- Słownik, w którym kluczami są nazwy okresów, a wartościami
+	formaty, w jakich zapisywane są okresy, zgodne z `datetime.strftime()`.
+	`MAX_CACHE_SIZE` -- Największa liczba zapamiętywanych okresów dat.
+	`columns` -- Lista indeksów kolumn, których wartości wyznaczają grupę.
+	`period` -- Nazwa okresu albo `None`.
+	`get_labels` -- Metoda zwracająca nagłówki kolumn wyników.
+	`update` -- Metoda uwzględniająca w wynikach kolejne wiersze.
+	`get_rows` -- Metoda zwracająca wiersze z wynikami dla każdej grupy.
+	"""
+	LABELS: tuple[str, ...] = (
+		"liczba transakcji",
+		"suma w PLN",
+		"najmniejsza kwota w PLN",
+		"największa kwota w PLN",
+	)
+	PERIOD_LABEL: str = "okres"
+	PERIODS: dict[str, str] = {
+		'day': '%Y-%m-%d',
+		'month': '%Y-%m',
+		'year': '%Y',
+	}
+	MAX_CACHE_SIZE: int = 65536
+
+	def __init__(
+			self,
+			columns: list[int],
+			period: str|None = None,
+			date_parser: utils.DateParser|None = None,
+			date_column: int|None = None,
+			decimal_point: str = ',',
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Aggregator`.
+
+		Przyjmuje następujące parametry:
+		`columns` -- Lista indeksów kolumn, których wartości wyznaczają grupę.
+		Pusta lista oznacza jedną grupę ze wszystkimi wierszami.
+		`period` -- Opcjonalnie, nazwa okresu będącego kluczem w `PERIODS`.
+		`date_parser` -- Obiekt klasy `utils.DateParser` odczytujący daty
+		transakcji. Wymagany, jeżeli podano okres.
+		`date_column` -- Opcjonalnie, indeks kolumny z datą transakcji.
+		Jeżeli nie został podany, datą jest pierwsza wartość w wierszu,
+		która odpowiada formatowi dat, jak w klasie `convert.RowConverter`.
+		`decimal_point` -- Opcjonalnie, separator dziesiętny w kwotach
+		w przetworzonych wierszach i w wynikach.
+		"""
+		if period is not None and (
+			period not in self.PERIODS or date_parser is None
+		):
+			raise ValueError(f"nieznany okres: '{period}'.")
+		self.columns: list[int] = columns
+		self.period: str|None = period
+		self._date_parser: utils.DateParser|None = date_parser
+		self._date_column: int|None = date_column
+		self._decimal_point: str = decimal_point
+		# Dla każdej grupy: liczba transakcji, suma, najmniejsza i największa
+		# kwota.
+		self._groups: dict[tuple[str, ...], list[typing.Any]] = {}
+		self._periods: dict[str, str] = {}
+
+	def get_labels(self, labels: list[str]) -> list[str]:
+		"""Zwraca nagłówki kolumn wyników na podstawie nagłówków kolumn
+		danych `labels`.
+
+		Nagłówkami kolumn wyznaczających grupę są nagłówki tych kolumn
+		w danych, a jeśli dane ich nie zawierają - numery kolumn.
+		"""
+		group_labels: list[str] = [
+			labels[index] if index < len(labels) else str(index + 1)
+			for index in self.columns
+		]
+		if self.period is not None:
+			group_labels.append(self.PERIOD_LABEL)
+		return group_labels + list(self.LABELS)
+
+	def update(self, rows: typing.Iterable[list[str]]) -> None:
+		"""Uwzględnia w wynikach przetworzone wiersze `rows`."""
+		groups: dict[tuple[str, ...], list[typing.Any]] = self._groups
+		columns: list[int] = self.columns
+		for row in rows:
+			key: tuple[str, ...] = tuple(
+				row[index] if index < len(row) else '' for index in columns)
+			if self.period is not None:
+				key += (self._get_period(row),)
+			amount: decimal.Decimal = decimal.Decimal(
+				row[-1].replace(self._decimal_point, '.'))
+			group: list[typing.Any]|None = groups.get(key)
+			if group is None:
+				groups[key] = [1, amount, amount, amount]
+				continue
+			group[0] += 1
+			group[1] = _EXACT_CONTEXT.add(group[1], amount)
+			if amount < group[2]:
+				group[2] = amount
+			elif amount > group[3]:
+				group[3] = amount
+
+	def get_rows(self) -> typing.Iterator[list[str]]:
+		"""Zwraca wiersze z wynikami dla każdej grupy.
+
+		Każdy wiersz zawiera wartości wyznaczające grupę, liczbę transakcji,
+		sumę oraz najmniejszą i największą kwotę w PLN.
+		"""
+		for key, (count, total, minimum, maximum) in self._groups.items():
+			yield list(key) + [str(count)] + [
+				self._format(value) for value in (total, minimum, maximum)]
+
+	def _format(self, value: decimal.Decimal) -> str:
+		# Zapisuje liczbę bez notacji wykładniczej i bez zaokrąglania.
+		return format(value, 'f').replace('.', self._decimal_point)
+
+	def _get_period(self, row: list[str]) -> str:
+		# Zwraca okres, w którym przypada data transakcji z wiersza `row`.
+		values: list[str] = row[:-2]
+		if self._date_column is not None:
+			values = values[self._date_column:self._date_column + 1]
+		for value in values:
+			period: str|None = self._periods.get(value)
+			if period is not None:
+				return period
+			try:
+				parsed: date = self._date_parser.parse( # type: ignore
+					value)
+			except ValueError:
+				continue
+			if len(self._periods) >= self.MAX_CACHE_SIZE:
+				self._periods.clear()
+			period = parsed.strftime(self.PERIODS[self.period]) # type: ignore
+			self._periods[value] = period
+			return period
+		return ''
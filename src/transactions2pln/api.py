@@ -0,0 +1,337 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Interfejs programistyczny do przeliczania transakcji w tym samym procesie.
+
+W odróżnieniu od funkcji `script.transactions2pln()`, funkcje tego modułu
+nie wymagają argumentów wiersza poleceń ani plików, nie zmieniają ustawień
+językowych ani kontekstu arytmetycznego procesu i nie wymagają polskiego
+języka systemu. Przyjmują dowolne iterowalne kolekcje wierszy i zwracają
+przetworzone wiersze w miarę ich odczytywania.
+
+Przykład użycia::
+
+	with Rates() as rates:
+		for row in convert_rows(rows, rates, 'USD', date_column='B'):
+			...
+
+Zawiera następujące klasy i funkcje:
+`Rates` -- Klasa udostępniająca kursy NBP, przeznaczona do wielokrotnego
+użycia w kolejnych wywołaniach `convert_rows()`.
+`convert_rows` -- Funkcja przeliczająca wiersze z transakcjami na PLN.
+`resolve_columns` -- Funkcja ustalająca walutę i indeksy kolumn na podstawie
+parametrów takich jak w wierszu poleceń.
+`detect_date` -- Funkcja ustalająca kolumnę z datą i format dat
+na podstawie początkowych wierszy danych.
+"""
+import decimal
+import itertools
+import typing
+from datetime import date
+
+from transactions2pln import exceptions as exc, utils
+from transactions2pln.cache import LazyTemporaryDirectory, TablesCache
+from transactions2pln.convert import RowConverter
+
+# Migawki kursów tworzy kod wywołujący, więc moduł `snapshot` importujemy
+# tylko na potrzeby sprawdzania typów.
+if typing.TYPE_CHECKING:
+	from transactions2pln.snapshot import Snapshot
+
+# Nagłówki kolumn dodawanych do wierszy danych.
+LABELS: tuple[str, str] = ("kurs do PLN", "kwota w PLN")
+# Precyzja obliczeń, taka jak w wierszu poleceń.
+DEFAULT_PRECISION: int = 10
+# Liczba początkowych wierszy, na podstawie których wykrywana jest kolumna
+# z datą i format dat.
+DETECTION_SAMPLE_SIZE: int = 100
+
+Column = typing.Union[int, str, None]
+
+
+class Rates():
+	"""Kursy walut NBP do wielokrotnego użycia.
+
+	Obiekt tej klasy przechowuje pobrane i wczytane tabele kursów, więc
+	utworzenie go raz i przekazywanie do kolejnych wywołań `convert_rows()`
+	pozwala uniknąć ponownego pobierania tabel. Ten sam obiekt może być
+	jednocześnie używany w wielu wątkach i zadaniach `asyncio` - jednoczesne
+	żądania tej samej tabeli powodują tylko jedno jej pobranie.
+
+	Obiektu można użyć jako menedżera kontekstu - po wyjściu z bloku `with`
+	usuwany jest jego katalog roboczy. Można to zrobić również metodą
+	`close()`.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`tables` -- Obiekt klasy `utils.TablesPool` przechowujący tabele kursów.
+	`preload` -- Metoda wczytująca do pamięci wszystkie tabele z wybranych
+	lat.
+	`get_exchange_ratio` -- Metoda zwracająca kurs w PLN wybranej waluty
+	w wybranym dniu.
+	`get_exchange_ratio_async` -- Współprogram zwracający kurs w PLN wybranej
+	waluty w wybranym dniu bez blokowania pętli zdarzeń.
+	`close` -- Metoda usuwająca katalog roboczy.
+	"""
+
+	def __init__(
+			self,
+			cache: TablesCache|None = None,
+			max_years: int|None = utils.TablesPool.DEFAULT_MAX_YEARS,
+			snapshot: 'Snapshot|None' = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Rates`.
+
+		Przyjmuje następujące parametry:
+		`cache` -- Opcjonalnie, obiekt klasy `cache.TablesCache`, w którym
+		przechowywane są pobrane pliki z tabelami.
+		`max_years` -- Opcjonalnie, liczba lat, dla których jednocześnie
+		przechowywane są tabele kursów, albo `None` (domyślnie), jeżeli liczba
+		lat nie jest ograniczona, jak w klasie `utils.TablesPool`.
+		`snapshot` -- Opcjonalnie, obiekt klasy `snapshot.Snapshot`, z którego
+		w pierwszej kolejności odczytywane są kursy.
+		"""
+		# Katalog roboczy jest tworzony dopiero, gdy jest potrzebny.
+		self._tmpdir: LazyTemporaryDirectory = LazyTemporaryDirectory(
+			prefix='transactions2pln_')
+		self.tables: utils.TablesPool = utils.TablesPool(
+			self._tmpdir, cache, max_years, snapshot=snapshot)
+
+	def __enter__(self) -> 'Rates':
+		return self
+
+	def __exit__(self, *exc_info: typing.Any) -> None:
+		self.close()
+
+	def preload(self, years: typing.Iterable[int]) -> None:
+		"""Pobiera równolegle i wczytuje do pamięci wszystkie tabele kursów
+		z lat `years`.
+
+		Po wywołaniu tej metody odczyt kursów z tych lat nie wymaga pobierania
+		ani parsowania plików. Jeżeli przy tworzeniu obiektu podano wartość
+		`max_years`, liczba lat nie powinna jej przekraczać, gdyż tabele
+		z najdawniej używanych lat zostałyby usunięte z pamięci. Lata objęte
+		migawką kursów są pomijane.
+		"""
+		snapshot: Snapshot|None = self.tables.snapshot
+		years = [
+			year for year in years
+			if snapshot is None or not snapshot.covers(year)
+		]
+		self.tables.prefetch(
+			(table, year)
+			for year in years
+			for table in utils.TablesManager.CURRENCY_MAP
+		)
+		for year in years:
+			manager: utils.TablesManager = self.tables.get_manager(year)
+			for table in manager.CURRENCY_MAP:
+				manager.get_dense_table(table)
+
+	def get_exchange_ratio(
+			self,
+			currency: str,
+			check_date: date,
+		) -> decimal.Decimal:
+		"""Zwraca kurs waluty `currency` obowiązujący w dniu `check_date`,
+		wyrażony w PLN.
+
+		W odróżnieniu od kursów dodawanych przez `convert_rows()`, dla dat
+		wypadających w sobotę lub niedzielę nie jest przyjmowany kurs
+		z piątku, lecz ostatni opublikowany nie wcześniej niż 3 dni przed
+		`check_date`. Jeżeli kursu nie można ustalić, zgłasza błąd
+		`ValueError`.
+		"""
+		return self.tables.get_exchange_ratio(currency, check_date)
+
+	async def get_exchange_ratio_async(
+			self,
+			currency: str,
+			check_date: date,
+		) -> decimal.Decimal:
+		"""Zwraca kurs tak jak metoda `get_exchange_ratio()`, ale bez
+		blokowania pętli zdarzeń `asyncio` - tabele kursów są w razie potrzeby
+		pobierane i wczytywane w osobnym wątku."""
+		return await self.tables.get_exchange_ratio_async(currency, check_date)
+
+	def close(self) -> None:
+		"""Usuwa katalog roboczy. Po wywołaniu tej metody obiekt może
+		wymagać ponownego pobrania tabel, których pliki były w nim
+		przechowywane."""
+		self._tmpdir.cleanup()
+
+
+def _get_column_index(
+		column: Column,
+		labels: list[str],
+		param_name: str,
+	) -> int|None:
+	# Zwraca indeks kolumny podanej jako indeks albo jako łańcuch
+	# rozumiany tak jak przez `utils.get_column_index()`.
+	if column is None or isinstance(column, int):
+		return column
+	try:
+		return utils.get_column_index(column, labels)
+	except ValueError as err:
+		raise exc.ColumnParameterError(param_name, column) from err
+
+
+def resolve_columns(
+		labels: list[str],
+		currency: str|int,
+		amount_column: Column = None,
+		date_column: Column = None,
+	) -> tuple[str|None, int|None, int|None, int|None]:
+	"""Ustala walutę transakcji i indeksy kolumn z danymi.
+
+	Funkcja przyjmuje następujące argumenty:
+	`labels` -- Lista nagłówków kolumn, pusta jeśli dane ich nie zawierają.
+	`currency` -- Trzyliterowy kod ISO 4217 waluty wspólnej dla wszystkich
+	transakcji albo odwołanie do kolumny z walutą.
+	`amount_column` -- Opcjonalnie, odwołanie do kolumny z kwotami.
+	`date_column` -- Opcjonalnie, odwołanie do kolumny z datami.
+
+	Odwołaniem do kolumny może być jej indeks (liczony od 0) albo łańcuch
+	z nagłówkiem, numerem (liczonym od 1) lub literą kolumny, jak w wierszu
+	poleceń. Zwraca krotkę złożoną z kodu waluty (albo `None`), indeksu
+	kolumny z walutą (albo `None`, jeśli podano kod waluty) oraz indeksów
+	kolumn z kwotami i datami (albo `None`, jeśli ich nie podano). Jeżeli
+	odwołanie nie wskazuje żadnej kolumny, zgłasza wyjątek
+	`exceptions.ColumnParameterError`.
+	"""
+	if isinstance(currency, str) and all((
+		currency.isupper(),
+		len(currency) == 3,
+		currency not in labels,
+	)):
+		return (
+			currency,
+			None,
+			_get_column_index(amount_column, labels, 'amount-column'),
+			_get_column_index(date_column, labels, 'date-column'),
+		)
+	# Waluta podana jako odwołanie do kolumny.
+	currency_column: int|None = _get_column_index(currency, labels, 'currency')
+	if currency_column is None:
+		raise exc.ColumnParameterError('currency', str(currency))
+	return (
+		None,
+		currency_column,
+		_get_column_index(amount_column, labels, 'amount-column'),
+		_get_column_index(date_column, labels, 'date-column'),
+	)
+
+
+def detect_date(
+		rows: typing.Iterator[list[str]],
+		date_column: int|None = None,
+		date_format: str|None = None,
+	) -> tuple[typing.Iterator[list[str]], int|None, str|None]:
+	"""Ustala kolumnę z datą i format dat, jeżeli któregoś z nich nie podano.
+
+	Funkcja odczytuje z iteratora `rows` najwyżej `DETECTION_SAMPLE_SIZE`
+	wierszy i sprawdza je funkcją `utils.detect_date_column()`. Zwraca
+	krotkę złożoną z iteratora po wszystkich wierszach, łącznie
+	z odczytanymi, indeksu kolumny z datą i formatu dat. Jeżeli nie udało się
+	ich ustalić, zwracane są wartości `date_column` i `date_format`.
+	"""
+	if date_column is not None and date_format is not None:
+		return rows, date_column, date_format
+	sample: list[list[str]] = list(itertools.islice(rows, DETECTION_SAMPLE_SIZE))
+	rows = itertools.chain(sample, rows)
+	detected: tuple[int, str]|None = utils.detect_date_column(
+		sample,
+		utils.DATE_FORMATS if date_format is None else (date_format,),
+		None if date_column is None else (date_column,),
+	)
+	if detected is None:
+		return rows, date_column, date_format
+	return rows, detected[0], detected[1]
+
+
+def convert_rows(
+		rows: typing.Iterable[typing.Sequence[str]],
+		rates: Rates,
+		currency: str|int,
+		*,
+		amount_column: Column = None,
+		date_column: Column = None,
+		date_format: str|None = None,
+		labels: bool = False,
+		decimal_point: str = ',',
+		precision: int = DEFAULT_PRECISION,
+		engine: str = 'row',
+	) -> typing.Iterator[list[str]]:
+	"""Przelicza transakcje z wierszy `rows` na PLN.
+
+	Funkcja przyjmuje następujące argumenty:
+	`rows` -- Kolekcja wierszy, z których każdy jest sekwencją łańcuchów,
+	np. obiekt zwracany przez `csv.reader()`.
+	`rates` -- Obiekt klasy `Rates`, z którego odczytywane są kursy.
+	`currency`, `amount_column`, `date_column` -- Waluta i odwołania
+	do kolumn, jak w funkcji `resolve_columns()`. Jeżeli nie podano kolumny
+	z kwotami, kwotą jest ostatnia kolumna w wierszu.
+	`date_format` -- Opcjonalnie, format dat zgodny z `datetime.strftime()`.
+	Jeżeli nie podano formatu dat lub kolumny z datą, są one ustalane
+	funkcją `detect_date()`.
+	`labels` -- Opcjonalnie, czy pierwszy wiersz zawiera nagłówki kolumn.
+	Jeżeli tak, zwracany jest on z dodanymi nagłówkami z `LABELS`.
+	`decimal_point` -- Opcjonalnie, separator dziesiętny w kursach i kwotach.
+	Domyślnie przecinek, jak w wierszu poleceń w polskich ustawieniach
+	językowych.
+	`precision` -- Opcjonalnie, liczba cyfr znaczących w obliczeniach.
+	`engine` -- Opcjonalnie, `row` albo `numpy`, jak parametr --engine
+	wiersza poleceń.
+
+	Zwraca generator, który odczytuje kolejne wiersze z `rows` dopiero
+	w miarę pobierania z niego wyników, i zwraca je jako listy z dodanym
+	kursem i kwotą w PLN. Błędy parametrów są więc zgłaszane przy pobraniu
+	pierwszego wiersza, a błędy przetwarzania - przy pobraniu wiersza,
+	którego dotyczą, jako wyjątek `exceptions.RowProcessingError` z numerem
+	wiersza liczonym od 1, łącznie z wierszem nagłówków.
+	"""
+	iterator: typing.Iterator[list[str]] = map(list, rows)
+	header: list[str] = []
+	if labels:
+		first: list[str]|None = next(iterator, None)
+		if first is None:
+			return
+		header = first
+		yield header + list(LABELS)
+
+	currency_code, currency_column, amount_idx, date_idx = resolve_columns(
+		header, currency, amount_column, date_column)
+	iterator, date_idx, date_format = detect_date(
+		iterator, date_idx, date_format)
+
+	converter_class: type[RowConverter] = RowConverter
+	if engine == 'numpy':
+		from transactions2pln.vectorized import VectorizedConverter
+		converter_class = VectorizedConverter
+	elif engine != 'row':
+		raise ValueError(f"nieznany sposób przetwarzania: '{engine}'.")
+	converter: RowConverter = converter_class(
+		rates.tables,
+		utils.DateParser('%x' if date_format is None else date_format),
+		currency_code,
+		currency_column or 0,
+		amount_idx,
+		date_idx,
+		decimal_point=decimal_point,
+		context=decimal.Context(prec=precision),
+	)
+	yield from converter.convert_rows(iterator, 1 if labels else 0)
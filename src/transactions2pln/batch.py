@@ -0,0 +1,482 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Przetwarzanie wielu plików wejściowych w jednym uruchomieniu programu.
+
+Przetworzenie każdego pliku osobnym uruchomieniem programu `transactions2pln`
+wymaga za każdym razem uruchomienia interpretera, utworzenia katalogu
+roboczego oraz pobrania i wczytania tabel kursów. Ten moduł przetwarza
+wiele plików w jednym procesie albo w puli procesów, w których wczytane
+tabele kursów są używane dla kolejnych plików, a pobrane pliki z tabelami
+są współdzielone za pośrednictwem pamięci podręcznej. Błąd w jednym pliku
+nie przerywa przetwarzania pozostałych - po zakończeniu wyświetlane jest
+podsumowanie z wynikiem przetworzenia każdego pliku.
+
+Zawiera następujące klasy i funkcje:
+`FileResult` -- Klasa opisująca wynik przetworzenia jednego pliku.
+`expand_paths` -- Funkcja zamieniająca ścieżki i wzorce ścieżek na listę
+plików.
+`output_paths` -- Funkcja ustalająca ścieżki plików wyjściowych.
+`convert_file` -- Funkcja przetwarzająca jeden plik.
+`convert_files` -- Funkcja przetwarzająca wiele plików w jednym procesie
+albo w puli procesów.
+`run` -- Obsługuje program wiersza poleceń `transactions2pln-batch`.
+"""
+import csv
+import glob
+import os
+import sys
+import typing
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
+
+from transactions2pln import api, compression, exceptions as exc, utils
+from transactions2pln.cache import TablesCache, default_cache_dir
+from transactions2pln.snapshot import Snapshot
+
+# Rozszerzenia plików wyjściowych w poszczególnych formatach.
+EXTENSIONS: dict[str, str] = {
+	'csv': '.csv',
+	'json': '.json',
+	'ndjson': '.ndjson',
+}
+
+# Kody błędów zwracane przez program, jak w programie `transactions2pln`.
+_ERROR_CODE_MAP: dict[typing.Type[Exception], int] = {
+	RuntimeError: 2,
+	ValueError: 3,
+	exc.ColumnParameterError: 4,
+	exc.RowProcessingError: 5,
+}
+
+# Stan procesu roboczego, ustawiany przez funkcję `_init_worker()`: obiekt
+# z kursami i argumenty funkcji `convert_file()`.
+_state: tuple[api.Rates, dict[str, typing.Any]]|None = None
+
+
+class FileResult():
+	"""Wynik przetworzenia jednego pliku wejściowego.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`input` -- Ścieżka do pliku wejściowego.
+	`output` -- Ścieżka do pliku wyjściowego.
+	`rows` -- Liczba zapisanych wierszy danych, bez wiersza nagłówków.
+	`error` -- Komunikat błędu, który przerwał przetwarzanie pliku, albo
+	`None`, jeżeli plik został przetworzony w całości.
+	`error_type` -- Klasa wyjątku, który przerwał przetwarzanie pliku, np.
+	`exceptions.RowProcessingError`, albo `None`.
+	"""
+
+	def __init__(
+			self,
+			input: str,
+			output: str,
+			rows: int = 0,
+			error: Exception|None = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `FileResult`.
+
+		Przyjmuje następujące parametry:
+		`input` -- Ścieżka do pliku wejściowego.
+		`output` -- Ścieżka do pliku wyjściowego.
+		`rows` -- Opcjonalnie, liczba zapisanych wierszy danych.
+		`error` -- Opcjonalnie, wyjątek, który przerwał przetwarzanie pliku.
+
+		Sam wyjątek nie jest przechowywany, gdyż wyniki są przekazywane
+		pomiędzy procesami, a nie wszystkie wyjątki dają się serializować.
+		"""
+		self.input: str = input
+		self.output: str = output
+		self.rows: int = rows
+		self.error: str|None = None if error is None else str(error)
+		self.error_type: typing.Type[Exception]|None = (
+			None if error is None else type(error))
+
+
+def expand_paths(patterns: typing.Iterable[str]) -> list[str]:
+	"""Zwraca listę ścieżek plików pasujących do ścieżek lub wzorców ścieżek
+	z `patterns`, takich jak w funkcji `glob.glob()` (np. `dane/**/*.csv`).
+
+	Pliki pasujące do wzorca są zwracane w kolejności alfabetycznej, a każdy
+	plik jest zwracany tylko raz. Ścieżka, do której nie pasuje żaden plik,
+	jest zwracana bez zmian, by błąd jej odczytu został wykazany
+	w podsumowaniu.
+	"""
+	paths: dict[str, None] = {}
+	for pattern in patterns:
+		matches: list[str] = sorted(
+			path for path in glob.glob(pattern, recursive=True)
+			if not os.path.isdir(path)
+		)
+		for path in matches or [pattern]:
+			paths[path] = None
+	return list(paths)
+
+
+def output_paths(
+		paths: typing.Iterable[str],
+		directory: str,
+		output_format: str = 'csv',
+	) -> list[str]:
+	"""Zwraca ścieżki plików wyjściowych dla plików wejściowych `paths`.
+
+	Plik wyjściowy ma nazwę pliku wejściowego z rozszerzeniem odpowiednim dla
+	formatu `output_format` i znajduje się w katalogu `directory`. Plik
+	wyjściowy dla pliku skompresowanego jest kompresowany w tym samym
+	formacie, np. dla pliku `dane.csv.gz` jest to plik `dane.json.gz`. Zgłasza
+	wyjątek `ValueError`, jeżeli dwa pliki wejściowe miałyby ten sam plik
+	wyjściowy albo plik wyjściowy byłby jednocześnie plikiem wejściowym.
+	"""
+	inputs: list[str] = list(paths)
+	outputs: list[str] = []
+	used: dict[str, str] = {}
+	for path in inputs:
+		name, suffix = compression.split_extension(os.path.basename(path))
+		output: str = os.path.join(
+			directory,
+			os.path.splitext(name)[0] + EXTENSIONS[output_format] + suffix,
+		)
+		key: str = os.path.normcase(os.path.abspath(output))
+		if key in used:
+			raise ValueError(
+				f"Pliki {used[key]} i {path} miałyby ten sam plik wyjściowy "
+				f"{output}."
+			)
+		used[key] = path
+		outputs.append(output)
+	for path in inputs:
+		if os.path.normcase(os.path.abspath(path)) in used:
+			raise ValueError(
+				f"Plik wejściowy {path} zostałby zastąpiony plikiem wyjściowym.")
+	return outputs
+
+
+def convert_file(
+		input_path: str,
+		output_path: str,
+		rates: api.Rates,
+		output_format: str = 'csv',
+		**options: typing.Any,
+	) -> FileResult:
+	"""Przetwarza plik CSV `input_path` i zapisuje wyniki w pliku
+	`output_path`.
+
+	Funkcja przyjmuje następujące argumenty:
+	`input_path` -- Ścieżka do pliku wejściowego, który może być
+	skompresowany, jak w funkcji `compression.open_file()`.
+	`output_path` -- Ścieżka do pliku wyjściowego. Istniejący plik zostanie
+	zastąpiony, a plik z rozszerzeniem formatu kompresji - skompresowany.
+	`rates` -- Obiekt klasy `api.Rates`, z którego odczytywane są kursy.
+	`output_format` -- Opcjonalnie, format pliku wyjściowego: `csv`, `json`
+	albo `ndjson`.
+	`options` -- Pozostałe argumenty funkcji `api.convert_rows()`, takie jak
+	`currency` czy `labels`.
+
+	Błędy nie są zgłaszane, lecz zwracane w obiekcie klasy `FileResult`
+	opisującym wynik przetwarzania. Tak jak w programie `transactions2pln`,
+	wiersze przetworzone przed błędem są zapisywane do pliku wyjściowego.
+	"""
+	result: FileResult = FileResult(input_path, output_path)
+	try:
+		with (
+			compression.open_file(input_path) as input,
+			compression.open_file(output_path, 'w') as output_file,
+		):
+			stream: utils.BufferedOutput = utils.BufferedOutput(output_file)
+			converted: typing.Iterator[list[str]] = api.convert_rows(
+				csv.reader(input), rates, **options)
+			header: list[str]|None = None
+			if options.get('labels'):
+				header = next(converted, None)
+			output: typing.Any
+			if output_format == 'csv':
+				output = csv.writer(stream)
+				if header is not None:
+					output.writerow(header)
+			else:
+				output = utils.JSONWrapper(
+					stream, # type: ignore[arg-type]
+					header,
+					output_format == 'ndjson',
+				)
+			try:
+				for row in converted:
+					output.writerow(row)
+					result.rows += 1
+			finally:
+				stream.flush()
+			if output_format != 'csv':
+				output.writeend()
+			stream.flush()
+	except Exception as err:
+		return FileResult(input_path, output_path, result.rows, err)
+	return result
+
+
+def _init_worker(rates: api.Rates, options: dict[str, typing.Any]) -> None:
+	# Przygotowuje proces roboczy. Tabele kursów wczytane w procesie
+	# nadrzędnym są dostępne w procesie roboczym, a tabele wczytane przez
+	# proces roboczy są używane do przetwarzania kolejnych plików.
+	global _state
+	_state = (rates, options)
+
+
+def _convert_file(input_path: str, output_path: str) -> FileResult:
+	# Przetwarza plik w procesie roboczym.
+	if _state is None:
+		raise RuntimeError("proces roboczy nie został przygotowany.")
+	rates, options = _state
+	return convert_file(input_path, output_path, rates, **options)
+
+
+def convert_files(
+		paths: typing.Iterable[str],
+		directory: str,
+		rates: api.Rates,
+		output_format: str = 'csv',
+		workers: int = 1,
+		**options: typing.Any,
+	) -> typing.Iterator[FileResult]:
+	"""Przetwarza pliki CSV `paths` i zapisuje wyniki w katalogu `directory`.
+
+	Funkcja przyjmuje następujące argumenty:
+	`paths` -- Ścieżki do plików wejściowych.
+	`directory` -- Katalog, w którym zapisywane są pliki wyjściowe, jak
+	w funkcji `output_paths()`. Zostanie utworzony, jeśli nie istnieje.
+	`rates` -- Obiekt klasy `api.Rates`, z którego odczytywane są kursy.
+	`output_format` -- Opcjonalnie, format plików wyjściowych: `csv`, `json`
+	albo `ndjson`.
+	`workers` -- Opcjonalnie, liczba procesów roboczych. Jeżeli jest większa
+	niż 1, pliki są przetwarzane równolegle w puli procesów. Procesy powinny
+	wtedy współdzielić pobrane tabele za pośrednictwem pamięci podręcznej
+	obiektu `rates`, gdyż każdy z nich wczytuje tabele osobno.
+	`options` -- Pozostałe argumenty funkcji `api.convert_rows()`.
+
+	Zwraca iterator po obiektach klasy `FileResult` opisujących wyniki
+	przetworzenia kolejnych plików, w kolejności plików w `paths`.
+	"""
+	inputs: list[str] = list(paths)
+	outputs: list[str] = output_paths(inputs, directory, output_format)
+	os.makedirs(directory, exist_ok=True)
+	if workers == 1 or len(inputs) == 1:
+		for input_path, output_path in zip(inputs, outputs):
+			yield convert_file(
+				input_path, output_path, rates, output_format, **options)
+		return
+	options = dict(options, output_format=output_format)
+	with ProcessPoolExecutor(
+		min(workers, len(inputs)),
+		initializer=_init_worker,
+		initargs=(rates, options),
+	) as executor:
+		yield from executor.map(_convert_file, inputs, outputs)
+
+
+def run() -> int:
+	"""Uruchamia przetwarzanie wielu plików jako program wiersza poleceń.
+
+	Zwraca 0, jeśli wszystkie pliki zostały przetworzone, albo kod błędu
+	pierwszego pliku, którego nie udało się przetworzyć, taki jak
+	w programie `transactions2pln` (np. 5 przy błędzie przetwarzania danych).
+	Komunikaty błędów i podsumowanie są zapisywane do standardowego
+	strumienia błędów.
+	"""
+	argparser: ArgumentParser = ArgumentParser(
+		prog="transactions2pln-batch",
+		description="""
+			Dodaje wartości w PLN do wielu plików CSV z transakcjami,
+			zapisując wyniki w osobnych plikach we wskazanym katalogu.
+		""",
+	)
+	argparser.add_argument(
+		'inputs',
+		nargs='+',
+		metavar='INPUT',
+		help="""
+			Ścieżki do plików CSV albo wzorce ścieżek, np. "dane/*.csv"
+			lub "dane/**/*.csv" dla plików we wszystkich podkatalogach.
+		""",
+	)
+	argparser.add_argument(
+		'-O', '--output-dir',
+		required=True,
+		metavar='DIR',
+		help="""
+			Katalog, w którym zapisywane są pliki wynikowe o nazwach plików
+			wejściowych. Zostanie utworzony, jeśli nie istnieje.
+		""",
+	)
+	argparser.add_argument(
+		'-j', '--json',
+		action='store_true',
+		help="Zwróć wyniki w formacie JSON.",
+	)
+	argparser.add_argument(
+		'--ndjson',
+		action='store_true',
+		help="Zwróć wyniki w formacie NDJSON (JSON Lines).",
+	)
+	argparser.add_argument(
+		'-a', '--amount-column',
+		help="""
+			Kolumna zawierająca kwotę transakcji - może być podana jako
+			nagłówek, liczba albo litera. Domyślnie: ostatnia kolumna w pliku.
+		""",
+	)
+	argparser.add_argument(
+		'-c', '--currency',
+		default='USD',
+		help="""
+			Waluta transakcji. Może być podana jako trzyliterowy kod,
+			nagłówek kolumny, liczba albo litera. Domyślnie: USD.
+		""",
+	)
+	argparser.add_argument(
+		'-d', '--date-column',
+		help="""
+			Kolumna zawierająca datę transakcji - może być podana jako
+			nagłówek, liczba albo litera. Domyślnie: program spróbuje
+			wykryć ją na podstawie początkowych wierszy każdego pliku.
+		""",
+	)
+	argparser.add_argument(
+		'-f', '--date-format',
+		help="""
+			Format dat używanych w kolumnie z datą transakcji, zgodny
+			z datetime.strftime(). Domyślnie: program spróbuje wykryć format
+			na podstawie początkowych wierszy każdego pliku.
+		""",
+	)
+	argparser.add_argument(
+		'-l', '--no-labels',
+		dest='labels',
+		action='store_false',
+		help="Nie traktuj pierwszego wiersza plików jako nagłówków kolumn.",
+	)
+	argparser.add_argument(
+		'-w', '--workers',
+		default=1,
+		type=int,
+		metavar='N',
+		help="""
+			Liczba procesów przetwarzających pliki równolegle.
+			Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'--engine',
+		default='row',
+		choices=('row', 'numpy'),
+		help="""
+			Sposób przetwarzania wierszy: pojedynczo (row) albo partiami,
+			za pomocą biblioteki NumPy (numpy). Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'--max-years',
+		type=int,
+		metavar='N',
+		help="""
+			Najwyższa liczba lat, z których tabele kursów są jednocześnie
+			przechowywane w pamięci. Domyślnie: bez ograniczenia.
+		""",
+	)
+	argparser.add_argument(
+		'--snapshot',
+		metavar='FILE',
+		help="""
+			Odczytuj kursy z pliku FILE zawierającego migawkę kursów, tworzonego
+			poleceniem "transactions2pln-snapshot build".
+		""",
+	)
+	argparser.add_argument(
+		'--cache-dir',
+		help="""
+			Katalog w którym przechowywane są pobrane tabele kursów NBP.
+			Domyślnie: %s
+		""" % default_cache_dir().replace('%', '%%'),
+	)
+	argparser.add_argument(
+		'--no-cache',
+		dest='cache',
+		action='store_false',
+		help="""
+			Nie używaj pamięci podręcznej - pobierz tabele kursów NBP
+			do katalogu tymczasowego i usuń je po zakończeniu działania.
+		""",
+	)
+	args: Namespace = argparser.parse_args()
+
+	results: list[FileResult] = []
+	try:
+		if args.workers < 1:
+			raise ValueError("Liczba procesów musi być dodatnia.")
+		with TemporaryDirectory(prefix='transactions2pln_') as tmpdir:
+			# Bez pamięci podręcznej tabele pobierane są do katalogu
+			# tymczasowego, który pełni jej rolę, dzięki czemu procesy robocze
+			# pobierają każdą tabelę tylko raz.
+			tables_cache: TablesCache = TablesCache(
+				(args.cache_dir or default_cache_dir()) if args.cache else tmpdir)
+			snapshot: Snapshot|None = None
+			if args.snapshot:
+				snapshot = Snapshot(args.snapshot)
+			with api.Rates(tables_cache, args.max_years, snapshot) as rates:
+				for result in convert_files(
+					expand_paths(args.inputs),
+					args.output_dir,
+					rates,
+					'ndjson' if args.ndjson else 'json' if args.json else 'csv',
+					args.workers,
+					currency=args.currency,
+					amount_column=args.amount_column,
+					date_column=args.date_column,
+					date_format=args.date_format,
+					labels=args.labels,
+					engine=args.engine,
+				):
+					results.append(result)
+					if result.error is None:
+						print(
+							f"{result.input}: OK, wiersze: {result.rows}",
+							file=sys.stderr,
+						)
+					else:
+						print(
+							f"{result.input}: BŁĄD - {result.error}",
+							file=sys.stderr,
+						)
+	except Exception as err:
+		if sys.flags.dev_mode:
+			raise
+		print(str(err), file=sys.stderr)
+		return _ERROR_CODE_MAP.get(err.__class__, 1)
+
+	failed: list[FileResult] = [
+		result for result in results if result.error_type is not None]
+	print(
+		f"Przetworzono pliki: {len(results) - len(failed)} z {len(results)}.",
+		file=sys.stderr,
+	)
+	if failed:
+		return _ERROR_CODE_MAP.get(failed[0].error_type, 1) # type: ignore
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run())
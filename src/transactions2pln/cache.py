@@ -0,0 +1,257 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Trwała pamięć podręczna plików z tabelami kursów NBP.
+
+Archiwalne tabele NBP za zamknięte lata nie ulegają zmianom, więc nie ma
+potrzeby pobierać ich przy każdym uruchomieniu programu. Ten moduł pozwala
+przechowywać pobrane pliki pomiędzy uruchomieniami i współdzielić je
+pomiędzy równolegle działającymi procesami.
+
+Zawiera następujące klasy i funkcje:
+`TablesCache` -- Klasa zarządzająca katalogiem, w którym przechowywane są
+pobrane pliki z tabelami NBP.
+`LazyTemporaryDirectory` -- Klasa katalogu tymczasowego tworzonego dopiero
+przy pierwszym użyciu.
+`default_cache_dir` -- Funkcja zwracająca domyślną ścieżkę katalogu
+pamięci podręcznej.
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+import typing
+from datetime import datetime
+
+if sys.platform == 'win32':
+	import msvcrt
+else:
+	import fcntl
+
+
+def default_cache_dir() -> str:
+	"""Zwraca domyślną ścieżkę katalogu pamięci podręcznej.
+
+	Na systemie Windows jest to podkatalog w katalogu wskazanym przez zmienną
+	środowiskową `LOCALAPPDATA`. Na pozostałych systemach ścieżka jest zgodna
+	ze specyfikacją XDG Base Directory - jest to podkatalog w katalogu
+	wskazanym przez zmienną `XDG_CACHE_HOME`, a jeśli nie jest ona ustawiona,
+	w katalogu `~/.cache`.
+	"""
+	base: str
+	if sys.platform == 'win32':
+		base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+		return os.path.join(base, 'transactions2pln', 'cache')
+	base = os.environ.get('XDG_CACHE_HOME') or ''
+	# Specyfikacja XDG nakazuje ignorować ścieżki względne.
+	if not os.path.isabs(base):
+		base = os.path.join(os.path.expanduser('~'), '.cache')
+	return os.path.join(base, 'transactions2pln')
+
+
+@contextlib.contextmanager
+def _file_lock(path: str) -> typing.Iterator[None]:
+	# Blokada na wyłączność na pliku `path`, zwalniana po wyjściu z bloku.
+	# Sam plik blokady nie jest nigdy usuwany - usunięcie go w trakcie, gdy
+	# inny proces na niego czeka, pozwoliłoby trzeciemu procesowi założyć
+	# blokadę na nowym pliku o tej samej nazwie.
+	with open(path, 'a+b') as lockfile:
+		if sys.platform == 'win32':
+			lockfile.seek(0)
+			# `msvcrt.LK_LOCK` ponawia próbę założenia blokady tylko przez
+			# około 10 sekund, dlatego ponawiamy ją aż do skutku.
+			while True:
+				try:
+					msvcrt.locking(lockfile.fileno(), msvcrt.LK_LOCK, 1)
+				except OSError:
+					continue
+				else:
+					break
+			try:
+				yield
+			finally:
+				lockfile.seek(0)
+				msvcrt.locking(lockfile.fileno(), msvcrt.LK_UNLCK, 1)
+		else:
+			fcntl.flock(lockfile.fileno(), fcntl.LOCK_EX)
+			try:
+				yield
+			finally:
+				fcntl.flock(lockfile.fileno(), fcntl.LOCK_UN)
+
+
+class TablesCache():
+	"""Katalog przechowujący pobrane pliki z tabelami kursów NBP.
+
+	Pliki są identyfikowane oznaczeniem tabeli i rokiem. Plik z tabelą
+	za zamknięty rok, pobrany już po jego zakończeniu, jest traktowany jako
+	niezmienny i nigdy nie jest pobierany ponownie. Plik z tabelą za bieżący
+	rok (lub pobrany jeszcze w trakcie roku, którego dotyczy) jest uznawany
+	za aktualny przez czas określony atrybutem `max_age`.
+
+	Pobieranie plików odbywa się pod blokadą pliku, dzięki czemu wiele
+	procesów może bezpiecznie korzystać z tego samego katalogu. Nowy plik
+	jest zapisywany pod tymczasową nazwą i dopiero po pobraniu w całości
+	zastępuje poprzednią wersję, więc odczyt nie wymaga blokady.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`DEFAULT_MAX_AGE` -- Domyślny czas ważności plików z tabelami za bieżący
+	rok, w sekundach.
+	`name` -- Łańcuch zawierający ścieżkę do katalogu pamięci podręcznej.
+	`max_age` -- Czas ważności plików z tabelami za bieżący rok, w sekundach.
+	`get_path` -- Metoda zwracająca ścieżkę do pliku z daną tabelą.
+	`is_fresh` -- Metoda sprawdzająca, czy plik z daną tabelą jest aktualny.
+	`fetch` -- Metoda zwracająca ścieżkę do aktualnego pliku z daną tabelą,
+	pobierając go w razie potrzeby.
+	"""
+	DEFAULT_MAX_AGE: int = 3600
+
+	def __init__(self, directory: str, max_age: int = DEFAULT_MAX_AGE) -> None:
+		"""Metoda inicjalizująca obiekty klasy `TablesCache`.
+
+		Przyjmuje następujące parametry:
+		`directory` -- Łańcuch zawierający ścieżkę do katalogu pamięci
+		podręcznej. Katalog zostanie utworzony przy pierwszym pobraniu pliku.
+		`max_age` -- Opcjonalnie, czas ważności plików z tabelami za bieżący
+		rok, w sekundach.
+		"""
+		# Nazwa atrybutu odpowiada atrybutowi obiektów
+		# `tempfile.TemporaryDirectory`.
+		self.name: str = directory
+		self.max_age: int = max_age
+
+	def get_path(self, table: str, year: int) -> str:
+		"""Zwraca ścieżkę do pliku z tabelą `table` za rok `year`."""
+		return os.path.join(self.name, f'archiwum_tab_{table}_{year}.csv')
+
+	def is_fresh(self, table: str, year: int) -> bool:
+		"""Sprawdza, czy plik z tabelą `table` za rok `year` jest obecny
+		w pamięci podręcznej i aktualny.
+		"""
+		try:
+			mtime: float = os.stat(self.get_path(table, year)).st_mtime
+		except FileNotFoundError:
+			return False
+		# Plik pobrany po zakończeniu roku którego dotyczy zawiera
+		# już wszystkie kursy z tego roku.
+		if datetime.fromtimestamp(mtime).year > year:
+			return True
+		# Zegar systemowy mógł zostać cofnięty, więc ujemny wiek pliku
+		# również traktujemy jako nieaktualny.
+		return 0 <= time.time() - mtime < self.max_age
+
+	def fetch(
+		self,
+		table: str,
+		year: int,
+		download: typing.Callable[[str], object],
+	) -> str:
+		"""Zwraca ścieżkę do aktualnego pliku z tabelą kursów.
+
+		Przyjmuje następujące parametry:
+		`table` -- Łańcuch zawierający oznaczenie tabeli NBP.
+		`year` -- Liczba całkowita oznaczająca rok, którego dotyczy tabela.
+		`download` -- Funkcja przyjmująca ścieżkę pliku i zapisująca pod nią
+		pobraną tabelę. Jest wywoływana tylko wtedy, gdy w pamięci podręcznej
+		nie ma aktualnego pliku.
+		"""
+		path: str = self.get_path(table, year)
+		if self.is_fresh(table, year):
+			return path
+
+		os.makedirs(self.name, exist_ok=True)
+		with _file_lock(path + '.lock'):
+			# Inny proces mógł pobrać plik w czasie, gdy czekaliśmy na blokadę.
+			if self.is_fresh(table, year):
+				return path
+			tmp_path: str = f'{path}.{os.getpid()}.tmp'
+			try:
+				download(tmp_path)
+				os.replace(tmp_path, path)
+			except BaseException:
+				with contextlib.suppress(FileNotFoundError):
+					os.remove(tmp_path)
+				raise
+		return path
+
+
+class LazyTemporaryDirectory():
+	"""Katalog tymczasowy tworzony dopiero przy pierwszym użyciu.
+
+	Katalog roboczy jest potrzebny tylko wtedy, gdy tabele kursów są
+	pobierane z pominięciem pamięci podręcznej. Obiekty tej klasy mogą być
+	używane zamiast obiektów `tempfile.TemporaryDirectory`, ale katalog -
+	a także sam moduł `tempfile` - są tworzone i importowane dopiero przy
+	pierwszym odczycie atrybutu `name`.
+
+	Wyjątkiem jest serializacja obiektu, np. przy przekazywaniu go procesom
+	roboczym: tworzy ona katalog, nawet jeżeli nie był dotąd potrzebny, by
+	wszystkie procesy korzystały z tego samego katalogu. W przeciwnym razie
+	każdy proces roboczy tworzyłby własny katalog, który nie zawsze zostałby
+	usunięty, np. gdy proces kończy działanie bez wywoływania funkcji
+	sprzątających. Katalog usuwa tylko obiekt, który go utworzył.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`name` -- Łańcuch zawierający ścieżkę do katalogu tymczasowego.
+	`cleanup` -- Metoda usuwająca katalog tymczasowy, jeżeli został
+	utworzony.
+	"""
+
+	def __init__(self, prefix: str|None = None) -> None:
+		"""Metoda inicjalizująca obiekty klasy `LazyTemporaryDirectory`.
+
+		Przyjmuje opcjonalny parametr `prefix` - początek nazwy katalogu, jak
+		w klasie `tempfile.TemporaryDirectory`.
+		"""
+		self._prefix: str|None = prefix
+		self._name: str|None = None
+		self._tmpdir: typing.Any = None
+		self._lock: threading.Lock = threading.Lock()
+
+	def __getstate__(self) -> dict[str, typing.Any]:
+		# Obiekt przekazany do innego procesu korzysta z tego samego katalogu,
+		# ale go nie usuwa, dlatego katalog jest tu tworzony, jeżeli jeszcze
+		# nie istnieje. Blokady nie można serializować.
+		state: dict[str, typing.Any] = self.__dict__.copy()
+		state['_name'] = self.name
+		state['_tmpdir'] = None
+		del state['_lock']
+		return state
+
+	def __setstate__(self, state: dict[str, typing.Any]) -> None:
+		self.__dict__.update(state)
+		self._lock = threading.Lock()
+
+	@property
+	def name(self) -> str:
+		"""Ścieżka do katalogu tymczasowego, tworzonego przy pierwszym odczycie
+		tego atrybutu."""
+		with self._lock:
+			if self._name is None:
+				from tempfile import TemporaryDirectory
+				self._tmpdir = TemporaryDirectory(prefix=self._prefix)
+				self._name = self._tmpdir.name
+			return self._name
+
+	def cleanup(self) -> None:
+		"""Usuwa katalog tymczasowy wraz z zawartością, jeżeli został
+		utworzony przez ten obiekt."""
+		with self._lock:
+			if self._tmpdir is not None:
+				self._tmpdir.cleanup()
@@ -0,0 +1,294 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Zapisywanie stanu przetwarzania pozwalające na jego wznowienie.
+
+Plik stanu przetwarzania (punkt kontrolny) jest plikiem JSON zapisywanym
+obok pliku wyjściowego. Zawiera liczbę przetworzonych wierszy, pozycję
+w pliku wejściowym za ostatnim z nich, wielkość pliku wyjściowego po ich
+zapisaniu oraz skrót SHA-256 przetworzonej części pliku wejściowego.
+Dzięki temu kolejne uruchomienie programu może przetworzyć jedynie wiersze
+dopisane do pliku wejściowego od poprzedniego uruchomienia, albo wznowić
+przetwarzanie przerwane przez błąd. Jeżeli przetworzona wcześniej część
+pliku wejściowego uległa zmianie, plik jest przetwarzany od początku.
+
+Zawiera następujące klasy:
+`Checkpoint` -- Klasa odczytująca i zapisująca stan przetwarzania.
+"""
+import codecs
+import collections
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+import typing
+
+
+class Checkpoint():
+	"""Stan przetwarzania pliku wejściowego, zapisywany w pliku JSON.
+
+	Zapisany stan dotyczy zawsze całych wierszy, które zostały już zapisane
+	do pliku wyjściowego. Pozycje wierszy w pliku wejściowym są ustalane przy
+	ich odczycie metodą `read_rows()` albo przekazywane metodą `mark()`,
+	a stan jest zapisywany metodą `commit()` nie częściej niż raz na
+	`INTERVAL` sekund. Przed zapisem stanu dane wyjściowe są zapisywane na
+	dysk, więc plik wyjściowy jest zawsze co najmniej tak duży, jak wynika
+	ze stanu - nadmiarowe dane są usuwane przy wznowieniu przetwarzania.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`VERSION` -- Wersja formatu pliku stanu.
+	`INTERVAL` -- Minimalny odstęp między zapisami stanu, w sekundach.
+	`path` -- Ścieżka do pliku stanu.
+	`input_path` -- Ścieżka do pliku wejściowego.
+	`options` -- Słownik z opcjami przetwarzania, które muszą być takie same
+	przy wznowieniu przetwarzania.
+	`rows` -- Liczba przetworzonych wierszy pliku wejściowego, razem
+	z wierszem nagłówków.
+	`input_offset` -- Pozycja w pliku wejściowym za ostatnim przetworzonym
+	wierszem, w bajtach.
+	`output_offset` -- Wielkość pliku wyjściowego po zapisaniu przetworzonych
+	wierszy, w bajtach.
+	`header` -- Lista nagłówków kolumn pliku wejściowego albo `None`.
+	`date_column` -- Indeks kolumny z datą transakcji albo `None`.
+	`date_format` -- Format dat transakcji albo `None`.
+	`load` -- Metoda wczytująca zapisany stan.
+	`reset` -- Metoda przywracająca stan początkowy.
+	`read_rows` -- Metoda odczytująca wiersze pliku wejściowego od pozycji
+	za ostatnim przetworzonym wierszem.
+	`position` -- Metoda zwracająca pozycję za ostatnim odczytanym wierszem.
+	`mark` -- Metoda zapamiętująca pozycję w pliku wejściowym za danym
+	wierszem.
+	`advance` -- Metoda oznaczająca wiersze jako zapisane do pliku
+	wyjściowego.
+	`due` -- Metoda sprawdzająca, czy nadszedł czas zapisu stanu.
+	`commit` -- Metoda zapisująca stan po ostatnich zapisanych wierszach.
+	"""
+	VERSION: int = 1
+	INTERVAL: float = 5.0
+
+	def __init__(
+			self,
+			path: str,
+			input_path: str,
+			options: dict[str, typing.Any],
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Checkpoint`.
+
+		Przyjmuje następujące parametry:
+		`path` -- Ścieżka do pliku stanu.
+		`input_path` -- Ścieżka do pliku wejściowego. Musi to być zwykły plik
+		na dysku, gdyż jest on odczytywany ponownie.
+		`options` -- Słownik z opcjami przetwarzania, które mają wpływ na
+		zawartość pliku wyjściowego. Wartości muszą dać się zapisać w formacie
+		JSON.
+		"""
+		self.path: str = path
+		self.input_path: str = input_path
+		self.options: dict[str, typing.Any] = options
+		self.reset()
+
+	def reset(self) -> None:
+		"""Przywraca stan początkowy, odpowiadający przetwarzaniu pliku
+		od początku."""
+		self.rows: int = 0
+		self.input_offset: int = 0
+		self.output_offset: int = 0
+		self.header: list[str]|None = None
+		self.date_column: int|None = None
+		self.date_format: str|None = None
+		self._hash: typing.Any = hashlib.sha256()
+		self._position: int = 0
+		# Pozycje w pliku wejściowym za kolejnymi odczytanymi wierszami,
+		# które nie zostały jeszcze zapisane do pliku wyjściowego, oraz
+		# pozycja za ostatnim zapisanym wierszem, jeżeli jest znana.
+		self._marks: collections.deque[tuple[int, int]] = collections.deque()
+		self._pending: tuple[int, int]|None = None
+		self._next_commit: float = time.monotonic() + self.INTERVAL
+
+	def load(self, output: typing.IO[str]) -> bool:
+		"""Wczytuje zapisany stan przetwarzania.
+
+		Przyjmuje otwarty plik wyjściowy. Zwraca `True`, jeżeli
+		przetwarzanie można wznowić - plik stanu istnieje, dotyczy tych samych
+		opcji przetwarzania, plik wyjściowy nie jest mniejszy niż po
+		zapisaniu stanu, a przetworzona część pliku wejściowego ma taki sam
+		skrót. W przeciwnym razie przywraca stan początkowy i zwraca `False`.
+		"""
+		self.reset()
+		try:
+			with open(self.path, encoding='utf-8') as f:
+				state: dict[str, typing.Any] = json.load(f)
+			if (
+				state['version'] != self.VERSION
+				or state['options'] != self.options
+				or os.fstat(output.fileno()).st_size < state['output_offset']
+				or os.path.getsize(self.input_path) < state['input_offset']
+			):
+				return False
+			# Skrót przetworzonej części pliku jest potrzebny również do
+			# zapisywania kolejnych stanów, więc obliczamy go od nowa.
+			with open(self.input_path, 'rb') as f:
+				self._update_hash(f, state['input_offset'])
+		except (OSError, ValueError, KeyError, TypeError):
+			self.reset()
+			return False
+		if self._hash.hexdigest() != state['input_hash']:
+			self.reset()
+			return False
+		self.rows = state['rows']
+		self.input_offset = self._position = state['input_offset']
+		self.output_offset = state['output_offset']
+		self.header = state['header']
+		self.date_column = state['date_column']
+		self.date_format = state['date_format']
+		return True
+
+	def read_rows(
+			self,
+			input: typing.TextIO,
+			mark: bool = True,
+		) -> typing.Iterator[list[str]]:
+		"""Odczytuje wiersze CSV z pliku wejściowego.
+
+		Odczyt zaczyna się od pozycji za ostatnim przetworzonym wierszem.
+		Argument `input` to plik wejściowy otwarty w trybie tekstowym, którego
+		kodowanie jest używane do dekodowania wierszy. Plik jest odczytywany
+		ponownie w trybie binarnym, by móc ustalić dokładną pozycję każdego
+		wiersza. Jeżeli argument `mark` ma
+		wartość `True`, pozycje odczytanych wierszy są zapamiętywane tak jak
+		przez metodę `mark()`.
+		"""
+		# Linie są dekodowane tak, jak przez plik otwarty w trybie tekstowym,
+		# łącznie z zamianą znaków końca linii.
+		decoder: io.IncrementalNewlineDecoder = io.IncrementalNewlineDecoder(
+			codecs.getincrementaldecoder(input.encoding)(
+				input.errors or 'strict'),
+			translate=True,
+		)
+		position: int = self.input_offset
+
+		def read_lines(f: typing.IO[bytes]) -> typing.Iterator[str]:
+			nonlocal position
+			for line in f:
+				position += len(line)
+				yield decoder.decode(line)
+			tail: str = decoder.decode(b'', True)
+			if tail:
+				yield tail
+
+		marks: collections.deque[tuple[int, int]] = self._marks
+		if mark:
+			marks.clear()
+		row_number: int = self.rows
+		with open(self.input_path, 'rb') as f:
+			f.seek(self.input_offset)
+			for row in csv.reader(read_lines(f)):
+				row_number += 1
+				self._position = position
+				if mark:
+					marks.append((row_number, position))
+				yield row
+
+	def position(self) -> int:
+		"""Zwraca pozycję w pliku wejściowym za ostatnim wierszem odczytanym
+		metodą `read_rows()`."""
+		return self._position
+
+	def mark(self, rows: int, offset: int) -> None:
+		"""Zapamiętuje, że za pierwszymi `rows` wierszami pliku wejściowego
+		znajduje się pozycja `offset`.
+
+		Kolejne wywołania muszą dotyczyć coraz dalszych wierszy.
+		"""
+		self._marks.append((rows, offset))
+
+	def advance(self, rows: int) -> bool:
+		"""Oznacza pierwsze `rows` wierszy pliku wejściowego jako zapisane
+		do pliku wyjściowego.
+
+		Zwraca `True`, jeżeli znana jest pozycja za ostatnim z nich, a więc
+		stan po nich może zostać zapisany metodą `commit()`, dopóki kolejne
+		wiersze nie zostaną zapisane do pliku wyjściowego.
+		"""
+		marks: collections.deque[tuple[int, int]] = self._marks
+		self._pending = None
+		while marks and marks[0][0] < rows:
+			marks.popleft()
+		if marks and marks[0][0] == rows:
+			self._pending = marks.popleft()
+			return True
+		return False
+
+	def due(self) -> bool:
+		"""Sprawdza, czy od poprzedniego zapisu stanu minęło co najmniej
+		`INTERVAL` sekund."""
+		return time.monotonic() >= self._next_commit
+
+	def commit(self, output: typing.IO[str]) -> None:
+		"""Zapisuje stan po wierszach oznaczonych ostatnim wywołaniem metody
+		`advance()`, które zwróciło `True`.
+
+		Argument `output` to plik wyjściowy, do którego zapisano już wszystkie
+		te wiersze i żadnych kolejnych. Jego zawartość jest najpierw zapisywana
+		na dysk, dzięki czemu zapisany stan nigdy nie wyprzedza pliku
+		wyjściowego. Plik stanu jest zapisywany pod tymczasową nazwą i dopiero
+		w całości zastępuje poprzednią wersję.
+		"""
+		self._next_commit = time.monotonic() + self.INTERVAL
+		if self._pending is None:
+			return
+		rows, input_offset = self._pending
+		self._pending = None
+		output.flush()
+		os.fsync(output.fileno())
+		output_offset: int = output.tell()
+		with open(self.input_path, 'rb') as f:
+			f.seek(self.input_offset)
+			self._update_hash(f, input_offset - self.input_offset)
+		self.rows = rows
+		self.input_offset = input_offset
+		self.output_offset = output_offset
+		state: dict[str, typing.Any] = {
+			'version': self.VERSION,
+			'options': self.options,
+			'rows': self.rows,
+			'input_offset': self.input_offset,
+			'input_hash': self._hash.hexdigest(),
+			'output_offset': self.output_offset,
+			'header': self.header,
+			'date_column': self.date_column,
+			'date_format': self.date_format,
+		}
+		tmp_path: str = f'{self.path}.{os.getpid()}.tmp'
+		with open(tmp_path, 'w', encoding='utf-8') as f:
+			json.dump(state, f, ensure_ascii=False)
+			f.flush()
+			os.fsync(f.fileno())
+		os.replace(tmp_path, self.path)
+
+	def _update_hash(self, file: typing.IO[bytes], size: int) -> None:
+		# Uzupełnia skrót o `size` kolejnych bajtów pliku `file`.
+		while size > 0:
+			data: bytes = file.read(min(size, 1024 * 1024))
+			if not data:
+				raise ValueError(
+					f"Plik {file.name} jest krótszy niż zapisany stan przetwarzania.")
+			self._hash.update(data)
+			size -= len(data)
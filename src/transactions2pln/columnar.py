@@ -0,0 +1,260 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Zapis wyników w kolumnowych formatach Parquet i Arrow IPC.
+
+Pliki CSV i JSON zawierają kursy i kwoty zapisane jako tekst, w dodatku
+z separatorem dziesiętnym z ustawień językowych, więc programy analizujące
+wyniki muszą je ponownie odczytywać i zamieniać na liczby. Ten moduł
+zapisuje wyniki w formatach kolumnowych, w których kursy i kwoty są liczbami
+dziesiętnymi, a daty - datami. Takie pliki są mniejsze i mogą być wczytane
+np. do hurtowni danych bez parsowania.
+
+Biblioteka pyarrow nie jest wymagana do działania programu - jeżeli nie jest
+zainstalowana, atrybut `pyarrow` tego modułu ma wartość `None`, a próba
+utworzenia obiektu klasy `ColumnarWriter` kończy się błędem.
+
+Zawiera następujące klasy:
+`ColumnarWriter` -- Klasa zapisująca wiersze danych w formacie Parquet
+albo Arrow IPC, z interfejsem takim jak obiekty zwracane przez funkcję
+`csv.writer()`.
+"""
+import decimal
+import itertools
+import locale
+import typing
+from datetime import date
+
+from transactions2pln import api, utils
+
+# Biblioteka pyarrow nie musi być zainstalowana, również tam, gdzie
+# sprawdzane są typy.
+try:
+	import pyarrow # type: ignore[import-not-found, unused-ignore]
+	import pyarrow.ipc # type: ignore[import-not-found, unused-ignore]
+	import pyarrow.parquet # type: ignore[import-not-found, unused-ignore]
+except ImportError:
+	pyarrow = None # type: ignore[assignment, unused-ignore]
+
+
+class _Sink():
+	# Plik wyjściowy przekazywany bibliotece pyarrow, która po zapisaniu
+	# danych zamyka plik. Zamknięcie pliku pozostawiamy jego właścicielowi,
+	# np. by można było zapisywać do standardowego wyjścia.
+
+	def __init__(self, file: typing.BinaryIO) -> None:
+		self._file: typing.BinaryIO = file
+		self.closed: bool = False
+
+	def write(self, data: bytes) -> int:
+		return self._file.write(data)
+
+	def flush(self) -> None:
+		self._file.flush()
+
+	def close(self) -> None:
+		self._file.flush()
+		self.closed = True
+
+
+class ColumnarWriter():
+	"""Zapisuje wiersze danych do pliku w formacie Parquet albo Arrow IPC.
+
+	Obiekty tej klasy udostępniają taki sam interfejs jak obiekty klasy
+	`utils.JSONWrapper`, więc mogą zastąpić je przy zapisie wyników. Dwie
+	ostatnie wartości każdego wiersza - kurs i kwota w PLN - są zapisywane
+	jako liczby dziesiętne (typ `decimal128`), wartości z kolumny z datą jako
+	daty (typ `date32`), a pozostałe wartości jako łańcuchy. Wiersze są
+	gromadzone i zapisywane w miarę przetwarzania, grupami po
+	`row_group_size` wierszy (jako grupy wierszy w formacie Parquet albo
+	partie rekordów w formacie Arrow IPC). Plik jest kompletny dopiero
+	po wywołaniu metody `writeend()`.
+
+	Kolumny mają nazwy z nagłówków, a jeżeli nie zostały one podane - numery
+	kolumn, liczone od 1. Liczba kolumn jest ustalana na podstawie nagłówków
+	albo pierwszego wiersza danych. Krótsze wiersze są uzupełniane wartościami
+	pustymi, a dłuższe powodują błąd `ValueError`.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`FORMATS` -- Krotka zawierająca nazwy obsługiwanych formatów.
+	`DEFAULT_ROW_GROUP_SIZE` -- Domyślna liczba wierszy w grupie.
+	`RATE_SCALE` -- Liczba cyfr po przecinku w kolumnie z kursem.
+	`AMOUNT_SCALE` -- Liczba cyfr po przecinku w kolumnie z kwotą w PLN.
+	`labels` -- Lista łańcuchów zawierających nagłówki jaka została ustawiona
+	przy tworzeniu obiektu.
+	`writerow` -- Metoda pozwalająca na zapis wiersza danych
+	do pliku wyjściowego.
+	`writerows` -- Metoda pozwalająca na zapis wielu wierszy danych
+	do pliku wyjściowego.
+	`writeend` -- Metoda zapisująca pozostałe wiersze i kończąca plik.
+	"""
+	FORMATS: tuple[str, str] = ('parquet', 'arrow')
+	DEFAULT_ROW_GROUP_SIZE: int = 65536
+	RATE_SCALE: int = 12
+	AMOUNT_SCALE: int = 2
+
+	def __init__(
+			self,
+			file: typing.BinaryIO,
+			output_format: str = 'parquet',
+			labels: list[str]|None = None,
+			date_column: int|None = None,
+			date_parser: utils.DateParser|None = None,
+			decimal_point: str|None = None,
+			row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `ColumnarWriter`.
+
+		Przyjmuje następujące parametry:
+		`file` -- Plik otwarty w trybie binarnym, do którego zapisywane są
+		dane. Nie jest on zamykany po zakończeniu zapisu.
+		`output_format` -- Opcjonalnie, format pliku: `parquet` albo `arrow`.
+		`labels` -- Opcjonalnie, lista łańcuchów zawierająca nagłówki
+		wszystkich kolumn, łącznie z kolumnami z kursem i kwotą w PLN.
+		`date_column` -- Opcjonalnie, indeks kolumny z datą transakcji.
+		`date_parser` -- Opcjonalnie, obiekt klasy `utils.DateParser`
+		odczytujący daty z kolumny `date_column`. Jeżeli nie podano kolumny
+		lub obiektu, daty są zapisywane jako łańcuchy.
+		`decimal_point` -- Opcjonalnie, separator dziesiętny w kursach
+		i kwotach, jak w klasie `convert.RowConverter`. Domyślnie separator
+		z ustawień językowych.
+		`row_group_size` -- Opcjonalnie, liczba wierszy w grupie.
+
+		Jeżeli biblioteka pyarrow nie jest zainstalowana, zgłasza wyjątek
+		`RuntimeError`.
+		"""
+		if pyarrow is None:
+			raise RuntimeError(
+				"zapis w formatach Parquet i Arrow wymaga biblioteki pyarrow, "
+				"którą można zainstalować poleceniem \"pip install pyarrow\"."
+			)
+		if output_format not in self.FORMATS:
+			raise ValueError(f"nieznany format pliku: '{output_format}'.")
+		self._sink: _Sink = _Sink(file)
+		self._format: str = output_format
+		self._labels: list[str]|None = labels
+		self._date_column: int|None = (
+			date_column if date_parser is not None else None)
+		self._date_parser: utils.DateParser|None = date_parser
+		self._decimal_point: str = (
+			decimal_point or str(locale.localeconv()['decimal_point']))
+		self._row_group_size: int = row_group_size
+		self._rows: list[list[str]] = []
+		self._schema: typing.Any = None
+		self._writer: typing.Any = None
+
+	@property
+	def labels(self) -> list[str]|None:
+		"""Lista łańcuchów zawierających nagłówki,
+		jeżeli została podana przy inicjalizacji obiektu.
+		"""
+		return self._labels
+
+	def writerow(self, row: list[str]) -> None:
+		"""Zapisanie wiersza danych do pliku wyjściowego.
+
+		Funkcja przyjmuje jeden argument, `row`, będący listą łańcuchów
+		gdzie kolejne elementy listy odpowiadają wartościom w kolejnych
+		kolumnach, a dwa ostatnie - kursowi i kwocie w PLN.
+		"""
+		self._rows.append(row)
+		if len(self._rows) >= self._row_group_size:
+			self._write_group()
+
+	def writerows(self, rows: typing.Iterable[list[str]]) -> None:
+		"""Zapisanie wielu wierszy danych do pliku wyjściowego.
+
+		Funkcja przyjmuje jeden argument, `rows`, będący kolekcją wierszy
+		w postaci przyjmowanej przez metodę `writerow()`.
+		"""
+		for row in rows:
+			self.writerow(row)
+
+	def writeend(self) -> None:
+		"""Zapisuje pozostałe wiersze i kończy plik.
+
+		Plik bez wierszy danych zawiera jedynie opis kolumn.
+		"""
+		if self._rows or self._writer is None:
+			self._write_group()
+		self._writer.close()
+
+	def _open(self, width: int) -> None:
+		# Ustala typy kolumn i rozpoczyna zapis pliku.
+		names: list[str] = self._labels or [
+			str(index + 1) for index in range(width - len(api.LABELS))
+		] + list(api.LABELS)
+		fields: list[typing.Any] = [
+			pyarrow.field(
+				name,
+				pyarrow.date32() if index == self._date_column
+				else pyarrow.string(),
+			)
+			for index, name in enumerate(names[:-len(api.LABELS)])
+		]
+		fields.append(pyarrow.field(
+			names[-2], pyarrow.decimal128(38, self.RATE_SCALE)))
+		fields.append(pyarrow.field(
+			names[-1], pyarrow.decimal128(38, self.AMOUNT_SCALE)))
+		self._schema = pyarrow.schema(fields)
+		if self._format == 'parquet':
+			self._writer = pyarrow.parquet.ParquetWriter(self._sink, self._schema)
+		else:
+			self._writer = pyarrow.ipc.new_file(self._sink, self._schema)
+
+	def _write_group(self) -> None:
+		# Zapisuje zgromadzone wiersze jako jedną grupę.
+		rows: list[list[str]] = self._rows
+		self._rows = []
+		if self._writer is None:
+			self._open(len(rows[0]) if rows else len(api.LABELS))
+		writer: typing.Any = self._writer
+		width: int = len(self._schema) - len(api.LABELS)
+		columns: list[list[typing.Any]] = [[] for _ in range(width)]
+		rates: list[decimal.Decimal] = []
+		amounts: list[decimal.Decimal] = []
+		for row in rows:
+			values: list[str] = row[:-len(api.LABELS)]
+			if len(values) > width:
+				raise ValueError(
+					f"wiersz zawiera {len(row)} kolumn, a plik wyjściowy "
+					f"{width + len(api.LABELS)}."
+				)
+			# Brakujące wartości krótszych wierszy są puste.
+			for column, value in itertools.zip_longest(columns, values):
+				column.append(value)
+			rates.append(self._decimal(row[-2]))
+			amounts.append(self._decimal(row[-1]))
+		if self._date_column is not None and self._date_column < width:
+			columns[self._date_column] = [
+				self._date(value) for value in columns[self._date_column]]
+		arrays: list[typing.Any] = [
+			pyarrow.array(column, field.type)
+			for column, field in zip(columns + [rates, amounts], self._schema)
+		]
+		writer.write_batch(pyarrow.record_batch(arrays, schema=self._schema))
+
+	def _decimal(self, value: str) -> decimal.Decimal:
+		return decimal.Decimal(value.replace(self._decimal_point, '.'))
+
+	def _date(self, value: str|None) -> date|None:
+		# Wartości, które nie są datą, zapisujemy jako puste.
+		try:
+			return self._date_parser.parse(value) # type: ignore
+		except (TypeError, ValueError):
+			return None
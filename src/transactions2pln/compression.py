@@ -0,0 +1,268 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Odczyt i zapis plików skompresowanych.
+
+Archiwa transakcji często są przechowywane w postaci skompresowanej.
+Ten moduł pozwala odczytywać i zapisywać takie pliki bezpośrednio, bez
+rozpakowywania ich na dysk - dane są rozpakowywane i kompresowane
+strumieniowo, w miarę odczytu i zapisu kolejnych wierszy.
+
+Obsługiwane są formaty gzip, bzip2 i xz, a jeżeli zainstalowana jest
+biblioteka zstandard - również format Zstandard. Format pliku wejściowego
+jest rozpoznawany na podstawie jego pierwszych bajtów, a format pliku
+wyjściowego - na podstawie rozszerzenia nazwy pliku.
+
+Zawiera następujące klasy i funkcje:
+`CompressedFile` -- Klasa pliku tekstowego odczytywanego z pliku
+skompresowanego albo zapisywanego do niego.
+`CompressedFileType` -- Klasa, której obiekty otwierają pliki podane jako
+opcje wiersza poleceń, jak obiekty klasy `argparse.FileType`.
+`detect` -- Funkcja rozpoznająca format kompresji na podstawie pierwszych
+bajtów pliku.
+`get_compression` -- Funkcja rozpoznająca format kompresji na podstawie
+rozszerzenia nazwy pliku.
+`split_extension` -- Funkcja oddzielająca rozszerzenie formatu kompresji od
+nazwy pliku.
+`open_file` -- Funkcja otwierająca plik, skompresowany albo nie, w trybie
+tekstowym.
+"""
+import io
+import os
+import sys
+import typing
+from argparse import ArgumentTypeError, FileType
+
+# Rozszerzenia nazw plików w poszczególnych formatach kompresji.
+EXTENSIONS: dict[str, tuple[str, ...]] = {
+	'gzip': ('.gz',),
+	'bzip2': ('.bz2',),
+	'xz': ('.xz',),
+	'zstd': ('.zst', '.zstd'),
+}
+
+# Początkowe bajty plików w poszczególnych formatach kompresji.
+_MAGIC: dict[str, bytes] = {
+	'gzip': b'\x1f\x8b',
+	'bzip2': b'BZh',
+	'xz': b'\xfd7zXZ\x00',
+	'zstd': b'\x28\xb5\x2f\xfd',
+}
+_MAGIC_SIZE: int = max(len(magic) for magic in _MAGIC.values())
+
+
+def detect(data: bytes) -> str|None:
+	"""Zwraca nazwę formatu kompresji pliku, którego pierwszymi bajtami
+	są `data`, albo `None`, jeżeli plik nie jest skompresowany.
+	"""
+	for compression, magic in _MAGIC.items():
+		if data.startswith(magic):
+			return compression
+	return # type: ignore[return-value]
+
+
+def get_compression(path: str) -> str|None:
+	"""Zwraca nazwę formatu kompresji odpowiadającego rozszerzeniu nazwy
+	pliku `path` albo `None`, jeżeli rozszerzenie nie wskazuje na kompresję.
+	"""
+	extension: str = os.path.splitext(path)[1].lower()
+	for compression, extensions in EXTENSIONS.items():
+		if extension in extensions:
+			return compression
+	return # type: ignore[return-value]
+
+
+def split_extension(path: str) -> tuple[str, str]:
+	"""Zwraca parę, w której pierwszym elementem jest ścieżka `path` bez
+	rozszerzenia formatu kompresji, a drugim - to rozszerzenie albo pusty
+	łańcuch, np. `('dane.csv', '.gz')` dla ścieżki `dane.csv.gz`.
+	"""
+	if get_compression(path) is None:
+		return path, ''
+	return os.path.splitext(path)
+
+
+class CompressedFile(io.TextIOWrapper):
+	"""Plik tekstowy odczytywany z pliku skompresowanego albo zapisywany
+	do niego.
+
+	W przeciwieństwie do plików rozpakowywanych przez moduły `gzip`, `bz2`
+	czy `lzma`, nie pozwala na zmianę pozycji w pliku - odczyt od innego
+	miejsca niż bieżące wymagałby rozpakowania pliku od początku. Program
+	traktuje go więc tak jak dane przekazywane przez potok. Zamknięcie pliku
+	zamyka również plik skompresowany.
+
+	Obiekty tej klasy udostępniają, oprócz atrybutów obiektów klasy
+	`io.TextIOWrapper`, następujące atrybuty:
+	`compression` -- Nazwa formatu kompresji.
+	`compressed` -- Plik binarny zawierający skompresowane dane. Pozycja
+	w tym pliku pozwala ustalić postęp przetwarzania.
+	"""
+
+	def __init__(
+			self,
+			compressed: typing.BinaryIO,
+			compression: str,
+			mode: str = 'r',
+			encoding: str|None = None,
+			errors: str|None = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `CompressedFile`.
+
+		Przyjmuje następujące parametry:
+		`compressed` -- Plik binarny, z którego odczytywane są skompresowane
+		dane albo do którego są one zapisywane.
+		`compression` -- Nazwa formatu kompresji, będąca kluczem
+		w `EXTENSIONS`.
+		`mode` -- Opcjonalnie, `r` dla odczytu albo `w` dla zapisu.
+		`encoding` -- Opcjonalnie, kodowanie znaków, jak w funkcji `open()`.
+		`errors` -- Opcjonalnie, sposób obsługi błędów kodowania, jak
+		w funkcji `open()`.
+
+		Zgłasza wyjątek `RuntimeError`, jeżeli do obsługi formatu potrzebna
+		jest niezainstalowana biblioteka.
+		"""
+		# Moduły obsługujące poszczególne formaty importujemy dopiero tutaj,
+		# by nie wydłużać uruchamiania programu, gdy pliki nie są
+		# skompresowane.
+		binary: io.BufferedIOBase
+		if compression == 'gzip':
+			import gzip
+			# Nazwa pliku zapisywana w nagłówku nie jest potrzebna.
+			binary = gzip.GzipFile(
+				filename='', mode=mode + 'b', fileobj=compressed)
+		elif compression == 'bzip2':
+			import bz2
+			if mode == 'w':
+				binary = bz2.BZ2File(compressed, 'w')
+			else:
+				binary = bz2.BZ2File(compressed)
+		elif compression == 'xz':
+			import lzma
+			binary = lzma.LZMAFile(compressed, mode)
+		else:
+			# Biblioteka zstandard nie musi być zainstalowana, również tam,
+			# gdzie sprawdzane są typy.
+			try:
+				import zstandard # type: ignore[import-not-found, unused-ignore]
+			except ImportError as err:
+				raise RuntimeError(
+					"Obsługa plików w formacie Zstandard wymaga biblioteki "
+					"zstandard."
+				) from err
+			binary = zstandard.open(compressed, mode + 'b', closefd=False)
+		self.compression: str = compression
+		self.compressed: typing.BinaryIO = compressed
+		# Typ parametru klasy `io.TextIOWrapper` wymaga atrybutu `name`, którego
+		# nie określa typ `io.BufferedIOBase`. Nazwę pliku i tak zwraca
+		# właściwość `name` tej klasy.
+		super().__init__(typing.cast(typing.BinaryIO, binary), encoding, errors)
+
+	@property
+	def name(self) -> str:
+		"""Ścieżka do pliku skompresowanego."""
+		return self.compressed.name
+
+	def seekable(self) -> bool:
+		"""Zwraca `False` - pozycji w pliku nie można zmieniać."""
+		return False
+
+	def close(self) -> None:
+		"""Zamyka plik, a następnie plik skompresowany."""
+		try:
+			super().close()
+		finally:
+			self.compressed.close()
+
+
+def open_file(
+		path: str,
+		mode: str = 'r',
+		encoding: str|None = None,
+		errors: str|None = None,
+	) -> typing.TextIO:
+	"""Otwiera plik `path` w trybie tekstowym.
+
+	Przyjmuje następujące parametry:
+	`path` -- Ścieżka do pliku.
+	`mode` -- Opcjonalnie, `r` dla odczytu albo `w` dla zapisu.
+	`encoding` -- Opcjonalnie, kodowanie znaków, jak w funkcji `open()`.
+	`errors` -- Opcjonalnie, sposób obsługi błędów kodowania, jak w funkcji
+	`open()`.
+
+	Plik odczytywany jest rozpakowywany, jeżeli jego pierwsze bajty wskazują
+	na jeden z obsługiwanych formatów kompresji, a plik zapisywany jest
+	kompresowany, jeżeli wskazuje na to rozszerzenie nazwy pliku. Wtedy
+	funkcja zwraca obiekt klasy `CompressedFile`, a w przeciwnym razie plik
+	otwarty funkcją `open()`.
+	"""
+	compression: str|None
+	if mode == 'r':
+		with open(path, 'rb') as file:
+			compression = detect(file.read(_MAGIC_SIZE))
+	else:
+		compression = get_compression(path)
+	if compression is None:
+		return typing.cast(
+			typing.TextIO, open(path, mode, encoding=encoding, errors=errors))
+	compressed: typing.BinaryIO = typing.cast(
+		typing.BinaryIO, open(path, mode + 'b'))
+	try:
+		return CompressedFile(compressed, compression, mode, encoding, errors)
+	except BaseException:
+		compressed.close()
+		raise
+
+
+class CompressedFileType(FileType):
+	"""Typ opcji wiersza poleceń otwierający plik o podanej ścieżce.
+
+	Działa tak jak klasa `argparse.FileType`, ale pliki skompresowane
+	otwiera za pomocą funkcji `open_file()`. Dane ze standardowego wejścia
+	są rozpakowywane, jeżeli ich pierwsze bajty wskazują na jeden
+	z obsługiwanych formatów kompresji. Dopisywanie danych do plików
+	skompresowanych nie jest obsługiwane.
+	"""
+
+	def __call__(self, string: str) -> typing.IO[typing.Any]:
+		"""Zwraca plik o ścieżce `string` otwarty w trybie tekstowym."""
+		if 'a' in self._mode and get_compression(string) is not None:
+			raise ArgumentTypeError(
+				f"nie można dopisywać danych do pliku skompresowanego "
+				f"'{string}'"
+			)
+		try:
+			if string == '-' and 'r' in self._mode:
+				return self._open_stdin()
+			if string != '-' and self._mode in ('r', 'w'):
+				return open_file(
+					string, self._mode, self._encoding, self._errors)
+		except (OSError, RuntimeError) as err:
+			raise ArgumentTypeError(
+				f"nie można otworzyć '{string}': {err}") from err
+		return super().__call__(string)
+
+	def _open_stdin(self) -> typing.IO[typing.Any]:
+		# Pierwsze bajty odczytujemy bez usuwania ich z bufora wejścia.
+		stdin: typing.BinaryIO = sys.stdin.buffer
+		compression: str|None = detect(
+			stdin.peek(_MAGIC_SIZE)[:_MAGIC_SIZE]) # type: ignore[attr-defined]
+		if compression is None:
+			return sys.stdin
+		return CompressedFile(
+			stdin, compression, 'r', self._encoding, self._errors)
@@ -0,0 +1,321 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Przeliczanie wierszy pliku wejściowego na wartości w PLN.
+
+Zawiera następujące klasy:
+`RowConverter` -- Klasa odczytująca z wierszy danych datę, walutę i kwotę
+transakcji i dodająca do nich kurs wymiany i kwotę w PLN.
+`TimedRowConverter` -- Klasa przetwarzająca wiersze tak jak `RowConverter`
+i mierząca czas poszczególnych etapów.
+"""
+import decimal
+import locale
+import time
+import typing
+from datetime import date
+
+from transactions2pln import exceptions as exc, utils
+from transactions2pln.stats import Stats, timer
+
+
+def _str_from_decimal(
+		d: decimal.Decimal,
+		decimal_point: str|None = None,
+	) -> str:
+	# Zapisuje liczbę tak jak `locale.str()`, z separatorem dziesiętnym
+	# z ustawień językowych albo podanym jako `decimal_point`.
+	if decimal_point is None:
+		return locale.str(d) # type: ignore
+	return ('%.12g' % d).replace('.', decimal_point)
+
+
+class RowConverter():
+	"""Przelicza wartości transakcji z wierszy pliku wejściowego na PLN.
+
+	Obiekty tej klasy przechowują wszystkie ustawienia potrzebne do
+	przetworzenia wiersza danych, więc mogą zostać przekazane do innego
+	procesu i przetwarzać tam część pliku wejściowego.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`tables` -- Obiekt klasy `utils.TablesPool`, z którego odczytywane są
+	kursy wymiany.
+	`date_parser` -- Obiekt klasy `utils.DateParser` odczytujący daty
+	transakcji.
+	`currency` -- Kod waluty wspólnej dla wszystkich transakcji albo `None`,
+	jeśli waluta jest odczytywana z kolumny `currency_column`.
+	`currency_column` -- Indeks kolumny zawierającej walutę transakcji.
+	`amount_column` -- Indeks kolumny zawierającej kwotę transakcji albo
+	`None`, jeśli kwotą jest ostatnia kolumna w wierszu.
+	`date_column` -- Indeks kolumny zawierającej datę transakcji albo `None`,
+	jeśli data ma być wyszukana wśród wszystkich pól wiersza.
+	`decimal_point` -- Separator dziesiętny w zapisywanych kursach i kwotach
+	albo `None`, jeśli ma on być zgodny z ustawieniami językowymi.
+	`context` -- Obiekt `decimal.Context`, w którym obliczane są kwoty,
+	albo `None`, jeśli obliczenia mają odbywać się w bieżącym kontekście
+	arytmetycznym.
+	`get_currency` -- Metoda zwracająca kod waluty transakcji.
+	`get_date` -- Metoda zwracająca datę, z której należy przyjąć kurs.
+	`get_needed_tables` -- Metoda ustalająca, jakie tabele kursów są
+	potrzebne do przetworzenia wierszy.
+	`get_exchange_ratio` -- Metoda zwracająca kurs wymiany w PLN.
+	`get_amount` -- Metoda zwracająca kwotę transakcji w PLN.
+	`get_context` -- Metoda zwracająca kontekst arytmetyczny obliczeń.
+	`convert` -- Metoda dodająca do wiersza kurs wymiany i kwotę w PLN.
+	`convert_rows` -- Metoda przetwarzająca kolejne wiersze danych.
+	"""
+
+	def __init__(
+			self,
+			tables: utils.TablesPool,
+			date_parser: utils.DateParser,
+			currency: str|None = None,
+			currency_column: int = 0,
+			amount_column: int|None = None,
+			date_column: int|None = None,
+			decimal_point: str|None = None,
+			context: decimal.Context|None = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `RowConverter`.
+
+		Przyjmuje parametry odpowiadające atrybutom o tych samych nazwach.
+		"""
+		self.tables: utils.TablesPool = tables
+		self.date_parser: utils.DateParser = date_parser
+		self.currency: str|None = currency
+		self.currency_column: int = currency_column
+		self.amount_column: int|None = amount_column
+		self.date_column: int|None = date_column
+		self.decimal_point: str|None = decimal_point
+		self.context: decimal.Context|None = context
+
+	def get_context(self) -> decimal.Context:
+		"""Zwraca kontekst arytmetyczny, w którym obliczane są kwoty."""
+		return self.context or decimal.getcontext()
+
+	def get_currency(self, row: list[str]) -> str:
+		"""Zwraca kod waluty transakcji z wiersza `row`."""
+		if self.currency is not None:
+			return self.currency
+		return row[self.currency_column]
+
+	def get_date(self, row: list[str], row_number: int) -> date:
+		"""Zwraca datę, z której należy przyjąć kurs dla transakcji
+		z wiersza `row`.
+
+		Argument `row_number` jest numerem wiersza podawanym w komunikacie
+		wyjątku `exceptions.RowProcessingError`, zgłaszanego jeśli wiersz
+		nie zawiera daty.
+		"""
+		if self.date_column is not None:
+			# Jeżeli mamy kolumnę z datą, próbujemy odczytać jej wartość.
+			try:
+				return self.date_parser.get_lookup_date(row[self.date_column])
+			except ValueError as err:
+				date_column_num = self.date_column + 1
+				raise exc.RowProcessingError(
+					row_number,
+					f"wartość kolumny {date_column_num!s} nie pasuje "
+					"do formatu określonego w --date-format",
+				) from err
+		# Jeżeli nie mamy kolumny, sprawdzamy każde kolejne pole
+		# w wierszu danych.
+		for cell in row:
+			try:
+				return self.date_parser.get_lookup_date(cell)
+			except ValueError:
+				continue
+		raise exc.RowProcessingError(
+			row_number,
+			"nie podano parametru --date-column i żadna wartość "
+			"nie pasuje do formatu określonego w --date-format.",
+		)
+
+	def get_needed_tables(
+			self,
+			rows: typing.Iterable[list[str]],
+		) -> set[tuple[str, int]]:
+		"""Zwraca zbiór par złożonych z oznaczenia tabeli NBP i roku,
+		potrzebnych do przetworzenia wierszy `rows`.
+
+		Wiersze, z których nie da się odczytać daty lub waluty, są pomijane -
+		błędy zostaną zgłoszone dopiero przy ich właściwym przetwarzaniu.
+		"""
+		needed: set[tuple[str, date]] = set()
+		for row in rows:
+			try:
+				needed.add((self.get_currency(row), self.get_date(row, 0)))
+			except (exc.RowProcessingError, IndexError):
+				continue
+		needed_tables: set[tuple[str, int]] = set()
+		for currency, needed_date in needed:
+			try:
+				table_mark: str = utils.TablesManager.get_table_mark(currency)
+			except ValueError:
+				continue
+			needed_tables.add((table_mark, needed_date.year))
+			# Kurs z pierwszych dni stycznia może pochodzić z tabeli
+			# za poprzedni rok.
+			if needed_date.month == 1 and needed_date.day <= 3:
+				needed_tables.add((table_mark, needed_date.year - 1))
+		return needed_tables
+
+	def get_exchange_ratio(
+			self,
+			currency: str,
+			check_date: date,
+			row_number: int,
+		) -> decimal.Decimal:
+		"""Zwraca kurs waluty `currency` z dnia `check_date`, wyrażony w PLN.
+
+		Jeżeli kursu nie można odczytać, zgłasza wyjątek
+		`exceptions.RowProcessingError` z numerem `row_number`.
+		"""
+		try:
+			return self.tables.get_exchange_ratio(currency, check_date)
+		except Exception as err:
+			raise exc.RowProcessingError(row_number, str(err)) from err
+
+	def get_amount(
+			self,
+			row: list[str],
+			exchange: decimal.Decimal,
+			row_number: int,
+		) -> decimal.Decimal:
+		"""Zwraca kwotę transakcji z wiersza `row` przeliczoną po kursie
+		`exchange` na PLN.
+
+		Jeżeli kwoty nie można przeliczyć, zgłasza wyjątek
+		`exceptions.RowProcessingError` z numerem `row_number`.
+		"""
+		amount: str|decimal.Decimal
+		if self.amount_column:
+			amount = row[self.amount_column]
+		else:
+			# Jeżeli nie podano kolumny z wartością, przyjmujemy domyślnie,
+			# że jest nią ostatnia kolumna w pliku wejściowym.
+			amount = row[-1]
+
+		context: decimal.Context = self.get_context()
+		try:
+			amount = decimal.Decimal(amount)
+			return context.multiply(amount, exchange).quantize(
+				decimal.Decimal('0.01'), context=context)
+		except decimal.InvalidOperation as err:
+			raise exc.RowProcessingError(
+				row_number,
+				f"kwota {amount!s} przekracza ustawioną precyzję "
+				"działań arytmetycznych"
+			) from err
+
+	def convert(self, row: list[str], row_number: int) -> list[str]:
+		"""Dodaje do wiersza `row` kurs wymiany i kwotę transakcji w PLN.
+
+		Zwraca zmieniony wiersz. Jeżeli nie można go przetworzyć, zgłasza
+		wyjątek `exceptions.RowProcessingError` z numerem `row_number`.
+		"""
+		week_date: date = self.get_date(row, row_number)
+		exchange: decimal.Decimal = self.get_exchange_ratio(
+			self.get_currency(row), week_date, row_number)
+		amount_pln: decimal.Decimal = self.get_amount(row, exchange, row_number)
+		# Dodajemy uzyskany kurs i kwotę transakcji do wiersza danych.
+		row.append(_str_from_decimal(exchange, self.decimal_point))
+		row.append(_str_from_decimal(amount_pln, self.decimal_point))
+		return row
+
+	def convert_rows(
+			self,
+			rows: typing.Iterable[list[str]],
+			start: int = 0,
+		) -> typing.Iterator[list[str]]:
+		"""Przetwarza kolejne wiersze z `rows` metodą `convert()`.
+
+		Argument `start` oznacza numer wiersza poprzedzającego pierwszy
+		z `rows`, np. 1 jeżeli plik wejściowy zawiera nagłówki.
+		"""
+		for row_number, row in enumerate(rows, start + 1):
+			yield self.convert(row, row_number)
+
+
+class TimedRowConverter(RowConverter):
+	"""Przelicza wiersze tak jak `RowConverter`, mierząc przy tym czas
+	poszczególnych etapów przetwarzania.
+
+	Obiekty tej klasy udostępniają, poza atrybutami klasy `RowConverter`,
+	atrybut `stats` - obiekt klasy `stats.Stats`, w którym zapisywany jest
+	czas odczytu dat, wyszukiwania kursów i obliczania kwot oraz liczba
+	odczytów dat i kursów. Czas wyszukiwania kursów nie obejmuje pobierania
+	i wczytywania tabel, mierzonego osobno.
+	"""
+
+	def __init__(
+			self,
+			stats: Stats,
+			*args: typing.Any,
+			**kwargs: typing.Any,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `TimedRowConverter`.
+
+		Przyjmuje parametr `stats`, a po nim parametry takie jak
+		klasa `RowConverter`.
+		"""
+		super().__init__(*args, **kwargs)
+		self.stats: Stats = stats
+
+	def get_date(self, row: list[str], row_number: int) -> date:
+		"""Zwraca datę tak jak `RowConverter.get_date()`, mierząc czas."""
+		if self.date_column is not None:
+			self.stats.count('date_lookups')
+		with timer(self.stats, 'dates'):
+			return super().get_date(row, row_number)
+
+	def get_exchange_ratio(
+			self,
+			currency: str,
+			check_date: date,
+			row_number: int,
+		) -> decimal.Decimal:
+		"""Zwraca kurs tak jak `RowConverter.get_exchange_ratio()`,
+		mierząc czas."""
+		self.stats.count('rate_lookups')
+		loading: float = self._loading_time()
+		start: float = time.perf_counter()
+		try:
+			return super().get_exchange_ratio(currency, check_date, row_number)
+		finally:
+			elapsed: float = time.perf_counter() - start
+			# Odejmujemy czas pobierania i wczytywania tabel, jeżeli nastąpiło
+			# podczas wyszukiwania kursu.
+			elapsed -= self._loading_time() - loading
+			self.stats.add_time('rates', elapsed)
+
+	def _loading_time(self) -> float:
+		return (
+			self.stats.times.get('download', 0.0)
+			+ self.stats.times.get('tables', 0.0)
+		)
+
+	def get_amount(
+			self,
+			row: list[str],
+			exchange: decimal.Decimal,
+			row_number: int,
+		) -> decimal.Decimal:
+		"""Zwraca kwotę tak jak `RowConverter.get_amount()`, mierząc czas."""
+		with timer(self.stats, 'amounts'):
+			return super().get_amount(row, exchange, row_number)
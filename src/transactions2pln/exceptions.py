@@ -58,7 +58,11 @@ class RowProcessingError(RuntimeError):
 		w którym wystąpił błąd.
 		`message` -- Łańcuch zawierający komunikat błędu który wystąpił
 		w podanym wierszu.
+
+		Obie wartości są dostępne jako atrybuty `row_number` i `message`.
 		"""
+		self.row_number: int = row_number
+		self.message: str = message
 		return super().__init__(
 			f"Błąd podczas przetwarzania wiersza {row_number!s}: " + message
 		)
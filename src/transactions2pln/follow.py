@@ -0,0 +1,182 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Odczyt pliku wejściowego, do którego na bieżąco dopisywane są dane.
+
+Zawiera następujące klasy:
+`Follower` -- Klasa odczytująca wiersze CSV z pliku tak jak polecenie
+`tail -f`, z obsługą rotacji plików.
+"""
+import csv
+import os
+import time
+import typing
+
+
+class Follower():
+	"""Odczytuje wiersze CSV z pliku, do którego na bieżąco dopisywane są
+	dane.
+
+	Po dojściu do końca pliku obiekt czeka na dopisanie kolejnych danych,
+	sprawdzając plik co `interval` sekund, tak jak polecenie `tail -f`.
+	Linie są przekazywane do parsowania dopiero wtedy, gdy zostaną dopisane
+	w całości, łącznie ze znakiem końca linii. Jeżeli plik zostanie zastąpiony
+	nowym plikiem o tej samej ścieżce (np. przy rotacji plików), obiekt
+	odczytuje do końca poprzedni plik, a następnie nowy plik od początku.
+	Tak samo jest odczytywany plik, który został skrócony. Jeżeli atrybut
+	`labels` ma wartość `True`, pierwszy wiersz ponownie odczytywanego pliku
+	jest pomijany jako nagłówki kolumn.
+
+	Iteracja kończy się, gdy program zostanie przerwany (np. klawiszami
+	Ctrl+C) w trakcie oczekiwania na dane. Niedokończona ostatnia linia
+	pliku nie jest wtedy przetwarzana.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`DEFAULT_INTERVAL` -- Domyślny odstęp między sprawdzeniami pliku,
+	w sekundach.
+	`file` -- Plik otwarty w trybie tekstowym, z którego odczytywane są dane.
+	Po rotacji jest to nowo otwarty plik.
+	`interval` -- Odstęp między sprawdzeniami pliku, w sekundach.
+	`labels` -- Wartość logiczna określająca, czy pliki zawierają nagłówki.
+	`on_wait` -- Funkcja bez argumentów wywoływana przed rozpoczęciem
+	oczekiwania na dane, np. by zapisać dotychczasowe wyniki, albo `None`.
+	`rotations` -- Liczba ponownych odczytów pliku od początku.
+	`read_available` -- Metoda zwracająca wiersze dostępne już w pliku, bez
+	oczekiwania na kolejne.
+	"""
+	DEFAULT_INTERVAL: float = 1.0
+
+	def __init__(
+			self,
+			file: typing.TextIO,
+			interval: float = DEFAULT_INTERVAL,
+			labels: bool = False,
+			on_wait: typing.Callable[[], object]|None = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Follower`.
+
+		Przyjmuje następujące parametry:
+		`file` -- Zwykły plik na dysku, otwarty w trybie tekstowym. Odczyt
+		zaczyna się od jego bieżącej pozycji.
+		`interval` -- Opcjonalnie, odstęp między sprawdzeniami pliku,
+		w sekundach.
+		`labels` -- Opcjonalnie, wartość logiczna określająca, czy pliki
+		zawierają nagłówki.
+		`on_wait` -- Opcjonalnie, funkcja wywoływana przed rozpoczęciem
+		oczekiwania na dane.
+		"""
+		self.file: typing.TextIO = file
+		self.interval: float = interval
+		self.labels: bool = labels
+		self.on_wait: typing.Callable[[], object]|None = on_wait
+		self.rotations: int = 0
+		self._stopped: bool = False
+		# Czy plik `file` został otwarty przez ten obiekt.
+		self._owned: bool = False
+
+	def __iter__(self) -> typing.Iterator[list[str]]:
+		"""Zwraca iterator po kolejnych wierszach pliku."""
+		try:
+			while not self._stopped:
+				rows: typing.Iterator[list[str]] = csv.reader(self._read_lines())
+				if self.rotations and self.labels:
+					next(rows, None)
+				yield from rows
+		finally:
+			if self._owned:
+				self.file.close()
+
+	def read_available(self, limit: int) -> list[list[str]]:
+		"""Zwraca najwyżej `limit` wierszy zapisanych już w całości w pliku.
+
+		Metoda nie czeka na dopisanie danych, więc pozwala np. wykryć format
+		danych na podstawie początku pliku. Dalsza iteracja zaczyna się od
+		wiersza następującego po zwróconych wierszach.
+		"""
+		lines: list[str] = []
+		while len(lines) < limit:
+			position: int = self.file.tell()
+			line: str = self.file.readline()
+			if not line.endswith('\n'):
+				self.file.seek(position)
+				break
+			lines.append(line)
+		return list(csv.reader(lines))
+
+	def _read_lines(self) -> typing.Iterator[str]:
+		# Zwraca kolejne całe linie pliku `file`, czekając na dopisanie
+		# nowych. Kończy iterację po przerwaniu programu albo po zastąpieniu
+		# lub skróceniu pliku, ustawiając wtedy `file` na początek nowej
+		# zawartości.
+		partial: str = ''
+		waiting: bool = False
+		while True:
+			line: str = self.file.readline()
+			if line:
+				partial += line
+				if partial.endswith('\n'):
+					yield partial
+					partial = ''
+					waiting = False
+				continue
+			if self._replaced():
+				# Do poprzedniego pliku mogły zostać dopisane dane tuż przed
+				# jego zastąpieniem.
+				while line := self.file.readline():
+					partial += line
+					if partial.endswith('\n'):
+						yield partial
+						partial = ''
+				if partial:
+					yield partial
+				self._reopen()
+				return
+			if os.fstat(self.file.fileno()).st_size < self.file.tell():
+				self.file.seek(0)
+				self.rotations += 1
+				return
+			if not waiting and self.on_wait is not None:
+				self.on_wait()
+			waiting = True
+			try:
+				time.sleep(self.interval)
+			except KeyboardInterrupt:
+				self._stopped = True
+				return
+
+	def _replaced(self) -> bool:
+		# Sprawdza, czy pod ścieżką pliku `file` znajduje się inny plik.
+		# Jeżeli po przeniesieniu pliku nowy nie został jeszcze utworzony,
+		# nadal odczytujemy poprzedni.
+		try:
+			status: os.stat_result = os.stat(self.file.name)
+		except OSError:
+			return False
+		current: os.stat_result = os.fstat(self.file.fileno())
+		return (status.st_dev, status.st_ino) != (current.st_dev, current.st_ino)
+
+	def _reopen(self) -> None:
+		# Otwiera plik, który zastąpił plik `file`. Zamykamy tylko pliki
+		# otwarte przez ten obiekt - pierwszy plik zamyka jego właściciel.
+		file: typing.TextIO = open(
+			self.file.name, encoding=self.file.encoding, errors=self.file.errors)
+		if self._owned:
+			self.file.close()
+		self.file = file
+		self._owned = True
+		self.rotations += 1
@@ -0,0 +1,277 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Przetwarzanie pliku wejściowego w wielu procesach.
+
+Plik wejściowy jest dzielony na fragmenty zawierające całe wiersze, które
+są przetwarzane równolegle w puli procesów. Przetworzone wiersze zwracane
+są w kolejności, w jakiej występują w pliku.
+
+Zawiera następujące funkcje:
+`split_csv_chunks` -- Funkcja dzieląca plik CSV na fragmenty o zbliżonej
+wielkości, zawierające całe wiersze.
+`convert_file` -- Funkcja przetwarzająca plik CSV w puli procesów.
+"""
+import collections
+import csv
+import decimal
+import io
+import itertools
+import locale
+import typing
+
+from transactions2pln import exceptions as exc
+from transactions2pln.convert import RowConverter
+
+# Domyślna wielkość fragmentu pliku przetwarzanego przez jeden proces,
+# w bajtach.
+DEFAULT_CHUNK_SIZE: int = 4 * 1024 * 1024
+
+# Fragment pliku: pozycja pierwszego i pozycja za ostatnim bajtem.
+Chunk = tuple[int, int]
+# Wynik przetworzenia fragmentu przez funkcję `_convert_chunk()`.
+_ChunkResult = tuple[int, list[list[str]], tuple[int, str]|None]
+
+
+class _WorkerState():
+	# Stan procesu roboczego przekazywany funkcji `_init_worker()`: obiekt
+	# przetwarzający wiersze, dane potrzebne do ponownego odczytu pliku
+	# wejściowego oraz ustawienia języka i precyzji działań, które nie muszą
+	# być dziedziczone po procesie nadrzędnym.
+
+	def __init__(
+			self,
+			converter: RowConverter,
+			path: str,
+			encoding: str,
+			errors: str|None,
+			numeric_locale: str,
+			context: decimal.Context,
+		) -> None:
+		self.converter: RowConverter = converter
+		self.path: str = path
+		self.encoding: str = encoding
+		self.errors: str|None = errors
+		self.numeric_locale: str = numeric_locale
+		self.context: decimal.Context = context
+
+
+# Stan procesu roboczego, ustawiany przez funkcję `_init_worker()`.
+_state: _WorkerState|None = None
+
+
+def split_csv_chunks(
+		path: str,
+		chunk_size: int = DEFAULT_CHUNK_SIZE,
+		start: int = 0,
+	) -> typing.Iterator[Chunk]:
+	"""Dzieli plik CSV na fragmenty zawierające całe wiersze.
+
+	Funkcja przyjmuje następujące argumenty:
+	`path` -- Ścieżka do pliku CSV.
+	`chunk_size` -- Opcjonalnie, przybliżona wielkość fragmentu w bajtach.
+	Domyślnie: `DEFAULT_CHUNK_SIZE`.
+	`start` -- Opcjonalnie, pozycja początku pierwszego wiersza, od którego
+	plik ma zostać podzielony. Domyślnie: początek pliku.
+
+	Zwraca iterator po parach liczb oznaczających pozycję pierwszego bajtu
+	fragmentu i pozycję za jego ostatnim bajtem. Fragmenty kończą się
+	znakiem nowej linii, który nie znajduje się wewnątrz pola ujętego
+	w cudzysłów.
+	"""
+	with open(path, 'rb') as f:
+		f.seek(start)
+		# Parzysta liczba dotychczasowych cudzysłowów oznacza, że nie
+		# jesteśmy wewnątrz pola - podwojony cudzysłów w treści pola nie
+		# zmienia parzystości.
+		quotes: int = 0
+		while True:
+			line: bytes = f.read(chunk_size)
+			if not line:
+				return
+			quotes += line.count(b'"')
+			# Dokańczamy wiersz, w którym wypadł koniec fragmentu.
+			while quotes % 2 or not line.endswith(b'\n'):
+				line = f.readline()
+				if not line:
+					break
+				quotes += line.count(b'"')
+			end: int = f.tell()
+			yield start, end
+			start = end
+
+
+def _init_worker(state: _WorkerState) -> None:
+	# Przygotowuje proces roboczy. Ustawienia języka i precyzji działań
+	# nie muszą być dziedziczone po procesie nadrzędnym, więc są ustawiane
+	# ponownie.
+	global _state
+	locale.setlocale(locale.LC_NUMERIC, state.numeric_locale)
+	decimal.setcontext(state.context)
+	_state = state
+
+
+def _get_state() -> _WorkerState:
+	# Zwraca stan procesu roboczego ustawiony przez funkcję `_init_worker()`.
+	if _state is None:
+		raise RuntimeError("proces roboczy nie został przygotowany.")
+	return _state
+
+
+def _read_chunk(chunk: Chunk) -> typing.Iterator[list[str]]:
+	# Zwraca iterator po wierszach danego fragmentu pliku wejściowego,
+	# odczytanych tak, jak z pliku otwartego w trybie tekstowym.
+	state: _WorkerState = _get_state()
+	start, end = chunk
+	with open(state.path, 'rb') as f:
+		f.seek(start)
+		data: bytes = f.read(end - start)
+	return csv.reader(io.TextIOWrapper(
+		io.BytesIO(data), state.encoding, state.errors))
+
+
+def _scan_chunk(chunk: Chunk) -> set[tuple[str, int]]:
+	# Ustala tabele kursów potrzebne do przetworzenia fragmentu.
+	return _get_state().converter.get_needed_tables(_read_chunk(chunk))
+
+
+def _convert_chunk(
+		chunk: Chunk,
+		skip: int,
+	) -> _ChunkResult:
+	# Przetwarza wiersze fragmentu, pomijając `skip` początkowych. Zwraca
+	# liczbę odczytanych wierszy, przetworzone wiersze oraz numer wiersza
+	# (liczony od początku fragmentu) i komunikat błędu, jeśli wystąpił.
+	# Wiersze przetworzone przed błędem są zwracane, by zostały zapisane
+	# tak jak przy przetwarzaniu w jednym procesie.
+	converter: RowConverter = _get_state().converter
+	rows: list[list[str]] = []
+	count: int = 0
+	try:
+		for row in _read_chunk(chunk):
+			count += 1
+			if count > skip:
+				rows.append(converter.convert(row, count))
+	except exc.RowProcessingError as err:
+		return count, rows, (err.row_number, err.message)
+	return count, rows, None
+
+
+def convert_file(
+		converter: RowConverter,
+		file: typing.TextIO,
+		workers: int,
+		skip: int = 0,
+		chunk_size: int = DEFAULT_CHUNK_SIZE,
+		progress: typing.Callable[[int], None]|None = None,
+		start: int = 0,
+		start_row: int = 0,
+	) -> typing.Iterator[list[list[str]]]:
+	"""Przetwarza plik CSV w puli procesów.
+
+	Funkcja przyjmuje następujące argumenty:
+	`converter` -- Obiekt klasy `convert.RowConverter` przetwarzający wiersze.
+	`file` -- Plik wejściowy otwarty w trybie tekstowym. Musi to być zwykły
+	plik na dysku, gdyż procesy robocze odczytują go ponownie.
+	`workers` -- Liczba procesów roboczych.
+	`skip` -- Opcjonalnie, liczba początkowych wierszy pliku, które nie są
+	przetwarzane, np. 1 jeśli plik zawiera nagłówki.
+	`chunk_size` -- Opcjonalnie, przybliżona wielkość fragmentu pliku
+	przetwarzanego przez jeden proces, w bajtach.
+	`progress` -- Opcjonalnie, funkcja wywoływana z pozycją końca fragmentu
+	w bajtach po zwróceniu wierszy z tego fragmentu.
+	`start` -- Opcjonalnie, pozycja w bajtach, od której plik jest
+	przetwarzany, np. przy wznawianiu przetwarzania. Musi to być początek
+	wiersza.
+	`start_row` -- Opcjonalnie, liczba wierszy pliku przed pozycją `start`,
+	uwzględniana w numerach wierszy w komunikatach błędów.
+
+	Najpierw procesy robocze ustalają, jakie tabele kursów są potrzebne.
+	Tabele te są pobierane i wczytywane do `converter.tables` (o ile nie
+	obejmuje ich migawka kursów), który jest
+	następnie przekazywany procesom przetwarzającym wiersze.
+
+	Zwraca iterator po listach przetworzonych wierszy z kolejnych fragmentów
+	pliku. Jeżeli przetworzenie wiersza się nie powiedzie, zgłasza wyjątek
+	`exceptions.RowProcessingError` z numerem wiersza liczonym od początku
+	pliku, po zwróceniu wierszy przetworzonych przed błędnym.
+	"""
+	# Moduł importujemy dopiero tutaj, gdyż importuje on moduł
+	# `multiprocessing`, co wydłuża uruchamianie programu nawet wtedy, gdy
+	# plik jest przetwarzany w jednym procesie.
+	from concurrent.futures import Future, ProcessPoolExecutor
+
+	chunks: list[Chunk] = list(
+		split_csv_chunks(file.name, chunk_size, start))
+	state: _WorkerState = _WorkerState(
+		converter,
+		file.name,
+		file.encoding,
+		file.errors,
+		locale.setlocale(locale.LC_NUMERIC),
+		decimal.getcontext(),
+	)
+
+	with ProcessPoolExecutor(
+		workers, initializer=_init_worker, initargs=(state,),
+	) as executor:
+		needed: set[tuple[str, int]] = set().union(
+			*executor.map(_scan_chunk, chunks))
+	converter.tables.prefetch(needed)
+	for table, year in needed:
+		# Kursy z lat objętych migawką kursów nie wymagają wczytywania tabel.
+		if (
+			converter.tables.snapshot is not None
+			and converter.tables.snapshot.covers(year)
+		):
+			continue
+		try:
+			converter.tables.get_manager(year).get_dense_table(table)
+		except Exception:
+			# Błąd zostanie zgłoszony przy przetwarzaniu wiersza, którego dotyczy.
+			continue
+
+	# Drugą pulę tworzymy dopiero teraz, by procesy robocze otrzymały kopię
+	# `converter` z wczytanymi tabelami.
+	executor = ProcessPoolExecutor(
+		workers, initializer=_init_worker, initargs=(state,))
+	try:
+		# Zlecamy przetworzenie ograniczonej liczby fragmentów naraz, by nie
+		# przechowywać w pamięci wyników, które nie mogą jeszcze zostać
+		# zapisane.
+		remaining: typing.Iterator[Chunk] = iter(chunks)
+		pending: collections.deque[Future[_ChunkResult]] = collections.deque(
+			executor.submit(
+				_convert_chunk, chunk, skip if chunk[0] == start else 0)
+			for chunk in itertools.islice(remaining, workers * 2)
+		)
+		row_offset: int = start_row
+		converted: int = 0
+		while pending:
+			count, rows, error = pending.popleft().result()
+			for chunk in itertools.islice(remaining, 1):
+				pending.append(executor.submit(_convert_chunk, chunk, 0))
+			yield rows
+			if error is not None:
+				raise exc.RowProcessingError(row_offset + error[0], error[1])
+			row_offset += count
+			if progress is not None:
+				progress(chunks[converted][1])
+			converted += 1
+	finally:
+		executor.shutdown(cancel_futures=True)
@@ -0,0 +1,195 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Raportowanie postępu przetwarzania.
+
+Zawiera następujące klasy i funkcje:
+`ProgressReporter` -- Klasa wypisująca postęp przetwarzania wraz
+z przepustowością i szacowanym czasem do końca.
+`input_size` -- Funkcja zwracająca wielkość pliku wejściowego w bajtach.
+`input_position` -- Funkcja zwracająca funkcję odczytującą bieżącą pozycję
+w pliku wejściowym.
+"""
+import datetime
+import json
+import os
+import stat
+import time
+import typing
+
+
+class ProgressReporter():
+	"""Wypisuje postęp przetwarzania.
+
+	Postęp jest wypisywany nie częściej niż raz na `interval` sekund jako
+	wiersz tekstu nadpisywany w miejscu (format `text`) albo jako kolejne
+	zdarzenia w formacie JSON, po jednym w wierszu (format `json`). Każde
+	zdarzenie zawiera następujące klucze:
+	`event` -- Rodzaj zdarzenia: `start`, `progress`, `end` lub `error`.
+	`time` -- Czas zdarzenia jako znacznik czasu Uniksa.
+	`elapsed` -- Czas od rozpoczęcia przetwarzania w sekundach.
+	`rows` -- Liczba przetworzonych wierszy.
+	`bytes` -- Liczba odczytanych bajtów pliku wejściowego albo `null`,
+	jeżeli nie jest znana.
+	`total_bytes` -- Wielkość pliku wejściowego albo `null`, jeżeli nie jest
+	znana.
+	`rows_per_s`, `bytes_per_s` -- Przepustowość od rozpoczęcia przetwarzania.
+	`eta` -- Szacowany czas do końca przetwarzania w sekundach albo `null`.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`stream` -- Strumień, do którego wypisywany jest postęp.
+	`total_bytes` -- Wielkość pliku wejściowego w bajtach albo `None`.
+	`output_format` -- Łańcuch `text` albo `json`.
+	`interval` -- Minimalny odstęp między raportami w sekundach.
+	`start` -- Metoda rozpoczynająca mierzenie postępu.
+	`update` -- Metoda wypisująca postęp, jeżeli minął odstęp `interval`.
+	`finish` -- Metoda wypisująca postęp na zakończenie przetwarzania.
+	`snapshot` -- Metoda zwracająca słownik z bieżącym postępem.
+	"""
+
+	def __init__(
+			self,
+			stream: typing.TextIO,
+			total_bytes: int|None = None,
+			output_format: str = 'text',
+			interval: float = 1.0,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `ProgressReporter`."""
+		self.stream: typing.TextIO = stream
+		self.total_bytes: int|None = total_bytes
+		self.output_format: str = output_format
+		self.interval: float = interval
+		self._start: float = time.monotonic()
+		self._next_report: float = self._start + interval
+
+	def start(self) -> None:
+		"""Rozpoczyna mierzenie postępu od bieżącej chwili.
+
+		W formacie `json` wypisuje zdarzenie `start`.
+		"""
+		self._start = time.monotonic()
+		self._next_report = self._start + self.interval
+		if self.output_format == 'json':
+			self._report('start', 0, None)
+
+	def update(self, rows: int, position: int|None = None) -> None:
+		"""Wypisuje postęp, jeżeli od poprzedniego raportu minęło co najmniej
+		`interval` sekund.
+
+		Argument `rows` to liczba przetworzonych wierszy, a `position` -
+		liczba odczytanych bajtów pliku wejściowego, jeżeli jest znana.
+		"""
+		now: float = time.monotonic()
+		if now < self._next_report:
+			return
+		self._next_report = now + self.interval
+		self._report('progress', rows, position)
+
+	def finish(
+			self,
+			rows: int,
+			position: int|None = None,
+			error: bool = False,
+		) -> None:
+		"""Wypisuje postęp na zakończenie przetwarzania.
+
+		Argument `error` określa, czy przetwarzanie zostało przerwane
+		przez błąd.
+		"""
+		self._report('error' if error else 'end', rows, position)
+		if self.output_format == 'text':
+			self.stream.write('\n')
+			self.stream.flush()
+
+	def snapshot(
+			self,
+			rows: int,
+			position: int|None = None,
+		) -> dict[str, typing.Any]:
+		"""Zwraca słownik z bieżącym postępem, zawierający klucze zdarzeń
+		opisane w dokumentacji klasy poza kluczem `event`."""
+		elapsed: float = time.monotonic() - self._start
+		eta: float|None = None
+		if position and self.total_bytes is not None:
+			eta = max(self.total_bytes - position, 0) * elapsed / position
+		return {
+			'time': time.time(),
+			'elapsed': elapsed,
+			'rows': rows,
+			'bytes': position,
+			'total_bytes': self.total_bytes,
+			'rows_per_s': rows / elapsed if elapsed else 0.0,
+			'bytes_per_s': (
+				position / elapsed if elapsed and position is not None else None),
+			'eta': eta,
+		}
+
+	def _report(self, event: str, rows: int, position: int|None) -> None:
+		snapshot: dict[str, typing.Any] = self.snapshot(rows, position)
+		if self.output_format == 'json':
+			self.stream.write(json.dumps({'event': event, **snapshot}) + '\n')
+		else:
+			self.stream.write('\r' + self._format(snapshot))
+		self.stream.flush()
+
+	def _format(self, snapshot: dict[str, typing.Any]) -> str:
+		parts: list[str] = [f"Przetworzono wierszy: {snapshot['rows']}"]
+		if snapshot['bytes'] is not None and self.total_bytes:
+			parts[0] += f" ({snapshot['bytes'] / self.total_bytes:.0%})"
+		parts.append(f"{snapshot['rows_per_s']:.0f} wierszy/s")
+		if snapshot['bytes_per_s'] is not None:
+			parts.append(f"{snapshot['bytes_per_s'] / 2**20:.1f} MiB/s")
+		if snapshot['eta'] is not None:
+			parts.append("pozostało ok. " + str(
+				datetime.timedelta(seconds=round(snapshot['eta']))))
+		# Spacje na końcu zamazują resztki dłuższego poprzedniego wiersza.
+		return ', '.join(parts) + ' ' * 8
+
+
+def input_size(file: typing.IO[typing.Any]) -> int|None:
+	"""Zwraca wielkość pliku `file` w bajtach.
+
+	Jeżeli nie jest to zwykły plik na dysku, np. gdy dane są przekazywane
+	przez potok, zwraca `None`.
+	"""
+	try:
+		status: os.stat_result = os.fstat(file.fileno())
+	except (AttributeError, OSError, ValueError):
+		return # type: ignore[return-value]
+	if not stat.S_ISREG(status.st_mode):
+		return # type: ignore[return-value]
+	return status.st_size
+
+
+def input_position(
+		file: typing.IO[typing.Any],
+	) -> typing.Callable[[], int]|None:
+	"""Zwraca funkcję odczytującą bieżącą pozycję w pliku `file` w bajtach.
+
+	Dla pliku otwartego w trybie tekstowym odczytywana jest pozycja w buforze
+	binarnym, który wyprzedza dane zwrócone do tej pory o najwyżej kilka
+	kilobajtów. Jeżeli pozycji nie da się odczytać, zwraca `None`.
+	"""
+	binary: typing.IO[bytes] = getattr(file, 'buffer', file)
+	try:
+		if not binary.seekable():
+			return # type: ignore[return-value]
+		binary.tell()
+	except (AttributeError, OSError, ValueError):
+		return # type: ignore[return-value]
+	return binary.tell
@@ -25,20 +25,41 @@ Zawiera następujące funkcje:
 `transactions2pln` -- Główna funkcja programu, przyjmuje argumenty
 	przygotowane przez funkcję `run()`, oblicza i zapisuje wartości transakcji.
 """
+import contextlib
 import csv
 import decimal
+import itertools
 import locale
+import os
 import sys
+import time
 import typing
 from argparse import (
 	ArgumentParser,
-	FileType,
+	ArgumentTypeError,
 	Namespace,
 )
-from datetime import date, datetime, timedelta
-from tempfile import TemporaryDirectory
+from datetime import date
 
-from transactions2pln import exceptions as exc, utils
+from transactions2pln import compression, exceptions as exc
+from transactions2pln.cache import (
+	LazyTemporaryDirectory,
+	TablesCache,
+	default_cache_dir,
+)
+
+# Na tym poziomie importujemy tylko moduły potrzebne do obsługi opcji
+# wiersza poleceń. Moduły przetwarzające dane są importowane dopiero przez
+# funkcję `transactions2pln()`, a moduły potrzebne tylko przy niektórych
+# opcjach - dopiero w razie potrzeby, by nie wydłużać uruchamiania programu.
+if typing.TYPE_CHECKING:
+	from tempfile import TemporaryDirectory
+
+	from transactions2pln.aggregate import Aggregator
+	from transactions2pln.checkpoint import Checkpoint
+	from transactions2pln.follow import Follower
+	from transactions2pln.progress import ProgressReporter
+	from transactions2pln.snapshot import Snapshot
 
 _ERROR_CODE_MAP: dict[typing.Type[Exception], int] = {
 	RuntimeError: 2,
@@ -48,8 +69,70 @@ _ERROR_CODE_MAP: dict[typing.Type[Exception], int] = {
 }
 
 
-def _str_from_decimal(d: decimal.Decimal) -> str:
-	return locale.str(d) # type: ignore
+# Liczba wierszy przekazywanych naraz do zapisu, jeśli parametr --flush
+# nie określa innej.
+_BATCH_SIZE: int = 512
+
+
+def _positive_int(value: str) -> int:
+	# Zamienia wartość parametru na dodatnią liczbę całkowitą.
+	try:
+		number: int = int(value)
+		assert number > 0
+	except (AssertionError, ValueError) as err:
+		raise ArgumentTypeError(
+			f"nieprawidłowa wartość '{value}' - dozwolone wartości to "
+			"dodatnie liczby całkowite."
+		) from err
+	return number
+
+
+def _positive_float(value: str) -> float:
+	# Zamienia wartość parametru na dodatnią liczbę zmiennoprzecinkową.
+	try:
+		number: float = float(value)
+		assert number > 0
+	except (AssertionError, ValueError) as err:
+		raise ArgumentTypeError(
+			f"nieprawidłowa wartość '{value}' - dozwolone wartości to "
+			"liczby dodatnie."
+		) from err
+	return number
+
+
+def _flush_policy(value: str) -> int:
+	# Zamienia wartość parametru --flush na liczbę wierszy, co którą
+	# opróżniany jest bufor wyjściowy, gdzie 0 oznacza koniec przetwarzania.
+	if value == 'row':
+		return 1
+	if value == 'end':
+		return 0
+	try:
+		rows: int = int(value)
+		assert rows > 0
+	except (AssertionError, ValueError) as err:
+		raise ArgumentTypeError(
+			f"nieprawidłowa wartość '{value}' - dozwolone wartości to "
+			"'row', 'end' albo dodatnia liczba całkowita."
+		) from err
+	return rows
+
+
+@contextlib.contextmanager
+def _profile(path: str|None) -> typing.Iterator[None]:
+	# Jeżeli podano ścieżkę, zapisuje w niej profil wykonania bloku kodu,
+	# również jeżeli zakończy się on błędem.
+	if not path:
+		yield
+		return
+	import cProfile
+	profiler: cProfile.Profile = cProfile.Profile()
+	profiler.enable()
+	try:
+		yield
+	finally:
+		profiler.disable()
+		profiler.dump_stats(path)
 
 
 def run() -> int:
@@ -71,6 +154,14 @@ def run() -> int:
 	błędów.
 	"""
 
+	# Plik wyjściowy jest otwierany już podczas odczytu opcji, a przy zapisie
+	# stanu przetwarzania jego zawartość nie może zostać usunięta, gdyż może
+	# zostać uzupełniona. Dlatego opcję --checkpoint odczytujemy wcześniej.
+	preparser: ArgumentParser = ArgumentParser(add_help=False)
+	preparser.add_argument('--checkpoint', nargs='?', const='')
+	output_mode: str = (
+		'w' if preparser.parse_known_args()[0].checkpoint is None else 'a')
+
 	argparser: ArgumentParser = ArgumentParser(
 		prog="transactions2pln",
 		description="Dodaje wartości w PLN do pliku CSV z transakcjami.",
@@ -80,14 +171,18 @@ def run() -> int:
 		"Opcje wejścia i wyjścia")
 	arggroup_io.add_argument(
 		'input',
-		type=FileType('r'),
-		help="Ścieżka do pliku CSV.",
+		type=compression.CompressedFileType('r'),
+		help="""
+			Ścieżka do pliku CSV. Pliki skompresowane w formatach gzip, bzip2,
+			xz i Zstandard są rozpakowywane w trakcie odczytu.
+		""",
 	)
 	arggroup_io.add_argument(
 		'-o', '--output',
-		type=FileType('w'),
+		type=compression.CompressedFileType(output_mode),
 		help="""
-			Ścieżka do pliku wynikowego. Domyślnie:
+			Ścieżka do pliku wynikowego. Plik z rozszerzeniem .gz, .bz2, .xz
+			albo .zst jest kompresowany w odpowiednim formacie. Domyślnie:
 			pusta, program zwraca wynik do wyjścia konsoli.
 		""",
 	)
@@ -96,6 +191,86 @@ def run() -> int:
 		action='store_true',
 		help="Zwróć wyniki w formacie JSON.",
 	)
+	arggroup_io.add_argument(
+		'--ndjson',
+		action='store_true',
+		help="""
+			Zwróć wyniki w formacie NDJSON (JSON Lines), gdzie każda linia
+			zawiera jeden wiersz danych.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--parquet',
+		action='store_true',
+		help="""
+			Zwróć wyniki w kolumnowym formacie Parquet, w którym kursy i kwoty
+			w PLN są liczbami dziesiętnymi, a daty transakcji - datami.
+			Wymaga zainstalowania biblioteki pyarrow.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--arrow',
+		action='store_true',
+		help="""
+			Zwróć wyniki w kolumnowym formacie Arrow IPC, z typami kolumn
+			takimi jak w formacie Parquet. Wymaga zainstalowania biblioteki
+			pyarrow.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--flush',
+		default=0,
+		type=_flush_policy,
+		metavar='{row,end,N}',
+		help="""
+			Kiedy zapisywać przetworzone dane do pliku wynikowego: po każdym
+			wierszu (row), co N wierszy albo dopiero na końcu (end). Zapis
+			po każdym wierszu jest przydatny gdy wynik jest na bieżąco
+			odczytywany przez inny program, ale spowalnia działanie.
+			Domyślnie: end.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--follow',
+		nargs='?',
+		const=1.0,
+		type=_positive_float,
+		metavar='SECONDS',
+		help="""
+			Po przetworzeniu pliku wejściowego czekaj na dopisanie do niego
+			kolejnych wierszy, tak jak polecenie "tail -f", sprawdzając plik
+			co SECONDS sekund (domyślnie co 1 sekundę). Nowe wiersze są
+			przetwarzane z użyciem wczytanych już tabel kursów, a wyniki są
+			zapisywane przed każdym oczekiwaniem na dane. Jeżeli plik zostanie
+			zastąpiony nowym (np. przy rotacji plików) albo skrócony, jest
+			odczytywany od początku. Przetwarzanie kończy się po przerwaniu
+			programu, np. klawiszami Ctrl+C. Działa tylko dla zwykłych plików.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--checkpoint',
+		nargs='?',
+		const='',
+		metavar='FILE',
+		help="""
+			Zapisuj w pliku FILE stan przetwarzania: liczbę przetworzonych
+			wierszy, pozycję w pliku wejściowym i skrót przetworzonej części
+			tego pliku. Kolejne uruchomienie z tą opcją przetworzy tylko wiersze
+			dopisane do pliku wejściowego od poprzedniego uruchomienia albo
+			wznowi przetwarzanie przerwane przez błąd, dopisując wyniki do
+			pliku wyjściowego. Jeżeli przetworzona wcześniej część pliku
+			wejściowego się zmieniła, plik jest przetwarzany od początku.
+			Wymaga podania pliku wyjściowego. Domyślnie: ścieżka pliku
+			wyjściowego z dodanym rozszerzeniem .checkpoint.
+		""",
+	)
+	arggroup_io.add_argument(
+		'--buffer-size',
+		type=int,
+		help="""
+			Wielkość bufora danych wyjściowych, w znakach. Domyślnie: 1048576.
+		""",
+	)
 
 	arggroup_parse: typing.Any = argparser.add_argument_group(
 		"Opcje parsowania pliku wejściowego")
@@ -120,17 +295,17 @@ def run() -> int:
 		help="""
 			Kolumna zawierająca datę transakcji - może być podana jako
 			nagłówek, liczba albo litera. Domyślnie: program spróbuje
-			znaleźć automatycznie dla każdego wiersza.
+			wykryć ją na podstawie początkowych wierszy pliku.
 		""",
 	)
 	arggroup_parse.add_argument(
 		'-f', '--date-format',
-		default='%%x',
 		help="""
 			Format dat używanych w kolumnie z datą transakcji. Ten parametr
 			używa formatu strftime() udokumentowanego pod adresem
 			https://docs.python.org/3.11/library/datetime.html#strftime-and-strptime-format-codes
-			Domyślnie: %%x
+			Domyślnie: program spróbuje wykryć format na podstawie
+			początkowych wierszy pliku.
 		"""
 	)
 	arggroup_parse.add_argument(
@@ -143,12 +318,178 @@ def run() -> int:
 		""",
 	)
 
+	arggroup_parse.add_argument(
+		'-w', '--workers',
+		default=1,
+		type=_positive_int,
+		metavar='N',
+		help="""
+			Liczba procesów przetwarzających plik wejściowy równolegle.
+			Przyspiesza przetwarzanie dużych plików na komputerach
+			z wieloma procesorami. Domyślnie: %(default)s.
+		""",
+	)
+
+	arggroup_parse.add_argument(
+		'--engine',
+		default='row',
+		choices=('row', 'numpy'),
+		help="""
+			Sposób przetwarzania wierszy: pojedynczo (row) albo partiami,
+			za pomocą operacji na tablicach biblioteki NumPy (numpy), co jest
+			szybsze dla dużych plików. Wyniki są w obu przypadkach takie same.
+			Przetwarzanie partiami wymaga zainstalowania biblioteki NumPy.
+			Domyślnie: %(default)s.
+		""",
+	)
+
+	arggroup_aggregate: typing.Any = argparser.add_argument_group(
+		"Opcje sumowania")
+	arggroup_aggregate.add_argument(
+		'--aggregate',
+		action='store_true',
+		help="""
+			Zamiast przetworzonych wierszy zwróć dla każdej grupy transakcji
+			liczbę transakcji, sumę oraz najmniejszą i największą kwotę w PLN.
+			Grupy wyznaczają opcje --group-by i --period, a bez nich wynikiem
+			jest jedna grupa ze wszystkimi transakcjami. Sumy są obliczane
+			dokładnie, a pamięć potrzebna do ich obliczenia zależy od liczby
+			grup, a nie od liczby wierszy. Jeżeli przetwarzanie zostanie
+			przerwane przez błąd, zwracane są wyniki dla wierszy przetworzonych
+			przed błędnym.
+		""",
+	)
+	arggroup_aggregate.add_argument(
+		'-g', '--group-by',
+		action='append',
+		metavar='COLUMN',
+		help="""
+			Kolumna, której wartości wyznaczają grupy transakcji - może być
+			podana jako nagłówek, liczba albo litera. Opcję można podać
+			wielokrotnie, by grupować według kilku kolumn. Włącza opcję
+			--aggregate.
+		""",
+	)
+	arggroup_aggregate.add_argument(
+		'--period',
+		choices=('day', 'month', 'year'),
+		help="""
+			Grupuj transakcje również według dnia (day), miesiąca (month) albo
+			roku (year) daty transakcji. Włącza opcję --aggregate.
+		""",
+	)
+
+	arggroup_rates: typing.Any = argparser.add_argument_group(
+		"Opcje pobierania tabel kursów")
+	arggroup_rates.add_argument(
+		'--cache-dir',
+		help="""
+			Katalog w którym przechowywane są pobrane tabele kursów NBP.
+			Domyślnie: %s
+		""" % default_cache_dir().replace('%', '%%'),
+	)
+	arggroup_rates.add_argument(
+		'-p', '--prefetch',
+		action='store_true',
+		help="""
+			Przed przetworzeniem danych odczytaj cały plik wejściowy i pobierz
+			równolegle wszystkie potrzebne tabele kursów. Ta opcja jest
+			pomijana, jeśli plik wejściowy nie pozwala na ponowny odczyt
+			(np. dla standardowego wejścia), oraz w trybie --follow.
+		""",
+	)
+	arggroup_rates.add_argument(
+		'--no-cache',
+		dest='cache',
+		action='store_false',
+		help="""
+			Nie używaj pamięci podręcznej - pobierz tabele kursów NBP
+			do katalogu tymczasowego i usuń je po zakończeniu działania.
+		""",
+	)
+	arggroup_rates.add_argument(
+		'--max-years',
+		type=int,
+		metavar='N',
+		help="""
+			Najwyższa liczba lat, z których tabele kursów są jednocześnie
+			przechowywane w pamięci. Przy danych z wielu lat, nieuporządkowanych
+			według dat, tabele mogą być wtedy wielokrotnie wczytywane ponownie.
+			Domyślnie: bez ograniczenia.
+		""",
+	)
+	arggroup_rates.add_argument(
+		'--snapshot',
+		metavar='FILE',
+		help="""
+			Odczytuj kursy z pliku FILE zawierającego migawkę kursów, tworzonego
+			poleceniem "transactions2pln-snapshot build". Tabele kursów są wtedy
+			pobierane tylko dla kursów, których migawka nie zawiera.
+		""",
+	)
+
+	arggroup_diagnostics: typing.Any = argparser.add_argument_group(
+		"Opcje diagnostyczne")
+	arggroup_diagnostics.add_argument(
+		'--stats',
+		nargs='?',
+		const='text',
+		choices=('text', 'json'),
+		help="""
+			Po zakończeniu wypisz do standardowego strumienia błędów statystyki:
+			czas poszczególnych etapów przetwarzania, liczbę wierszy na sekundę,
+			liczbę pobranych i ponownie użytych tabel kursów oraz odsetek kursów
+			i dat odczytanych z pamięci podręcznej. Statystyki są wypisywane
+			jako tekst (text) albo w formacie JSON (json). Domyślnie: text.
+		""",
+	)
+	arggroup_diagnostics.add_argument(
+		'--profile',
+		metavar='FILE',
+		help="""
+			Zapisz w pliku FILE profil wykonania programu w formacie modułu
+			pstats, np. do analizy poleceniem "python -m pstats FILE".
+		""",
+	)
+
+	arggroup_diagnostics.add_argument(
+		'--progress',
+		nargs='?',
+		const='text',
+		choices=('text', 'json'),
+		help="""
+			Podczas przetwarzania wypisuj do standardowego strumienia błędów
+			postęp: liczbę przetworzonych wierszy, przepustowość i szacowany
+			czas do końca, obliczany na podstawie wielkości pliku wejściowego.
+			Postęp jest wypisywany jako nadpisywany wiersz tekstu (text) albo
+			jako zdarzenia w formacie JSON, po jednym w wierszu (json),
+			przydatne do wykrywania zawieszonego przetwarzania przez inne
+			programy. Domyślnie: text.
+		""",
+	)
+	arggroup_diagnostics.add_argument(
+		'--progress-interval',
+		metavar='SECONDS',
+		type=_positive_float,
+		default=1.0,
+		help="""
+			Minimalny odstęp w sekundach między kolejnymi raportami postępu.
+			Domyślnie: 1.
+		""",
+	)
+
 	args: Namespace = argparser.parse_args()
-	tmpdir: TemporaryDirectory = TemporaryDirectory() # type: ignore[type-arg]
+	# Katalog roboczy jest potrzebny tylko przy pobieraniu tabel kursów
+	# z pominięciem pamięci podręcznej, więc jest tworzony dopiero wtedy.
+	tmpdir: LazyTemporaryDirectory = LazyTemporaryDirectory()
 	decimal.getcontext().prec = 10
 
 	try:
-		transactions2pln(args, tmpdir)
+		tables_cache: TablesCache|None = None
+		if args.cache:
+			tables_cache = TablesCache(args.cache_dir or default_cache_dir())
+		with _profile(args.profile):
+			transactions2pln(args, tmpdir, tables_cache)
 		args.input.close()
 	except Exception as err:
 		args.input.close()
@@ -163,14 +504,16 @@ def run() -> int:
 
 def transactions2pln(
 		args: Namespace,
-		tmpdir: TemporaryDirectory, # type: ignore[type-arg]
+		tmpdir: 'TemporaryDirectory[str]|LazyTemporaryDirectory',
+		cache: TablesCache|None = None,
 	) -> None:
 	"""Oblicza wartości w PLN dla transakcji w innych walutach
 	i dodaje je do pliku wejściowego.
 
-	Funkcja przyjmuje dwa argumenty: `args` zawierający argumenty przekazane
-	przez interfejs wiersza poleceń i `tmpdir` będący tymczasową ścieżką
-	do użycia jako katalog roboczy.
+	Funkcja przyjmuje argumenty: `args` zawierający argumenty przekazane
+	przez interfejs wiersza poleceń, `tmpdir` będący tymczasową ścieżką
+	do użycia jako katalog roboczy i opcjonalnie `cache` - obiekt klasy
+	`cache.TablesCache` w którym przechowywane są pobrane tabele kursów.
 
 	Argument `args` powinien posiadać następujące atrybuty:
 	`input` -- Otwarty deskryptor pliku zawierającego transakcje
@@ -179,10 +522,12 @@ def transactions2pln(
 	transakcje z pliku wejściowego rozszerzone o wartości w PLN
 	(**plik wyjściowy**).
 	`date_format` -- Łańcuch opisujący format w jakim w pliku wejściowym
-	zapisane są daty transakcji, zgodny z `datetime.strftime`.
+	zapisane są daty transakcji, zgodny z `datetime.strftime`, albo `None`
+	jeśli format ma zostać wykryty automatycznie.
 	`date_column` -- Łańcuch oznaczajacy kolumnę w pliku wejściowym
 	zawierającą daty transakcji; może być to litera, liczba lub nagłówek
-	jeśli atrybut `labels` zawiera wartość `True`.
+	jeśli atrybut `labels` zawiera wartość `True`. Pusty łańcuch oznacza,
+	że kolumna ma zostać wykryta automatycznie.
 	`currency` -- Łańcuch oznaczający kolumnę w pliku wejściowym
 	zawierającą walutę danej transakcji (patrz opis atrybutu `date_column`)
 	albo trzyliterowy kod zgodny z ISO 4217.
@@ -190,8 +535,54 @@ def transactions2pln(
 	zawierającą wartości transakcji (patrz opis atrybutu `date_column`).
 	`json` -- Wartość logiczna, jeżeli jest to `True` funkcja zapisuje
 	plik wyjściowy w formacie JSON.
+	`ndjson` -- Wartość logiczna, jeżeli jest to `True` funkcja zapisuje
+	plik wyjściowy w formacie NDJSON.
+	`parquet` -- Wartość logiczna, jeżeli jest to `True` funkcja zapisuje
+	plik wyjściowy w formacie Parquet.
+	`arrow` -- Wartość logiczna, jeżeli jest to `True` funkcja zapisuje
+	plik wyjściowy w formacie Arrow IPC.
+	`aggregate` -- Wartość logiczna, jeżeli jest to `True` funkcja zapisuje
+	zamiast przetworzonych wierszy liczbę transakcji, sumę oraz najmniejszą
+	i największą kwotę w PLN w grupach transakcji. Po błędzie przetwarzania
+	zapisywane są wyniki dla wierszy przetworzonych przed błędnym.
+	`group_by` -- Lista łańcuchów oznaczających kolumny, których wartości
+	wyznaczają grupy transakcji (patrz opis atrybutu `date_column`), albo
+	`None`. Podanie kolumn włącza sumowanie.
+	`period` -- Nazwa okresu (`day`, `month` lub `year`), według którego
+	grupowane są transakcje, albo `None`. Podanie okresu włącza sumowanie.
+	`flush` -- Liczba całkowita określająca, co ile wierszy dane są zapisywane
+	do pliku wyjściowego; 0 oznacza zapis dopiero po przetworzeniu wszystkich
+	wierszy.
+	`buffer_size` -- Liczba całkowita oznaczająca wielkość bufora danych
+	wyjściowych, w znakach, albo `None` dla domyślnej wielkości bufora.
 	`labels` -- Wartość logiczna, jeżeli jest to `True` pierwsza linijka
 	pliku wejściowego jest traktowana jako nagłówki kolumn a nie zawartość.
+	`max_years` -- Liczba całkowita oznaczająca, z ilu lat tabele kursów są
+	jednocześnie przechowywane w pamięci, albo `None`, jeżeli liczba lat
+	nie jest ograniczona.
+	`prefetch` -- Wartość logiczna, jeżeli jest to `True` funkcja przed
+	przetwarzaniem danych odczytuje cały plik wejściowy by równolegle pobrać
+	wszystkie potrzebne tabele kursów.
+	`workers` -- Liczba całkowita oznaczająca, w ilu procesach przetwarzany
+	jest plik wejściowy.
+	`engine` -- Łańcuch `row` lub `numpy` określający sposób przetwarzania
+	wierszy.
+	`stats` -- Łańcuch `text` lub `json` określający format statystyk
+	wypisywanych po zakończeniu przetwarzania, albo `None` jeżeli statystyki
+	nie mają być zbierane.
+	`progress` -- Łańcuch `text` lub `json` określający format raportów
+	postępu, albo `None` jeżeli postęp nie ma być raportowany.
+	`progress_interval` -- Minimalny odstęp między raportami postępu
+	w sekundach.
+	`snapshot` -- Ścieżka do pliku migawki kursów, z którego odczytywane są
+	kursy, albo `None`.
+	`follow` -- Odstęp w sekundach między sprawdzeniami, czy do pliku
+	wejściowego dopisano nowe wiersze, albo `None`, jeżeli przetwarzanie ma
+	się zakończyć na końcu pliku.
+	`checkpoint` -- Ścieżka do pliku stanu przetwarzania, pusty łańcuch
+	oznaczający ścieżkę pliku wyjściowego z rozszerzeniem `.checkpoint`, albo
+	`None`, jeżeli stan przetwarzania nie ma być zapisywany. Plik wyjściowy
+	musi być wtedy otwarty w trybie dopisywania.
 	"""
 	# `locale.getlocale()` zwraca łańcuch lub krotkę której elementami
 	# mogą być łańcuchy lub `None`. W tym bloku uzyskujemy jednolity łańcuch
@@ -204,6 +595,15 @@ def transactions2pln(
 		map(lambda s: s or '', current_locale)
 	).lower()
 
+	# Moduły przetwarzające dane importujemy dopiero tutaj, by nie wydłużać
+	# wyświetlania pomocy i zgłaszania błędnych opcji wiersza poleceń.
+	from transactions2pln import api, utils
+	from transactions2pln.convert import RowConverter, TimedRowConverter
+	from transactions2pln.stats import Stats, timer
+
+	# Przy zbieraniu statystyk czas całkowity liczony jest od tego miejsca.
+	stats: Stats|None = Stats() if args.stats else None
+
 	if any((
 		current_locale_string.startswith('pl'),
 		current_locale_string.startswith('polish')
@@ -215,14 +615,117 @@ def transactions2pln(
 			"gdy język systemu jest ustawiony na polski.",
 		)
 
-	input = csv.reader(args.input)
-	current_row: int = 0
+	# Przy zapisie stanu przetwarzania wiersze są odczytywane za jego
+	# pośrednictwem, by znać ich pozycje w pliku wejściowym. Jeżeli zapisany
+	# stan pozwala na wznowienie przetwarzania, przetworzone już wiersze są
+	# pomijane, a z pliku wyjściowego usuwane są dane zapisane po zapisaniu
+	# stanu. W przeciwnym razie plik wyjściowy jest czyszczony.
+	input: typing.Iterator[list[str]]
+	checkpoint: Checkpoint|None = None
+	follower: Follower|None = None
+	if args.follow is not None and args.checkpoint is not None:
+		raise ValueError(
+			"Opcji --follow nie można używać razem z opcją --checkpoint.")
+	# Pliki w formatach kolumnowych dają się odczytać dopiero po zakończeniu
+	# zapisu i nie można do nich dopisywać danych.
+	columnar: str|None = (
+		'parquet' if args.parquet else 'arrow' if args.arrow else None)
+	if columnar is not None and (
+		args.follow is not None or args.checkpoint is not None
+	):
+		raise ValueError(
+			"Formatów Parquet i Arrow nie można używać razem z opcjami "
+			"--follow i --checkpoint."
+		)
+	# Wyniki sumowania są zapisywane dopiero po przetworzeniu całego pliku.
+	aggregate: bool = bool(args.aggregate or args.group_by or args.period)
+	if aggregate and (
+		columnar is not None
+		or args.follow is not None
+		or args.checkpoint is not None
+	):
+		raise ValueError(
+			"Opcji --aggregate nie można używać razem z opcjami --follow, "
+			"--checkpoint, --parquet i --arrow."
+		)
+	# Pozycja w pliku skompresowanym nie odpowiada pozycji w danych, więc nie
+	# da się wznowić odczytu od zapamiętanego miejsca ani zmienić danych
+	# dopisanych wcześniej.
+	if (
+		isinstance(args.input, compression.CompressedFile)
+		or isinstance(args.output, compression.CompressedFile)
+	) and (args.follow is not None or args.checkpoint is not None):
+		raise ValueError(
+			"Plików skompresowanych nie można używać razem z opcjami "
+			"--follow i --checkpoint."
+		)
+	if args.follow is not None and not os.path.isfile(args.input.name):
+		print(
+			"Plik wejściowy nie jest zwykłym plikiem - "
+			"opcja --follow zostanie pominięta.",
+			file=sys.stderr,
+		)
+	elif args.follow is not None:
+		from transactions2pln.follow import Follower
+		follower = Follower(args.input, args.follow, args.labels)
+		input = iter(follower)
+	elif args.checkpoint is not None:
+		if not (
+			args.output is not None
+			and os.path.isfile(args.output.name)
+			and os.path.isfile(args.input.name)
+		):
+			raise ValueError(
+				"Zapis stanu przetwarzania wymaga, by plik wejściowy i plik "
+				"wyjściowy były zwykłymi plikami na dysku."
+			)
+		from transactions2pln.checkpoint import Checkpoint
+		checkpoint = Checkpoint(
+			args.checkpoint or args.output.name + '.checkpoint',
+			args.input.name,
+			{
+				'encoding': args.input.encoding,
+				'currency': args.currency,
+				'amount_column': args.amount_column,
+				'date_column': args.date_column,
+				'date_format': args.date_format,
+				'labels': args.labels,
+				'json': args.json,
+				'ndjson': args.ndjson,
+			},
+		)
+		loaded: bool = checkpoint.load(args.output)
+		# Jeżeli przetworzono dotąd jedynie nagłówki, zaczynamy od początku.
+		if loaded and checkpoint.rows > int(args.labels):
+			print(
+				f"Wznowiono przetwarzanie od wiersza {checkpoint.rows + 1}.",
+				file=sys.stderr,
+			)
+		else:
+			if not loaded and os.path.exists(checkpoint.path):
+				print(
+					"Zapisany stan przetwarzania nie odpowiada plikowi wejściowemu "
+					"lub wyjściowemu - plik wejściowy zostanie przetworzony "
+					"od początku.",
+					file=sys.stderr,
+				)
+			checkpoint.reset()
+		args.output.seek(checkpoint.output_offset)
+		args.output.truncate()
+		input = checkpoint.read_rows(args.input)
+	else:
+		input = csv.reader(args.input)
+	# Przy wznowieniu przetwarzania wiersze są liczone od początku pliku.
+	resumed: bool = checkpoint is not None and checkpoint.rows > 0
+	current_row: int = checkpoint.rows if checkpoint is not None else 0
 
 	labels: list[str] = []
-	if args.labels:
+	if checkpoint is not None and checkpoint.header is not None:
+		labels = checkpoint.header + list(api.LABELS)
+	elif args.labels:
 		try:
 			# Dodajemy nagłówki dla kolumn, które wypełniamy przetwarzając dane.
-			labels = next(input) + ["kurs do PLN", "kwota w PLN"]
+			labels = next(input) + list(api.LABELS)
 		except StopIteration as err:
 			# Próba wczytania nagłówków to jedyna sytuacja, gdy przeszkadza nam
 			# pusty plik. Jeżeli nie ma nagłówków, po prostu nic nie zwracamy
@@ -233,140 +736,341 @@ def transactions2pln(
 			) from err
 		else:
 			current_row += 1
+			if checkpoint is not None:
+				checkpoint.header = labels[:-len(api.LABELS)]
 
 	# Waluta może być podana jako kod ISO 4217 albo odwołanie do kolumny.
-	# W tym bloku tworzymy funkcję `get_currency()` która będzie nam zawsze
-	# zwracać właściwy kod.
-	if all((
-		args.currency.isupper(),
-		len(args.currency) == 3,
-		args.currency not in labels,
-	)):
-		# Waluta została podana jako kod - `get_currency()` po prostu go zwraca.
-		def get_currency(row: list[str]) -> str: return str(args.currency)
-	else:
-		# Waluta podana jako odwołanie do kolumny. Najpierw musimy uzyskać
-		# indeks kolumny.
-		try:
-			currency_column_idx: int|None = utils.get_column_index(
-				args.currency, labels)
-			assert currency_column_idx is not None
-		except (AssertionError, ValueError) as err:
-			# Jeżeli nie możemy uzyskać indeksu, zwracamy błąd.
-			raise exc.ColumnParameterError('currency', args.currency) from err
-		# W tym wariancie, `get_currency()` dynamicznie odczytuje walutę
-		# dla każdego wiersza.
-		def get_currency(row: list[str]) -> str: return row[currency_column_idx]
-
-	# Wartość i data mogą być podane tylko jako odwołania do kolumny,
-	# więc nie wymagają takich akrobacji jak waluta.
-	try:
-		amount_column_idx: int|None = utils.get_column_index(
-			args.amount_column, labels)
-	except ValueError as err:
-		raise exc.ColumnParameterError('amount-column', args.amount_column) from err
+	# Ustalamy albo kod waluty wspólny dla wszystkich wierszy, albo indeks
+	# kolumny, z której waluta będzie odczytywana, oraz indeksy kolumn
+	# z kwotą i datą.
+	currency_code: str|None
+	currency_column_idx: int|None
+	amount_column_idx: int|None
+	date_column_idx: int|None
+	currency_code, currency_column_idx, amount_column_idx, date_column_idx = (
+		api.resolve_columns(
+			labels, args.currency, args.amount_column, args.date_column))
 
-	try:
-		date_column_idx: int|None = utils.get_column_index(args.date_column, labels)
-	except ValueError as err:
-		raise exc.ColumnParameterError('date-column', args.date_column) from err
+	# Jeżeli nie podano kolumny z datą lub formatu dat, próbujemy je ustalić
+	# na podstawie początkowych wierszy pliku. Ustalone wartości obowiązują
+	# dla wszystkich wierszy.
+	date_format: str|None = args.date_format
+	if checkpoint is not None and resumed:
+		# Kolumna z datą i format dat mogły zostać wykryte na podstawie
+		# wierszy przetworzonych wcześniej.
+		date_column_idx = checkpoint.date_column
+		date_format = checkpoint.date_format
+	elif date_column_idx is None or date_format is None:
+		if follower is not None:
+			# Nie czekamy na dopisanie wierszy potrzebnych do wykrycia formatu
+			# - wystarczą wiersze zapisane już w pliku.
+			sample: typing.Iterator[list[str]]
+			sample, date_column_idx, date_format = api.detect_date(
+				iter(follower.read_available(api.DETECTION_SAMPLE_SIZE)),
+				date_column_idx,
+				date_format,
+			)
+			input = itertools.chain(sample, input)
+		else:
+			input, date_column_idx, date_format = api.detect_date(
+				input, date_column_idx, date_format)
+		if date_column_idx is not None and date_format is not None:
+			column_name: str = str(date_column_idx + 1)
+			if date_column_idx < len(labels):
+				column_name += f" ({labels[date_column_idx]})"
+			print(
+				f"Wykryto kolumnę z datą {column_name} i format dat {date_format}.",
+				file=sys.stderr,
+			)
+	if checkpoint is not None:
+		checkpoint.date_column = date_column_idx
+		checkpoint.date_format = date_format
+
+	# Przetwarzanie w wielu procesach wymaga, by procesy robocze mogły
+	# odczytać plik wejściowy samodzielnie, więc nie jest dostępne np. dla
+	# standardowego wejścia.
+	workers: int = args.workers
+	if workers > 1 and follower is not None:
+		print(
+			"W trybie --follow plik wejściowy jest przetwarzany "
+			"w jednym procesie.",
+			file=sys.stderr,
+		)
+		workers = 1
+	if workers > 1 and not (
+		args.input.seekable() and os.path.isfile(args.input.name)
+	):
+		print(
+			"Plik wejściowy nie pozwala na ponowny odczyt - "
+			"zostanie przetworzony w jednym procesie.",
+			file=sys.stderr,
+		)
+		workers = 1
 
-	output: typing.Any = args.output or sys.stdout
-	if args.json:
-		output = utils.JSONWrapper(output, labels)
+	# Obiekt `converter` odczytuje z wierszy danych datę, walutę i kwotę
+	# transakcji i dodaje do nich kurs wymiany i kwotę w PLN. Jeżeli nie
+	# udało się wykryć formatu dat, przyjmujemy format daty właściwy dla
+	# ustawień językowych. Przy zbieraniu statystyk mierzony jest czas
+	# poszczególnych etapów przetwarzania wierszy - ale tylko w jednym
+	# procesie, gdyż procesy robocze nie przekazują statystyk.
+	snapshot: Snapshot|None = None
+	if args.snapshot:
+		from transactions2pln.snapshot import Snapshot
+		snapshot = Snapshot(args.snapshot)
+	converter_args: tuple[typing.Any, ...] = (
+		utils.TablesPool(
+			tmpdir, cache, args.max_years, stats=stats, snapshot=snapshot),
+		utils.DateParser('%x' if date_format is None else date_format, stats),
+		currency_code,
+		currency_column_idx or 0,
+		amount_column_idx,
+		date_column_idx,
+	)
+	converter: RowConverter
+	engine: str = args.engine
+	if engine == 'numpy' and follower is not None:
+		# Przetwarzanie partiami opóźniałoby zapis wyników do czasu
+		# dopisania do pliku całej partii wierszy.
+		print(
+			"W trybie --follow wiersze są przetwarzane pojedynczo.",
+			file=sys.stderr,
+		)
+		engine = 'row'
+	if engine == 'numpy':
+		# Moduł importujemy tylko w razie potrzeby, gdyż importuje on
+		# bibliotekę NumPy, która nie musi być zainstalowana.
+		from transactions2pln.vectorized import VectorizedConverter
+		converter = VectorizedConverter(*converter_args)
+	elif stats is not None and workers == 1:
+		converter = TimedRowConverter(stats, *converter_args)
 	else:
-		output = csv.writer(output)
+		converter = RowConverter(*converter_args)
+
+	# Opcjonalny wstępny przebieg przez plik wejściowy: odczytujemy jedynie
+	# daty i waluty, by ustalić, jakie tabele kursów będą potrzebne,
+	# i pobrać je równolegle jeszcze przed właściwym przetwarzaniem.
+	# Wymaga to możliwości powrotu na początek pliku, więc dla strumieni
+	# takich jak standardowe wejście ten krok jest pomijany, podobnie jak
+	# przy śledzeniu pliku. Przy przetwarzaniu w wielu procesach tabele są
+	# zawsze pobierane wcześniej.
+	if (
+		args.prefetch
+		and workers == 1
+		and follower is None
+		and args.input.seekable()
+	):
+		if checkpoint is not None:
+			# Wiersze odczytane w celu ustalenia potrzebnych tabel nie są
+			# uwzględniane w stanie przetwarzania.
+			converter.tables.prefetch(converter.get_needed_tables(
+				checkpoint.read_rows(args.input, mark=False)))
+			input = checkpoint.read_rows(args.input)
+		else:
+			converter.tables.prefetch(converter.get_needed_tables(input))
+			args.input.seek(0)
+			input = csv.reader(args.input)
+		if args.labels and not resumed:
+			next(input)
+
+	# Przy sumowaniu przetworzone wiersze są przekazywane obiektowi
+	# `aggregator` zamiast do zapisu, a zapisywane są jedynie wyniki dla
+	# każdej grupy, z nagłówkami ustalonymi na podstawie nagłówków danych.
+	aggregator: Aggregator|None = None
+	if aggregate:
+		from transactions2pln.aggregate import Aggregator
+		group_columns: list[int] = []
+		for column in args.group_by or []:
+			try:
+				column_idx: int|None = utils.get_column_index(column, labels)
+				assert column_idx is not None
+			except (AssertionError, ValueError) as err:
+				raise exc.ColumnParameterError('group-by', column) from err
+			group_columns.append(column_idx)
+		aggregator = Aggregator(
+			group_columns,
+			args.period,
+			converter.date_parser,
+			date_column_idx,
+			str(locale.localeconv()['decimal_point']),
+		)
 		if args.labels:
+			labels = aggregator.get_labels(labels)
+
+	# Dane wyjściowe są gromadzone w buforze o wielkości określonej przez
+	# parametr --buffer-size i zapisywane partiami, a nie wiersz po wierszu.
+	stream: utils.BufferedOutput = utils.BufferedOutput(
+		args.output or sys.stdout,
+		args.buffer_size or utils.BufferedOutput.DEFAULT_BUFFER_SIZE,
+	)
+	output: typing.Any
+	if columnar is not None:
+		# Moduł importujemy tylko w razie potrzeby, gdyż importuje on
+		# bibliotekę pyarrow, która nie musi być zainstalowana. Dane
+		# binarne zapisujemy bezpośrednio do bufora pliku wyjściowego.
+		from transactions2pln.columnar import ColumnarWriter
+		output = ColumnarWriter(
+			(args.output or sys.stdout).buffer,
+			columnar,
+			labels or None,
+			date_column_idx,
+			converter.date_parser,
+		)
+	elif args.json or args.ndjson:
+		output = utils.JSONWrapper(
+			stream, labels, args.ndjson, resumed) # type: ignore[arg-type]
+	else:
+		output = csv.writer(stream)
+		if args.labels and not resumed:
 			output.writerow(labels)
 
-	# W tej pętli `for` odbywa się przetwarzanie danych wejściowych.
-	# Zwróć uwagę, że jest dłuższa niż może się wydawać.
-	tables: utils.TablesManager
-	year: int|None = None
-	for row in input:
-		current_row += 1
-		row_date: date
-		if date_column_idx is not None:
-			# Jeżeli mamy kolumnę z datą, próbujemy odczytać jej wartość.
-			try:
-				row_date = datetime.strptime(
-					row[date_column_idx],
-					args.date_format,
-				).date()
-			except ValueError as err:
-				date_column_num = date_column_idx + 1
-				raise exc.RowProcessingError(
-					current_row,
-					f"wartość kolumny {date_column_num!s} nie pasuje "
-					"do formatu określonego w --date-format",
-				) from err
-		else:
-			# Jeżeli nie mamy kolumny, sprawdzamy każde kolejne pole
-			# w wierszu danych.
-			for cell in row:
-				try:
-					row_date = datetime.strptime(cell, args.date_format).date()
-				except ValueError:
-					continue
-				else:
-					break
-			if not row_date:
-				raise exc.RowProcessingError(
-					current_row,
-					"nie podano parametru --date-column i żadna wartość "
-					"nie pasuje do formatu określonego w --date-format.",
-				)
-		# Jeżeli data wypada w sobotę i niedzielę, zmieniamy ją na piątek.
-		# Odjęcie 4 od numeru dnia tygodnia oznacza, że sobota będzie miałą
-		# wartość 1, niedziela 2, pozostałe dni tygodnia - 0 i mniej.
-		# Wywołanie `max()` ustawia 0 dla pozostałych dni tygodnia.
-		# Następnie odejmujemy tyle dni, ile wynosi ta wartość, a więc
-		# jeżeli była to sobota lub niedziela, uzyskujemy ostatni piątek.
-		weekend_days: int = max(row_date.weekday() - 4, 0)
-		week_date: date = row_date - timedelta(days=weekend_days)
-
-		# Ustawiamy rok, ale tylko, jeżeli nie został jeszcze ustawiony.
-		if year is None:
-			year = week_date.year
-			tables = utils.TablesManager(tmpdir, year)
-
-		currency: str = get_currency(row)
-		try:
-			exchange: decimal.Decimal = tables.get_exchange_ratio(
-				currency, week_date)
-		except Exception as err:
-			raise exc.RowProcessingError(current_row, str(err)) from err
-
-		amount: str|decimal.Decimal
-		if amount_column_idx:
-			amount = row[amount_column_idx]
-		else:
-			# Jeżeli nie podano kolumny z wartością, przyjmujemy domyślnie,
-			# że jest nią ostatnia kolumna w pliku wejściowym.
-			amount = row[-1]
+	# Przetworzone wiersze - w jednym procesie przetwarzane są kolejno,
+	# w wielu procesach otrzymujemy je w pierwotnej kolejności, fragmentami.
+	# Pozycja w pliku wejściowym służy do raportowania postępu. W wielu
+	# procesach jest to koniec ostatniego fragmentu, z którego zapisano
+	# wiersze.
+	reporter: ProgressReporter|None = None
+	input_position: typing.Callable[[], int]|None = None
+	chunk_end: int|None = None
 
-		# Obliczanie kwoty transakcji w PLN.
-		try:
-			amount = decimal.Decimal(amount)
-			amount_pln: decimal.Decimal = (amount * exchange).quantize(
-				decimal.Decimal('0.01'))
-		except decimal.InvalidOperation as err:
-			raise exc.RowProcessingError(
-				current_row,
-				f"kwota {amount!s} przekracza ustawioną precyzję "
-				"działań arytmetycznych"
-			) from err
-		# Dodajemy uzyskany kurs i kwotę transakcji do wiersza danych...
-		row.append(_str_from_decimal(exchange))
-		row.append(_str_from_decimal(amount_pln))
-		# ...i zapisujemy w pliku wyjściowym.
-		try:
-			output.writerow(row)
-		except AttributeError:
-			output.write(''.join(row))
-	# Tutaj kończy się pętla `for`.
-
-	if args.json:
-		output.writeend()
-	if args.output:
-		args.output.close()
+	def set_chunk_end(end: int) -> None:
+		nonlocal chunk_end
+		chunk_end = end
+		# Stan przetwarzania w wielu procesach może zostać zapisany tylko
+		# na końcu fragmentu, więc wszystkie jego wiersze, które są już
+		# w `batch`, zapisujemy od razu.
+		if checkpoint is not None:
+			checkpoint.mark(current_row + written + len(batch), end)
+			write_batch(False)
+
+	def position() -> int|None:
+		if input_position is not None:
+			return input_position()
+		return chunk_end
+
+	if args.progress:
+		from transactions2pln import progress
+		# Postęp odczytu pliku skompresowanego jest mierzony w danych
+		# skompresowanych, tak jak jego wielkość.
+		input_file: typing.IO[typing.Any] = args.input
+		if isinstance(args.input, compression.CompressedFile):
+			input_file = args.input.compressed
+		reporter = progress.ProgressReporter(
+			sys.stderr,
+			progress.input_size(input_file),
+			args.progress,
+			args.progress_interval,
+		)
+		if checkpoint is not None:
+			input_position = checkpoint.position
+		elif workers == 1:
+			input_position = progress.input_position(input_file)
+		reporter.start()
+
+	rows: typing.Iterator[list[str]]
+	if workers > 1:
+		from transactions2pln import parallel
+		start: int = 0
+		start_row: int = 0
+		if checkpoint is not None:
+			start, start_row = checkpoint.input_offset, checkpoint.rows
+		rows = itertools.chain.from_iterable(parallel.convert_file(
+			converter,
+			args.input,
+			workers,
+			current_row - start_row,
+			progress=(
+				None if reporter is None and checkpoint is None
+				else set_chunk_end
+			),
+			start=start,
+			start_row=start_row,
+		))
+	else:
+		if stats is not None:
+			input = stats.timed(input, 'read')
+		rows = converter.convert_rows(input, current_row)
+
+	# Parametr --flush określa, co ile wierszy dane mają być zapisywane
+	# i opróżniane z bufora. Wartość 0 oznacza opróżnienie bufora dopiero
+	# na końcu, a wiersze są wtedy przekazywane do zapisu partiami
+	# o wielkości `_BATCH_SIZE`.
+	batch: list[list[str]] = []
+	batch_size: int = args.flush or _BATCH_SIZE
+	written: int = 0
+
+	def write_batch(flush: bool) -> None:
+		nonlocal written
+		with timer(stats, 'write'):
+			if aggregator is not None:
+				aggregator.update(batch)
+			else:
+				output.writerows(batch)
+			if flush:
+				stream.flush()
+		written += len(batch)
+		if stats is not None:
+			stats.count('rows', len(batch))
+		if reporter is not None:
+			reporter.update(written, position())
+		batch.clear()
+		# Stan przetwarzania zapisujemy co pewien czas, o ile znamy pozycję
+		# w pliku wejściowym za ostatnim zapisanym wierszem.
+		if (
+			checkpoint is not None
+			and checkpoint.advance(current_row + written)
+			and checkpoint.due()
+		):
+			with timer(stats, 'write'):
+				stream.flush()
+				checkpoint.commit(args.output)
+
+	# Przy śledzeniu pliku wyniki są zapisywane przed każdym oczekiwaniem
+	# na nowe wiersze. Tabele za bieżący rok są uzupełniane w każdym dniu
+	# roboczym, więc co pewien czas wczytujemy je ponownie.
+	refreshed: float = time.monotonic()
+
+	def wait_for_input() -> None:
+		nonlocal refreshed
+		write_batch(True)
+		if time.monotonic() - refreshed >= TablesCache.DEFAULT_MAX_AGE:
+			converter.tables.discard(date.today().year)
+			refreshed = time.monotonic()
+
+	if follower is not None:
+		follower.on_wait = wait_for_input
+
+	completed: bool = False
+	try:
+		for row in rows:
+			batch.append(row)
+			if len(batch) >= batch_size:
+				write_batch(bool(args.flush))
+		completed = True
+	finally:
+		# Zapisujemy wszystkie przetworzone wiersze, również jeżeli
+		# przetwarzanie zostało przerwane przez błąd.
+		write_batch(True)
+		if aggregator is not None:
+			with timer(stats, 'write'):
+				output.writerows(aggregator.get_rows())
+				stream.flush()
+		if checkpoint is not None:
+			with timer(stats, 'write'):
+				checkpoint.commit(args.output)
+		# Plik w formacie kolumnowym, którego zapis nie został zakończony,
+		# nie daje się odczytać.
+		if columnar is not None:
+			with timer(stats, 'write'):
+				output.writeend()
+		if reporter is not None:
+			reporter.finish(written, position(), error=not completed)
+
+	with timer(stats, 'write'):
+		if args.json or args.ndjson:
+			output.writeend()
+		stream.flush()
+		if args.output:
+			args.output.close()
+
+	if stats is not None:
+		print(stats.format(args.stats), file=sys.stderr)
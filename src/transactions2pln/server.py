@@ -0,0 +1,514 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Serwer HTTP przeliczający transakcje na PLN.
+
+Każde uruchomienie programu `transactions2pln` wymaga uruchomienia
+interpretera, zaimportowania modułów oraz pobrania i wczytania tabel kursów.
+Ten moduł pozwala uruchomić długo działający serwer, który przechowuje
+wczytane tabele kursów w pamięci, dzięki czemu obsługa niewielkich żądań
+trwa milisekundy. Serwer obsługuje następujące żądania:
+
+`POST /convert` -- Przelicza transakcje z treści żądania i zwraca je
+z dodanym kursem i kwotą w PLN. Treść żądania jest w formacie CSV albo,
+jeżeli nagłówek `Content-Type` to `application/x-ndjson`, NDJSON - gdzie
+każda linia zawiera tablicę wartości albo obiekt, którego klucze są
+nagłówkami kolumn. Wyniki są przesyłane w miarę przetwarzania, w formacie
+danych wejściowych albo określonym parametrem `format` (`csv`, `json` lub
+`ndjson`). Pozostałe parametry odpowiadają opcjom wiersza poleceń: `currency`,
+`amount-column`, `date-column`, `date-format`, `labels` (`1` lub `0`, jak
+brak opcji --no-labels albo jej podanie; domyślnie `1` dla danych CSV i `0`
+dla NDJSON) oraz `decimal-point` - separator dziesiętny w wynikach.
+`GET /rate` -- Zwraca obiekt JSON z kursem waluty `currency` w dniu `date`
+(w formacie RRRR-MM-DD), takim jak dodawany do transakcji z tego dnia.
+
+Błędy parametrów i danych wykryte przed wysłaniem wyników są zwracane jako
+obiekt JSON z kluczem `error`, ze statusem 400, a błędy pobierania tabel
+kursów - ze statusem 502. Błąd przetwarzania wykryty już w trakcie
+przesyłania wyników przerywa połączenie bez zakończenia odpowiedzi, przez co
+klient otrzymuje niekompletną odpowiedź.
+
+Zawiera następujące klasy i funkcje:
+`ConversionServer` -- Serwer HTTP przechowujący tabele kursów w pamięci.
+`RequestHandler` -- Klasa obsługująca żądania HTTP.
+`run` -- Uruchamia serwer jako program wiersza poleceń.
+"""
+import codecs
+import csv
+import itertools
+import json
+import sys
+import threading
+import time
+import typing
+from argparse import ArgumentParser, Namespace
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from transactions2pln import api, exceptions as exc, utils
+from transactions2pln.cache import TablesCache, default_cache_dir
+from transactions2pln.snapshot import Snapshot
+
+# Typy treści dla obsługiwanych formatów danych.
+CONTENT_TYPES: dict[str, str] = {
+	'csv': 'text/csv',
+	'json': 'application/json',
+	'ndjson': 'application/x-ndjson',
+}
+# Typy treści żądania, które są traktowane jako dane w formacie NDJSON.
+_NDJSON_CONTENT_TYPES: frozenset[str] = frozenset((
+	'application/x-ndjson',
+	'application/ndjson',
+	'application/jsonl',
+	'application/json-lines',
+))
+# Komunikat błędu dla wiersza danych, w którym brakuje wymaganych kolumn.
+_SHORT_ROW_MESSAGE: str = "wiersz danych zawiera za mało kolumn."
+
+
+class _ChunkedWriter():
+	# Zapisuje łańcuchy do strumienia odpowiedzi HTTP jako kolejne fragmenty
+	# w kodowaniu `chunked`, dzięki czemu wyniki mogą być przesyłane zanim
+	# znana jest ich łączna długość.
+
+	def __init__(self, file: typing.BinaryIO) -> None:
+		self._file: typing.BinaryIO = file
+
+	def write(self, data: str) -> int:
+		encoded: bytes = data.encode('utf-8')
+		if encoded:
+			self._file.write(b'%x\r\n%b\r\n' % (len(encoded), encoded))
+		return len(data)
+
+	def flush(self) -> None:
+		self._file.flush()
+
+	def close(self) -> None:
+		# Fragment o zerowej długości oznacza koniec odpowiedzi.
+		self._file.write(b'0\r\n\r\n')
+		self._file.flush()
+
+
+def _read_lines(
+		file: typing.BinaryIO,
+		length: int,
+		encoding: str,
+	) -> typing.Iterator[str]:
+	# Odczytuje kolejne linie z treści żądania o długości `length` bajtów.
+	while length > 0:
+		line: bytes = file.readline(length)
+		if not line:
+			break
+		length -= len(line)
+		yield line.decode(encoding)
+
+
+def _to_string(value: typing.Any) -> str:
+	# Zamienia wartość z obiektu JSON na łańcuch, jak w danych CSV.
+	if isinstance(value, str):
+		return value
+	if value is None:
+		return ''
+	return json.dumps(value)
+
+
+def _check_ndjson(
+		values: typing.Iterable[typing.Any],
+		value_type: type,
+	) -> typing.Iterator[typing.Any]:
+	# Zwraca kolejne wartości z linii NDJSON, zgłaszając `ValueError`, jeżeli
+	# któraś z nich nie jest typu `value_type` - takiego jak w pierwszej linii.
+	for number, value in enumerate(values, 1):
+		if not isinstance(value, value_type):
+			raise ValueError(
+				f"wiersz {number} danych NDJSON musi zawierać "
+				f"{'obiekt' if value_type is dict else 'tablicę'} JSON, "
+				"tak jak pierwszy wiersz."
+			)
+		yield value
+
+
+def _read_ndjson(
+		lines: typing.Iterator[str],
+	) -> tuple[typing.Iterator[list[str]], bool]:
+	# Zamienia linie w formacie NDJSON na wiersze danych. Zwraca iterator
+	# wierszy i wartość logiczną określającą, czy pierwszy wiersz zawiera
+	# nagłówki kolumn - tak jest, gdy linie zawierają obiekty.
+	values: typing.Iterator[typing.Any] = (
+		json.loads(line) for line in lines if line.strip())
+	end: object = object()
+	first: typing.Any = next(values, end)
+	if first is end:
+		return iter(()), False
+	if not isinstance(first, (dict, list)):
+		raise ValueError(
+			"wiersze danych NDJSON muszą zawierać obiekty albo tablice JSON.")
+	values = _check_ndjson(itertools.chain([first], values), type(first))
+	if isinstance(first, dict):
+		keys: list[str] = list(first)
+		return itertools.chain(
+			[keys],
+			([_to_string(value.get(key)) for key in keys] for value in values),
+		), True
+	return ([_to_string(item) for item in value] for value in values), False
+
+
+class ConversionServer(ThreadingHTTPServer):
+	"""Serwer HTTP przeliczający transakcje na PLN.
+
+	Każde żądanie jest obsługiwane w osobnym wątku, a wszystkie wątki
+	korzystają z tego samego obiektu `api.Rates`, więc tabela potrzebna
+	w kilku jednoczesnych żądaniach jest pobierana tylko raz.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`BUFFER_SIZE` -- Wielkość fragmentów, w których przesyłane są wyniki,
+	w znakach.
+	`rates` -- Obiekt klasy `api.Rates`, z którego odczytywane są kursy.
+	`refresh_interval` -- Czas w sekundach, co który tabele za bieżący rok
+	są wczytywane ponownie.
+	`refresh` -- Metoda usuwająca z pamięci nieaktualne tabele za bieżący rok.
+	"""
+	BUFFER_SIZE: int = 64 * 1024
+	# Wątki obsługujące żądania nie wstrzymują zatrzymania programu.
+	daemon_threads = True
+
+	def __init__(
+			self,
+			address: tuple[str, int],
+			rates: api.Rates,
+			refresh_interval: float = TablesCache.DEFAULT_MAX_AGE,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `ConversionServer`.
+
+		Przyjmuje następujące parametry:
+		`address` -- Para złożona z adresu i numeru portu, na którym serwer
+		przyjmuje połączenia.
+		`rates` -- Obiekt klasy `api.Rates`, z którego odczytywane są kursy.
+		`refresh_interval` -- Opcjonalnie, czas w sekundach, co który tabele
+		za bieżący rok są wczytywane ponownie, gdyż NBP uzupełnia je o nowe
+		kursy w każdym dniu roboczym.
+		"""
+		super().__init__(address, RequestHandler)
+		self.rates: api.Rates = rates
+		self.refresh_interval: float = refresh_interval
+		self._refreshed: float = time.monotonic()
+		self._refresh_lock: threading.Lock = threading.Lock()
+
+	def refresh(self) -> None:
+		"""Usuwa z pamięci tabele za bieżący rok, jeżeli od poprzedniego
+		usunięcia minęło co najmniej `refresh_interval` sekund. Zostaną one
+		wczytane ponownie przy kolejnym odczycie kursu z bieżącego roku."""
+		now: float = time.monotonic()
+		if now - self._refreshed < self.refresh_interval:
+			return
+		# Tabele usuwa tylko jeden z jednocześnie obsługiwanych wątków.
+		with self._refresh_lock:
+			if now - self._refreshed >= self.refresh_interval:
+				self.rates.tables.discard(date.today().year)
+				self._refreshed = now
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+	"""Klasa obsługująca żądania HTTP przesyłane do `ConversionServer`.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`do_GET` -- Metoda obsługująca żądania odczytu kursu.
+	`do_POST` -- Metoda obsługująca żądania przeliczenia transakcji.
+	"""
+	# HTTP/1.1 pozwala na ponowne użycie połączenia w kolejnych żądaniach
+	# i przesyłanie wyników fragmentami.
+	protocol_version = 'HTTP/1.1'
+	# Wyniki są przesyłane w wielu małych fragmentach, których wysłanie
+	# nie powinno być opóźniane w oczekiwaniu na kolejne dane.
+	disable_nagle_algorithm = True
+	server: ConversionServer
+
+	def do_GET(self) -> None:
+		"""Obsługuje żądanie `GET /rate`."""
+		url = urlsplit(self.path)
+		if url.path != '/rate':
+			self._send_error(HTTPStatus.NOT_FOUND, "nieznana ścieżka.")
+			return
+		params: dict[str, str] = dict(parse_qsl(url.query))
+		currency: str = params.get('currency', '')
+		try:
+			check_date: date = date.fromisoformat(params.get('date', ''))
+		except ValueError:
+			self._send_error(
+				HTTPStatus.BAD_REQUEST,
+				"parametr date musi zawierać datę w formacie RRRR-MM-DD.",
+			)
+			return
+		self.server.refresh()
+		try:
+			rate = self.server.rates.get_exchange_ratio(currency, check_date)
+		except ValueError as err:
+			self._send_error(HTTPStatus.NOT_FOUND, str(err))
+			return
+		except OSError as err:
+			self._send_error(HTTPStatus.BAD_GATEWAY, str(err))
+			return
+		self._send_json(HTTPStatus.OK, {
+			'currency': currency,
+			'date': check_date.isoformat(),
+			'rate': str(rate),
+		})
+
+	def do_POST(self) -> None:
+		"""Obsługuje żądanie `POST /convert`."""
+		# Treść żądania może nie zostać odczytana w całości, więc połączenie
+		# jest zamykane po odpowiedzi innej niż wyniki przetwarzania.
+		self.close_connection = True
+		url = urlsplit(self.path)
+		if url.path != '/convert':
+			self._send_error(HTTPStatus.NOT_FOUND, "nieznana ścieżka.")
+			return
+		try:
+			length: int = int(self.headers['Content-Length'])
+			assert length >= 0
+		except (AssertionError, TypeError, ValueError):
+			self._send_error(
+				HTTPStatus.LENGTH_REQUIRED,
+				"żądanie musi zawierać nagłówek Content-Length.",
+			)
+			return
+		params: dict[str, str] = dict(parse_qsl(url.query))
+		# Treść żądania jest dekodowana dopiero w trakcie odczytu, więc
+		# kodowanie znaków sprawdzamy wcześniej.
+		encoding: str = self.headers.get_content_charset('utf-8')
+		try:
+			codecs.lookup(encoding)
+		except LookupError:
+			self._send_error(
+				HTTPStatus.BAD_REQUEST,
+				f"nieznane kodowanie znaków '{encoding}' "
+				"w nagłówku Content-Type.",
+			)
+			return
+		lines: typing.Iterator[str] = _read_lines(self.rfile, length, encoding)
+
+		try:
+			rows: typing.Iterator[list[str]]
+			labels: bool
+			input_format: str
+			if self.headers.get_content_type() in _NDJSON_CONTENT_TYPES:
+				rows, labels = _read_ndjson(lines)
+				labels = labels or params.get('labels') == '1'
+				input_format = 'ndjson'
+			else:
+				rows = csv.reader(lines)
+				labels = params.get('labels', '1') != '0'
+				input_format = 'csv'
+			output_format: str = params.get('format', input_format)
+			if output_format not in CONTENT_TYPES:
+				raise ValueError(
+					"parametr format musi mieć wartość csv, json albo ndjson.")
+			converted: typing.Iterator[list[str]] = api.convert_rows(
+				rows,
+				self.server.rates,
+				params.get('currency', 'USD'),
+				amount_column=params.get('amount-column') or None,
+				date_column=params.get('date-column') or None,
+				date_format=params.get('date-format') or None,
+				labels=labels,
+				decimal_point=params.get('decimal-point', ','),
+			)
+			self.server.refresh()
+			# Błędy parametrów są zgłaszane przy pobraniu pierwszego wiersza
+			# danych, więc pobieramy go przed wysłaniem odpowiedzi.
+			head: list[list[str]] = list(
+				itertools.islice(converted, 2 if labels else 1))
+		except (ValueError, exc.RowProcessingError) as err:
+			# Błąd pobierania tabeli kursów jest zgłaszany jako błąd
+			# przetwarzania wiersza, ale nie jest błędem danych.
+			status: HTTPStatus = HTTPStatus.BAD_REQUEST
+			if isinstance(err.__cause__, OSError):
+				status = HTTPStatus.BAD_GATEWAY
+			self._send_error(status, str(err))
+			return
+		except IndexError:
+			self._send_error(HTTPStatus.BAD_REQUEST, _SHORT_ROW_MESSAGE)
+			return
+
+		self.send_response(HTTPStatus.OK)
+		self.send_header(
+			'Content-Type', CONTENT_TYPES[output_format] + '; charset=utf-8')
+		self.send_header('Transfer-Encoding', 'chunked')
+		self.end_headers()
+		writer: _ChunkedWriter = _ChunkedWriter(self.wfile)
+		stream: utils.BufferedOutput = utils.BufferedOutput(
+			writer, self.server.BUFFER_SIZE) # type: ignore[arg-type]
+		output: typing.Any
+		if output_format == 'csv':
+			output = csv.writer(stream)
+		else:
+			output = utils.JSONWrapper(
+				stream, # type: ignore[arg-type]
+				head.pop(0) if labels and head else None,
+				output_format == 'ndjson',
+			)
+		try:
+			output.writerows(head)
+			for row in converted:
+				output.writerow(row)
+		except (ValueError, IndexError, exc.RowProcessingError) as err:
+			# Odpowiedź została już rozpoczęta, więc nie można zmienić jej
+			# statusu. Przesyłamy przetworzone wiersze i przerywamy połączenie
+			# bez zakończenia odpowiedzi.
+			stream.flush()
+			self.log_error(
+				"%s",
+				_SHORT_ROW_MESSAGE if isinstance(err, IndexError) else str(err),
+			)
+			return
+		if output_format != 'csv':
+			output.writeend()
+		stream.flush()
+		writer.close()
+		self.close_connection = False
+
+	def _send_json(self, status: HTTPStatus, value: typing.Any) -> None:
+		body: bytes = json.dumps(value, ensure_ascii=False).encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json; charset=utf-8')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def _send_error(self, status: HTTPStatus, message: str) -> None:
+		self._send_json(status, {'error': message})
+
+
+def run() -> int:
+	"""Uruchamia serwer jako program wiersza poleceń.
+
+	Serwer działa aż do przerwania klawiszami Ctrl+C. Zwraca 0, jeśli
+	został zatrzymany w ten sposób, 2 przy błędzie systemu (np. gdy port
+	jest zajęty) lub 1 przy innym błędzie. Komunikaty błędów są zapisywane
+	do standardowego strumienia błędów.
+	"""
+	argparser: ArgumentParser = ArgumentParser(
+		prog="transactions2pln-serve",
+		description="""
+			Uruchamia serwer HTTP przeliczający transakcje na PLN,
+			przechowujący tabele kursów w pamięci.
+		""",
+	)
+	argparser.add_argument(
+		'--host',
+		default='127.0.0.1',
+		help="Adres, na którym serwer przyjmuje połączenia. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'--port',
+		default=8080,
+		type=int,
+		help="Port, na którym serwer przyjmuje połączenia. Domyślnie: %(default)s.",
+	)
+	argparser.add_argument(
+		'--preload',
+		nargs='*',
+		type=int,
+		metavar='YEAR',
+		help="""
+			Lata, z których tabele kursów są wczytywane przy uruchomieniu
+			serwera. Tabele z pozostałych lat są wczytywane przy pierwszym
+			użyciu. Domyślnie: bieżący rok.
+		""",
+	)
+	argparser.add_argument(
+		'--max-years',
+		default=30,
+		type=int,
+		help="""
+			Najwyższa liczba lat, z których tabele kursów są jednocześnie
+			przechowywane w pamięci. Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'--refresh',
+		default=TablesCache.DEFAULT_MAX_AGE,
+		type=float,
+		metavar='SECONDS',
+		help="""
+			Co ile sekund ponownie wczytywać tabele kursów za bieżący rok,
+			uzupełniane przez NBP w każdym dniu roboczym. Domyślnie: %(default)s.
+		""",
+	)
+	argparser.add_argument(
+		'--snapshot',
+		metavar='FILE',
+		help="""
+			Odczytuj kursy z pliku FILE zawierającego migawkę kursów, tworzonego
+			poleceniem "transactions2pln-snapshot build".
+		""",
+	)
+	argparser.add_argument(
+		'--cache-dir',
+		help="""
+			Katalog w którym przechowywane są pobrane tabele kursów NBP.
+			Domyślnie: %s
+		""" % default_cache_dir().replace('%', '%%'),
+	)
+	argparser.add_argument(
+		'--no-cache',
+		dest='cache',
+		action='store_false',
+		help="""
+			Nie używaj pamięci podręcznej - pobierz tabele kursów NBP
+			do katalogu tymczasowego i usuń je po zatrzymaniu serwera.
+		""",
+	)
+	args: Namespace = argparser.parse_args()
+
+	try:
+		tables_cache: TablesCache|None = None
+		if args.cache:
+			tables_cache = TablesCache(args.cache_dir or default_cache_dir())
+		snapshot: Snapshot|None = None
+		if args.snapshot:
+			snapshot = Snapshot(args.snapshot)
+		with api.Rates(tables_cache, args.max_years, snapshot) as rates:
+			rates.preload(
+				[date.today().year] if args.preload is None else args.preload)
+			with ConversionServer(
+				(args.host, args.port), rates, args.refresh,
+			) as server:
+				host: str|bytes = server.server_address[0]
+				if isinstance(host, bytes):
+					host = host.decode()
+				print(
+					"Serwer przyjmuje połączenia pod adresem "
+					f"http://{host}:{server.server_address[1]}/",
+					file=sys.stderr,
+				)
+				server.serve_forever()
+	except KeyboardInterrupt:
+		return 0
+	except Exception as err:
+		if sys.flags.dev_mode:
+			raise
+		print(str(err), file=sys.stderr)
+		return 2 if isinstance(err, OSError) else 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run())
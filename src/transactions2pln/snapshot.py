@@ -0,0 +1,549 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Migawka kursów NBP - binarny plik z kursami mapowany do pamięci.
+
+Odczyt kursów z plików CSV publikowanych przez NBP wymaga parsowania
+wszystkich wierszy tabel przy każdym uruchomieniu programu. Ten moduł
+pozwala zapisać kursy z wielu lat w jednym pliku binarnym o stałym układzie
+(migawce kursów), który jest następnie mapowany do pamięci. Otwarcie migawki
+jest natychmiastowe, odczyt kursu nie wymaga parsowania, a zawartość pliku
+jest współdzielona przez wszystkie korzystające z niej procesy za
+pośrednictwem pamięci podręcznej systemu operacyjnego.
+
+Plik migawki składa się z następujących części, w których liczby są zapisane
+w kolejności bajtów little-endian:
+`HEADER` -- Nagłówek zawierający sygnaturę `MAGIC`, wersję formatu, pierwszy
+rok, liczbę lat, liczbę walut, datę utworzenia migawki (jako liczbę
+porządkową zgodną z `date.toordinal()`) i sumę kontrolną CRC-32 pozostałej
+części pliku.
+Indeks walut -- Dla każdej waluty 4 bajty: kod ISO 4217 i oznaczenie tabeli
+NBP. Indeks jest uzupełniony zerami do wielokrotności 8 bajtów.
+Tablice kursów -- Dla każdej waluty z indeksu, w tej samej kolejności,
+tablica 64-bitowych liczb całkowitych, po jednej dla każdego dnia kolejnych
+lat, poczynając od 1 stycznia pierwszego roku. Liczba zawiera kurs
+obowiązujący w danym dniu zapisany jako liczba całkowita przesunięta o 4
+bity, a w 4 najmłodszych bitach - liczbę jego cyfr po przecinku. Wartość -1
+oznacza, że migawka nie zawiera kursu dla tego dnia.
+
+Zawiera następujące klasy i funkcje:
+`Snapshot` -- Klasa udostępniająca kursy zapisane w pliku migawki.
+`build` -- Funkcja tworząca plik migawki z tabel kursów NBP.
+`update` -- Funkcja tworząca ponownie plik migawki z aktualnych tabel.
+`verify` -- Funkcja sprawdzająca poprawność pliku migawki.
+`run` -- Obsługuje program wiersza poleceń `transactions2pln-snapshot`.
+"""
+import mmap
+import os
+import struct
+import sys
+import typing
+import zlib
+from array import array
+from datetime import date
+from decimal import Context, Decimal
+
+if typing.TYPE_CHECKING:
+	from transactions2pln.utils import TablesPool
+
+MAGIC: bytes = b'T2PS'
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct('<4sHHHHII4x')
+
+# Wartość oznaczająca brak kursu.
+_MISSING: int = -1
+_VALUE: struct.Struct = struct.Struct('<q')
+# Liczba bitów, na których zapisana jest liczba cyfr kursu po przecinku.
+_PLACES_BITS: int = 4
+# Kontekst pozwalający dokładnie odtworzyć każdy zapisany kurs, niezależnie
+# od kontekstu arytmetycznego programu.
+_CONTEXT: Context = Context(prec=38)
+
+
+def _encode(rate: Decimal) -> int:
+	# Zamienia kurs na liczbę całkowitą zapisywaną w migawce.
+	sign, digits, exponent = rate.as_tuple()
+	places: int = -exponent # type: ignore[operator]
+	mantissa: int = int(''.join(map(str, digits)))
+	if sign or not 0 <= places < 1 << _PLACES_BITS or mantissa >> 58:
+		raise ValueError(f"kursu {rate} nie można zapisać w migawce kursów.")
+	return mantissa << _PLACES_BITS | places
+
+
+def _decode(value: int) -> Decimal:
+	# Odtwarza kurs zapisany funkcją `_encode()`.
+	return Decimal(value >> _PLACES_BITS).scaleb(
+		-(value & (1 << _PLACES_BITS) - 1), _CONTEXT)
+
+
+def _index_size(currency_count: int) -> int:
+	# Wielkość indeksu walut w bajtach, wraz z wyrównaniem.
+	return (4 * currency_count + 7) // 8 * 8
+
+
+def _days(first_year: int, year_count: int) -> int:
+	# Liczba dni w kolejnych latach.
+	return (
+		date(first_year + year_count, 1, 1).toordinal()
+		- date(first_year, 1, 1).toordinal()
+	)
+
+
+class Snapshot():
+	"""Kursy NBP odczytywane z pliku migawki mapowanego do pamięci.
+
+	Obiekty tej klasy mogą być przekazywane do innych procesów - otwierają
+	wtedy ponownie ten sam plik. Można ich też używać jako menedżera
+	kontekstu, który po wyjściu z bloku `with` zamyka plik.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`path` -- Łańcuch zawierający ścieżkę do pliku migawki.
+	`first_year` -- Pierwszy rok, z którego kursy zawiera migawka.
+	`last_year` -- Ostatni rok, z którego kursy zawiera migawka.
+	`created` -- Data utworzenia migawki.
+	`currencies` -- Słownik, w którym kluczami są kody walut zawartych
+	w migawce, a wartościami oznaczenia tabel NBP.
+	`covers` -- Metoda sprawdzająca, czy migawka zawiera kursy z danego roku.
+	`get_rate` -- Metoda zwracająca kurs w PLN wybranej waluty w wybranym
+	dniu albo `None`, jeśli migawka go nie zawiera.
+	`check` -- Metoda sprawdzająca sumę kontrolną pliku.
+	`close` -- Metoda zamykająca plik.
+	"""
+
+	def __init__(self, path: str) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Snapshot`.
+
+		Przyjmuje jeden parametr, `path`, będący ścieżką do pliku migawki.
+		Jeżeli plik nie jest prawidłową migawką kursów, zgłasza wyjątek
+		`ValueError`.
+		"""
+		self.path: str = path
+		invalid: str = f"plik {path} nie jest prawidłową migawką kursów."
+		with open(path, 'rb') as file:
+			try:
+				self._map: mmap.mmap = mmap.mmap(
+					file.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError as err:
+				# Pustego pliku nie można zmapować.
+				raise ValueError(invalid) from err
+		try:
+			if len(self._map) < HEADER.size:
+				raise ValueError(invalid)
+			magic, version, first_year, year_count, currency_count, created, (
+				self._checksum) = HEADER.unpack_from(self._map)
+			if magic != MAGIC:
+				raise ValueError(invalid)
+			if version != VERSION:
+				raise ValueError(
+					f"plik {path} zawiera migawkę kursów w nieobsługiwanej "
+					f"wersji {version}."
+				)
+			self.first_year: int = first_year
+			self.last_year: int = first_year + year_count - 1
+			self.created: date = date.fromordinal(created)
+			self._first_day: int = date(first_year, 1, 1).toordinal()
+			self._days: int = _days(first_year, year_count)
+			data_start: int = HEADER.size + _index_size(currency_count)
+			if len(self._map) != data_start + currency_count * self._days * 8:
+				raise ValueError(invalid)
+			self.currencies: dict[str, str] = {}
+			# Położenie tablicy kursów każdej waluty w pliku.
+			self._offsets: dict[str, int] = {}
+			for i in range(currency_count):
+				entry: str = self._map[
+					HEADER.size + 4 * i:HEADER.size + 4 * i + 4].decode('ascii')
+				self.currencies[entry[:3]] = entry[3]
+				self._offsets[entry[:3]] = data_start + i * self._days * 8
+		except BaseException:
+			self._map.close()
+			raise
+
+	def __getstate__(self) -> dict[str, typing.Any]:
+		# Zmapowanego pliku nie można serializować - obiekt przekazany
+		# do innego procesu otwiera go ponownie.
+		return {'path': self.path}
+
+	def __setstate__(self, state: dict[str, typing.Any]) -> None:
+		self.__init__(state['path']) # type: ignore[misc]
+
+	def __enter__(self) -> 'Snapshot':
+		return self
+
+	def __exit__(self, *exc_info: typing.Any) -> None:
+		self.close()
+
+	def covers(self, year: int) -> bool:
+		"""Sprawdza, czy migawka zawiera kursy z roku `year`."""
+		return self.first_year <= year <= self.last_year
+
+	def get_rate(self, currency: str, check_date: date) -> Decimal|None:
+		"""Zwraca kurs waluty `currency` z dnia `check_date`, wyrażony w PLN,
+		taki jak zwracany przez `utils.TablesPool.get_exchange_ratio()`.
+
+		Jeżeli migawka nie zawiera tego kursu, zwraca `None`. Dotyczy to
+		również dni z bieżącego roku, w których kurs nie był jeszcze
+		opublikowany w chwili utworzenia migawki.
+		"""
+		offset: int|None = self._offsets.get(currency)
+		day: int = check_date.toordinal() - self._first_day
+		if offset is None or not 0 <= day < self._days:
+			return # type: ignore[return-value]
+		value: int = _VALUE.unpack_from(self._map, offset + day * 8)[0]
+		if value == _MISSING:
+			return # type: ignore[return-value]
+		return _decode(value)
+
+	def check(self) -> None:
+		"""Sprawdza sumę kontrolną pliku. Jeżeli jest nieprawidłowa, zgłasza
+		wyjątek `ValueError`."""
+		with memoryview(self._map) as view, view[HEADER.size:] as data:
+			if zlib.crc32(data) != self._checksum:
+				raise ValueError(
+					f"nieprawidłowa suma kontrolna migawki kursów {self.path}.")
+
+	def close(self) -> None:
+		"""Zamyka plik migawki."""
+		self._map.close()
+
+	def _get_column(self, currency: str) -> 'array[int]':
+		# Zwraca tablicę zapisanych kursów waluty `currency`.
+		offset: int = self._offsets[currency]
+		column: array[int] = array('q', self._map[offset:offset + self._days * 8])
+		if sys.byteorder == 'big':
+			column.byteswap()
+		return column
+
+
+def _collect(
+		tables: 'TablesPool',
+		first_year: int,
+		last_year: int,
+		created: date,
+	) -> 'dict[str, tuple[str, array[int]]]':
+	# Odczytuje z tabel NBP kursy z lat od `first_year` do `last_year`
+	# i zwraca słownik, w którym kluczami są kody walut, a wartościami
+	# oznaczenia tabel i tablice kursów do zapisania w migawce.
+	first_day: int = date(first_year, 1, 1).toordinal()
+	days: int = _days(first_year, last_year - first_year + 1)
+	columns: dict[str, tuple[str, array[int]]] = {}
+	for year in range(first_year, last_year + 1):
+		manager = tables.get_manager(year)
+		year_start: int = date(year, 1, 1).toordinal()
+		for table, currencies in manager.CURRENCY_MAP.items():
+			# Kursy z dni po ostatniej publikacji w bieżącym roku nie są
+			# zapisywane, gdyż NBP może jeszcze opublikować nowsze.
+			last_published: date|None = None
+			if year >= created.year:
+				last_published = max(manager.get_table(table), default=None)
+			for currency in sorted(currencies):
+				try:
+					rate_column = manager.get_rate_column(currency)
+				except ValueError:
+					# Waluta nie była notowana w tym roku.
+					continue
+				if currency not in columns:
+					columns[currency] = (table, array('q', [_MISSING]) * days)
+				column: array[int] = columns[currency][1]
+				for day, rate in enumerate(rate_column):
+					check_date: date = date.fromordinal(year_start + day)
+					if last_published is not None and check_date > last_published:
+						break
+					# Kursy z pierwszych dni stycznia mogą pochodzić z tabel
+					# za poprzedni rok, o ile migawka go obejmuje.
+					if rate is None and day < 3 and year > first_year:
+						try:
+							rate = tables.get_exchange_ratio(currency, check_date)
+						except ValueError:
+							continue
+					if rate is not None:
+						column[year_start - first_day + day] = _encode(rate)
+	return columns
+
+
+def _write(
+		path: str,
+		first_year: int,
+		last_year: int,
+		created: date,
+		columns: 'dict[str, tuple[str, array[int]]]',
+	) -> None:
+	# Zapisuje plik migawki. Plik jest zapisywany pod tymczasową nazwą
+	# i dopiero w całości zastępuje poprzednią wersję, więc procesy, które
+	# mają ją otwartą, mogą nadal z niej korzystać.
+	currencies: list[str] = sorted(columns)
+	index: bytes = b''.join(
+		(currency + columns[currency][0]).encode('ascii')
+		for currency in currencies
+	).ljust(_index_size(len(currencies)), b'\0')
+	parts: list[bytes] = [index]
+	for currency in currencies:
+		column: array[int] = columns[currency][1]
+		if sys.byteorder == 'big':
+			column = array('q', column)
+			column.byteswap()
+		parts.append(column.tobytes())
+	checksum: int = 0
+	for part in parts:
+		checksum = zlib.crc32(part, checksum)
+	header: bytes = HEADER.pack(
+		MAGIC,
+		VERSION,
+		first_year,
+		last_year - first_year + 1,
+		len(currencies),
+		created.toordinal(),
+		checksum,
+	)
+	tmp_path: str = f'{path}.{os.getpid()}.tmp'
+	try:
+		with open(tmp_path, 'wb') as file:
+			file.write(header)
+			file.writelines(parts)
+		os.replace(tmp_path, path)
+	except BaseException:
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+		raise
+
+
+def build(
+		path: str,
+		tables: 'TablesPool',
+		first_year: int,
+		last_year: int,
+	) -> int:
+	"""Tworzy plik migawki z kursami z lat od `first_year` do `last_year`.
+
+	Funkcja przyjmuje następujące argumenty:
+	`path` -- Ścieżka do tworzonego pliku. Istniejący plik jest zastępowany.
+	`tables` -- Obiekt klasy `utils.TablesPool`, z którego odczytywane są
+	tabele kursów. Powinien przechowywać tabele z co najmniej tylu lat,
+	ile obejmuje migawka.
+	`first_year`, `last_year` -- Pierwszy i ostatni rok, z którego kursy
+	zawiera migawka.
+
+	Zwraca liczbę walut zapisanych w migawce. Jeżeli którejś z tabel nie
+	można pobrać, zgłasza wyjątek, a plik nie jest tworzony.
+	"""
+	if first_year > last_year:
+		raise ValueError(
+			f"rok {first_year} jest późniejszy niż rok {last_year}.")
+	created: date = date.today()
+	columns: dict[str, tuple[str, array[int]]] = _collect(
+		tables, first_year, last_year, created)
+	_write(path, first_year, last_year, created, columns)
+	return len(columns)
+
+
+def update(
+		path: str,
+		tables: 'TablesPool',
+		last_year: int|None = None,
+	) -> tuple[int, int]:
+	"""Tworzy ponownie istniejący plik migawki z aktualnych tabel kursów.
+
+	Nowa migawka obejmuje lata od pierwszego roku dotychczasowej migawki
+	do `last_year` (domyślnie do bieżącego roku), ale nie mniej lat niż
+	dotychczasowa migawka. Argument `tables` jest taki sam jak w funkcji
+	`build()`. Zwraca pierwszy i ostatni rok nowej migawki.
+	"""
+	with Snapshot(path) as snapshot:
+		first_year: int = snapshot.first_year
+		last_year = max(
+			snapshot.last_year, last_year or date.today().year)
+	build(path, tables, first_year, last_year)
+	return first_year, last_year
+
+
+def verify(path: str, tables: 'TablesPool|None' = None) -> None:
+	"""Sprawdza poprawność pliku migawki.
+
+	Sprawdzana jest struktura pliku i jego suma kontrolna, a jeśli podano
+	argument `tables` - obiekt klasy `utils.TablesPool` - również zgodność
+	zapisanych kursów z tabelami NBP. Jeżeli migawka jest nieprawidłowa lub
+	nieaktualna, zgłasza wyjątek `ValueError`.
+	"""
+	with Snapshot(path) as snapshot:
+		snapshot.check()
+		if tables is None:
+			return
+		expected: dict[str, tuple[str, array[int]]] = _collect(
+			tables, snapshot.first_year, snapshot.last_year, snapshot.created)
+		differences: list[tuple[str, date]] = []
+		for currency in sorted(expected.keys() | snapshot.currencies.keys()):
+			if currency not in expected or currency not in snapshot.currencies:
+				differences.append((currency, date(snapshot.first_year, 1, 1)))
+				continue
+			stored: array[int] = snapshot._get_column(currency)
+			differences.extend(
+				(currency, date.fromordinal(snapshot._first_day + day))
+				for day, value in enumerate(expected[currency][1])
+				if stored[day] != value
+			)
+	if differences:
+		currency, check_date = differences[0]
+		raise ValueError(
+			f"migawka kursów {path} różni się od tabel NBP w {len(differences)} "
+			f"przypadkach, pierwszy raz dla waluty {currency} w dniu "
+			f"{check_date}. Migawkę należy zaktualizować."
+		)
+
+
+def run() -> int:
+	"""Uruchamia program wiersza poleceń do tworzenia, aktualizowania
+	i sprawdzania migawek kursów.
+
+	Zwraca 0 jeśli wykonanie zakończyło się sukcesem, 3 jeśli migawka jest
+	nieprawidłowa lub nieaktualna albo 1 przy innym błędzie. Komunikaty
+	błędów są zapisywane do standardowego strumienia błędów.
+	"""
+	# Moduł `utils` importujemy dopiero tutaj, gdyż sam importuje ten moduł.
+	# Moduł `argparse` jest potrzebny tylko w programie wiersza poleceń, a nie
+	# przy odczycie kursów z migawki.
+	from argparse import ArgumentParser, Namespace
+
+	from transactions2pln import utils
+	from transactions2pln.cache import (
+		LazyTemporaryDirectory,
+		TablesCache,
+		default_cache_dir,
+	)
+
+	options: ArgumentParser = ArgumentParser(add_help=False)
+	options.add_argument('file', help="Ścieżka do pliku migawki.")
+	options.add_argument(
+		'--cache-dir',
+		help="""
+			Katalog w którym przechowywane są pobrane tabele kursów NBP.
+			Domyślnie: %s
+		""" % default_cache_dir().replace('%', '%%'),
+	)
+	options.add_argument(
+		'--no-cache',
+		dest='cache',
+		action='store_false',
+		help="""
+			Nie używaj pamięci podręcznej - pobierz tabele kursów NBP
+			do katalogu tymczasowego i usuń je po zakończeniu działania.
+		""",
+	)
+	argparser: ArgumentParser = ArgumentParser(
+		prog="transactions2pln-snapshot",
+		description="""
+			Tworzy, aktualizuje i sprawdza migawki kursów - pliki binarne
+			z kursami NBP, z których program transactions2pln odczytuje kursy
+			bez parsowania tabel (opcja --snapshot).
+		""",
+	)
+	commands: typing.Any = argparser.add_subparsers(
+		dest='command', required=True)
+	this_year: int = date.today().year
+	build_parser: ArgumentParser = commands.add_parser(
+		'build',
+		parents=[options],
+		help="Utwórz migawkę z kursami z wybranych lat.",
+	)
+	build_parser.add_argument(
+		'--from',
+		dest='first_year',
+		type=int,
+		default=this_year,
+		metavar='YEAR',
+		help="Pierwszy rok. Domyślnie: bieżący rok.",
+	)
+	build_parser.add_argument(
+		'--to',
+		dest='last_year',
+		type=int,
+		default=this_year,
+		metavar='YEAR',
+		help="Ostatni rok. Domyślnie: bieżący rok.",
+	)
+	update_parser: ArgumentParser = commands.add_parser(
+		'update',
+		parents=[options],
+		help="""
+			Utwórz ponownie migawkę z aktualnych tabel kursów, rozszerzając ją
+			w razie potrzeby do bieżącego roku.
+		""",
+	)
+	update_parser.add_argument(
+		'--to',
+		dest='last_year',
+		type=int,
+		metavar='YEAR',
+		help="Ostatni rok. Domyślnie: bieżący rok.",
+	)
+	verify_parser: ArgumentParser = commands.add_parser(
+		'verify',
+		parents=[options],
+		help="Sprawdź poprawność migawki.",
+	)
+	verify_parser.add_argument(
+		'--tables',
+		action='store_true',
+		help="Sprawdź również zgodność kursów z aktualnymi tabelami NBP.",
+	)
+	args: Namespace = argparser.parse_args()
+
+	try:
+		tmpdir: LazyTemporaryDirectory = LazyTemporaryDirectory()
+		tables_cache: TablesCache|None = None
+		if args.cache:
+			tables_cache = TablesCache(args.cache_dir or default_cache_dir())
+		first_year: int
+		last_year: int
+		if args.command == 'build':
+			first_year, last_year = args.first_year, args.last_year
+		else:
+			with Snapshot(args.file) as snapshot:
+				first_year, last_year = snapshot.first_year, snapshot.last_year
+			if args.command == 'update':
+				last_year = max(last_year, args.last_year or this_year)
+		# Pula przechowuje tabele ze wszystkich lat migawki i roku
+		# poprzedzającego, by żadna nie była wczytywana wielokrotnie.
+		tables: utils.TablesPool = utils.TablesPool(
+			tmpdir, tables_cache, max(last_year - first_year + 2, 2))
+		if args.command == 'build':
+			count: int = build(args.file, tables, first_year, last_year)
+			print(
+				f"Zapisano kursy {count} walut z lat {first_year}-{last_year} "
+				f"w pliku {args.file}.",
+				file=sys.stderr,
+			)
+		elif args.command == 'update':
+			first_year, last_year = update(args.file, tables, args.last_year)
+			print(
+				f"Zaktualizowano kursy z lat {first_year}-{last_year} "
+				f"w pliku {args.file}.",
+				file=sys.stderr,
+			)
+		else:
+			verify(args.file, tables if args.tables else None)
+			print(f"Migawka kursów {args.file} jest poprawna.", file=sys.stderr)
+		tmpdir.cleanup()
+	except Exception as err:
+		if sys.flags.dev_mode:
+			raise
+		print(str(err), file=sys.stderr)
+		return 3 if isinstance(err, ValueError) else 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(run())
@@ -0,0 +1,186 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Statystyki wydajności przetwarzania.
+
+Zawiera następujące klasy i funkcje:
+`Stats` -- Klasa gromadząca czas poszczególnych etapów przetwarzania
+i liczniki zdarzeń, takich jak pobranie tabeli kursów.
+`timer` -- Funkcja zwracająca menedżer kontekstu mierzący czas etapu,
+jeżeli statystyki są zbierane.
+"""
+import collections
+import contextlib
+import json
+import time
+import typing
+
+
+class Stats():
+	"""Gromadzi statystyki wydajności przetwarzania.
+
+	Obiekty tej klasy są przekazywane obiektom, których działanie ma być
+	mierzone. Mierzony jest czas etapów wymienionych w `STAGES` oraz
+	liczba następujących zdarzeń:
+	`rows` -- Zapisane wiersze danych.
+	`tables_downloaded` -- Pobrane pliki z tabelami kursów.
+	`tables_reused` -- Pliki z tabelami kursów użyte bez pobierania.
+	`rate_lookups` -- Odczyty kursów wymiany.
+	`rate_misses` -- Odczyty kursów, których nie było w pamięci podręcznej.
+	`date_lookups` -- Odczyty dat z kolumny z datą.
+	`date_misses` -- Odczyty dat, których nie było w pamięci podręcznej.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`STAGES` -- Słownik, w którym kluczami są nazwy etapów a wartościami
+	ich opisy.
+	`times` -- Słownik, w którym kluczami są nazwy etapów a wartościami
+	łączny czas ich trwania w sekundach. Zawiera tylko zmierzone etapy.
+	`counters` -- Obiekt `collections.Counter` z liczbą zdarzeń.
+	`add_time` -- Metoda dodająca czas trwania etapu.
+	`count` -- Metoda zwiększająca licznik zdarzeń.
+	`timed` -- Metoda mierząca czas odczytu kolejnych elementów iteratora.
+	`summary` -- Metoda zwracająca podsumowanie statystyk.
+	`format` -- Metoda zwracająca podsumowanie statystyk jako tekst.
+	"""
+	STAGES: dict[str, str] = {
+		'download': "pobieranie tabel kursów",
+		'tables': "wczytywanie tabel kursów",
+		'read': "odczyt pliku wejściowego",
+		'dates': "odczyt dat",
+		'rates': "wyszukiwanie kursów",
+		'amounts': "obliczanie kwot",
+		'write': "zapis pliku wyjściowego",
+	}
+
+	def __init__(self) -> None:
+		"""Metoda inicjalizująca obiekty klasy `Stats`.
+
+		Czas całkowity jest liczony od utworzenia obiektu.
+		"""
+		self.times: dict[str, float] = {}
+		self.counters: collections.Counter[str] = collections.Counter()
+		self._start: float = time.perf_counter()
+
+	def add_time(self, stage: str, seconds: float) -> None:
+		"""Dodaje `seconds` sekund do czasu trwania etapu `stage`."""
+		self.times[stage] = self.times.get(stage, 0.0) + seconds
+
+	def count(self, name: str, number: int = 1) -> None:
+		"""Zwiększa licznik zdarzeń `name` o `number`."""
+		self.counters[name] += number
+
+	def timed(
+			self,
+			iterable: typing.Iterable[typing.Any],
+			stage: str,
+		) -> typing.Iterator[typing.Any]:
+		"""Zwraca iterator po elementach `iterable`, dodający czas odczytu
+		każdego z nich do czasu trwania etapu `stage`."""
+		iterator: typing.Iterator[typing.Any] = iter(iterable)
+		while True:
+			start: float = time.perf_counter()
+			try:
+				item: typing.Any = next(iterator)
+			except StopIteration:
+				return
+			finally:
+				self.add_time(stage, time.perf_counter() - start)
+			yield item
+
+	def summary(self) -> dict[str, typing.Any]:
+		"""Zwraca słownik z podsumowaniem statystyk.
+
+		Słownik zawiera liczbę wierszy (`rows`), czas całkowity w sekundach
+		(`seconds`), przepustowość (`rows_per_s`), czas zmierzonych etapów
+		(`stages`), liczbę pobranych i ponownie użytych tabel kursów oraz
+		liczbę odczytów kursów i dat wraz z odsetkiem odczytów obsłużonych
+		z pamięci podręcznej (`None`, jeżeli nie było odczytów).
+		"""
+		seconds: float = time.perf_counter() - self._start
+		rows: int = self.counters['rows']
+		summary: dict[str, typing.Any] = {
+			'rows': rows,
+			'seconds': seconds,
+			'rows_per_s': rows / seconds if seconds else 0.0,
+			'stages': dict(self.times),
+			'tables_downloaded': self.counters['tables_downloaded'],
+			'tables_reused': self.counters['tables_reused'],
+		}
+		for name in ('rate', 'date'):
+			lookups: int = self.counters[f'{name}_lookups']
+			summary[f'{name}_lookups'] = lookups
+			summary[f'{name}_hit_rate'] = (
+				1 - self.counters[f'{name}_misses'] / lookups if lookups else None)
+		return summary
+
+	def format(self, output_format: str = 'text') -> str:
+		"""Zwraca podsumowanie statystyk jako tekst.
+
+		Argument `output_format` może mieć wartość `text` (tekst czytelny dla
+		człowieka) albo `json` (słownik zwracany przez metodę `summary()`
+		w formacie JSON).
+		"""
+		summary: dict[str, typing.Any] = self.summary()
+		if output_format == 'json':
+			return json.dumps(summary)
+		lines: list[str] = [
+			"Statystyki przetwarzania:",
+			f"  wiersze: {summary['rows']} "
+			f"({summary['rows_per_s']:.0f} wierszy/s)",
+			f"  czas całkowity: {summary['seconds']:.3f} s",
+		]
+		for stage, description in self.STAGES.items():
+			if stage in summary['stages']:
+				stage_seconds: float = summary['stages'][stage]
+				lines.append(
+					f"  {description}: {stage_seconds:.3f} s "
+					f"({stage_seconds / summary['seconds']:.1%})"
+				)
+		lines.append(
+			f"  tabele kursów pobrane: {summary['tables_downloaded']}, "
+			f"użyte ponownie: {summary['tables_reused']}"
+		)
+		for name, description in (('rate', "kursów"), ('date', "dat")):
+			hit_rate: float|None = summary[f'{name}_hit_rate']
+			if hit_rate is not None:
+				lines.append(
+					f"  odczyty {description} z pamięci podręcznej: {hit_rate:.1%} "
+					f"z {summary[f'{name}_lookups']}"
+				)
+		return '\n'.join(lines)
+
+
+def timer(
+		stats: Stats|None,
+		stage: str,
+	) -> typing.ContextManager[None]:
+	"""Zwraca menedżer kontekstu dodający czas wykonania bloku kodu do czasu
+	trwania etapu `stage` w obiekcie `stats`. Jeżeli `stats` to `None`,
+	zwracany menedżer kontekstu nic nie robi."""
+	if stats is None:
+		return contextlib.nullcontext()
+	return _timer(stats, stage)
+
+
+@contextlib.contextmanager
+def _timer(stats: Stats, stage: str) -> typing.Iterator[None]:
+	start: float = time.perf_counter()
+	try:
+		yield
+	finally:
+		stats.add_time(stage, time.perf_counter() - start)
@@ -20,26 +20,115 @@
 
 Zawiera funkcje i klasy abstrahujące część zadań potrzebnych przy obliczeniach
 dokonywanych z użyciem niniejszej paczki:
+`BufferedOutput` -- Klasa opakowująca deskryptor pliku wyjściowego
+i gromadząca zapisywane dane w buforze o określonej wielkości.
 `JSONWrapper` -- Klasa opakowująca deskryptor pliku wyjściowego
 i udostępniająca interfejs podobny do `csv.writer` ale zapisujący
 w formacie JSON.
 `TablesManager` -- Klasa implementująca interfejs do pobierania plików
 z odpowiednimi tabelami NBP, parsowania ich i uzyskiwania danych.
+`TablesPool` -- Klasa udostępniająca kursy z wielu lat za pomocą obiektów
+klasy `TablesManager`.
+`DateParser` -- Klasa implementująca interfejs do odczytywania dat
+transakcji w danym formacie.
 `NBPDialect` -- Klasa implementująca dialekt plików CSV umożliwiający
 odczytanie tabel NBP.
+`detect_date_column` -- Funkcja ustalająca na podstawie próbki danych,
+która kolumna zawiera daty i w jakim formacie.
 `get_column_index` -- Funkcja zwracająca indeks kolumny w tabeli na podstawie
 nagłówka, liczby lub litery.
+`urlretrieve` -- Funkcja pobierająca plik spod podanego adresu.
 """
+import collections
+import contextlib
 import csv
 import json
-import locale
 import os
 import string
+import threading
 import typing
 from datetime import date, datetime, timedelta
-from decimal import Decimal
-from tempfile import TemporaryDirectory
-from urllib.request import urlretrieve
+from decimal import Decimal, InvalidOperation
+from json.encoder import encode_basestring_ascii
+
+from transactions2pln.cache import LazyTemporaryDirectory, TablesCache
+from transactions2pln.stats import Stats, timer
+
+# Moduły `asyncio`, `concurrent.futures`, `tempfile` i `urllib.request` są
+# importowane dopiero w razie potrzeby, gdyż ich import znacząco wydłuża
+# uruchamianie programu, a przy wielu uruchomieniach nie są używane - np.
+# gdy wszystkie tabele kursów są w pamięci podręcznej. Migawki kursów
+# tworzy kod wywołujący, więc moduł `snapshot` nie jest tu importowany.
+if typing.TYPE_CHECKING:
+	from tempfile import TemporaryDirectory
+
+	from transactions2pln.snapshot import Snapshot
+
+# Funkcja kodująca łańcuch w formacie JSON tak, jak `json.dumps()`
+# z domyślnymi parametrami.
+_encode_json_string: typing.Callable[[str], str] = encode_basestring_ascii
+
+
+def urlretrieve(url: str, filename: str) -> None:
+	"""Pobiera plik spod adresu `url` i zapisuje go pod ścieżką `filename`,
+	tak jak funkcja `urllib.request.urlretrieve()`."""
+	from urllib.request import urlretrieve
+	urlretrieve(url, filename)
+
+
+class BufferedOutput():
+	"""Opakowuje deskryptor pliku wyjściowego, gromadząc zapisywane dane
+	w buforze o określonej wielkości.
+
+	Obiekty tej klasy przekazują dane do opakowanego pliku dopiero, gdy
+	łączna długość zgromadzonych łańcuchów przekroczy wielkość bufora, albo
+	przy wywołaniu metody `flush()`. Dzięki temu liczba wywołań systemowych
+	nie zależy od sposobu buforowania samego pliku, co ma znaczenie m.in.
+	przy zapisie do potoków i sieciowych systemów plików.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`DEFAULT_BUFFER_SIZE` -- Domyślna wielkość bufora, w znakach.
+	`buffer_size` -- Wielkość bufora, w znakach.
+	`write` -- Metoda zapisująca łańcuch do bufora.
+	`flush` -- Metoda przekazująca zawartość bufora do opakowanego pliku
+	i opróżniająca jego bufor.
+	"""
+	DEFAULT_BUFFER_SIZE: int = 1024 * 1024
+
+	def __init__(
+		self,
+		file: typing.IO[str],
+		buffer_size: int = DEFAULT_BUFFER_SIZE,
+	) -> None:
+		"""Metoda inicjalizująca obiekty klasy `BufferedOutput`.
+
+		Przyjmuje następujące parametry:
+		`file` -- Deskryptor pliku do którego mają być zapisywane dane.
+		`buffer_size` -- Opcjonalnie, wielkość bufora w znakach.
+		"""
+		self.buffer_size: int = buffer_size
+		self._file: typing.IO[str] = file
+		self._buffer: list[str] = []
+		self._buffered: int = 0
+
+	def write(self, data: str) -> int:
+		"""Zapisuje łańcuch `data` do bufora i zwraca jego długość."""
+		self._buffer.append(data)
+		self._buffered += len(data)
+		if self._buffered >= self.buffer_size:
+			self._file.write(''.join(self._buffer))
+			self._buffer.clear()
+			self._buffered = 0
+		return len(data)
+
+	def flush(self) -> None:
+		"""Przekazuje zawartość bufora do opakowanego pliku
+		i opróżnia jego bufor."""
+		if self._buffer:
+			self._file.write(''.join(self._buffer))
+			self._buffer.clear()
+			self._buffered = 0
+		self._file.flush()
 
 
 class JSONWrapper():
@@ -49,20 +138,28 @@ class JSONWrapper():
 	Ideą tej klasy jest to, by zapewniała podobny interfejs co obiekty
 	zwracane przez funkcję `csv.writer`. Dzięki temu obsługa formatów
 	CSV i JSON nie wymaga osobnych ścieżek kodu. Dane w formacie JSON
-	są zapisywane jako elementy tablicy.
+	są zapisywane jako elementy tablicy, albo - w trybie NDJSON - jako
+	kolejne linie, z których każda zawiera jeden wiersz danych.
 
 	Obiekty tej klasy udostępniają następujące atrybuty:
 	`labels` -- Lista łańcuchów zawierających nagłówki jaka została ustawiona
 	przy tworzeniu obiektu.
 	`writerow` -- Metoda pozwalająca na zapis wiersza danych
 	do pliku wyjściowego.
+	`writerows` -- Metoda pozwalająca na zapis wielu wierszy danych
+	do pliku wyjściowego.
 	`writeend` -- Metoda zapisująca znak końca tablicy w pliku wyjściowym.
+
+	Zapisane dane nie są natychmiast opróżniane z bufora pliku - następuje to
+	dopiero przy wywołaniu metody `writeend()`.
 	"""
 
 	def __init__(
 		self,
 		file: typing.IO[str],
-		labels: list[str]|None = None
+		labels: list[str]|None = None,
+		lines: bool = False,
+		resume: bool = False,
 	) -> None:
 		"""Metoda inicjalizująca obiekty klasy `JSONWrapper`.
 
@@ -71,13 +168,33 @@ class JSONWrapper():
 		w formacie JSON z użyciem innych funkcji tej klasy.
 		`labels` -- Opcjonalnie, lista łańcuchów zawierająca nagłówki.
 		Jeżeli zostanie podana, dane będą zapisywane jako obiekty.
+		`lines` -- Opcjonalnie, wartość logiczna. Jeżeli jest to `True`,
+		dane są zapisywane w formacie NDJSON (JSON Lines) zamiast tablicy.
+		`resume` -- Opcjonalnie, wartość logiczna. Jeżeli jest to `True`,
+		dane są dopisywane za wierszami zapisanymi do pliku wcześniej - znak
+		otwierający tablicę nie jest zapisywany, a pierwszy wiersz jest
+		poprzedzony separatorem.
 		"""
 		self._labels: list[str]|None = labels
 		self._file: typing.IO[str] = file
-		self._file.write('[') # Zapisuje znak otwierający tablicę w formacie JSON.
+		self._lines: bool = lines
+		# Łańcuchy oddzielające i kończące kolejne wiersze danych.
+		self._separator: str = '' if lines else ','
+		self._terminator: str = '\n' if lines else ''
+		# Klucze obiektów JSON są takie same dla każdego wiersza, więc kodujemy
+		# je tylko raz, razem z następującym po nich separatorem. Jeżeli
+		# nagłówki się powtarzają, obiekt JSON zawiera tylko ostatnią wartość
+		# dla danego klucza - wtedy korzystamy z wolniejszej, ogólnej metody.
+		self._key_prefixes: list[str]|None = None
+		if labels and len(set(labels)) == len(labels):
+			self._key_prefixes = [
+				_encode_json_string(label) + ': ' for label in labels]
+		if not lines and not resume:
+			# Zapisuje znak otwierający tablicę w formacie JSON.
+			self._file.write('[')
 		# Flaga oznaczająca, że dopiero zaczęliśmy zapisywanie danych. Dzięki temu
 		# metoda writerow() nie umieści tu przecinka.
-		self._started = True
+		self._started = not resume
 
 	@property
 	def labels(self) -> list[str]|None:
@@ -97,32 +214,82 @@ class JSONWrapper():
 		`labels`, cały wiersz jest zapisywany jako tablica, osadzona w głównej
 		tablicy w pliku.
 		"""
-		# Jeżeli nie mamy nagłówków, zapisujemy wiersz jako listę.
-		writeable: list[str]|dict[str, str] = row
-		if self._labels:
-			# Jeżeli mamy nagłówki, zapisujemy wiersz jako słownik gdzie klucze
-			# to nagłówki a wartości - dane z wiersza.
-			writeable = {}
-			for index, item in enumerate(row):
-				# Przypisanie danych z wiersza do nagłówków wg kolejności.
-				writeable[self._labels[index]] = item
 		# Wyczyszczenie flagi oznaczającej początek zapisu, jeśli została
 		# ustawiona. Jeśli nie, zapisujemy przecinek ponieważ jesteśmy gdzieś
 		# w środku pliku.
 		if self._started:
 			self._started = False
 		else:
-			self._file.write(',')
-		self._file.write(json.dumps(writeable))
-		self._file.flush()
+			self._file.write(self._separator)
+		self._file.write(self._encode(row) + self._terminator)
+
+	def writerows(self, rows: typing.Iterable[list[str]]) -> None:
+		"""Zapisanie wielu wierszy danych do pliku wyjściowego.
+
+		Funkcja przyjmuje jeden argument, `rows`, będący kolekcją wierszy
+		w postaci przyjmowanej przez metodę `writerow()`. Wszystkie wiersze
+		są zapisywane do pliku wyjściowego jednym wywołaniem.
+		"""
+		terminator: str = self._terminator
+		encoded: list[str] = [self._encode(row) + terminator for row in rows]
+		if not encoded:
+			return
+		if self._started:
+			self._started = False
+		else:
+			encoded[0] = self._separator + encoded[0]
+		self._file.write(self._separator.join(encoded))
+
+	def _encode(self, row: list[str]) -> str:
+		# Wynik jest identyczny z wynikiem `json.dumps()` dla listy lub
+		# słownika łańcuchów, ale nie wymaga tworzenia słownika dla każdego
+		# wiersza ani ogólnej obsługi typów danych przez moduł `json`.
+		key_prefixes: list[str]|None = self._key_prefixes
+		if key_prefixes is not None and len(row) <= len(key_prefixes):
+			return '{' + ', '.join([
+				prefix + _encode_json_string(item)
+				for prefix, item in zip(key_prefixes, row)
+			]) + '}'
+		if not self._labels:
+			# Jeżeli nie mamy nagłówków, zapisujemy wiersz jako listę.
+			return '[' + ', '.join(map(_encode_json_string, row)) + ']'
+		# Jeżeli nagłówki się powtarzają albo wiersz jest dłuższy niż lista
+		# nagłówków, zapisujemy wiersz jako słownik gdzie klucze to nagłówki
+		# a wartości - dane z wiersza.
+		writeable: dict[str, str] = {}
+		for index, item in enumerate(row):
+			# Przypisanie danych z wiersza do nagłówków wg kolejności.
+			writeable[self._labels[index]] = item
+		return json.dumps(writeable)
 
 	def writeend(self) -> None:
-		"""Zapisuje znak końca tablicy w formacie JSON."""
-		self._file.write(']')
+		"""Zapisuje znak końca tablicy w formacie JSON.
+
+		W trybie NDJSON jedynie opróżnia bufor pliku.
+		"""
+		if not self._lines:
+			self._file.write(']')
 		self._file.flush()
 
 
 ExchangeTable: typing.TypeAlias = dict[date, list[str]]
+DenseTable: typing.TypeAlias = list[list[str]|None]
+RateColumn: typing.TypeAlias = list[Decimal|None]
+
+
+def _parse_rate(value: str) -> Decimal|None:
+	# Odczytuje kurs z tabeli NBP. Tabele zapisują kursy zawsze z przecinkiem
+	# jako separatorem dziesiętnym i bez separatorów tysięcy, więc odczyt
+	# nie zależy od ustawień językowych. Zwraca `None`, jeżeli komórka nie
+	# zawiera prawidłowego kursu, np. jest pusta - błąd zgłaszany jest dopiero
+	# przy odczycie kursu z dnia, którego on dotyczy.
+	try:
+		rate: Decimal = Decimal(value.replace(',', '.'))
+	except InvalidOperation:
+		return # type: ignore[return-value]
+	if not rate.is_finite():
+		return # type: ignore[return-value]
+	return rate
 
 
 class TablesManager():
@@ -138,9 +305,31 @@ class TablesManager():
 	a wartościami zbiory zawierające łańcuchy odpowiadające kodom ISO 4217
 	walut, jakie zawiera dana tabela.
 	`year` -- Liczba całkowita oznaczająca rok dla którego pobierane są tabele.
+	`cache` -- Obiekt klasy `cache.TablesCache` przechowujący pobrane pliki
+	pomiędzy uruchomieniami programu albo `None`.
+	`stats` -- Obiekt klasy `stats.Stats` gromadzący statystyki albo `None`.
+	`get_table_file` -- Metoda zwracająca ścieżkę do lokalnej kopii pliku
+	z wybraną tabelą.
 	`get_table` -- Metoda zwracająca dane z wybranej tabeli.
+	`get_table_async` -- Współprogram zwracający dane z wybranej tabeli
+	bez blokowania pętli zdarzeń.
+	`get_dense_table` -- Metoda zwracająca dane z wybranej tabeli w postaci
+	listy indeksowanej numerem dnia w roku.
+	`get_table_mark` -- Metoda zwracająca oznaczenie tabeli zawierającej
+	wybraną walutę.
+	`get_rate_column` -- Metoda zwracająca kursy wybranej waluty w postaci
+	listy indeksowanej numerem dnia w roku.
+	`get_published_rate` -- Metoda zwracająca kurs w PLN wybranej waluty
+	opublikowany w wybranym dniu.
+	`find_exchange_ratio` -- Metoda zwracająca kurs w PLN wybranej waluty
+	w wybranym dniu albo `None`, jeśli nie jest on dostępny.
 	`get_exchange_ratio` -- Metoda zwracająca kurs w PLN wybranej waluty
 	w wybranym dniu.
+
+	Obiekty tej klasy mogą być jednocześnie używane przez wiele wątków.
+	Pobieranie i wczytywanie każdej tabeli odbywa się pod osobną blokadą, więc
+	jednoczesne żądania tej samej tabeli powodują tylko jedno jej pobranie,
+	na którego zakończenie czekają pozostałe wątki.
 	"""
 	DOWNLOAD_URL: str = 'https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_{table}_{year}.csv' # noqa: E501
 	CURRENCY_MAP: dict[str, set[str]] = {
@@ -165,11 +354,20 @@ class TablesManager():
 			'BDT', 'WST', 'KZT', 'MNT', 'VUV', 'BAM'
 		},
 	}
+	# Odwrotność `CURRENCY_MAP` - kluczami są kody walut a wartościami
+	# oznaczenia tabel.
+	_TABLE_INDEX: dict[str, str] = {
+		currency: table
+		for table, currencies in CURRENCY_MAP.items()
+		for currency in currencies
+	}
 
 	def __init__(
 			self,
-			tmp_dir: TemporaryDirectory, # type: ignore[type-arg]
+			tmp_dir: 'TemporaryDirectory[str]|LazyTemporaryDirectory',
 			year: int,
+			cache: TablesCache|None = None,
+			stats: Stats|None = None,
 		) -> None:
 		"""Metoda inicjalizująca obiekty klasy `TablesManager.
 
@@ -177,38 +375,120 @@ class TablesManager():
 		`tmp_dir` -- Obiekt katalogu tymczasowego do użytku roboczego.
 		`year` -- Liczba całkowita oznaczająca rok dla którego obiekt
 		ma pobierać i udostępniać dane o kursach.
+		`cache` -- Opcjonalnie, obiekt klasy `cache.TablesCache`. Jeżeli
+		zostanie podany, pliki z tabelami będą pobierane do pamięci podręcznej
+		zamiast do katalogu tymczasowego.
+		`stats` -- Opcjonalnie, obiekt klasy `stats.Stats`, w którym
+		zapisywany jest czas pobierania i wczytywania tabel.
 		"""
 		self.year: int = year
-		self._tmpdir: TemporaryDirectory = tmp_dir # type: ignore[type-arg]
+		self.cache: TablesCache|None = cache
+		self.stats: Stats|None = stats
+		self._tmpdir: TemporaryDirectory[str]|LazyTemporaryDirectory = tmp_dir
 		self._currency_lookup: dict[str, int] = {}
+		self._dense_tables: dict[str, DenseTable] = {}
+		self._rate_columns: dict[str, RateColumn] = {}
+		self._table_locks: dict[str, threading.RLock] = self._create_locks()
+		# Liczba porządkowa 1 stycznia (zgodna z `date.toordinal()`) - odjęta
+		# od liczby porządkowej daty daje indeks dnia w tabelach zwracanych
+		# przez metodę `get_dense_table()`.
+		self._first_day: int = date(year, 1, 1).toordinal()
+
+	@classmethod
+	def _create_locks(cls) -> dict[str, threading.RLock]:
+		# Blokady chroniące pobieranie, wczytywanie i przekształcanie
+		# poszczególnych tabel. Metody wczytujące tabelę wywołują się nawzajem,
+		# dlatego blokady mogą być zakładane wielokrotnie przez ten sam wątek.
+		return {table: threading.RLock() for table in cls.CURRENCY_MAP}
+
+	def __getstate__(self) -> dict[str, typing.Any]:
+		# Blokad nie można serializować - obiekt przekazywany do innego
+		# procesu otrzymuje nowe blokady.
+		state: dict[str, typing.Any] = self.__dict__.copy()
+		del state['_table_locks']
+		return state
+
+	def __setstate__(self, state: dict[str, typing.Any]) -> None:
+		self.__dict__.update(state)
+		self._table_locks = self._create_locks()
+
+	def _fetch_table_file(self, table: str, year: int) -> str:
+		# Pobieranie pliku tabeli, o ile nie jest już dostępny lokalnie.
+		url: str = self.DOWNLOAD_URL.format(table=table, year=year)
+		downloads: list[str] = []
+
+		def download(path: str) -> None:
+			downloads.append(path)
+			urlretrieve(url, path)
+
+		with timer(self.stats, 'download'):
+			dest: str
+			if self.cache is not None:
+				dest = self.cache.fetch(table, year, download)
+			else:
+				dest = os.path.join(
+					self._tmpdir.name, f'archiwum_tab_{table}_{year}.csv')
+				# Katalog tymczasowy jest tworzony dla każdego uruchomienia
+				# programu, więc obecny w nim plik został pobrany podczas
+				# bieżącego uruchomienia.
+				if not os.path.exists(dest):
+					try:
+						download(dest)
+					except BaseException:
+						# Nie zostawiamy niekompletnego pliku.
+						with contextlib.suppress(FileNotFoundError):
+							os.remove(dest)
+						raise
+		if self.stats is not None:
+			self.stats.count(
+				'tables_downloaded' if downloads else 'tables_reused')
+		return dest
 
 	def _download_table(self, table: str, year: int) -> ExchangeTable:
 		# Pobieranie i parsowanie pliku tabeli.
-		url: str = self.DOWNLOAD_URL.format(table=table, year=year)
-		dest: str = os.path.join(
-			self._tmpdir.name, f'archiwum_tab_{table}_{year}.csv')
-		urlretrieve(url, dest)
+		dest: str = self._fetch_table_file(table, year)
 
 		parsed_table: dict[date, list[str]] = {}
-		with open(dest, 'r', encoding='cp1250') as tablefile:
+		currency_lookup: dict[str, int] = {}
+		with timer(self.stats, 'tables'), open(
+			dest, 'r', encoding='cp1250',
+		) as tablefile:
 			for row in csv.reader(tablefile, dialect=NBPDialect()):
 				if row:
 					# Wiersze w tabelach NBP zaczynają się albo od daty, albo od
 					# łańcucha `kod ISO`. Daty parsujemy i zapisujemy w słowniku
 					# jako klucze a resztę wiersza - jako wartość. Wiersz `kod ISO`
 					# zawiera kody ISO 4217 w kolejności występowania w wierszach -
-					# - mapujemy kod do kolumny w polu `self._currency_lookup`.
+					# - mapujemy kod do kolumny w polu `self._currency_lookup`,
+					# uzupełnianym dopiero po wczytaniu całej tabeli.
 					try:
 						row_date = datetime.strptime(row[0], '%Y%m%d')
 					except ValueError:
 						if row[0] == 'kod ISO':
 							for i, v in enumerate(row[1:]):
-								self._currency_lookup[v] = i
+								currency_lookup[v] = i
 					else:
 						parsed_table.setdefault(row_date.date(), row[1:])
 
+		self._currency_lookup.update(currency_lookup)
 		return parsed_table
 
+	def get_table_file(self, table: str) -> str:
+		"""Zwraca ścieżkę do lokalnej kopii pliku z podaną tabelą kursów
+		dziennych NBP, pobierając go, jeżeli nie jest jeszcze dostępny.
+
+		Funkcja przyjmuje jeden argument, `table`, będący łańcuchem zawierającym
+		oznaczenie tabeli NBP. W odróżnieniu od metody `get_table()`
+		nie parsuje pobranego pliku.
+		"""
+		if table not in self.CURRENCY_MAP:
+			raise ValueError(
+				f"oznaczenie '{table}' nie odpowiada "
+				"żadnej z tabel publikowanych przez NBP."
+			)
+		with self._table_locks[table]:
+			return self._fetch_table_file(table, self.year)
+
 	def get_table(self, table: str) -> ExchangeTable:
 		"""Pobiera i zwraca pełne dane z podanej tabeli kursów dziennych NBP.
 
@@ -227,11 +507,187 @@ class TablesManager():
 		saved_table: ExchangeTable|None = getattr(self, table_attr, None)
 		if saved_table is not None:
 			return saved_table
-		else:
+		with self._table_locks[table]:
+			# Inny wątek mógł wczytać tabelę w czasie, gdy czekaliśmy
+			# na blokadę.
+			loaded_table: ExchangeTable|None = getattr(self, table_attr, None)
+			if loaded_table is not None:
+				return loaded_table
 			new_table: ExchangeTable = self._download_table(table, self.year)
 			setattr(self, table_attr, new_table)
 			return new_table
 
+	async def get_table_async(self, table: str) -> ExchangeTable:
+		"""Zwraca dane z podanej tabeli kursów tak jak metoda `get_table()`,
+		ale bez blokowania pętli zdarzeń `asyncio`.
+
+		Jeżeli tabela nie jest jeszcze wczytana, jest pobierana i wczytywana
+		w osobnym wątku. Jednoczesne wywołania dla tej samej tabeli powodują
+		tylko jedno jej pobranie.
+		"""
+		saved_table: ExchangeTable|None = getattr(self, 'table_' + table, None)
+		if saved_table is not None:
+			return saved_table
+		import asyncio
+		return await asyncio.to_thread(self.get_table, table)
+
+	def get_dense_table(self, table: str) -> DenseTable:
+		"""Zwraca dane z podanej tabeli kursów dziennych NBP w postaci listy
+		indeksowanej numerem dnia w roku.
+
+		Funkcja przyjmuje jeden argument, `table`, będący łańcuchem zawierającym
+		oznaczenie tabeli NBP. Zwraca listę zawierającą element dla każdego dnia
+		roku określonego przez atrybut `year`, gdzie pierwszy element odpowiada
+		1 stycznia. Elementem jest wiersz tabeli z kursami obowiązującymi
+		w danym dniu, czyli ostatnimi opublikowanymi nie wcześniej niż 3 dni
+		przed nim. Jeżeli takich kursów nie ma, elementem jest `None`.
+		Lista jest tworzona raz, przy pierwszym wywołaniu dla danej tabeli.
+		"""
+		dense_table: DenseTable|None = self._dense_tables.get(table)
+		if dense_table is not None:
+			return dense_table
+		exchange_table: ExchangeTable = self.get_table(table)
+		with self._table_locks[table]:
+			dense_table = self._dense_tables.get(table)
+			if dense_table is not None:
+				return dense_table
+			days: int = date(self.year + 1, 1, 1).toordinal() - self._first_day
+			dense_table = [None] * days
+			# Nie wszystkie daty są uwzględnione w tabeli - w weekendy i święta
+			# NBP nie publikuje kursów. Należy wtedy przyjąć ostatni opublikowany
+			# kurs, ale przyjmujemy, że przerwa w publikowaniu kursów nie powinna
+			# być dłuższa niż 4 dni. Dni, dla których nie ma kursu spełniającego
+			# ten warunek, pozostają puste.
+			last_row: list[str]|None = None
+			last_day: int = -4
+			for day in range(days):
+				row: list[str]|None = exchange_table.get(
+					date.fromordinal(self._first_day + day))
+				if row is not None:
+					last_row = row
+					last_day = day
+				if day - last_day < 4:
+					dense_table[day] = last_row
+			self._dense_tables[table] = dense_table
+			return dense_table
+
+	@classmethod
+	def get_table_mark(cls, currency: str) -> str:
+		"""Zwraca oznaczenie tabeli NBP zawierającej kurs danej waluty.
+
+		Funkcja przyjmuje jeden argument, `currency`, będący trzyliterowym
+		kodem ISO 4217 waluty.
+		"""
+		try:
+			return cls._TABLE_INDEX[currency]
+		except KeyError:
+			raise ValueError(
+				f"waluta o symbolu '{currency}' nie figuruje w żadnej z tabel NBP."
+			) from None
+
+	def get_rate_column(self, currency: str) -> RateColumn:
+		"""Zwraca kursy danej waluty w postaci listy indeksowanej numerem
+		dnia w roku.
+
+		Funkcja przyjmuje jeden argument, `currency`, będący trzyliterowym
+		kodem ISO 4217 waluty. Zwracana lista odpowiada liście zwracanej przez
+		metodę `get_dense_table()`, ale zamiast wierszy tabeli zawiera
+		odczytane z nich kursy waluty `currency`, a dla wierszy, które nie
+		zawierają prawidłowego kursu - `None`. Lista jest tworzona raz, przy
+		pierwszym wywołaniu dla danej waluty.
+		"""
+		rate_column: RateColumn|None = self._rate_columns.get(currency)
+		if rate_column is not None:
+			return rate_column
+		table_mark: str = self.get_table_mark(currency)
+		dense_table: DenseTable = self.get_dense_table(table_mark)
+		try:
+			column_idx: int = self._currency_lookup[currency]
+		except KeyError:
+			raise ValueError(
+				f"waluta o symbolu '{currency}' nie figuruje "
+				f"w tabeli {table_mark.capitalize()} za rok {self.year!s}."
+			) from None
+		with self._table_locks[table_mark]:
+			rate_column = self._rate_columns.get(currency)
+			if rate_column is not None:
+				return rate_column
+			# Ten sam wiersz tabeli powtarza się w liście dla kolejnych dni bez
+			# publikacji kursów, więc zapamiętujemy już odczytane kursy, by każdy
+			# parsować tylko raz.
+			parsed: dict[int, Decimal|None] = {}
+			rate_column = []
+			for row in dense_table:
+				if row is None:
+					rate_column.append(None)
+					continue
+				if id(row) not in parsed:
+					parsed[id(row)] = _parse_rate(row[column_idx])
+				rate_column.append(parsed[id(row)])
+			self._rate_columns[currency] = rate_column
+			return rate_column
+
+	def get_published_rate(
+		self,
+		currency: str,
+		check_date: date,
+	) -> Decimal|None:
+		"""Zwraca kurs danej waluty opublikowany w danym dniu, wyrażony w PLN.
+
+		Funkcja przyjmuje takie same argumenty jak `get_exchange_ratio()`,
+		ale w odróżnieniu od niej nie szuka kursu z poprzednich dni - jeżeli
+		w dniu `check_date` NBP nie opublikował kursu, zwraca `None`.
+		Zgłasza `ValueError`, jeżeli opublikowany kurs jest nieprawidłowy.
+		"""
+		table_mark: str = self.get_table_mark(currency)
+		table: ExchangeTable = self.get_table(table_mark)
+		date_row: list[str]|None = table.get(check_date)
+		if date_row is None:
+			return # type: ignore[return-value]
+		try:
+			column_idx: int = self._currency_lookup[currency]
+		except KeyError:
+			raise ValueError(
+				f"waluta o symbolu '{currency}' nie figuruje "
+				f"w tabeli {table_mark.capitalize()} za rok {self.year!s}."
+			) from None
+		rate: Decimal|None = _parse_rate(date_row[column_idx])
+		if rate is None:
+			raise ValueError(
+				f"nieprawidłowy kurs waluty '{currency}' opublikowany w dniu "
+				f"{check_date!s} w tabeli {table_mark.capitalize()}."
+			)
+		return rate
+
+	def find_exchange_ratio(
+		self,
+		currency: str,
+		check_date: date,
+	) -> Decimal|None:
+		"""Zwraca kurs danej waluty z danego dnia, wyrażony w PLN, albo `None`
+		jeżeli tabela za rok określony przez atrybut `year` nie zawiera
+		kursu obowiązującego w tym dniu.
+
+		Funkcja przyjmuje takie same argumenty jak `get_exchange_ratio()`.
+		Zgłasza `ValueError`, jeżeli tabela zawiera kurs obowiązujący w tym
+		dniu, ale jest on nieprawidłowy.
+		"""
+		rate_column: RateColumn = self.get_rate_column(currency)
+		day: int = check_date.toordinal() - self._first_day
+		if not 0 <= day < len(rate_column):
+			return # type: ignore[return-value]
+		rate: Decimal|None = rate_column[day]
+		if rate is None:
+			# Brak kursu oznacza brak wiersza tabeli dla tego dnia albo wiersz
+			# z nieprawidłowym kursem - np. z pustą komórką.
+			table_mark: str = self.get_table_mark(currency)
+			if self.get_dense_table(table_mark)[day] is not None:
+				raise ValueError(
+					f"nieprawidłowy kurs waluty '{currency}' obowiązujący w dniu "
+					f"{check_date!s} w tabeli {table_mark.capitalize()}."
+				)
+		return rate
+
 	def get_exchange_ratio(self, currency: str, check_date: date) -> Decimal:
 		"""Zwraca kurs danej waluty z danego dnia, wyrażony w PLN.
 
@@ -240,43 +696,345 @@ class TablesManager():
 		walutę, dla jakiej zwrócony będzie kurs.
 		`check_date` -- Data określająca dzień, z którego zwrócony będzie kurs.
 		"""
-		table_mark: str
-		for k, v in self.CURRENCY_MAP.items():
-			if currency in v:
-				table_mark = k
-				break
-		else:
+		rate: Decimal|None = self.find_exchange_ratio(currency, check_date)
+		if rate is None:
 			raise ValueError(
-				f"waluta o symbolu '{currency}' nie figuruje w żadnej z tabel NBP.")
+				f"brak wiersza dla daty {check_date!s} "
+				f"w tabeli {self.get_table_mark(currency).capitalize()}."
+			)
+		return rate
 
-		table: ExchangeTable = self.get_table(table_mark)
 
-		date_row: list[str]
-		day_cnt = 0
-		# Nie wszystkie daty są uwzględnione w tabeli - w weekendy i święta
-		# NBP nie publikuje kursów. Należy wtedy przyjąć ostatni opublikowany
-		# kurs. Dlatego odczytując kurs sprawdzamy najpierw dostępność
-		# danej daty. Jeśli dla daty nie ma kursu, próbujemy
-		# odczytać za dzień poprzedni, następnie za dwa dni wstecz itp.
-		# Przyjmujemy, że przerwa w publikowaniu kursów nie powinna być dłuższa
-		# niż 4 dni.
-		while day_cnt < 4:
-			try:
-				# Obliczamy, o ile dni wstecz się cofnąć.
-				# Dla pierwszego przebiegu pętli będzie to 0.
-				date_row = table[check_date - timedelta(day_cnt)]
-			except KeyError:
-				day_cnt += 1 # Jeśli nie udało się odczytać kursu, cofamy się o dzień.
-			else:
-				break
-		else:
+class TablesPool():
+	"""Zbiór obiektów klasy `TablesManager` dla wielu lat.
+
+	Obiekt klasy `TablesManager` udostępnia kursy tylko z jednego roku.
+	Ta klasa tworzy je w miarę potrzeby dla kolejnych lat, pozwalając
+	odczytywać kursy z dowolnego dnia. Domyślnie przechowuje obiekty dla
+	wszystkich lat, z których odczytano kursy. Aby ograniczyć zużycie
+	pamięci, można przechowywać jednocześnie najwyżej `max_years` obiektów -
+	po przekroczeniu tej liczby usuwany jest ten, który był najdawniej
+	używany. Przy danych z wielu lat, nieuporządkowanych według dat, tabele
+	mogą być wtedy wielokrotnie wczytywane ponownie. Kursy są
+	w pierwszej kolejności odczytywane z migawki kursów, jeśli ją podano,
+	a tabele są wczytywane tylko dla kursów, których migawka nie zawiera.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`DEFAULT_MAX_YEARS` -- Domyślna wartość atrybutu `max_years`.
+	`PREFETCH_WORKERS` -- Liczba wątków używanych przez metodę `prefetch()`.
+	`max_years` -- Liczba całkowita oznaczająca, dla ilu lat jednocześnie
+	przechowywane są tabele kursów, albo `None`, jeżeli liczba lat nie jest
+	ograniczona.
+	`snapshot` -- Obiekt klasy `snapshot.Snapshot` albo `None`.
+	`get_manager` -- Metoda zwracająca obiekt `TablesManager` dla danego roku.
+	`prefetch` -- Metoda pobierająca równolegle pliki z wybranymi tabelami.
+	`discard` -- Metoda usuwająca tabele i kursy z wybranego roku.
+	`get_exchange_ratio` -- Metoda zwracająca kurs w PLN wybranej waluty
+	w wybranym dniu.
+	`get_exchange_ratio_async` -- Współprogram zwracający kurs w PLN wybranej
+	waluty w wybranym dniu bez blokowania pętli zdarzeń.
+
+	Podobnie jak obiekty klasy `TablesManager`, obiekty tej klasy mogą być
+	jednocześnie używane przez wiele wątków i zadań `asyncio`.
+	"""
+	DEFAULT_MAX_YEARS: int|None = None
+	PREFETCH_WORKERS: int = 4
+
+	def __init__(
+			self,
+			tmp_dir: 'TemporaryDirectory[str]|LazyTemporaryDirectory',
+			cache: TablesCache|None = None,
+			max_years: int|None = DEFAULT_MAX_YEARS,
+			stats: Stats|None = None,
+			snapshot: 'Snapshot|None' = None,
+		) -> None:
+		"""Metoda inicjalizująca obiekty klasy `TablesPool`.
+
+		Przyjmuje następujące parametry:
+		`tmp_dir` -- Obiekt katalogu tymczasowego do użytku roboczego.
+		`cache` -- Opcjonalnie, obiekt klasy `cache.TablesCache` przekazywany
+		tworzonym obiektom `TablesManager`.
+		`max_years` -- Opcjonalnie, liczba całkowita oznaczająca, dla ilu lat
+		jednocześnie przechowywane są tabele kursów, albo `None` (domyślnie),
+		by nie ograniczać liczby lat. Nie może być mniejsza niż 2, gdyż kursy
+		z początku stycznia mogą wymagać tabel z poprzedniego roku.
+		`stats` -- Opcjonalnie, obiekt klasy `stats.Stats` przekazywany
+		tworzonym obiektom `TablesManager`, w którym zapisywana jest też
+		liczba odczytów kursów spoza pamięci podręcznej.
+		`snapshot` -- Opcjonalnie, obiekt klasy `snapshot.Snapshot`, z którego
+		odczytywane są kursy.
+		"""
+		if max_years is not None and max_years < 2:
 			raise ValueError(
-				f"brak wiersza dla daty {check_date!s} "
-				f"w tabeli {table_mark.capitalize()}."
-			)
+				"liczba jednocześnie przechowywanych lat nie może być mniejsza niż 2.")
+		self.max_years: int|None = max_years
+		self._tmpdir: TemporaryDirectory[str]|LazyTemporaryDirectory = tmp_dir
+		self._cache: TablesCache|None = cache
+		self._stats: Stats|None = stats
+		self.snapshot: Snapshot|None = snapshot
+		# Słownik zachowuje kolejność wstawiania kluczy - ostatnio używane lata
+		# przenosimy na jego koniec, najdawniej używane są więc na początku.
+		self._managers: collections.OrderedDict[int, TablesManager] = (
+			collections.OrderedDict())
+		# Blokada chroniąca słownik `_managers`.
+		self._lock: threading.Lock = threading.Lock()
+		# Już odczytane kursy - kluczami są pary złożone z kodu waluty i daty.
+		self._rates: dict[tuple[str, date], Decimal] = {}
 
-		return locale.atof( # type: ignore
-			date_row[self._currency_lookup[currency]], Decimal) # type: ignore
+	def __getstate__(self) -> dict[str, typing.Any]:
+		# Blokad nie można serializować - obiekt przekazywany do innego
+		# procesu otrzymuje nową blokadę.
+		state: dict[str, typing.Any] = self.__dict__.copy()
+		del state['_lock']
+		return state
+
+	def __setstate__(self, state: dict[str, typing.Any]) -> None:
+		self.__dict__.update(state)
+		self._lock = threading.Lock()
+
+	def get_manager(self, year: int) -> TablesManager:
+		"""Zwraca obiekt klasy `TablesManager` dla roku `year`, tworząc go
+		jeśli nie jest przechowywany."""
+		with self._lock:
+			manager: TablesManager|None = self._managers.get(year)
+			if manager is not None:
+				self._managers.move_to_end(year)
+				return manager
+			manager = TablesManager(self._tmpdir, year, self._cache, self._stats)
+			self._managers[year] = manager
+			if self.max_years is not None and len(self._managers) > self.max_years:
+				self._managers.popitem(last=False)
+			return manager
+
+	def prefetch(self, tables: typing.Iterable[tuple[str, int]]) -> None:
+		"""Pobiera równolegle pliki z podanymi tabelami kursów.
+
+		Funkcja przyjmuje jeden argument, `tables`, będący kolekcją par
+		złożonych z oznaczenia tabeli NBP i roku. Pliki są pobierane, ale
+		nie parsowane - odbywa się to dopiero przy pierwszym odczycie kursu
+		z danej tabeli, który nie wymaga już jednak połączenia z siecią.
+
+		Tabele z lat objętych migawką kursów nie są pobierane. Błędy
+		pobierania są pomijane - jeżeli dana tabela okaże się potrzebna,
+		błąd wystąpi ponownie przy próbie odczytu kursu, gdzie zostanie
+		zgłoszony wraz z numerem wiersza, którego dotyczy.
+		"""
+		managers: list[tuple[TablesManager, str]] = [
+			(self.get_manager(year), table) for table, year in set(tables)
+			if self.snapshot is None or not self.snapshot.covers(year)
+		]
+		if not managers:
+			return
+		from concurrent.futures import ThreadPoolExecutor
+		with ThreadPoolExecutor(self.PREFETCH_WORKERS) as executor:
+			for manager, table in managers:
+				executor.submit(manager.get_table_file, table)
+
+	def discard(self, year: int) -> None:
+		"""Usuwa przechowywane tabele i odczytane kursy z roku `year`.
+
+		Przy kolejnym odczycie kursu z tego roku tabele zostaną wczytane
+		ponownie. Jest to potrzebne w długo działających programach, gdyż
+		tabele za bieżący rok są uzupełniane o nowe kursy w każdym dniu
+		roboczym. Pliki pobrane do katalogu roboczego są usuwane, a pliki
+		w pamięci podręcznej są pobierane ponownie, jeśli nie są już aktualne.
+		"""
+		with self._lock:
+			manager: TablesManager|None = self._managers.pop(year, None)
+		# Kursy z początku następnego roku mogą pochodzić z tabel z roku `year`.
+		self._rates = {
+			key: rate for key, rate in self._rates.items()
+			if key[1].year not in (year, year + 1)
+		}
+		if self._cache is None:
+			for table in TablesManager.CURRENCY_MAP:
+				# Usuwany obiekt może właśnie pobierać lub wczytywać plik.
+				lock: typing.ContextManager[typing.Any] = contextlib.nullcontext()
+				if manager is not None:
+					lock = manager._table_locks[table]
+				with lock, contextlib.suppress(FileNotFoundError):
+					os.remove(os.path.join(
+						self._tmpdir.name, f'archiwum_tab_{table}_{year}.csv'))
+
+	def get_exchange_ratio(self, currency: str, check_date: date) -> Decimal:
+		"""Zwraca kurs danej waluty z danego dnia, wyrażony w PLN.
+
+		Funkcja przyjmuje takie same argumenty jak
+		`TablesManager.get_exchange_ratio()`. W odróżnieniu od niej, szukając
+		kursu z poprzednich dni sięga również do tabel z poprzedniego roku,
+		co jest potrzebne dla pierwszych dni stycznia.
+		"""
+		rate: Decimal|None = self._rates.get((currency, check_date))
+		if rate is not None:
+			return rate
+		if self._stats is not None:
+			self._stats.count('rate_misses')
+		if self.snapshot is not None:
+			rate = self.snapshot.get_rate(currency, check_date)
+			if rate is not None:
+				self._rates[currency, check_date] = rate
+				return rate
+		manager: TablesManager = self.get_manager(check_date.year)
+		rate = manager.find_exchange_ratio(currency, check_date)
+		if rate is not None:
+			self._rates[currency, check_date] = rate
+			return rate
+		# Tabela z danego roku nie zawiera kursów sprzed pierwszej publikacji
+		# w tym roku. Dla pierwszych dni stycznia sprawdzamy więc, czy kurs
+		# nie został opublikowany w ostatnich dniach poprzedniego roku.
+		day_cnt = 1
+		while day_cnt < 4:
+			day: date = check_date - timedelta(day_cnt)
+			if day.year != check_date.year:
+				rate = self.get_manager(day.year).get_published_rate(currency, day)
+				if rate is not None:
+					self._rates[currency, check_date] = rate
+					return rate
+			day_cnt += 1
+		raise ValueError(
+			f"brak wiersza dla daty {check_date!s} "
+			f"w tabeli {manager.get_table_mark(currency).capitalize()}."
+		)
+
+	async def get_exchange_ratio_async(
+			self,
+			currency: str,
+			check_date: date,
+		) -> Decimal:
+		"""Zwraca kurs danej waluty z danego dnia tak jak metoda
+		`get_exchange_ratio()`, ale bez blokowania pętli zdarzeń `asyncio`.
+
+		Już odczytane kursy są zwracane od razu, a pozostałe są odczytywane
+		w osobnym wątku, gdyż może to wymagać pobrania i wczytania tabel.
+		"""
+		rate: Decimal|None = self._rates.get((currency, check_date))
+		if rate is None and self.snapshot is not None:
+			rate = self.snapshot.get_rate(currency, check_date)
+		if rate is not None:
+			return rate
+		import asyncio
+		return await asyncio.to_thread(
+			self.get_exchange_ratio, currency, check_date)
+
+
+def _parse_ymd(value: str, separator: str) -> date|None:
+	# Szybkie parsowanie dat w formacie RRRR-MM-DD z podanym separatorem.
+	# Zwraca `None` dla łańcuchów o innej postaci - wtedy należy użyć
+	# `datetime.strptime()`, który może je zaakceptować, np. gdy miesiąc
+	# lub dzień nie jest poprzedzony zerem.
+	if (
+		len(value) == 10
+		and value[4] == separator
+		and value[7] == separator
+		and (value[:4] + value[5:7] + value[8:]).isdecimal()
+	):
+		return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+	return # type: ignore[return-value]
+
+
+def _parse_dmy(value: str, separator: str) -> date|None:
+	# Szybkie parsowanie dat w formacie DD.MM.RRRR z podanym separatorem,
+	# na zasadach takich jak w `_parse_ymd()`.
+	if (
+		len(value) == 10
+		and value[2] == separator
+		and value[5] == separator
+		and (value[:2] + value[3:5] + value[6:]).isdecimal()
+	):
+		return date(int(value[6:]), int(value[3:5]), int(value[:2]))
+	return # type: ignore[return-value]
+
+
+class DateParser():
+	"""Interfejs do odczytywania dat transakcji w danym formacie.
+
+	Odczyt dat za pomocą `datetime.strptime()` jest stosunkowo kosztowny,
+	a pliki z transakcjami zawierają zwykle wiele wierszy z tą samą datą.
+	Obiekty tej klasy zapamiętują więc daty odczytane z kolejnych łańcuchów.
+	Dla najczęściej używanych formatów dat (`FAST_FORMATS`) łańcuchy
+	są ponadto odczytywane bezpośrednio, bez użycia `datetime.strptime()`.
+
+	Obiekty tej klasy udostępniają następujące atrybuty:
+	`FAST_FORMATS` -- Zbiór formatów dat odczytywanych bez użycia
+	`datetime.strptime()`.
+	`MAX_CACHE_SIZE` -- Największa liczba zapamiętywanych dat.
+	`date_format` -- Łańcuch opisujący format dat, zgodny z
+	`datetime.strftime()`.
+	`parse` -- Metoda odczytująca datę z łańcucha.
+	`get_lookup_date` -- Metoda zwracająca datę, z której należy przyjąć kurs
+	wymiany dla transakcji z daty zapisanej w łańcuchu.
+	"""
+	_FAST_PARSERS: dict[str, typing.Callable[[str], date|None]] = {
+		'%Y-%m-%d': lambda value: _parse_ymd(value, '-'),
+		'%Y/%m/%d': lambda value: _parse_ymd(value, '/'),
+		'%d.%m.%Y': lambda value: _parse_dmy(value, '.'),
+	}
+	FAST_FORMATS: frozenset[str] = frozenset(_FAST_PARSERS)
+	MAX_CACHE_SIZE: int = 65536
+
+	def __init__(self, date_format: str, stats: Stats|None = None) -> None:
+		"""Metoda inicjalizująca obiekty klasy `DateParser`.
+
+		Przyjmuje parametr `date_format`, będący łańcuchem opisującym
+		format dat zgodnym z `datetime.strftime()`, i opcjonalnie `stats` -
+		obiekt klasy `stats.Stats`, w którym zapisywana jest liczba odczytów
+		dat spoza pamięci podręcznej.
+		"""
+		self.date_format: str = date_format
+		self._stats: Stats|None = stats
+		self._fast_parser: typing.Callable[[str], date|None]|None = (
+			self._FAST_PARSERS.get(date_format))
+		self._lookup_dates: dict[str, date] = {}
+
+	def parse(self, value: str) -> date:
+		"""Odczytuje datę z łańcucha `value`.
+
+		Jeżeli łańcuch nie odpowiada formatowi określonemu przez atrybut
+		`date_format`, zgłasza błąd `ValueError`.
+		"""
+		if self._fast_parser is not None:
+			parsed: date|None = self._fast_parser(value)
+			if parsed is not None:
+				return parsed
+		return datetime.strptime(value, self.date_format).date()
+
+	def get_lookup_date(self, value: str) -> date:
+		"""Zwraca datę, z której należy przyjąć kurs wymiany dla transakcji
+		z daty zapisanej w łańcuchu `value`.
+
+		Jeżeli data wypada w sobotę lub niedzielę, zwracany jest poprzedzający
+		ją piątek. Zwrócone daty są zapamiętywane, a po przekroczeniu
+		liczby `MAX_CACHE_SIZE` zapamiętanych dat są one zapominane.
+		Jeżeli łańcuch nie odpowiada formatowi określonemu przez atrybut
+		`date_format`, zgłasza błąd `ValueError`.
+		"""
+		try:
+			return self._lookup_dates[value]
+		except KeyError:
+			pass
+		if self._stats is not None:
+			self._stats.count('date_misses')
+		row_date: date = self.parse(value)
+		# Jeżeli data wypada w sobotę i niedzielę, zmieniamy ją na piątek.
+		# Odjęcie 4 od numeru dnia tygodnia oznacza, że sobota będzie miałą
+		# wartość 1, niedziela 2, pozostałe dni tygodnia - 0 i mniej.
+		# Wywołanie `max()` ustawia 0 dla pozostałych dni tygodnia.
+		# Następnie odejmujemy tyle dni, ile wynosi ta wartość, a więc
+		# jeżeli była to sobota lub niedziela, uzyskujemy ostatni piątek.
+		weekend_days: int = max(row_date.weekday() - 4, 0)
+		lookup_date: date = row_date - timedelta(days=weekend_days)
+		if len(self._lookup_dates) >= self.MAX_CACHE_SIZE:
+			self._lookup_dates.clear()
+		self._lookup_dates[value] = lookup_date
+		return lookup_date
+
+
+# Formaty dat sprawdzane przez `detect_date_column()` jeśli nie podano innych,
+# w kolejności od najbardziej prawdopodobnego.
+DATE_FORMATS: tuple[str, ...] = (
+	'%Y-%m-%d', '%Y/%m/%d', '%d.%m.%Y', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y',
+	'%x', '%Y%m%d',
+)
 
 
 class NBPDialect(csv.Dialect):
@@ -288,6 +1046,43 @@ class NBPDialect(csv.Dialect):
 	quoting: int = csv.QUOTE_NONE
 
 
+def detect_date_column(
+	sample: list[list[str]],
+	date_formats: typing.Sequence[str] = DATE_FORMATS,
+	columns: typing.Iterable[int]|None = None,
+) -> tuple[int, str]|None:
+	"""Ustala, która kolumna w pliku wejściowym zawiera daty i w jakim formacie.
+
+	Funkcja przyjmuje następujące argumenty:
+	`sample` -- Lista początkowych wierszy danych z pliku wejściowego.
+	`date_formats` -- Opcjonalnie, sekwencja łańcuchów opisujących formaty dat
+	zgodnych z `datetime.strftime()`. Domyślnie: `DATE_FORMATS`.
+	`columns` -- Opcjonalnie, indeksy kolumn, które należy sprawdzić.
+	Domyślnie sprawdzane są wszystkie kolumny.
+
+	Zwraca parę złożoną z indeksu kolumny i formatu dat, albo `None` jeżeli
+	żadna kolumna nie zawiera dat w żadnym z podanych formatów. Kolumna musi
+	zawierać datę w każdym wierszu próbki. Jeżeli warunek ten spełnia więcej
+	kolumn lub formatów, wybierany jest pierwszy format z `date_formats`
+	i pierwsza kolumna od lewej.
+	"""
+	if not sample:
+		return # type: ignore[return-value]
+	if columns is None:
+		columns = range(min(len(row) for row in sample))
+	columns = list(columns)
+	for date_format in date_formats:
+		parser: DateParser = DateParser(date_format)
+		for column in columns:
+			try:
+				for row in sample:
+					parser.parse(row[column])
+			except (IndexError, ValueError):
+				continue
+			return column, date_format
+	return # type: ignore[return-value]
+
+
 def get_column_index(
 	column: str|None = None,
 	labels: list[str] = [],
@@ -0,0 +1,264 @@
+# Copyright © 2007 Hubert Bielenia
+#
+# Oprogramowanie chronione licencją EUPL, Wersja 1.2.
+# Nie wolno korzystać z tego utworu w sposób inny niż
+# zgodnie z Licencją.
+# Kopia Licencji dostępna jest pod adresem:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Z wyjątkiem przypadków wymaganych obowiązującym prawem
+# lub uzgodnionych na piśmie, oprogramowanie
+# rozpowszechniane w ramach Licencji jest rozpowszechniane
+# w „ISTNIEJĄCEJ FORMIE",
+# BEZ JAKIEGOKOLWIEK RODZAJU GWARANCJI LUB WARUNKÓW,
+# wyraźnych lub dorozumianych.
+# W celu poznania szczegółowych postanowień dotyczących
+# pozwoleń i ograniczeń w ramach Licencji, należy zapoznać
+# się z treścią licencji.
+"""Wektorowe przetwarzanie wierszy danych z użyciem biblioteki NumPy.
+
+Biblioteka NumPy nie jest wymagana do działania programu - jeżeli nie jest
+zainstalowana, atrybut `numpy` tego modułu ma wartość `None`, a próba
+utworzenia obiektu klasy `VectorizedConverter` kończy się błędem.
+
+Zawiera następujące klasy:
+`VectorizedConverter` -- Klasa przetwarzająca wiersze tak jak
+`convert.RowConverter`, ale całymi partiami, za pomocą operacji na tablicach.
+"""
+import decimal
+import itertools
+import locale
+import typing
+
+from transactions2pln.convert import RowConverter, _str_from_decimal
+
+# Biblioteka NumPy nie musi być zainstalowana, również tam, gdzie
+# sprawdzane są typy.
+try:
+	import numpy # type: ignore[import-not-found, unused-ignore]
+except ImportError:
+	numpy = None # type: ignore[assignment, unused-ignore]
+
+# Największa liczba cyfr liczby całkowitej, dla której operacje na tablicach
+# typu `int64` są dokładne.
+_MAX_DIGITS: int = 18
+# Kolejne potęgi 10 mieszczące się w typie `int64`.
+_POWERS: typing.Any = (
+	None if numpy is None
+	else 10 ** numpy.arange(_MAX_DIGITS + 1, dtype=numpy.int64)
+)
+
+
+def _digits(values: typing.Any) -> typing.Any:
+	# Zwraca liczbę cyfr nieujemnych liczb całkowitych z tablicy `values`,
+	# przy czym 0 ma jedną cyfrę.
+	return numpy.maximum(numpy.searchsorted(_POWERS, values, 'right'), 1)
+
+
+def _round_half_even(values: typing.Any, places: typing.Any) -> typing.Any:
+	# Dzieli nieujemne liczby całkowite z tablicy `values` przez 10 do potęgi
+	# `places` i zaokrągla wynik tak jak `decimal.ROUND_HALF_EVEN`.
+	divisor: typing.Any = _POWERS[places]
+	quotient, remainder = numpy.divmod(values, divisor)
+	twice: typing.Any = remainder * 2
+	return quotient + (
+		(twice > divisor) | ((twice == divisor) & (quotient % 2 == 1)))
+
+
+class VectorizedConverter(RowConverter):
+	"""Przelicza wartości transakcji na PLN całymi partiami wierszy.
+
+	Obiekty tej klasy przyjmują takie same parametry i dają takie same wyniki
+	jak obiekty klasy `convert.RowConverter`, ale zamiast przetwarzać wiersze
+	pojedynczo, odczytują z partii wierszy kolumny z datami, walutami
+	i kwotami do tablic NumPy. Kursy są wyszukiwane raz dla każdej
+	występującej w partii pary waluty i daty, a kwoty w PLN obliczane
+	na liczbach całkowitych w zapisie stałoprzecinkowym, z zaokrąglaniem
+	takim jak przy obliczeniach na obiektach `decimal.Decimal` w bieżącym
+	kontekście arytmetycznym.
+
+	Wiersze, których nie da się przetworzyć w ten sposób - np. z kwotami
+	w nietypowym zapisie, zbyt dużymi kwotami lub błędnymi danymi - są
+	przetwarzane pojedynczo metodą `convert()`, która zgłasza też wyjątki
+	z numerem błędnego wiersza. Jeśli kolumna z datą nie jest znana,
+	wszystkie wiersze są przetwarzane pojedynczo.
+
+	Obiekty tej klasy udostępniają, poza atrybutami klasy `RowConverter`,
+	następujące atrybuty:
+	`BATCH_SIZE` -- Liczba wierszy przetwarzanych w jednej partii.
+	`convert_batch` -- Metoda przetwarzająca partię wierszy.
+	"""
+	BATCH_SIZE: int = 8192
+
+	def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+		"""Metoda inicjalizująca obiekty klasy `VectorizedConverter`.
+
+		Przyjmuje takie same parametry jak klasa `RowConverter`. Jeżeli
+		biblioteka NumPy nie jest zainstalowana, zgłasza wyjątek
+		`RuntimeError`.
+		"""
+		if numpy is None:
+			raise RuntimeError(
+				"przetwarzanie wektorowe wymaga biblioteki NumPy, "
+				"którą można zainstalować poleceniem \"pip install numpy\"."
+			)
+		super().__init__(*args, **kwargs)
+
+	def convert_rows(
+			self,
+			rows: typing.Iterable[list[str]],
+			start: int = 0,
+		) -> typing.Iterator[list[str]]:
+		"""Przetwarza kolejne wiersze z `rows` tak jak
+		`RowConverter.convert_rows()`, odczytując je partiami
+		po `BATCH_SIZE` wierszy."""
+		context: decimal.Context = self.get_context()
+		if (
+			self.date_column is None
+			or context.prec > _MAX_DIGITS
+			or context.rounding != decimal.ROUND_HALF_EVEN
+		):
+			yield from super().convert_rows(rows, start)
+			return
+		iterator: typing.Iterator[list[str]] = iter(rows)
+		row_number: int = start
+		while batch := list(itertools.islice(iterator, self.BATCH_SIZE)):
+			for row, result in zip(batch, self.convert_batch(batch)):
+				row_number += 1
+				if result is None:
+					yield self.convert(row, row_number)
+				else:
+					row.append(result[0])
+					row.append(result[1])
+					yield row
+
+	def convert_batch(
+			self,
+			rows: list[list[str]],
+		) -> list[tuple[str, str]|None]:
+		"""Oblicza kursy wymiany i kwoty w PLN dla wierszy z listy `rows`.
+
+		Zwraca listę, która dla każdego wiersza zawiera parę łańcuchów
+		z kursem i kwotą w PLN, takich jak dodawane do wiersza przez metodę
+		`convert()`, albo `None`, jeśli wiersz musi zostać przetworzony
+		pojedynczo. Nie zgłasza wyjątków związanych z treścią wierszy.
+		"""
+		assert self.date_column is not None
+		amount_column: int = self.amount_column or -1
+		try:
+			dates: list[str] = [row[self.date_column] for row in rows]
+			amounts: list[str] = [row[amount_column] for row in rows]
+			currencies: list[str] = (
+				[self.currency] if self.currency is not None
+				else [row[self.currency_column] for row in rows]
+			)
+		except IndexError:
+			return [None] * len(rows)
+		# Kwoty w postaci bajtów - tylko cyfry ASCII są odczytywane
+		# wektorowo, pozostałe zapisy obsługuje `decimal.Decimal`.
+		amount_values: typing.Any
+		try:
+			amount_values = numpy.array(amounts, dtype=numpy.bytes_)
+		except UnicodeEncodeError:
+			amount_values = numpy.char.encode(amounts, 'ascii', 'replace')
+
+		# Kursy dla każdej pary waluty i daty występującej w partii.
+		unique_dates, date_index = numpy.unique(dates, return_inverse=True)
+		unique_currencies, currency_index = numpy.unique(
+			currencies, return_inverse=True)
+		unique_keys, key_index = numpy.unique(
+			currency_index * len(unique_dates) + date_index, return_inverse=True)
+		key_count: int = len(unique_keys)
+		rate_coefficients: typing.Any = numpy.zeros(key_count, numpy.int64)
+		rate_scales: typing.Any = numpy.zeros(key_count, numpy.int64)
+		rate_valid: typing.Any = numpy.zeros(key_count, numpy.bool_)
+		rate_strings: list[str] = [''] * key_count
+		for i, key in enumerate(unique_keys.tolist()):
+			currency_key, date_key = divmod(key, len(unique_dates))
+			try:
+				rate: decimal.Decimal = self.tables.get_exchange_ratio(
+					str(unique_currencies[currency_key]),
+					self.date_parser.get_lookup_date(str(unique_dates[date_key])),
+				)
+			except Exception:
+				continue
+			sign, digits, exponent = rate.as_tuple()
+			if (
+				sign
+				or not isinstance(exponent, int)
+				or exponent > 0
+				or len(digits) > _MAX_DIGITS
+			):
+				continue
+			rate_coefficients[i] = int(''.join(map(str, digits)))
+			rate_scales[i] = -exponent
+			rate_valid[i] = True
+			rate_strings[i] = _str_from_decimal(rate, self.decimal_point)
+
+		# Kwoty jako liczby całkowite z liczbą cyfr po przecinku.
+		negative: typing.Any = numpy.char.startswith(amount_values, b'-')
+		unsigned: typing.Any = numpy.where(
+			negative, numpy.char.lstrip(amount_values, b'-'), amount_values)
+		parts: typing.Any = numpy.char.partition(unsigned, b'.')
+		integer_part: typing.Any = parts[:, 0]
+		fraction_part: typing.Any = parts[:, 2]
+		amount_scales: typing.Any = numpy.char.str_len(fraction_part)
+		valid: typing.Any = (
+			rate_valid[key_index]
+			& (
+				numpy.char.str_len(amount_values)
+				== numpy.char.str_len(unsigned) + negative
+			)
+			& numpy.char.isdigit(integer_part)
+			& ((parts[:, 1] == b'') | numpy.char.isdigit(fraction_part))
+			& (
+				numpy.char.str_len(integer_part) + amount_scales <= _MAX_DIGITS)
+		)
+		amount_coefficients: typing.Any = numpy.where(
+			valid, numpy.char.add(integer_part, fraction_part), b'0',
+		).astype(numpy.int64)
+		rates: typing.Any = rate_coefficients[key_index]
+		valid &= _digits(amount_coefficients) + _digits(rates) <= _MAX_DIGITS
+		amount_coefficients[~valid] = 0
+
+		# Iloczyn kwoty i kursu jest zaokrąglany do liczby cyfr znaczących
+		# określonej przez kontekst arytmetyczny, tak jak przy mnożeniu
+		# obiektów `decimal.Decimal`.
+		prec: int = self.get_context().prec
+		products: typing.Any = amount_coefficients * rates
+		scales: typing.Any = amount_scales + rate_scales[key_index]
+		dropped: typing.Any = numpy.maximum(_digits(products) - prec, 0)
+		products = _round_half_even(products, dropped)
+		scales -= dropped
+
+		# Zaokrąglenie do groszy, tak jak `quantize(Decimal('0.01'))`.
+		# Wynik nie może mieć więcej cyfr niż określa kontekst arytmetyczny.
+		down: typing.Any = numpy.clip(scales - 2, 0, _MAX_DIGITS)
+		up: typing.Any = numpy.clip(2 - scales, 0, _MAX_DIGITS)
+		valid &= (scales - 2 <= _MAX_DIGITS) & (
+			_digits(products) - down + up <= _MAX_DIGITS)
+		products[~valid] = 0
+		grosze: typing.Any = _round_half_even(products, down) * _POWERS[up]
+		# Kwoty są zapisywane tak jak przez `locale.str()`, czyli
+		# po zamianie na liczbę zmiennoprzecinkową, która musi więc
+		# dokładnie odpowiadać liczbie groszy.
+		decimal_point: str = (
+			str(locale.localeconv()['decimal_point'])
+			if self.decimal_point is None
+			else self.decimal_point
+		)
+		valid &= (_digits(grosze) <= prec) & (grosze < 2 ** 53)
+		values: typing.Any = grosze / 100
+		values = numpy.where(negative, -values, values)
+		amount_strings: list[str] = numpy.char.replace(
+			numpy.char.mod('%.12g', values),
+			'.',
+			decimal_point,
+		).tolist()
+
+		return [
+			(rate_strings[key], amount) if is_valid else None
+			for key, amount, is_valid in zip(
+				key_index.tolist(), amount_strings, valid.tolist())
+		]